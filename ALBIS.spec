@@ -40,7 +40,7 @@ datas = [("frontend", "frontend")]
 if os.path.exists("albis.config.json"):
     datas.append(("albis.config.json", "."))
 binaries: list = []
-hiddenimports: list = ["backend.app", "backend.config"]
+hiddenimports: list = ["backend.app", "backend.config", "backend.services.series_worker"]
 if sys.platform == "darwin":
     hiddenimports += ["AppKit", "Foundation", "objc", "Cocoa"]
 
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import multiprocessing
 import os
 import socket
 import subprocess
@@ -525,4 +526,6 @@ def main() -> None:
         pass
 
 if __name__ == "__main__":
+    # Series jobs run in spawned worker processes; frozen builds must dispatch them here.
+    multiprocessing.freeze_support()
     main()
@@ -48,13 +48,26 @@ try:
         _strip_image_ext,
         _write_tiff,
     )
+    from .services.remote_ingest import RemoteIngestQueue
+    from .services.remote_recorder import RemoteRecorderDeps, RemoteRecorderService
     from .services.remote_stream import (
+        remote_attach_meta as _remote_attach_meta,
+        remote_configure as _remote_configure,
         remote_extract_metadata as _remote_extract_metadata,
+        remote_frame_at as _remote_frame_at,
+        remote_frame_bytes as _remote_frame_bytes,
+        remote_history as _remote_history,
+        remote_pack_peak_sets as _remote_pack_peak_sets,
         remote_parse_meta as _remote_parse_meta,
+        remote_raw_frame as _remote_raw_frame,
+        remote_raw_layout as _remote_raw_layout,
         remote_read_image_bytes as _remote_read_image_bytes,
         remote_safe_source_id as _remote_safe_source_id,
         remote_snapshot as _remote_snapshot,
         remote_store_frame as _remote_store_frame,
+        remote_store_raw as _remote_store_raw,
+        remote_subscribe as _remote_subscribe,
+        remote_unpack_peak_sets as _remote_unpack_peak_sets,
     )
     from .services.series_ops import (
         iter_sum_groups as _iter_sum_groups,
@@ -62,6 +75,10 @@ try:
         mask_slices as _mask_slices,
     )
     from .services.series_summing import SeriesSummingDeps, SeriesSummingService
+    from .services.series_worker import run_series_job as _run_series_job
+    from .services.hit_finding import HitFindingDeps, HitFindingService
+    from .services.series_follow import SeriesFollowDeps, SeriesFollowService
+    from .services.series_index import SeriesIndexDeps, SeriesIndexService
     from .services.hdf5_stack import HDF5StackService
     from .services.simplon import (
         simplon_base as _simplon_base,
@@ -102,13 +119,26 @@ except ImportError:  # pragma: no cover - supports `python backend/app.py`
         _strip_image_ext,
         _write_tiff,
     )
+    from services.remote_ingest import RemoteIngestQueue
+    from services.remote_recorder import RemoteRecorderDeps, RemoteRecorderService
     from services.remote_stream import (
+        remote_attach_meta as _remote_attach_meta,
+        remote_configure as _remote_configure,
         remote_extract_metadata as _remote_extract_metadata,
+        remote_frame_at as _remote_frame_at,
+        remote_frame_bytes as _remote_frame_bytes,
+        remote_history as _remote_history,
+        remote_pack_peak_sets as _remote_pack_peak_sets,
         remote_parse_meta as _remote_parse_meta,
+        remote_raw_frame as _remote_raw_frame,
+        remote_raw_layout as _remote_raw_layout,
         remote_read_image_bytes as _remote_read_image_bytes,
         remote_safe_source_id as _remote_safe_source_id,
         remote_snapshot as _remote_snapshot,
         remote_store_frame as _remote_store_frame,
+        remote_store_raw as _remote_store_raw,
+        remote_subscribe as _remote_subscribe,
+        remote_unpack_peak_sets as _remote_unpack_peak_sets,
     )
     from services.series_ops import (
         iter_sum_groups as _iter_sum_groups,
@@ -116,6 +146,10 @@ except ImportError:  # pragma: no cover - supports `python backend/app.py`
         mask_slices as _mask_slices,
     )
     from services.series_summing import SeriesSummingDeps, SeriesSummingService
+    from services.series_worker import run_series_job as _run_series_job
+    from services.hit_finding import HitFindingDeps, HitFindingService
+    from services.series_follow import SeriesFollowDeps, SeriesFollowService
+    from services.series_index import SeriesIndexDeps, SeriesIndexService
     from services.hdf5_stack import HDF5StackService
     from services.simplon import (
         simplon_base as _simplon_base,
@@ -153,6 +187,19 @@ class RuntimeState:
     max_scan_depth: int = -1
     max_upload_mb: int = 0
     max_upload_bytes: int = 0
+    job_workers: int = 2
+    job_isolation: str = "process"
+    job_max_rss_mb: int = 0
+    job_checkpoint_interval_s: float = 60.0
+    job_result_cache_mb: int = 2048
+    job_decode_workers: int = 0
+    remote_ring_frames: int = 64
+    remote_ring_mb: int = 256
+    remote_max_mb: int = 1024
+    remote_compression: str = "zstd"
+    remote_decode_workers: int = 0
+    remote_queue_depth: int = 32
+    remote_queue_policy: str = "reject"
 
     def apply_config(self, payload: dict[str, Any]) -> None:
         self.config = payload
@@ -161,11 +208,52 @@ class RuntimeState:
         self.max_scan_depth = get_int(self.config, ("data", "max_scan_depth"), -1)
         self.max_upload_mb = max(0, get_int(self.config, ("data", "max_upload_mb"), 0))
         self.max_upload_bytes = self.max_upload_mb * 1024 * 1024 if self.max_upload_mb > 0 else 0
+        self.job_workers = max(1, get_int(self.config, ("jobs", "workers"), 2))
+        self.job_isolation = get_str(self.config, ("jobs", "isolation"), "process").lower()
+        self.job_max_rss_mb = max(0, get_int(self.config, ("jobs", "max_rss_mb"), 0))
+        self.job_checkpoint_interval_s = max(
+            0.0, get_float(self.config, ("jobs", "checkpoint_interval_s"), 60.0)
+        )
+        self.job_result_cache_mb = max(0, get_int(self.config, ("jobs", "result_cache_mb"), 2048))
+        self.job_decode_workers = max(0, get_int(self.config, ("jobs", "decode_workers"), 0))
+        self.remote_ring_frames = max(1, get_int(self.config, ("remote", "ring_frames"), 64))
+        self.remote_ring_mb = max(0, get_int(self.config, ("remote", "ring_mb"), 256))
+        self.remote_max_mb = max(0, get_int(self.config, ("remote", "max_mb"), 1024))
+        self.remote_compression = get_str(self.config, ("remote", "compression"), "zstd").lower()
+        self.remote_decode_workers = max(0, get_int(self.config, ("remote", "decode_workers"), 0))
+        self.remote_queue_depth = max(1, get_int(self.config, ("remote", "queue_depth"), 32))
+        self.remote_queue_policy = get_str(
+            self.config, ("remote", "queue_policy"), "reject"
+        ).lower()
 
 
 runtime_state = RuntimeState(config=CONFIG, config_path=CONFIG_PATH, data_dir=DATA_DIR)
 runtime_state.apply_config(CONFIG)
 
+
+remote_ingest = RemoteIngestQueue(
+    workers=runtime_state.remote_decode_workers,
+    depth=runtime_state.remote_queue_depth,
+    policy=runtime_state.remote_queue_policy,
+)
+
+
+def _configure_remote_rings() -> None:
+    _remote_configure(
+        ring_frames=runtime_state.remote_ring_frames,
+        ring_mb=runtime_state.remote_ring_mb,
+        max_mb=runtime_state.remote_max_mb,
+        compression=runtime_state.remote_compression,
+    )
+    remote_ingest.configure(
+        workers=runtime_state.remote_decode_workers,
+        depth=runtime_state.remote_queue_depth,
+        policy=runtime_state.remote_queue_policy,
+    )
+
+
+_configure_remote_rings()
+
 ALBIS_VERSION = "0.8.1"
 
 app = FastAPI(title="ALBIS — ALBIS WEB VIEW", version=ALBIS_VERSION)
@@ -253,6 +341,9 @@ async def _log_startup_banner() -> None:
     pid = os.getpid()
     logger.info("ALBIS data dir (pid=%s): %s", pid, runtime_state.data_dir)
     logger.info("ALBIS config (pid=%s): %s", pid, runtime_state.config_path)
+    resumable = series_summing.list_resumable_jobs()
+    if resumable:
+        logger.info("%d interrupted series job(s) can be resumed", len(resumable))
 
 
 @app.middleware("http")
@@ -511,6 +602,8 @@ _resolve_node = hdf5_stack.resolve_node
 _resolve_dataset = hdf5_stack.resolve_dataset
 _resolve_dataset_view = hdf5_stack.resolve_dataset_view
 _extract_frame = hdf5_stack.extract_frame
+_extract_frames = hdf5_stack.extract_frames
+_frame_chunk_depth = hdf5_stack.frame_chunk_depth
 
 series_summing = SeriesSummingService(
     SeriesSummingDeps(
@@ -533,11 +626,87 @@ series_summing = SeriesSummingService(
         mask_slices=_mask_slices,
         resolve_dataset_view=_resolve_dataset_view,
         extract_frame=_extract_frame,
+        extract_frames=_extract_frames,
+        frame_chunk_depth=_frame_chunk_depth,
         find_pixel_mask=_find_pixel_mask,
+        get_job_workers=lambda: runtime_state.job_workers,
+        get_job_isolation=lambda: runtime_state.job_isolation,
+        get_job_max_rss_mb=lambda: runtime_state.job_max_rss_mb,
+        worker_target=_run_series_job,
+        get_checkpoint_interval_s=lambda: runtime_state.job_checkpoint_interval_s,
+        get_result_cache_mb=lambda: runtime_state.job_result_cache_mb,
+        get_decode_workers=lambda: runtime_state.job_decode_workers,
     )
 )
 
 
+@app.on_event("shutdown")
+async def _stop_job_workers() -> None:
+    series_summing.shutdown()
+
+
+series_index = SeriesIndexService(
+    SeriesIndexDeps(
+        data_dir=runtime_state.data_dir,
+        logger=logger,
+        ensure_hdf5_stack=_ensure_hdf5_stack,
+        get_h5py=_get_h5py,
+        resolve_image_file=_resolve_image_file,
+        resolve_dataset_view=_resolve_dataset_view,
+        extract_frames=_extract_frames,
+        frame_chunk_depth=_frame_chunk_depth,
+    )
+)
+
+series_follow = SeriesFollowService(
+    SeriesFollowDeps(
+        logger=logger,
+        ensure_hdf5_stack=_ensure_hdf5_stack,
+        get_h5py=_get_h5py,
+        resolve_image_file=_resolve_image_file,
+        image_ext_name=_image_ext_name,
+        resolve_series_files=_resolve_series_files,
+        read_tiff=_read_tiff,
+        read_cbf=_read_cbf,
+        read_cbf_gz=_read_cbf_gz,
+        read_edf=_read_edf,
+        resolve_dataset_view=_resolve_dataset_view,
+        extract_frames=_extract_frames,
+        frame_chunk_depth=_frame_chunk_depth,
+        find_pixel_mask=_find_pixel_mask,
+    )
+)
+
+
+@app.on_event("shutdown")
+async def _stop_follow_sessions() -> None:
+    series_follow.shutdown()
+
+
+hit_finding = HitFindingService(
+    HitFindingDeps(
+        data_dir=runtime_state.data_dir,
+        get_allow_abs_paths=lambda: runtime_state.allow_abs_paths,
+        is_within=_is_within,
+        logger=logger,
+        ensure_hdf5_stack=_ensure_hdf5_stack,
+        get_h5py=_get_h5py,
+        resolve_image_file=_resolve_image_file,
+        resolve_dataset_view=_resolve_dataset_view,
+        extract_frames=_extract_frames,
+        frame_chunk_depth=_frame_chunk_depth,
+        find_pixel_mask=_find_pixel_mask,
+        get_decode_workers=lambda: runtime_state.job_decode_workers,
+        get_job_workers=lambda: runtime_state.job_workers,
+    )
+)
+
+
+@app.on_event("shutdown")
+async def _stop_hit_finding() -> None:
+    hit_finding.shutdown()
+
+
 def _settings_payload() -> dict[str, Any]:
     return {
         "config": runtime_state.config,
@@ -549,6 +718,7 @@ def _settings_payload() -> dict[str, Any]:
 
 def _apply_runtime_config(payload: dict[str, Any]) -> None:
     runtime_state.apply_config(payload)
+    _configure_remote_rings()
 
 
 def _get_log_path() -> Path | None:
@@ -610,6 +780,24 @@ register_file_routes(
 )
 
 
+remote_recorder = RemoteRecorderService(
+    RemoteRecorderDeps(
+        data_dir=runtime_state.data_dir,
+        get_allow_abs_paths=lambda: runtime_state.allow_abs_paths,
+        is_within=_is_within,
+        logger=logger,
+        get_h5py=_get_h5py,
+        subscribe=_remote_subscribe,
+        frame_bytes=_remote_frame_bytes,
+    )
+)
+
+
+@app.on_event("shutdown")
+async def _stop_remote_recordings() -> None:
+    remote_recorder.shutdown()
+
+
 register_stream_routes(
     app,
     StreamRouteDeps(
@@ -634,6 +822,21 @@ register_stream_routes(
         remote_extract_metadata=_remote_extract_metadata,
         remote_store_frame=_remote_store_frame,
         remote_snapshot=_remote_snapshot,
+        remote_frame_at=_remote_frame_at,
+        remote_history=_remote_history,
+        remote_raw_layout=_remote_raw_layout,
+        remote_raw_frame=_remote_raw_frame,
+        remote_store_raw=_remote_store_raw,
+        remote_attach_meta=_remote_attach_meta,
+        remote_subscribe=_remote_subscribe,
+        remote_frame_bytes=_remote_frame_bytes,
+        remote_pack_peak_sets=_remote_pack_peak_sets,
+        remote_unpack_peak_sets=_remote_unpack_peak_sets,
+        remote_ingest_submit=remote_ingest.submit,
+        remote_ingest_metrics=remote_ingest.metrics,
+        remote_record_start=remote_recorder.start,
+        remote_record_stop=remote_recorder.stop,
+        remote_record_status=remote_recorder.status,
     ),
 )
 
@@ -668,6 +871,24 @@ register_analysis_routes(
         read_threshold_energies=_read_threshold_energies,
         start_series_sum_job=series_summing.start_job,
         get_series_sum_job=series_summing.get_job,
+        cancel_series_sum_job=series_summing.cancel_job,
+        subscribe_series_sum_job=series_summing.subscribe_job,
+        list_resumable_series_jobs=series_summing.list_resumable_jobs,
+        resume_series_sum_job=series_summing.resume_job,
+        discard_series_sum_job=series_summing.discard_job,
+        start_series_index=series_index.start_build,
+        get_series_index_status=series_index.get_status,
+        series_index_range_sum=series_index.range_sum,
+        start_series_follow=series_follow.start,
+        get_series_follow=series_follow.get_status,
+        subscribe_series_follow=series_follow.subscribe,
+        refresh_series_follow=series_follow.refresh,
+        stop_series_follow=series_follow.stop,
+        series_follow_frame=series_follow.frame,
+        start_hit_finding=hit_finding.start,
+        get_hit_finding=hit_finding.get_status,
+        cancel_hit_finding=hit_finding.cancel,
+        hit_finding_peak_counts=hit_finding.peak_counts,
     ),
 )
 
@@ -680,6 +901,7 @@ register_frame_routes(
         resolve_file=_resolve_file,
         resolve_dataset_view=_resolve_dataset_view,
         extract_frame=_extract_frame,
+        extract_frames=_extract_frames,
         find_pixel_mask=_find_pixel_mask,
         read_threshold_energies=_read_threshold_energies,
     ),
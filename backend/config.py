@@ -32,6 +32,23 @@ DEFAULT_CONFIG: dict[str, Any] = {
         "max_scan_depth": -1,
         "max_upload_mb": 0,
     },
+    "jobs": {
+        "workers": 2,
+        "isolation": "process",
+        "max_rss_mb": 0,
+        "checkpoint_interval_s": 60.0,
+        "result_cache_mb": 2048,
+        "decode_workers": 0,
+    },
+    "remote": {
+        "ring_frames": 64,
+        "ring_mb": 256,
+        "max_mb": 1024,
+        "compression": "zstd",
+        "decode_workers": 0,
+        "queue_depth": 32,
+        "queue_policy": "reject",
+    },
     "logging": {
         "level": "INFO",
         "dir": "",
@@ -47,6 +64,9 @@ DEFAULT_CONFIG: dict[str, Any] = {
 
 _LOG_LEVELS = {"DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"}
 _PIXEL_LABEL_FORMATS = {"auto", "integer", "scientific"}
+_JOB_ISOLATION_MODES = {"process", "thread"}
+_REMOTE_COMPRESSIONS = {"zstd", "lz4", "none"}
+_REMOTE_QUEUE_POLICIES = {"reject", "drop_oldest"}
 
 
 def _repo_root() -> Path:
@@ -124,6 +144,25 @@ def normalize_config(raw: dict[str, Any] | None) -> dict[str, Any]:
     if max_scan_depth < -1:
         max_scan_depth = -1
     max_upload_mb = max(0, get_int(merged, ("data", "max_upload_mb"), 0))
+    job_workers = max(1, min(32, get_int(merged, ("jobs", "workers"), 2)))
+    job_isolation = get_str(merged, ("jobs", "isolation"), "process").strip().lower()
+    if job_isolation not in _JOB_ISOLATION_MODES:
+        job_isolation = "process"
+    job_max_rss_mb = max(0, get_int(merged, ("jobs", "max_rss_mb"), 0))
+    job_checkpoint_interval = max(0.0, get_float(merged, ("jobs", "checkpoint_interval_s"), 60.0))
+    job_result_cache_mb = max(0, get_int(merged, ("jobs", "result_cache_mb"), 2048))
+    job_decode_workers = max(0, min(64, get_int(merged, ("jobs", "decode_workers"), 0)))
+    remote_ring_frames = max(1, min(100000, get_int(merged, ("remote", "ring_frames"), 64)))
+    remote_ring_mb = max(0, get_int(merged, ("remote", "ring_mb"), 256))
+    remote_max_mb = max(0, get_int(merged, ("remote", "max_mb"), 1024))
+    remote_compression = get_str(merged, ("remote", "compression"), "zstd").strip().lower()
+    if remote_compression not in _REMOTE_COMPRESSIONS:
+        remote_compression = "zstd"
+    remote_decode_workers = max(0, min(64, get_int(merged, ("remote", "decode_workers"), 0)))
+    remote_queue_depth = max(1, min(4096, get_int(merged, ("remote", "queue_depth"), 32)))
+    remote_queue_policy = get_str(merged, ("remote", "queue_policy"), "reject").strip().lower()
+    if remote_queue_policy not in _REMOTE_QUEUE_POLICIES:
+        remote_queue_policy = "reject"
     log_level = get_str(merged, ("logging", "level"), "INFO").upper()
     if log_level not in _LOG_LEVELS:
         log_level = "INFO"
@@ -153,6 +192,23 @@ def normalize_config(raw: dict[str, Any] | None) -> dict[str, Any]:
             "max_scan_depth": max_scan_depth,
             "max_upload_mb": max_upload_mb,
         },
+        "jobs": {
+            "workers": job_workers,
+            "isolation": job_isolation,
+            "max_rss_mb": job_max_rss_mb,
+            "checkpoint_interval_s": job_checkpoint_interval,
+            "result_cache_mb": job_result_cache_mb,
+            "decode_workers": job_decode_workers,
+        },
+        "remote": {
+            "ring_frames": remote_ring_frames,
+            "ring_mb": remote_ring_mb,
+            "max_mb": remote_max_mb,
+            "compression": remote_compression,
+            "decode_workers": remote_decode_workers,
+            "queue_depth": remote_queue_depth,
+            "queue_policy": remote_queue_policy,
+        },
         "logging": {
             "level": log_level,
             "dir": get_str(merged, ("logging", "dir"), ""),
@@ -6,6 +6,8 @@ This module centralizes detector image file handling that is shared by
 multiple endpoints (file load, metadata/header extraction, monitor parsing).
 """
 
+import functools
+import gzip
 import math
 import re
 import struct
@@ -365,21 +367,7 @@ def _open_fabio_image(path: Path):
         if path.suffix.lower() != ".gz":
             return None
         try:
-            import gzip
-            import tempfile
-
-            with gzip.open(path, "rb") as gz:
-                data = gz.read()
-            with tempfile.NamedTemporaryFile(suffix=".cbf", delete=False) as tmp:
-                tmp.write(data)
-                tmp_path = Path(tmp.name)
-            try:
-                return _fabio.open(str(tmp_path))
-            finally:
-                try:
-                    tmp_path.unlink(missing_ok=True)
-                except Exception:
-                    pass
+            return _fabio_image_from_bytes(gzip.decompress(path.read_bytes()), "cbf")
         except Exception:
             return None
 
@@ -530,7 +518,7 @@ def _normalize_image_array(arr: np.ndarray, index: int = 0) -> np.ndarray:
         raise HTTPException(status_code=400, detail="Unsupported image shape")
     frame = np.ascontiguousarray(frame)
     if frame.dtype.byteorder == ">" or (frame.dtype.byteorder == "=" and sys.byteorder == "big"):
-        frame = frame.byteswap().newbyteorder("<")
+        frame = frame.astype(frame.dtype.newbyteorder("<"))
     if frame.dtype.kind in {"u", "i"} and frame.dtype.itemsize > 4:
         if frame.dtype.kind == "u":
             vmax = int(np.max(frame, initial=0))
@@ -578,41 +566,253 @@ def _write_tiff(path: Path, arr: np.ndarray) -> None:
     _tifffile.imwrite(path, arr, photometric="minisblack")
 
 
-def _read_cbf(path: Path) -> np.ndarray:
-    _ensure_fabio()
-    image = _fabio.open(str(path))
-    arr = np.asarray(image.data)
-    return _normalize_image_array(arr)
+_CBF_BINARY_START = b"\x0c\x1a\x04\xd5"
+_CBF_ELEMENT_TYPE = re.compile(r"(un)?signed\s+(8|16|32|64)-bit\s+integer", re.IGNORECASE)
+_EDF_DTYPES = {
+    "unsignedbyte": "u1",
+    "signedbyte": "i1",
+    "unsignedshort": "u2",
+    "signedshort": "i2",
+    "unsignedinteger": "u4",
+    "signedinteger": "i4",
+    "unsignedlong": "u4",
+    "signedlong": "i4",
+    "unsigned64": "u8",
+    "signed64": "i8",
+    "floatvalue": "f4",
+    "float": "f4",
+    "doublevalue": "f8",
+    "double": "f8",
+}
 
 
-def _read_cbf_gz(path: Path) -> np.ndarray:
+def _gunzip_if_needed(raw: bytes) -> bytes:
+    if raw[:2] == b"\x1f\x8b":
+        return gzip.decompress(raw)
+    return raw
+
+
+def _fabio_image_from_bytes(raw: bytes, kind: str):
+    """Parse an in-memory CBF/EDF payload with fabio's own readers."""
     _ensure_fabio()
+    from fabio.fabioutils import BytesIO as FabioBytesIO  # type: ignore[import-not-found]
+
+    if kind == "edf":
+        from fabio.edfimage import EdfImage  # type: ignore[import-not-found]
+
+        return EdfImage().read(FabioBytesIO(raw))
+    from fabio.cbfimage import CbfImage  # type: ignore[import-not-found]
+
+    return CbfImage().read(FabioBytesIO(raw))
+
+
+def _le_ints_at(buf: np.ndarray, starts: np.ndarray, width: int) -> np.ndarray:
+    value = np.zeros(starts.size, dtype=np.uint64)
+    for byte in range(width):
+        value |= buf[starts + byte].astype(np.uint64) << np.uint64(8 * byte)
+    return value.astype(f"<u{width}").view(f"<i{width}").astype(np.int64)
+
+
+@functools.lru_cache(maxsize=1)
+def _byte_offset_kernel() -> Any:
     try:
-        image = _fabio.open(str(path))
-        arr = np.asarray(image.data)
-        return _normalize_image_array(arr)
+        from fabio.ext import byte_offset  # type: ignore[import-not-found]
     except Exception:
-        import gzip
-        import tempfile
-
-        with gzip.open(path, "rb") as gz:
-            data = gz.read()
-        with tempfile.NamedTemporaryFile(suffix=".cbf", delete=False) as tmp:
-            tmp.write(data)
-            tmp_path = Path(tmp.name)
-        try:
-            image = _fabio.open(str(tmp_path))
-            arr = np.asarray(image.data)
-            return _normalize_image_array(arr)
-        finally:
-            try:
-                tmp_path.unlink(missing_ok=True)
-            except Exception:
-                pass
+        return None
+    return byte_offset
+
+
+def _decode_cbf_byte_offset(
+    data: bytes | memoryview, count: int, dtype: np.dtype | str = np.int64
+) -> np.ndarray:
+    """Decode ``count`` values of a CBF byte-offset stream as ``dtype``.
+
+    Uses fabio's compiled kernel when it is installed and the vectorized
+    NumPy decoder otherwise.
+    """
+    dtype = np.dtype(dtype)
+    kernel = _byte_offset_kernel()
+    if kernel is None:
+        return _decode_cbf_byte_offset_numpy(data, count, dtype)
+    decode = kernel.dec_cbf32 if dtype.itemsize <= 4 else kernel.dec_cbf
+    # The kernel wants bytes and may read a wide delta past the end; padding
+    # keeps that inside the buffer.
+    values = np.asarray(decode(bytes(data) + bytes(15), count))
+    if values.size < count:
+        raise ValueError("CBF byte-offset stream is truncated")
+    return values.astype(dtype, copy=False)
+
+
+def _decode_cbf_byte_offset_numpy(
+    data: bytes | memoryview, count: int, dtype: np.dtype | str = np.int64
+) -> np.ndarray:
+    """Vectorized CBF byte-offset decoder.
+
+    Every value is a delta to its predecessor: one signed byte, or 0x80
+    followed by an int16, whose 0x8000 escapes to an int32, whose 0x80000000
+    escapes to an int64. Plain bytes are handled as one vector; only the
+    escape positions are inspected individually.
+    """
+    dtype = np.dtype(dtype)
+    # Wrapping 32-bit sums are exact for every element type up to 32 bits.
+    acc = np.int64 if dtype.itemsize > 4 else np.int32
+    buf = np.frombuffer(data, dtype=np.uint8)
+    escapes = np.flatnonzero(buf == 0x80)
+    if escapes.size == 0:
+        if buf.size < count:
+            raise ValueError("CBF byte-offset stream is truncated")
+        return np.cumsum(buf[:count].view(np.int8), dtype=acc).astype(dtype, copy=False)
+
+    padded = np.zeros(buf.size + 15, dtype=np.uint8)
+    padded[: buf.size] = buf
+    values = _le_ints_at(padded, escapes + 1, 2)
+    lengths = np.full(escapes.size, 3, dtype=np.int64)
+    wide = np.flatnonzero(values == -0x8000)
+    if wide.size:
+        values[wide] = _le_ints_at(padded, escapes[wide] + 3, 4)
+        lengths[wide] = 7
+        wider = wide[values[wide] == -0x80000000]
+        if wider.size:
+            values[wider] = _le_ints_at(padded, escapes[wider] + 7, 8)
+            lengths[wider] = 15
+
+    # A 0x80 byte inside a wider delta is payload, not an escape. Whether a
+    # candidate is real only depends on earlier real ones, so iterating
+    # "not covered by the current real set" settles within the longest chain.
+    ends = escapes + lengths
+    real = np.ones(escapes.size, dtype=bool)
+    while True:
+        reach = np.maximum.accumulate(np.where(real, ends, 0))
+        settled = np.ones(escapes.size, dtype=bool)
+        settled[1:] = escapes[1:] >= reach[:-1]
+        if np.array_equal(settled, real):
+            break
+        real = settled
+    escapes, values, lengths = escapes[real], values[real], lengths[real]
+
+    payload = np.zeros(padded.size, dtype=bool)
+    for width in (3, 7, 15):
+        starts = escapes[lengths == width]
+        if starts.size:
+            payload[(starts[:, None] + np.arange(1, width)).ravel()] = True
+    deltas = buf.view(np.int8)[~payload[: buf.size]]
+    if deltas.size < count:
+        raise ValueError("CBF byte-offset stream is truncated")
+    deltas = deltas[:count].astype(acc)
+    # Each escape moves left by the payload bytes of the escapes before it.
+    skipped = np.cumsum(lengths - 1) - (lengths - 1)
+    slots = escapes - skipped
+    inside = slots < count
+    deltas[slots[inside]] = values[inside].astype(acc)
+    return np.cumsum(deltas, dtype=acc, out=deltas).astype(dtype, copy=False)
+
+
+def _decode_cbf_bytes(raw: bytes) -> np.ndarray:
+    start = raw.find(_CBF_BINARY_START)
+    if start < 0:
+        raise ValueError("CBF binary section not found")
+    head = raw.rfind(b"--CIF-BINARY-FORMAT-SECTION--", 0, start)
+    text = raw[max(head, 0) : start].decode("latin-1")
+    fields: dict[str, str] = {}
+    for line in text.splitlines():
+        key, sep, value = line.partition(":")
+        if sep:
+            fields[key.strip().lower()] = value.strip()
+    # The conversions parameter sits on a continuation line of Content-Type.
+    if "x-cbf_byte_offset" not in text.lower():
+        raise ValueError("Only byte-offset CBF is decoded natively")
+    if fields.get("content-transfer-encoding", "binary").lower() != "binary":
+        raise ValueError("Only binary CBF transfer encoding is decoded natively")
+    match = _CBF_ELEMENT_TYPE.search(fields.get("x-binary-element-type", ""))
+    if not match:
+        raise ValueError("Unsupported CBF element type")
+    dtype = np.dtype(f"{'u' if match.group(1) else 'i'}{int(match.group(2)) // 8}")
+    try:
+        width = int(fields["x-binary-size-fastest-dimension"])
+        height = int(fields["x-binary-size-second-dimension"])
+        count = int(fields.get("x-binary-number-of-elements", width * height))
+        size = int(fields.get("x-binary-size", len(raw) - start - 4))
+    except (KeyError, ValueError) as exc:
+        raise ValueError("CBF binary header is incomplete") from exc
+    if count != width * height:
+        raise ValueError("CBF element count does not match its dimensions")
+    payload = memoryview(raw)[start + 4 : start + 4 + size]
+    return _decode_cbf_byte_offset(payload, count, dtype).reshape(height, width)
+
+
+def _decode_edf_bytes(raw: bytes) -> np.ndarray:
+    if not raw.startswith(b"{"):
+        raise ValueError("EDF header not found")
+    close = raw.find(b"}\n")
+    if close < 0:
+        raise ValueError("EDF header is not terminated")
+    fields: dict[str, str] = {}
+    for item in raw[1:close].decode("latin-1").split(";"):
+        key, sep, value = item.partition("=")
+        if sep:
+            fields[key.strip().lower()] = value.strip()
+    compression = fields.get("compression", "none").lower()
+    if compression not in {"", "none", "nocompression"}:
+        raise ValueError("Only uncompressed EDF is decoded natively")
+    code = _EDF_DTYPES.get(fields.get("datatype", "").replace("_", "").lower())
+    if code is None:
+        raise ValueError("Unsupported EDF data type")
+    order = ">" if fields.get("byteorder", "").lower() == "highbytefirst" else "<"
+    try:
+        width = int(fields["dim_1"])
+        height = int(fields.get("dim_2", 1))
+        depth = int(fields.get("dim_3", 1))
+    except (KeyError, ValueError) as exc:
+        raise ValueError("EDF header is missing its dimensions") from exc
+    if depth != 1:
+        raise ValueError("Only 2D EDF is decoded natively")
+    dtype = np.dtype(order + code)
+    offset = close + 2
+    nbytes = width * height * dtype.itemsize
+    if len(raw) - offset < nbytes:
+        raise ValueError("EDF payload is truncated")
+    return np.frombuffer(raw, dtype=dtype, count=width * height, offset=offset).reshape(
+        height, width
+    )
 
 
-def _read_edf(path: Path) -> np.ndarray:
-    _ensure_fabio()
-    image = _fabio.open(str(path))
-    arr = np.asarray(image.data)
+def _read_cbf_bytes(raw: bytes) -> np.ndarray:
+    try:
+        arr = _decode_cbf_bytes(raw)
+    except ValueError:
+        arr = np.asarray(_fabio_image_from_bytes(raw, "cbf").data)
+    return _normalize_image_array(arr)
+
+
+def _read_cbf_gz_bytes(raw: bytes) -> np.ndarray:
+    return _read_cbf_bytes(_gunzip_if_needed(raw))
+
+
+def _read_edf_bytes(raw: bytes) -> np.ndarray:
+    raw = _gunzip_if_needed(raw)
+    try:
+        arr = _decode_edf_bytes(raw)
+    except ValueError:
+        arr = np.asarray(_fabio_image_from_bytes(raw, "edf").data)
     return _normalize_image_array(arr)
+
+
+def _read_file_buffer(path: Path) -> bytearray:
+    # A writable buffer keeps zero-copy EDF frames writable, as fabio's were.
+    with path.open("rb") as handle:
+        buf = bytearray(path.stat().st_size)
+        size = handle.readinto(buf)
+    del buf[size:]
+    return buf
+
+
+def _read_cbf(path: Path) -> np.ndarray:
+    return _read_cbf_bytes(_read_file_buffer(path))
+
+
+def _read_cbf_gz(path: Path) -> np.ndarray:
+    return _read_cbf_gz_bytes(_read_file_buffer(path))
+
+
+def _read_edf(path: Path) -> np.ndarray:
+    return _read_edf_bytes(_read_file_buffer(path))
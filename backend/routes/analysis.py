@@ -1,10 +1,23 @@
 from __future__ import annotations
 
+import json
+import time
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Callable
 
-from fastapi import Body, FastAPI, HTTPException, Query
+import numpy as np
+from fastapi import Body, FastAPI, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+
+from .wakeup import Wakeup
+
+_JOB_FINISHED_STATUSES = {"done", "error", "cancelled"}
+# Seconds between SSE keep-alives (queued jobs re-check their queue position faster).
+_JOB_EVENTS_KEEPALIVE_S = 15.0
+_JOB_EVENTS_QUEUED_S = 1.0
+# Upper bound for one long-poll wait on a follow session.
+_FOLLOW_WAIT_MAX_S = 30.0
 
 
 @dataclass(frozen=True)
@@ -22,6 +35,128 @@ class AnalysisRouteDeps:
     read_threshold_energies: Callable[[Any, int], list[float | None]]
     start_series_sum_job: Callable[..., str]
     get_series_sum_job: Callable[[str], dict[str, Any] | None]
+    cancel_series_sum_job: Callable[[str], dict[str, Any] | None]
+    subscribe_series_sum_job: Callable[[str, Callable[[], None]], Callable[[], None]]
+    list_resumable_series_jobs: Callable[[], list[dict[str, Any]]]
+    resume_series_sum_job: Callable[..., dict[str, Any] | None]
+    discard_series_sum_job: Callable[[str], bool]
+    start_series_index: Callable[..., dict[str, Any]]
+    get_series_index_status: Callable[..., dict[str, Any]]
+    series_index_range_sum: Callable[..., tuple[np.ndarray, int]]
+    start_series_follow: Callable[..., dict[str, Any]]
+    get_series_follow: Callable[[str], dict[str, Any] | None]
+    subscribe_series_follow: Callable[[str, Callable[[], None]], Callable[[], None]]
+    refresh_series_follow: Callable[[str], dict[str, Any] | None]
+    stop_series_follow: Callable[[str], dict[str, Any] | None]
+    series_follow_frame: Callable[[str], tuple[np.ndarray, dict[str, Any]] | None]
+    start_hit_finding: Callable[..., dict[str, Any]]
+    get_hit_finding: Callable[[str], dict[str, Any] | None]
+    cancel_hit_finding: Callable[[str], dict[str, Any] | None]
+    hit_finding_peak_counts: Callable[[str], np.ndarray | None]
+
+
+def parse_series_sum_request(payload: dict[str, Any]) -> dict[str, Any]:
+    """Validate a series-sum start request and return `SeriesSummingService.start_job` kwargs.
+
+    Shared by `/api/analysis/series-sum/start` and the headless CLI.
+    """
+    file = str(payload.get("file", "")).strip()
+    dataset = str(payload.get("dataset", "")).strip()
+    mode = str(payload.get("mode", "all")).strip().lower()
+    step = int(payload.get("step", 10) or 10)
+    stride = int(payload.get("stride", 1) or 1)
+    priority = int(payload.get("priority", 0) or 0)
+    operation = str(payload.get("operation", "sum")).strip().lower()
+    operations_raw = payload.get("operations")
+    if operations_raw is None:
+        operations_raw = [operation]
+    elif isinstance(operations_raw, str):
+        operations_raw = operations_raw.split(",")
+    if not isinstance(operations_raw, list):
+        raise HTTPException(status_code=400, detail="Invalid operations")
+    operations = [str(item).strip().lower() for item in operations_raw if str(item).strip()]
+    normalize_frame = payload.get("normalize_frame")
+    normalize_frame = (
+        int(normalize_frame)
+        if normalize_frame is not None and str(normalize_frame).strip() != ""
+        else None
+    )
+    range_start = payload.get("range_start")
+    range_end = payload.get("range_end")
+    range_start = (
+        int(range_start) if range_start is not None and str(range_start).strip() != "" else None
+    )
+    range_end = int(range_end) if range_end is not None and str(range_end).strip() != "" else None
+    output_path = payload.get("output_path")
+    output_format = str(payload.get("format", "hdf5")).strip().lower()
+    apply_mask = bool(payload.get("apply_mask", True))
+    compression = str(payload.get("compression", "gzip") or "gzip").strip().lower()
+    dark_file = str(payload.get("dark_file") or "").strip()
+    dark_dataset = str(payload.get("dark_dataset") or "").strip()
+    flat_file = str(payload.get("flat_file") or "").strip()
+    flat_dataset = str(payload.get("flat_dataset") or "").strip()
+    flat_mode = str(payload.get("flat_mode") or "flat").strip().lower()
+
+    if not file:
+        raise HTTPException(status_code=400, detail="Missing file")
+    ext = Path(file).suffix.lower()
+    if ext in {".h5", ".hdf5"} and not dataset:
+        raise HTTPException(status_code=400, detail="Missing dataset")
+    if mode not in {"all", "step", "nth", "range", "rolling"}:
+        raise HTTPException(status_code=400, detail="Invalid mode")
+    if not operations or any(
+        item not in {"sum", "mean", "median", "std", "var", "min", "max"} for item in operations
+    ):
+        raise HTTPException(status_code=400, detail="Invalid operation")
+    if output_format not in {"hdf5", "h5", "tiff", "tif"}:
+        raise HTTPException(status_code=400, detail="Invalid format")
+    if compression not in {"bitshuffle-lz4", "zstd", "gzip", "none"}:
+        raise HTTPException(status_code=400, detail="Invalid compression")
+    if step < 1:
+        raise HTTPException(status_code=400, detail="Step must be >= 1")
+    if stride < 1:
+        raise HTTPException(status_code=400, detail="Stride must be >= 1")
+    if mode == "rolling" and any(item not in {"sum", "mean"} for item in operations):
+        raise HTTPException(status_code=400, detail="Rolling windows support sum and mean only")
+    if range_start is not None and range_start < 1:
+        raise HTTPException(status_code=400, detail="Range start must be >= 1")
+    if range_end is not None and range_end < 1:
+        raise HTTPException(status_code=400, detail="Range end must be >= 1")
+    if range_start is not None and range_end is not None and range_start > range_end:
+        raise HTTPException(status_code=400, detail="Range start must be <= range end")
+    if normalize_frame is not None and normalize_frame < 1:
+        raise HTTPException(status_code=400, detail="Normalize frame must be >= 1")
+    if flat_mode not in {"flat", "gain"}:
+        raise HTTPException(status_code=400, detail="Invalid flat mode")
+    for ref_file, ref_dataset, label in (
+        (dark_file, dark_dataset, "dark"),
+        (flat_file, flat_dataset, "flat"),
+    ):
+        if Path(ref_file).suffix.lower() in {".h5", ".hdf5"} and not ref_dataset:
+            raise HTTPException(status_code=400, detail=f"Missing {label} dataset")
+
+    return {
+        "file": file,
+        "dataset": dataset,
+        "mode": mode,
+        "step": step,
+        "stride": stride,
+        "operation": operations[0],
+        "operations": operations,
+        "normalize_frame": normalize_frame,
+        "range_start": range_start,
+        "range_end": range_end,
+        "output_path": str(output_path or ""),
+        "output_format": output_format,
+        "apply_mask": apply_mask,
+        "compression": compression,
+        "dark_file": dark_file,
+        "dark_dataset": dark_dataset,
+        "flat_file": flat_file,
+        "flat_dataset": flat_dataset,
+        "flat_mode": flat_mode,
+        "priority": priority,
+    }
 
 
 def register_analysis_routes(app: FastAPI, deps: AnalysisRouteDeps) -> None:
@@ -158,69 +293,294 @@ def register_analysis_routes(app: FastAPI, deps: AnalysisRouteDeps) -> None:
     @app.post("/api/analysis/series-sum/start")
     def analysis_series_sum_start(payload: dict[str, Any] = Body(...)) -> dict[str, Any]:
         """Start asynchronous series summing and return pollable job metadata."""
+        job_id = deps.start_series_sum_job(**parse_series_sum_request(payload))
+        return {"job_id": job_id, "status": "queued"}
+
+    @app.get("/api/analysis/series-sum/status")
+    def analysis_series_sum_status(job_id: str = Query(..., min_length=1)) -> dict[str, Any]:
+        job = deps.get_series_sum_job(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return dict(job)
+
+    @app.get("/api/analysis/jobs/{job_id}/events")
+    async def analysis_job_events(job_id: str) -> StreamingResponse:
+        """Server-Sent Events stream of job snapshots; closes once the job finishes."""
+        if not deps.get_series_sum_job(job_id):
+            raise HTTPException(status_code=404, detail="Job not found")
+
+        async def _stream():
+            # Waiting costs no thread: job updates wake this generator on the event loop.
+            wakeup = Wakeup()
+            unsubscribe = deps.subscribe_series_sum_job(job_id, wakeup.notify)
+            try:
+                current = deps.get_series_sum_job(job_id)
+                last_key = None
+                while current is not None:
+                    key = (current.get("revision"), current.get("queue_position"))
+                    if key != last_key:
+                        last_key = key
+                        revision = int(current.get("revision", 0))
+                        yield f"id: {revision}\ndata: {json.dumps(current)}\n\n"
+                    else:
+                        yield ": keepalive\n\n"
+                    if current.get("status") in _JOB_FINISHED_STATUSES:
+                        return
+                    timeout = (
+                        _JOB_EVENTS_QUEUED_S
+                        if current.get("status") == "queued"
+                        else _JOB_EVENTS_KEEPALIVE_S
+                    )
+                    await wakeup.wait(timeout)
+                    current = deps.get_series_sum_job(job_id)
+            finally:
+                unsubscribe()
+
+        return StreamingResponse(
+            _stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    @app.post("/api/analysis/series-sum/cancel")
+    def analysis_series_sum_cancel(payload: dict[str, Any] = Body(...)) -> dict[str, Any]:
+        """Cancel a queued or running series job (running jobs stop at the next progress update)."""
+        job_id = str(payload.get("job_id", "")).strip()
+        if not job_id:
+            raise HTTPException(status_code=400, detail="Missing job_id")
+        job = deps.cancel_series_sum_job(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return dict(job)
+
+    @app.get("/api/analysis/series-sum/resumable")
+    def analysis_series_sum_resumable() -> dict[str, Any]:
+        """List checkpointed series jobs that were interrupted and can be resumed."""
+        return {"jobs": deps.list_resumable_series_jobs()}
+
+    @app.post("/api/analysis/series-sum/resume")
+    def analysis_series_sum_resume(payload: dict[str, Any] = Body(...)) -> dict[str, Any]:
+        """Queue an interrupted job again; it continues from its last checkpoint."""
+        job_id = str(payload.get("job_id", "")).strip()
+        if not job_id:
+            raise HTTPException(status_code=400, detail="Missing job_id")
+        priority = payload.get("priority")
+        job = deps.resume_series_sum_job(
+            job_id, priority=int(priority) if priority is not None else None
+        )
+        if not job:
+            raise HTTPException(status_code=404, detail="Checkpoint not found")
+        return dict(job)
+
+    @app.post("/api/analysis/series-sum/discard")
+    def analysis_series_sum_discard(payload: dict[str, Any] = Body(...)) -> dict[str, Any]:
+        """Delete a checkpoint together with the partial outputs of its job."""
+        job_id = str(payload.get("job_id", "")).strip()
+        if not job_id:
+            raise HTTPException(status_code=400, detail="Missing job_id")
+        if not deps.discard_series_sum_job(job_id):
+            raise HTTPException(status_code=404, detail="Checkpoint not found")
+        return {"ok": True}
+
+    @app.post("/api/analysis/series-index/build")
+    def analysis_series_index_build(payload: dict[str, Any] = Body(...)) -> dict[str, Any]:
+        """Start building the prefix-sum checkpoint index for one HDF5 stack."""
         file = str(payload.get("file", "")).strip()
         dataset = str(payload.get("dataset", "")).strip()
-        mode = str(payload.get("mode", "all")).strip().lower()
-        step = int(payload.get("step", 10) or 10)
-        operation = str(payload.get("operation", "sum")).strip().lower()
-        normalize_frame = payload.get("normalize_frame")
-        normalize_frame = (
-            int(normalize_frame)
-            if normalize_frame is not None and str(normalize_frame).strip() != ""
-            else None
+        interval = payload.get("interval")
+        interval = int(interval) if interval is not None and str(interval).strip() != "" else None
+        if not file:
+            raise HTTPException(status_code=400, detail="Missing file")
+        if not dataset:
+            raise HTTPException(status_code=400, detail="Missing dataset")
+        if interval is not None and interval < 1:
+            raise HTTPException(status_code=400, detail="Interval must be >= 1")
+        return deps.start_series_index(file=file, dataset=dataset, interval=interval)
+
+    @app.get("/api/analysis/series-index/status")
+    def analysis_series_index_status(
+        file: str = Query(..., min_length=1),
+        dataset: str = Query(..., min_length=1),
+    ) -> dict[str, Any]:
+        return deps.get_series_index_status(file=file, dataset=dataset)
+
+    @app.get("/api/analysis/series-index/range-sum")
+    def analysis_series_index_range_sum(
+        file: str = Query(..., min_length=1),
+        dataset: str = Query(..., min_length=1),
+        range_start: int = Query(..., ge=1),
+        range_end: int = Query(..., ge=1),
+        threshold: int = Query(0, ge=0),
+    ) -> Response:
+        """Return the sum of frames range_start..range_end (1-based, inclusive) as raw bytes."""
+        if range_start > range_end:
+            raise HTTPException(status_code=400, detail="Range start must be <= range end")
+        total, frames_read = deps.series_index_range_sum(
+            file=file,
+            dataset=dataset,
+            start=range_start - 1,
+            end=range_end - 1,
+            threshold=threshold,
         )
-        range_start = payload.get("range_start")
-        range_end = payload.get("range_end")
-        range_start = (
-            int(range_start) if range_start is not None and str(range_start).strip() != "" else None
+        arr = np.ascontiguousarray(total, dtype=np.dtype(total.dtype).newbyteorder("<"))
+        headers = {
+            "X-Dtype": arr.dtype.str,
+            "X-Shape": ",".join(str(x) for x in arr.shape),
+            "X-Range-Start": str(range_start),
+            "X-Range-End": str(range_end),
+            "X-Frames-Read": str(frames_read),
+        }
+        return Response(
+            content=arr.tobytes(order="C"), media_type="application/octet-stream", headers=headers
         )
-        range_end = (
-            int(range_end) if range_end is not None and str(range_end).strip() != "" else None
+
+    @app.post("/api/analysis/series-follow/start")
+    def analysis_series_follow_start(payload: dict[str, Any] = Body(...)) -> dict[str, Any]:
+        """Start following a growing dataset; an identical active session is reused."""
+        file = str(payload.get("file", "")).strip()
+        if not file:
+            raise HTTPException(status_code=400, detail="Missing file")
+        interval_s = payload.get("interval_s")
+        try:
+            threshold = int(payload.get("threshold", 0) or 0)
+            interval = float(interval_s) if interval_s not in (None, "") else None
+        except (TypeError, ValueError) as exc:
+            raise HTTPException(status_code=400, detail="Invalid follow parameters") from exc
+        return deps.start_series_follow(
+            file=file,
+            dataset=str(payload.get("dataset", "") or "").strip(),
+            threshold=threshold,
+            operation=str(payload.get("operation", "sum") or "sum"),
+            apply_mask=bool(payload.get("apply_mask", True)),
+            interval_s=interval,
         )
-        output_path = payload.get("output_path")
-        output_format = str(payload.get("format", "hdf5")).strip().lower()
-        apply_mask = bool(payload.get("apply_mask", True))
 
+    @app.get("/api/analysis/series-follow/status")
+    async def analysis_series_follow_status(
+        id: str = Query(..., min_length=1),
+        after: int | None = Query(None, ge=0),
+        timeout: float = Query(10.0, ge=0.0),
+    ) -> dict[str, Any]:
+        """Session status; with `after`, wait until the revision moves past it."""
+        session = deps.get_series_follow(id)
+        if session and after is not None and int(session["revision"]) <= after:
+            wakeup = Wakeup()
+            unsubscribe = deps.subscribe_series_follow(id, wakeup.notify)
+            try:
+                deadline = time.monotonic() + min(timeout, _FOLLOW_WAIT_MAX_S)
+                session = deps.get_series_follow(id)
+                while session and int(session["revision"]) <= after:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    await wakeup.wait(remaining)
+                    session = deps.get_series_follow(id)
+            finally:
+                unsubscribe()
+        if not session:
+            raise HTTPException(status_code=404, detail="Follow session not found")
+        return session
+
+    @app.post("/api/analysis/series-follow/refresh")
+    def analysis_series_follow_refresh(payload: dict[str, Any] = Body(...)) -> dict[str, Any]:
+        session = deps.refresh_series_follow(str(payload.get("id", "")).strip())
+        if not session:
+            raise HTTPException(status_code=404, detail="Follow session not found")
+        return session
+
+    @app.post("/api/analysis/series-follow/stop")
+    def analysis_series_follow_stop(payload: dict[str, Any] = Body(...)) -> dict[str, Any]:
+        session = deps.stop_series_follow(str(payload.get("id", "")).strip())
+        if not session:
+            raise HTTPException(status_code=404, detail="Follow session not found")
+        return session
+
+    @app.get("/api/analysis/series-follow/frame")
+    def analysis_series_follow_frame(
+        id: str = Query(..., min_length=1),
+        after: int | None = Query(None, ge=0),
+    ) -> Response:
+        """Return the current live sum as raw bytes (204 until it moves past `after`)."""
+        if deps.get_series_follow(id) is None:
+            raise HTTPException(status_code=404, detail="Follow session not found")
+        current = deps.series_follow_frame(id)
+        if current is None:
+            return Response(status_code=204)
+        total, session = current
+        if after is not None and int(session["revision"]) <= after:
+            return Response(status_code=204)
+        arr = np.ascontiguousarray(total, dtype=np.dtype(total.dtype).newbyteorder("<"))
+        headers = {
+            "X-Dtype": arr.dtype.str,
+            "X-Shape": ",".join(str(x) for x in arr.shape),
+            "X-Frames-Summed": str(int(session["frames_summed"])),
+            "X-Revision": str(int(session["revision"])),
+            "X-Follow-Status": str(session["status"]),
+        }
+        return Response(
+            content=arr.tobytes(order="C"), media_type="application/octet-stream", headers=headers
+        )
+
+    @app.post("/api/analysis/hit-finding/start")
+    def analysis_hit_finding_start(payload: dict[str, Any] = Body(...)) -> dict[str, Any]:
+        """Count peaks on every frame of a stack and write a hits-only virtual dataset."""
+        file = str(payload.get("file", "")).strip()
+        dataset = str(payload.get("dataset", "")).strip()
         if not file:
             raise HTTPException(status_code=400, detail="Missing file")
-        ext = Path(file).suffix.lower()
-        if ext in {".h5", ".hdf5"} and not dataset:
+        if not dataset:
             raise HTTPException(status_code=400, detail="Missing dataset")
-        if mode not in {"all", "step", "nth", "range"}:
-            raise HTTPException(status_code=400, detail="Invalid mode")
-        if operation not in {"sum", "mean", "median"}:
-            raise HTTPException(status_code=400, detail="Invalid operation")
-        if output_format not in {"hdf5", "h5", "tiff", "tif"}:
-            raise HTTPException(status_code=400, detail="Invalid format")
-        if step < 1:
-            raise HTTPException(status_code=400, detail="Step must be >= 1")
-        if range_start is not None and range_start < 1:
-            raise HTTPException(status_code=400, detail="Range start must be >= 1")
-        if range_end is not None and range_end < 1:
-            raise HTTPException(status_code=400, detail="Range end must be >= 1")
-        if range_start is not None and range_end is not None and range_start > range_end:
-            raise HTTPException(status_code=400, detail="Range start must be <= range end")
-        if normalize_frame is not None and normalize_frame < 1:
-            raise HTTPException(status_code=400, detail="Normalize frame must be >= 1")
-
-        job_id = deps.start_series_sum_job(
+        try:
+            threshold = int(payload.get("threshold", 0) or 0)
+            min_peaks = int(payload.get("min_peaks", 10) or 10)
+            min_intensity = float(payload.get("min_intensity", 0) or 0)
+            saturation = payload.get("saturation")
+            saturation = (
+                float(saturation)
+                if saturation is not None and str(saturation).strip() != ""
+                else None
+            )
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid hit-finding parameters") from None
+        if min_peaks < 1:
+            raise HTTPException(status_code=400, detail="Minimum peaks must be >= 1")
+        if not np.isfinite(min_intensity) or (saturation is not None and not saturation > 0):
+            raise HTTPException(status_code=400, detail="Invalid hit-finding parameters")
+        return deps.start_hit_finding(
             file=file,
             dataset=dataset,
-            mode=mode,
-            step=step,
-            operation=operation,
-            normalize_frame=normalize_frame,
-            range_start=range_start,
-            range_end=range_end,
-            output_path=str(output_path or ""),
-            output_format=output_format,
-            apply_mask=apply_mask,
+            threshold=threshold,
+            min_peaks=min_peaks,
+            min_intensity=min_intensity,
+            saturation=saturation,
+            apply_mask=bool(payload.get("apply_mask", True)),
+            output_path=str(payload.get("output_path", "") or "").strip() or None,
         )
-        return {"job_id": job_id, "status": "queued"}
 
-    @app.get("/api/analysis/series-sum/status")
-    def analysis_series_sum_status(job_id: str = Query(..., min_length=1)) -> dict[str, Any]:
-        job = deps.get_series_sum_job(job_id)
+    @app.get("/api/analysis/hit-finding/status")
+    def analysis_hit_finding_status(id: str = Query(..., min_length=1)) -> dict[str, Any]:
+        job = deps.get_hit_finding(id)
         if not job:
-            raise HTTPException(status_code=404, detail="Job not found")
-        return dict(job)
+            raise HTTPException(status_code=404, detail="Hit-finding job not found")
+        return job
+
+    @app.post("/api/analysis/hit-finding/cancel")
+    def analysis_hit_finding_cancel(payload: dict[str, Any] = Body(...)) -> dict[str, Any]:
+        job = deps.cancel_hit_finding(str(payload.get("id", "")).strip())
+        if not job:
+            raise HTTPException(status_code=404, detail="Hit-finding job not found")
+        return job
+
+    @app.get("/api/analysis/hit-finding/peak-counts")
+    def analysis_hit_finding_peak_counts(id: str = Query(..., min_length=1)) -> Response:
+        """Return the per-frame peak counts as raw int32 (-1 for frames not scanned yet)."""
+        counts = deps.hit_finding_peak_counts(id)
+        if counts is None:
+            if deps.get_hit_finding(id) is None:
+                raise HTTPException(status_code=404, detail="Hit-finding job not found")
+            return Response(status_code=204)
+        arr = np.ascontiguousarray(counts, dtype="<i4")
+        headers = {"X-Dtype": arr.dtype.str, "X-Shape": str(arr.shape[0])}
+        return Response(
+            content=arr.tobytes(order="C"), media_type="application/octet-stream", headers=headers
+        )
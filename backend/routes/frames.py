@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import sys
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Callable
@@ -17,17 +19,80 @@ class FrameRouteDeps:
     resolve_file: Callable[[str], Path]
     resolve_dataset_view: Callable[[Any, Path, str], tuple[dict[str, Any], list[Any]]]
     extract_frame: Callable[[dict[str, Any], int, int], np.ndarray]
+    extract_frames: Callable[[dict[str, Any], int, int, int], np.ndarray]
     find_pixel_mask: Callable[[Any, int | None], Any | None]
     read_threshold_energies: Callable[[Any, int], list[float | None]]
 
 
 def _to_little_endian(arr: np.ndarray) -> np.ndarray:
     if arr.dtype.byteorder == ">" or (arr.dtype.byteorder == "=" and sys.byteorder == "big"):
-        return arr.byteswap().newbyteorder("<")
+        return arr.astype(arr.dtype.newbyteorder("<"))
     return arr
 
 
+BIN_OPERATIONS = ("sum", "mean", "max")
+_BIN_CACHE_BYTES = 256 * 1024 * 1024
+# Binned frames are read and reduced this many frames at a time.
+_BIN_SLICE_FRAMES = 64
+
+
+def _reduce_frames(
+    read: Callable[[int, int], np.ndarray], start: int, stop: int, op: str
+) -> np.ndarray:
+    """Sum (int64/float64) or max frames [start, stop) in slices of `_BIN_SLICE_FRAMES`.
+
+    Slices are read in order, so only one slice and the accumulator are held
+    in memory however large the bin is.
+    """
+
+    def _reduce(lo: int) -> np.ndarray:
+        block = np.asarray(read(lo, min(stop, lo + _BIN_SLICE_FRAMES)))
+        if op == "max":
+            return block.max(axis=0)
+        return block.sum(axis=0, dtype=np.int64 if block.dtype.kind in "biu" else np.float64)
+
+    acc = _reduce(start)
+    for lo in range(start + _BIN_SLICE_FRAMES, stop, _BIN_SLICE_FRAMES):
+        if op == "max":
+            np.maximum(acc, _reduce(lo), out=acc)
+        else:
+            np.add(acc, _reduce(lo), out=acc)
+    return acc
+
+
+class _BinnedFrameCache:
+    """Byte-bounded LRU of binned frame reductions."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self._max_bytes = max(0, int(max_bytes))
+        self._items: OrderedDict[tuple[Any, ...], np.ndarray] = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[Any, ...]) -> np.ndarray | None:
+        with self._lock:
+            arr = self._items.get(key)
+            if arr is not None:
+                self._items.move_to_end(key)
+            return arr
+
+    def put(self, key: tuple[Any, ...], arr: np.ndarray) -> None:
+        if arr.nbytes > self._max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._nbytes -= old.nbytes
+            self._items[key] = arr
+            self._nbytes += arr.nbytes
+            while self._nbytes > self._max_bytes and self._items:
+                _, evicted = self._items.popitem(last=False)
+                self._nbytes -= evicted.nbytes
+
+
 def register_frame_routes(app: FastAPI, deps: FrameRouteDeps) -> None:
+    binned_cache = _BinnedFrameCache(_BIN_CACHE_BYTES)
+
     @app.get("/api/metadata")
     def metadata(
         file: str = Query(..., min_length=1), dataset: str = Query(..., min_length=1)
@@ -64,17 +129,57 @@ def register_frame_routes(app: FastAPI, deps: FrameRouteDeps) -> None:
         dataset: str = Query(..., min_length=1),
         index: int = Query(0, ge=0),
         threshold: int = Query(0, ge=0),
+        bin_size: int = Query(1, ge=1, le=100000, alias="bin"),
+        bin_op: str = Query("sum", alias="op"),
     ) -> Response:
+        bin_op = bin_op.strip().lower()
+        if bin_size > 1 and bin_op not in BIN_OPERATIONS:
+            raise HTTPException(status_code=400, detail="Invalid bin operation")
         deps.ensure_hdf5_stack()
         h5py = deps.get_h5py()
         path = deps.resolve_file(file)
+        bin_count = 1
         with h5py.File(path, "r") as h5:
             try:
                 view, extra_files = deps.resolve_dataset_view(h5, path, dataset)
             except KeyError as exc:
                 raise HTTPException(status_code=404, detail="Dataset not found") from exc
             try:
-                frame_data = deps.extract_frame(view, index=index, threshold=threshold)
+                if bin_size > 1:
+                    frame_count = int(view["shape"][0])
+                    if index >= frame_count:
+                        raise HTTPException(status_code=416, detail="Frame index out of range")
+                    stop = min(frame_count, index + bin_size)
+                    bin_count = stop - index
+                    # Sum and mean share one cached reduction; the key carries the
+                    # file signature so growing or rewritten files are re-read.
+                    base_op = "max" if bin_op == "max" else "sum"
+                    stat = path.stat()
+                    key = (
+                        str(path),
+                        int(stat.st_mtime_ns),
+                        int(stat.st_size),
+                        dataset,
+                        threshold,
+                        index,
+                        stop,
+                        base_op,
+                    )
+                    reduced = binned_cache.get(key)
+                    if reduced is None:
+                        reduced = _reduce_frames(
+                            lambda lo, hi: deps.extract_frames(view, lo, hi, threshold),
+                            index,
+                            stop,
+                            base_op,
+                        )
+                        binned_cache.put(key, reduced)
+                    if bin_op == "mean":
+                        frame_data = (reduced / float(bin_count)).astype(np.float32)
+                    else:
+                        frame_data = reduced
+                else:
+                    frame_data = deps.extract_frame(view, index=index, threshold=threshold)
             finally:
                 for handle in extra_files:
                     handle.close()
@@ -86,6 +191,9 @@ def register_frame_routes(app: FastAPI, deps: FrameRouteDeps) -> None:
                 "X-Shape": ",".join(str(x) for x in arr.shape),
                 "X-Frame": str(index),
             }
+            if bin_size > 1:
+                headers["X-Bin"] = str(bin_count)
+                headers["X-Bin-Op"] = bin_op
             return Response(content=data, media_type="application/octet-stream", headers=headers)
 
     @app.get("/api/preview")
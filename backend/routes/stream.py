@@ -1,11 +1,38 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import time
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Callable
 
-from fastapi import FastAPI, File, Form, HTTPException, Query, UploadFile
-from fastapi.responses import JSONResponse, Response
+import anyio
+import numpy as np
+from fastapi import (
+    Body,
+    FastAPI,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    UploadFile,
+    WebSocket,
+)
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from .wakeup import Wakeup
+
+# Long-polls and event streams are bounded so dead clients do not pile up; an
+# EventSource reconnects on its own and resumes from its Last-Event-ID.
+_REMOTE_WAIT_MAX_S = 30.0
+_REMOTE_EVENTS_KEEPALIVE_S = 15.0
+_REMOTE_EVENTS_MAX_S = 60.0
+# Compressed frames are byte-shuffled, which no HTTP client undoes on its own: the
+# stored form is only sent to clients that opt in with this header (and accept the coding).
+_REMOTE_SHUFFLE_OPT_IN = "x-accept-byte-shuffle"
 
 
 @dataclass(frozen=True)
@@ -31,6 +58,212 @@ class StreamRouteDeps:
     remote_extract_metadata: Callable[[dict[str, Any]], dict[str, Any]]
     remote_store_frame: Callable[..., int]
     remote_snapshot: Callable[[str], dict[str, Any] | None]
+    remote_frame_at: Callable[[str, int], dict[str, Any] | None]
+    remote_history: Callable[[str], dict[str, Any]]
+    remote_raw_layout: Callable[..., tuple[Any, tuple[int, ...]]]
+    remote_raw_frame: Callable[..., tuple[bytes, str, tuple[int, ...]]]
+    remote_store_raw: Callable[..., int]
+    remote_attach_meta: Callable[[str, int, dict[str, Any]], bool]
+    remote_subscribe: Callable[..., Callable[[], None]]
+    remote_frame_bytes: Callable[[dict[str, Any]], bytes]
+    remote_pack_peak_sets: Callable[[list[dict[str, Any]]], bytes]
+    remote_unpack_peak_sets: Callable[[bytes], list[dict[str, Any]]]
+    remote_ingest_submit: Callable[..., Any]
+    remote_ingest_metrics: Callable[[str | None], dict[str, Any]]
+    remote_record_start: Callable[..., dict[str, Any]]
+    remote_record_stop: Callable[[str], dict[str, Any] | None]
+    remote_record_status: Callable[[str | None], dict[str, Any]]
+
+
+def _remote_frame_headers(source_id: str, frame: dict[str, Any]) -> dict[str, str]:
+    meta = frame.get("meta") or {}
+    resolution = meta.get("resolution") or {}
+    display_name = str(meta.get("display_name") or "").strip()
+    if not display_name:
+        parts: list[str] = [f"Remote stream ({source_id})"]
+        if meta.get("series_number") is not None:
+            parts.append(f"S{meta.get('series_number')}")
+        if meta.get("image_number") is not None:
+            parts.append(f"Img{meta.get('image_number')}")
+        if meta.get("image_datetime"):
+            parts.append(str(meta.get("image_datetime")))
+        display_name = " ".join(parts)
+    headers = {
+        "X-Dtype": str(frame.get("dtype") or ""),
+        "X-Shape": ",".join(str(v) for v in frame.get("shape") or ()),
+        "X-Frame": "0",
+        "X-Remote-Source": source_id,
+        "X-Remote-Seq": str(int(frame.get("seq", 0))),
+        "X-Remote-Display": display_name,
+    }
+    if meta.get("series_number") is not None:
+        headers["X-Remote-Series"] = str(meta.get("series_number"))
+    if meta.get("image_number") is not None:
+        headers["X-Remote-Image"] = str(meta.get("image_number"))
+    if meta.get("image_datetime"):
+        headers["X-Remote-Date"] = str(meta.get("image_datetime"))
+    if resolution.get("distance_mm") is not None:
+        headers["X-Remote-DetectorDistance-MM"] = str(resolution.get("distance_mm"))
+    if resolution.get("pixel_size_um") is not None:
+        headers["X-Remote-PixelSize-UM"] = str(resolution.get("pixel_size_um"))
+    if resolution.get("energy_ev") is not None:
+        headers["X-Remote-Energy-Ev"] = str(resolution.get("energy_ev"))
+    if resolution.get("wavelength_a") is not None:
+        headers["X-Remote-Wavelength-A"] = str(resolution.get("wavelength_a"))
+    center = resolution.get("beam_center_px")
+    if isinstance(center, list) and len(center) >= 2:
+        headers["X-Remote-BeamCenter-X"] = str(center[0])
+        headers["X-Remote-BeamCenter-Y"] = str(center[1])
+    peak_sets = meta.get("peak_sets") if isinstance(meta, dict) else []
+    headers["X-Remote-PeakSets"] = str(len(peak_sets) if isinstance(peak_sets, list) else 0)
+    return headers
+
+
+def _accepts_encoding(accept_encoding: str | None, coding: str) -> bool:
+    """True when an Accept-Encoding header lists `coding` with a non-zero q-value."""
+    for item in (accept_encoding or "").split(","):
+        token, _, params = item.partition(";")
+        if token.strip().lower() != coding:
+            continue
+        quality = params.strip().lower()
+        if quality.startswith("q="):
+            try:
+                return float(quality[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+def _remote_frame_response(
+    source_id: str,
+    frame: dict[str, Any],
+    request: Request,
+    frame_bytes: Callable[[dict[str, Any]], bytes],
+) -> Response:
+    """Send a stored frame, compressed as stored when the client can take it that way.
+
+    Pass-through responses carry `Content-Encoding: <zstd|lz4>` and `X-Byte-Shuffle:
+    <itemsize>`; every other client gets the pixels decompressed on the server.
+    """
+    headers = _remote_frame_headers(source_id, frame)
+    headers["Vary"] = "Accept-Encoding, X-Accept-Byte-Shuffle"
+    encoding = frame.get("encoding")
+    if (
+        encoding
+        and frame.get("encoded") is not None
+        and request.headers.get(_REMOTE_SHUFFLE_OPT_IN, "").strip() == "1"
+        and _accepts_encoding(request.headers.get("accept-encoding"), str(encoding))
+    ):
+        headers["Content-Encoding"] = str(encoding)
+        headers["X-Byte-Shuffle"] = str(int(frame.get("shuffle") or 1))
+        content = frame["encoded"]
+    else:
+        content = frame_bytes(frame)
+    return Response(content=content, media_type="application/octet-stream", headers=headers)
+
+
+def _peak_sets_json(peak_sets: list[dict[str, Any]], *, points: bool) -> list[dict[str, Any]]:
+    """JSON form of stored peak sets: `[x, y]` / `[x, y, intensity]` lists, or only counts.
+
+    Values are rounded to 3 decimals; float32 values printed as doubles would carry
+    eight spurious digits each.
+    """
+    out = []
+    for item in peak_sets:
+        rows = np.round(item["points"].astype(np.float64), 3)
+        entry = {"name": item["name"], "color": item["color"], "count": int(rows.shape[0])}
+        if points:
+            has_intensity = np.isfinite(rows[:, 2])
+            if has_intensity.all():
+                entry["points"] = rows.tolist()
+            elif not has_intensity.any():
+                entry["points"] = rows[:, :2].tolist()
+            else:
+                entry["points"] = [
+                    row if keep else row[:2] for row, keep in zip(rows.tolist(), has_intensity)
+                ]
+        out.append(entry)
+    return out
+
+
+def _remote_meta_payload(
+    source_id: str, frame: dict[str, Any], *, peak_points: bool = True
+) -> dict[str, Any]:
+    """Frame metadata as JSON; without `peak_points` the peak sets are listed without points."""
+    meta = frame.get("meta") if isinstance(frame.get("meta"), dict) else {}
+    return {
+        "source_id": source_id,
+        "seq": int(frame.get("seq", 0)),
+        "updated_at": frame.get("updated_at"),
+        "display_name": meta.get("display_name") or "",
+        "series_number": meta.get("series_number"),
+        "image_number": meta.get("image_number"),
+        "image_datetime": meta.get("image_datetime") or "",
+        "resolution": meta.get("resolution") or {},
+        "peak_sets": _peak_sets_json(meta.get("peak_sets") or [], points=peak_points),
+        "extra": meta.get("extra") or {},
+    }
+
+
+class _LatestFrameSlot:
+    """Mailbox of one WebSocket viewer: a newer frame replaces one not yet sent."""
+
+    def __init__(self) -> None:
+        self.frame: dict[str, Any] | None = None
+        self.dropped = 0
+        self.sent_version = 0
+        self._ready = asyncio.Event()
+
+    def offer(self, frame: dict[str, Any]) -> None:
+        if self.frame is not None:
+            self.dropped += 1
+        self.frame = frame
+        self._ready.set()
+
+    async def take(self) -> dict[str, Any]:
+        """Wait for the newest frame not sent yet (the subscription may repeat the snapshot)."""
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            frame, self.frame = self.frame, None
+            if frame is not None and int(frame.get("version", 0)) > self.sent_version:
+                self.sent_version = int(frame.get("version", 0))
+                return frame
+
+
+def _split_ws_frame(message: bytes) -> tuple[dict[str, Any], memoryview]:
+    """Split a WebSocket frame message into its JSON header and pixel payload.
+
+    Layout: little-endian uint32 header length, UTF-8 JSON header, raw C-order pixels.
+    """
+    if len(message) < 4:
+        raise HTTPException(status_code=400, detail="Frame message is shorter than its prefix")
+    size = int.from_bytes(message[:4], "little")
+    if len(message) < 4 + size:
+        raise HTTPException(status_code=400, detail="Frame header exceeds the message")
+    try:
+        header = json.loads(message[4 : 4 + size])
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Invalid frame header JSON") from exc
+    if not isinstance(header, dict):
+        raise HTTPException(status_code=400, detail="Frame header must be a JSON object")
+    return header, memoryview(message)[4 + size :]
+
+
+def _size_mismatch(expected: int, got: Any) -> str:
+    return f"Remote raw image size mismatch (expected {expected} bytes, got {got})"
+
+
+def _remote_not_retained(history: dict[str, Any]) -> JSONResponse:
+    return JSONResponse(
+        status_code=404,
+        content={
+            "detail": "Requested sequence is not retained",
+            "oldest_seq": history.get("oldest_seq"),
+            "latest_seq": history.get("latest_seq"),
+        },
+    )
 
 
 def register_stream_routes(app: FastAPI, deps: StreamRouteDeps) -> None:
@@ -174,90 +407,425 @@ def register_stream_routes(app: FastAPI, deps: StreamRouteDeps) -> None:
         seq: int | None = Query(None, ge=0),
         meta: str = Form("{}"),
         image: UploadFile = File(...),
+        peaks: UploadFile | None = File(None),
     ) -> dict[str, Any]:
+        """Ingest one encoded frame; peak sets may come as a binary `peaks` attachment."""
         if not image.filename:
             raise HTTPException(status_code=400, detail="Missing image filename")
         payload = await image.read()
         if not payload:
             raise HTTPException(status_code=400, detail="Empty image payload")
+        peaks_payload = await peaks.read() if peaks is not None else None
         meta_dict = deps.remote_parse_meta(meta)
         safe_source = deps.remote_safe_source_id(
             source_id or str(meta_dict.get("source_id") or "default")
         )
-        frame = deps.remote_read_image_bytes(payload, meta=meta_dict, filename=image.filename)
-        extracted_meta = deps.remote_extract_metadata(meta_dict)
-        seq_value = deps.remote_store_frame(
-            source_id=safe_source, frame=frame, meta=extracted_meta, seq=seq
-        )
-        deps.logger.debug(
-            "Remote frame ingested: source=%s seq=%s shape=%s dtype=%s peak_sets=%d",
-            safe_source,
-            seq_value,
-            tuple(int(v) for v in frame.shape),
-            frame.dtype.str,
-            len(extracted_meta.get("peak_sets") or []),
+        filename = image.filename
+
+        def _decode() -> tuple[np.ndarray, dict[str, Any]]:
+            frame = deps.remote_read_image_bytes(payload, meta=meta_dict, filename=filename)
+            extracted_meta = deps.remote_extract_metadata(meta_dict)
+            if peaks_payload is not None:
+                extracted_meta["peak_sets"] = deps.remote_unpack_peak_sets(peaks_payload)
+            return frame, extracted_meta
+
+        def _store(decoded: tuple[np.ndarray, dict[str, Any]]) -> int:
+            frame, extracted_meta = decoded
+            seq_value = deps.remote_store_frame(
+                source_id=safe_source, frame=frame, meta=extracted_meta, seq=seq
+            )
+            deps.logger.debug(
+                "Remote frame ingested: source=%s seq=%s shape=%s dtype=%s peak_sets=%d",
+                safe_source,
+                seq_value,
+                tuple(int(v) for v in frame.shape),
+                frame.dtype.str,
+                len(extracted_meta.get("peak_sets") or []),
+            )
+            return seq_value
+
+        # Decoding runs on the ingest pool so the event loop keeps serving other requests;
+        # stores of one source keep the order the frames arrived in.
+        seq_value = await asyncio.wrap_future(
+            deps.remote_ingest_submit(safe_source, _decode, _store)
         )
+        if seq_value is None:
+            return {"status": "dropped", "source_id": safe_source, "seq": None}
         return {"status": "ok", "source_id": safe_source, "seq": seq_value}
 
+    @app.post("/api/remote/v2/frame")
+    async def remote_frame_ingest_raw(
+        request: Request,
+        source_id: str = Query("default", min_length=1),
+        seq: int | None = Query(None, ge=0),
+        x_dtype: str = Header(...),
+        x_shape: str = Header(...),
+        x_seq: int | None = Header(None, ge=0),
+        x_meta: str | None = Header(None),
+    ) -> dict[str, Any]:
+        """Ingest one raw frame sent as the request body (`application/octet-stream`).
+
+        dtype/shape/seq come from `X-Dtype`, `X-Shape` and `X-Seq`; metadata from an
+        `X-Meta` JSON header or a separate `/api/remote/v2/meta` request.
+        """
+        safe_source = deps.remote_safe_source_id(source_id)
+        dtype, shape = deps.remote_raw_layout(x_dtype, x_shape)
+        expected = int(np.prod(shape)) * dtype.itemsize
+        length = request.headers.get("content-length")
+        # A wrong Content-Length is rejected before the body is read.
+        if length is not None and length.strip() != str(expected):
+            raise HTTPException(status_code=400, detail=_size_mismatch(expected, length))
+        payload = await request.body()
+        if len(payload) != expected:
+            raise HTTPException(status_code=400, detail=_size_mismatch(expected, len(payload)))
+        meta_dict = deps.remote_parse_meta(x_meta) if x_meta else None
+
+        def _store(normalized: tuple[bytes, str, tuple[int, ...]]) -> dict[str, Any]:
+            raw, dtype_str, stored_shape = normalized
+            seq_value = deps.remote_store_raw(
+                source_id=safe_source,
+                raw=raw,
+                dtype=dtype_str,
+                shape=stored_shape,
+                meta=deps.remote_extract_metadata(meta_dict) if meta_dict is not None else None,
+                seq=x_seq if x_seq is not None else seq,
+            )
+            return {"seq": seq_value, "stored_as_received": raw is payload}
+
+        stored = await asyncio.wrap_future(
+            deps.remote_ingest_submit(
+                safe_source, lambda: deps.remote_raw_frame(payload, dtype, shape), _store
+            )
+        )
+        if stored is None:
+            return {"status": "dropped", "source_id": safe_source, "seq": None}
+        return {"status": "ok", "source_id": safe_source, **stored}
+
+    @app.post("/api/remote/v2/meta")
+    def remote_meta_ingest(
+        source_id: str = Query("default", min_length=1),
+        seq: int = Query(..., ge=0),
+        meta: dict[str, Any] = Body(...),
+    ) -> dict[str, Any]:
+        """Attach metadata to frame `seq`, before or after the frame itself arrives."""
+        safe_source = deps.remote_safe_source_id(source_id)
+        attached = deps.remote_attach_meta(safe_source, seq, deps.remote_extract_metadata(meta))
+        return {"status": "ok", "source_id": safe_source, "seq": seq, "attached": attached}
+
+    @app.websocket("/api/remote/v2/ws/ingest")
+    async def remote_ws_ingest(
+        websocket: WebSocket, source_id: str = Query("default", min_length=1)
+    ) -> None:
+        """Persistent producer connection: every binary message is one frame.
+
+        Messages use the `_split_ws_frame` layout; the header carries `dtype`, `shape`
+        and optionally `seq`, `meta`, `ack` and `peaks_nbytes` (binary peak sets appended
+        after the pixels). Nothing is sent back unless a frame is rejected
+        (`{"error", "seq"}`) or the header asks for an acknowledgement.
+        """
+        try:
+            safe_source = deps.remote_safe_source_id(source_id)
+        except HTTPException as exc:
+            await websocket.close(code=1008, reason=str(exc.detail))
+            return
+        await websocket.accept()
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            header: dict[str, Any] = {}
+            try:
+                if message.get("bytes") is None:
+                    raise HTTPException(status_code=400, detail="Frames must be binary messages")
+                header, payload = _split_ws_frame(message["bytes"])
+                seq = header.get("seq")
+                if seq is not None and (not isinstance(seq, int) or seq < 0):
+                    raise HTTPException(
+                        status_code=400, detail="seq must be a non-negative integer"
+                    )
+                meta = header.get("meta")
+                if meta is not None and not isinstance(meta, dict):
+                    raise HTTPException(status_code=400, detail="meta must be a JSON object")
+                peaks_nbytes = header.get("peaks_nbytes") or 0
+                if not isinstance(peaks_nbytes, int) or not 0 <= peaks_nbytes <= len(payload):
+                    raise HTTPException(status_code=400, detail="Invalid peaks_nbytes")
+                split = len(payload) - peaks_nbytes
+                dtype, shape = deps.remote_raw_layout(
+                    header.get("dtype"), header.get("shape"), split
+                )
+
+                # Each frame is awaited before the next message is read, so the
+                # closures below see this frame's payload and header.
+                def _decode() -> tuple[tuple[bytes, str, tuple[int, ...]], dict[str, Any] | None]:
+                    extracted = deps.remote_extract_metadata(meta) if meta is not None else None
+                    if split < len(payload):
+                        if extracted is None:
+                            extracted = deps.remote_extract_metadata({})
+                        extracted["peak_sets"] = deps.remote_unpack_peak_sets(
+                            bytes(payload[split:])
+                        )
+                    frame = deps.remote_raw_frame(bytes(payload[:split]), dtype, shape)
+                    return frame, extracted
+
+                def _store(decoded: Any) -> int:
+                    (raw, dtype_str, stored_shape), extracted = decoded
+                    return deps.remote_store_raw(
+                        source_id=safe_source,
+                        raw=raw,
+                        dtype=dtype_str,
+                        shape=stored_shape,
+                        meta=extracted,
+                        seq=seq,
+                    )
+
+                # Same bounded queue (and per-source store order) as the HTTP ingest routes.
+                seq_value = await asyncio.wrap_future(
+                    deps.remote_ingest_submit(safe_source, _decode, _store)
+                )
+            except HTTPException as exc:
+                await websocket.send_json({"error": exc.detail, "seq": header.get("seq")})
+                continue
+            if seq_value is None:
+                await websocket.send_json({"status": "dropped", "seq": header.get("seq")})
+            elif header.get("ack"):
+                await websocket.send_json({"seq": seq_value})
+
+    @app.websocket("/api/remote/v2/ws/stream")
+    async def remote_ws_stream(
+        websocket: WebSocket,
+        source_id: str = Query("default", min_length=1),
+        after_seq: int | None = Query(None, ge=0),
+    ) -> None:
+        """Viewer connection: each frame is a JSON text message followed by its pixel bytes.
+
+        When the header's `peaks_nbytes` is non-zero, a second binary message with the
+        frame's peak sets (the `/api/remote/v1/peaks` form) follows the pixels.
+
+        Every viewer holds at most one undelivered frame; a slow viewer skips to the
+        newest one (`dropped` counts the skipped frames). All viewers send the stored
+        bytes object itself, so fan-out adds no per-viewer copy.
+        """
+        try:
+            safe_source = deps.remote_safe_source_id(source_id)
+        except HTTPException as exc:
+            await websocket.close(code=1008, reason=str(exc.detail))
+            return
+        await websocket.accept()
+        loop = asyncio.get_running_loop()
+        slot = _LatestFrameSlot()
+        unsubscribe = deps.remote_subscribe(
+            safe_source, lambda frame: loop.call_soon_threadsafe(slot.offer, frame)
+        )
+        current = deps.remote_snapshot(safe_source)
+        if current and (after_seq is None or int(current.get("seq", 0)) > after_seq):
+            slot.offer(current)
+
+        async def _send() -> None:
+            while True:
+                frame = await slot.take()
+                peak_sets = (frame.get("meta") or {}).get("peak_sets") or []
+                peaks = deps.remote_pack_peak_sets(peak_sets) if peak_sets else b""
+                await websocket.send_text(
+                    json.dumps(
+                        {
+                            "seq": int(frame.get("seq", 0)),
+                            "dropped": slot.dropped,
+                            "headers": _remote_frame_headers(safe_source, frame),
+                            "meta": _remote_meta_payload(safe_source, frame, peak_points=False),
+                            "peaks_nbytes": len(peaks),
+                        }
+                    )
+                )
+                await websocket.send_bytes(deps.remote_frame_bytes(frame))
+                if peaks:
+                    await websocket.send_bytes(peaks)
+
+        async def _until_closed() -> None:
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+
+        try:
+            async with anyio.create_task_group() as group:
+
+                async def _first_done(job: Callable[[], Any]) -> None:
+                    try:
+                        await job()
+                    finally:
+                        # Either side ending (viewer gone, send failed) ends the session.
+                        group.cancel_scope.cancel()
+
+                group.start_soon(_first_done, _send)
+                group.start_soon(_first_done, _until_closed)
+        except Exception:
+            # Sending into a socket the viewer already closed; nothing is left to report.
+            pass
+        finally:
+            unsubscribe()
+
+    async def _next_remote_frame(
+        source_id: str,
+        wakeup: Wakeup,
+        timeout_s: float,
+        *,
+        after_seq: int | None = None,
+        after_version: int = 0,
+    ) -> dict[str, Any] | None:
+        # `wakeup` is subscribed to the source, so waiting holds no thread.
+        deadline = time.monotonic() + timeout_s
+        while True:
+            frame = deps.remote_snapshot(source_id)
+            if (
+                frame
+                and (after_seq is None or int(frame.get("seq", 0)) > after_seq)
+                and int(frame.get("version", 0)) > after_version
+            ):
+                return frame
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            await wakeup.wait(remaining)
+
     @app.get("/api/remote/v1/latest")
-    def remote_frame_latest(
+    async def remote_frame_latest(
+        request: Request,
         source_id: str = Query("default", min_length=1),
         after_seq: int | None = Query(None, ge=0),
+        timeout: float = Query(0.0, ge=0.0),
     ) -> Response:
+        """Newest frame of a source; with `timeout`, wait up to that long for one past `after_seq`."""
         safe_source = deps.remote_safe_source_id(source_id)
-        frame = deps.remote_snapshot(safe_source)
+        if timeout > 0:
+            wakeup = Wakeup()
+            unsubscribe = deps.remote_subscribe(safe_source, wakeup.notify)
+            try:
+                frame = await _next_remote_frame(
+                    safe_source, wakeup, min(timeout, _REMOTE_WAIT_MAX_S), after_seq=after_seq
+                )
+            finally:
+                unsubscribe()
+        else:
+            frame = deps.remote_snapshot(safe_source)
         if not frame:
             return Response(status_code=204)
         seq = int(frame.get("seq", 0))
         if after_seq is not None and seq <= int(after_seq):
             return Response(status_code=204)
+        # Decompressing a stored frame is CPU work; keep it off the event loop.
+        return await anyio.to_thread.run_sync(
+            _remote_frame_response, safe_source, frame, request, deps.remote_frame_bytes
+        )
 
-        meta = frame.get("meta") or {}
-        resolution = meta.get("resolution") or {}
-        display_name = str(meta.get("display_name") or "").strip()
-        if not display_name:
-            parts: list[str] = [f"Remote stream ({safe_source})"]
-            if meta.get("series_number") is not None:
-                parts.append(f"S{meta.get('series_number')}")
-            if meta.get("image_number") is not None:
-                parts.append(f"Img{meta.get('image_number')}")
-            if meta.get("image_datetime"):
-                parts.append(str(meta.get("image_datetime")))
-            display_name = " ".join(parts)
-        headers = {
-            "X-Dtype": str(frame.get("dtype") or ""),
-            "X-Shape": ",".join(str(v) for v in frame.get("shape") or ()),
-            "X-Frame": "0",
-            "X-Remote-Source": safe_source,
-            "X-Remote-Seq": str(seq),
-            "X-Remote-Display": display_name,
-        }
-        if meta.get("series_number") is not None:
-            headers["X-Remote-Series"] = str(meta.get("series_number"))
-        if meta.get("image_number") is not None:
-            headers["X-Remote-Image"] = str(meta.get("image_number"))
-        if meta.get("image_datetime"):
-            headers["X-Remote-Date"] = str(meta.get("image_datetime"))
-        if resolution.get("distance_mm") is not None:
-            headers["X-Remote-DetectorDistance-MM"] = str(resolution.get("distance_mm"))
-        if resolution.get("pixel_size_um") is not None:
-            headers["X-Remote-PixelSize-UM"] = str(resolution.get("pixel_size_um"))
-        if resolution.get("energy_ev") is not None:
-            headers["X-Remote-Energy-Ev"] = str(resolution.get("energy_ev"))
-        if resolution.get("wavelength_a") is not None:
-            headers["X-Remote-Wavelength-A"] = str(resolution.get("wavelength_a"))
-        center = resolution.get("beam_center_px")
-        if isinstance(center, list) and len(center) >= 2:
-            headers["X-Remote-BeamCenter-X"] = str(center[0])
-            headers["X-Remote-BeamCenter-Y"] = str(center[1])
-        peak_sets = meta.get("peak_sets") if isinstance(meta, dict) else []
-        headers["X-Remote-PeakSets"] = str(len(peak_sets) if isinstance(peak_sets, list) else 0)
-        return Response(
-            content=frame.get("bytes") or b"",
-            media_type="application/octet-stream",
-            headers=headers,
+    @app.get("/api/remote/v1/events")
+    async def remote_frame_events(
+        source_id: str = Query("default", min_length=1),
+        after_seq: int | None = Query(None, ge=0),
+        last_event_id: str | None = Header(None),
+    ) -> StreamingResponse:
+        """Server-Sent Events announcing each newly committed frame of a source (`id` = seq)."""
+        safe_source = deps.remote_safe_source_id(source_id)
+        if after_seq is None and last_event_id and last_event_id.strip().isdigit():
+            after_seq = int(last_event_id.strip())
+
+        def _event(frame: dict[str, Any]) -> str:
+            payload = {
+                "source_id": safe_source,
+                "seq": int(frame.get("seq", 0)),
+                "dtype": str(frame.get("dtype") or ""),
+                "shape": list(frame.get("shape") or ()),
+                "nbytes": int(frame.get("nbytes", 0)),
+                "updated_at": frame.get("updated_at"),
+            }
+            return f"id: {payload['seq']}\ndata: {json.dumps(payload)}\n\n"
+
+        async def _stream():
+            deadline = time.monotonic() + _REMOTE_EVENTS_MAX_S
+            wakeup = Wakeup()
+            unsubscribe = deps.remote_subscribe(safe_source, wakeup.notify)
+            try:
+                yield "retry: 1000\n\n"
+                version = 0
+                frame = deps.remote_snapshot(safe_source)
+                if frame:
+                    version = int(frame.get("version", 0))
+                    if after_seq is None or int(frame.get("seq", 0)) > after_seq:
+                        yield _event(frame)
+                while time.monotonic() < deadline:
+                    frame = await _next_remote_frame(
+                        safe_source,
+                        wakeup,
+                        min(_REMOTE_EVENTS_KEEPALIVE_S, max(0.0, deadline - time.monotonic())),
+                        after_version=version,
+                    )
+                    if frame is None:
+                        yield ": keepalive\n\n"
+                        continue
+                    version = int(frame.get("version", 0))
+                    yield _event(frame)
+            finally:
+                unsubscribe()
+
+        return StreamingResponse(
+            _stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
         )
 
+    @app.get("/api/remote/v1/frame")
+    def remote_frame_at(
+        request: Request,
+        source_id: str = Query("default", min_length=1),
+        seq: int = Query(..., ge=0),
+    ) -> Response:
+        """Return any frame still held in the source's ring (404 once it was evicted)."""
+        safe_source = deps.remote_safe_source_id(source_id)
+        frame = deps.remote_frame_at(safe_source, seq)
+        if not frame:
+            return _remote_not_retained(deps.remote_history(safe_source))
+        return _remote_frame_response(safe_source, frame, request, deps.remote_frame_bytes)
+
+    @app.get("/api/remote/v1/metrics")
+    def remote_ingest_metrics(source_id: str | None = Query(None, min_length=1)) -> dict[str, Any]:
+        """Ingest queue state, plus per-source counters and latencies (ms) of the recent frames."""
+        safe_source = deps.remote_safe_source_id(source_id) if source_id is not None else None
+        return deps.remote_ingest_metrics(safe_source)
+
+    @app.post("/api/remote/v1/record/start")
+    def remote_record_start(payload: dict[str, Any] = Body(...)) -> dict[str, Any]:
+        """Append every frame stored for a source to an HDF5 stack until stopped."""
+        safe_source = deps.remote_safe_source_id(str(payload.get("source_id", "") or ""))
+        try:
+            max_frames = int(payload.get("max_frames", 0) or 0)
+            max_seconds = float(payload.get("max_seconds", 0) or 0)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid recording limits") from None
+        if max_frames < 0 or not np.isfinite(max_seconds) or max_seconds < 0:
+            raise HTTPException(status_code=400, detail="Invalid recording limits")
+        return deps.remote_record_start(
+            source_id=safe_source,
+            output_path=str(payload.get("output_path", "") or "").strip() or None,
+            max_frames=max_frames,
+            max_seconds=max_seconds,
+        )
+
+    @app.post("/api/remote/v1/record/stop")
+    def remote_record_stop(payload: dict[str, Any] = Body(...)) -> dict[str, Any]:
+        """Stop a recording once its queued frames are written; returns the final status."""
+        safe_source = deps.remote_safe_source_id(str(payload.get("source_id", "") or ""))
+        status = deps.remote_record_stop(safe_source)
+        if status is None:
+            raise HTTPException(status_code=404, detail="Source is not being recorded")
+        return status
+
+    @app.get("/api/remote/v1/record/status")
+    def remote_record_status(source_id: str | None = Query(None, min_length=1)) -> dict[str, Any]:
+        safe_source = deps.remote_safe_source_id(source_id) if source_id is not None else None
+        return deps.remote_record_status(safe_source)
+
+    @app.get("/api/remote/v1/history")
+    def remote_frame_history(source_id: str = Query("default", min_length=1)) -> dict[str, Any]:
+        """List the sequence numbers retained for a source, oldest first."""
+        return deps.remote_history(deps.remote_safe_source_id(source_id))
+
     @app.get("/api/remote/v1/meta")
     def remote_frame_meta(
         source_id: str = Query("default", min_length=1),
@@ -269,25 +837,46 @@ def register_stream_routes(app: FastAPI, deps: StreamRouteDeps) -> None:
             return Response(status_code=204)
         current_seq = int(frame.get("seq", 0))
         if seq is not None and int(seq) != current_seq:
-            return JSONResponse(
-                status_code=409,
-                content={
-                    "detail": "Requested sequence is no longer current",
-                    "current_seq": current_seq,
-                },
-            )
-        meta = frame.get("meta") if isinstance(frame.get("meta"), dict) else {}
-        return JSONResponse(
-            {
-                "source_id": safe_source,
-                "seq": current_seq,
-                "updated_at": frame.get("updated_at"),
-                "display_name": meta.get("display_name") or "",
-                "series_number": meta.get("series_number"),
-                "image_number": meta.get("image_number"),
-                "image_datetime": meta.get("image_datetime") or "",
-                "resolution": meta.get("resolution") or {},
-                "peak_sets": meta.get("peak_sets") or [],
-                "extra": meta.get("extra") or {},
-            }
+            frame = deps.remote_frame_at(safe_source, int(seq))
+            if not frame:
+                return JSONResponse(
+                    status_code=409,
+                    content={
+                        "detail": "Requested sequence is no longer retained",
+                        "current_seq": current_seq,
+                    },
+                )
+        return JSONResponse(_remote_meta_payload(safe_source, frame))
+
+    @app.get("/api/remote/v1/peaks")
+    def remote_frame_peaks(
+        source_id: str = Query("default", min_length=1),
+        seq: int | None = Query(None, ge=0),
+    ) -> Response:
+        """Peak sets of a frame as float32 rows (see `remote_pack_peak_sets` for the layout)."""
+        safe_source = deps.remote_safe_source_id(source_id)
+        frame = deps.remote_snapshot(safe_source)
+        if not frame:
+            return Response(status_code=204)
+        current_seq = int(frame.get("seq", 0))
+        if seq is not None and int(seq) != current_seq:
+            frame = deps.remote_frame_at(safe_source, int(seq))
+            if not frame:
+                return JSONResponse(
+                    status_code=409,
+                    content={
+                        "detail": "Requested sequence is no longer retained",
+                        "current_seq": current_seq,
+                    },
+                )
+        peak_sets = (frame.get("meta") or {}).get("peak_sets") or []
+        headers = {
+            "X-Remote-Source": safe_source,
+            "X-Remote-Seq": str(int(frame.get("seq", 0))),
+            "X-Remote-PeakSets": str(len(peak_sets)),
+        }
+        return Response(
+            content=deps.remote_pack_peak_sets(peak_sets),
+            media_type="application/octet-stream",
+            headers=headers,
         )
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+"""Wake async handlers from the service threads that change their state.
+
+Long-poll and streaming handlers used to block a threadpool thread in a
+service's `threading.Condition` wait. They now subscribe `Wakeup.notify` to
+the service and await `Wakeup.wait`, so a waiting client holds no thread.
+"""
+
+import asyncio
+from typing import Any
+
+
+class Wakeup:
+    """An asyncio event that any thread may set; create it inside the handler's loop."""
+
+    def __init__(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._event = asyncio.Event()
+
+    def notify(self, *_args: Any) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._event.set)
+        except RuntimeError:
+            pass  # the loop is closing; nobody waits any more
+
+    async def wait(self, timeout_s: float) -> bool:
+        """Wait for a notification since the previous wait; False on timeout."""
+        try:
+            await asyncio.wait_for(self._event.wait(), max(0.0, float(timeout_s)))
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._event.clear()
+        return True
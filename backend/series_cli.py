@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+"""Headless series reductions for batch scripts and compute nodes.
+
+`sum` runs the same job as `/api/analysis/series-sum/start` without the web
+server; `--shard i/n` reduces only part i of n so a long series can be split
+across nodes, and `merge` reassembles the shard outputs:
+
+    python -m backend.series_cli sum scan_master.h5 --dataset /entry/data/data \\
+        --mode step --step 1000 --shard 3/16 --output out/part_03.h5
+    python -m backend.series_cli merge out/scan_sum.h5 out/part_*.h5
+
+Relative paths are resolved against the working directory. The job result
+(status, outputs) is printed as JSON on stdout; progress goes to stderr.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+from fastapi import HTTPException
+
+from .routes.analysis import parse_series_sum_request
+from .services.series_merge import merge_series_shards
+from .services.series_summing import SeriesSummingService
+from .services.series_worker import build_worker_deps
+
+_FINISHED_STATUSES = {"done", "error", "cancelled"}
+
+
+def _parse_shard(value: str) -> tuple[int, int]:
+    try:
+        index, count = (int(part) for part in value.split("/", 1))
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected i/n, e.g. 3/16") from None
+    if count < 1 or not 1 <= index <= count:
+        raise argparse.ArgumentTypeError("shard must be i/n with 1 <= i <= n")
+    return index, count
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m backend.series_cli", description="Headless ALBIS series reductions."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("sum", help="reduce a series (optionally one shard of it)")
+    run.add_argument("file", help="HDF5 master/stack or first file of a CBF/TIFF/EDF series")
+    run.add_argument("--dataset", default="", help="HDF5 dataset path")
+    run.add_argument("--mode", default="all", choices=["all", "step", "nth", "range", "rolling"])
+    run.add_argument("--step", type=int, default=10, help="group size / N / window length")
+    run.add_argument("--stride", type=int, default=1, help="rolling window stride")
+    run.add_argument("--operation", default="sum", help="sum, mean, median, std, var, min, max")
+    run.add_argument("--operations", default=None, help="comma-separated list of operations")
+    run.add_argument("--normalize-frame", type=int, default=None)
+    run.add_argument("--range-start", type=int, default=None)
+    run.add_argument("--range-end", type=int, default=None)
+    run.add_argument("--output", default="", help="output file or base name")
+    run.add_argument("--format", default="hdf5", choices=["hdf5", "h5", "tiff", "tif"])
+    run.add_argument("--compression", default="gzip")
+    run.add_argument("--no-mask", action="store_true", help="do not apply the pixel mask")
+    run.add_argument("--dark", default="", help="dark frame or dark stack to subtract")
+    run.add_argument("--dark-dataset", default="", help="HDF5 dataset of --dark")
+    run.add_argument("--flat", default="", help="flat field (or gain map) to correct with")
+    run.add_argument("--flat-dataset", default="", help="HDF5 dataset of --flat")
+    run.add_argument("--flat-mode", default="flat", choices=["flat", "gain"])
+    run.add_argument("--shard", type=_parse_shard, default=None, metavar="I/N")
+    run.add_argument(
+        "--decode-workers", type=int, default=0, help="file-series decode threads (0 = auto)"
+    )
+    run.add_argument("--quiet", action="store_true", help="no progress on stderr")
+
+    merge = commands.add_parser("merge", help="combine shard outputs into one file")
+    merge.add_argument("output", help="merged HDF5 file")
+    merge.add_argument("shards", nargs="+", help="shard output files (any order)")
+    merge.add_argument("--overwrite", action="store_true")
+    return parser
+
+
+def _run_sum(args: argparse.Namespace) -> int:
+    payload: dict[str, Any] = {
+        "file": args.file,
+        "dataset": args.dataset,
+        "mode": args.mode,
+        "step": args.step,
+        "stride": args.stride,
+        "operation": args.operation,
+        "operations": args.operations,
+        "normalize_frame": args.normalize_frame,
+        "range_start": args.range_start,
+        "range_end": args.range_end,
+        "output_path": args.output,
+        "format": args.format,
+        "apply_mask": not args.no_mask,
+        "compression": args.compression,
+        "dark_file": args.dark,
+        "dark_dataset": args.dark_dataset,
+        "flat_file": args.flat,
+        "flat_dataset": args.flat_dataset,
+        "flat_mode": args.flat_mode,
+    }
+    deps = build_worker_deps(Path.cwd(), True, decode_workers=max(0, int(args.decode_workers)))
+    service = SeriesSummingService(deps)
+    job_id = service.start_job(**parse_series_sum_request(payload), shard=args.shard)
+    job = service.get_job(job_id) or {}
+    last_line = 0.0
+    try:
+        while job.get("status") not in _FINISHED_STATUSES:
+            job = service.wait_job_update(job_id, int(job.get("revision", 0)), 1.0) or job
+            now = time.monotonic()
+            if not args.quiet and now - last_line >= 1.0:
+                last_line = now
+                progress = float(job.get("progress", 0.0)) * 100.0
+                print(f"{progress:5.1f}% {job.get('message', '')}", file=sys.stderr, flush=True)
+    except KeyboardInterrupt:
+        service.cancel_job(job_id)
+        while job.get("status") not in _FINISHED_STATUSES:
+            job = service.wait_job_update(job_id, int(job.get("revision", 0)), 1.0) or job
+    # The status turns final before the job thread has released its files; exiting
+    # while that daemon thread still holds h5py objects can hang the interpreter.
+    service.wait_idle()
+    summary = {key: job.get(key) for key in ("status", "message", "outputs", "error")}
+    print(json.dumps(summary, indent=2))
+    return 0 if job.get("status") == "done" else 1
+
+
+def _run_merge(args: argparse.Namespace) -> int:
+    summary = merge_series_shards(
+        build_worker_deps(Path.cwd(), True).get_h5py(),
+        [Path(path) for path in args.shards],
+        Path(args.output),
+        overwrite=args.overwrite,
+    )
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _build_parser().parse_args(argv)
+    try:
+        if args.command == "merge":
+            return _run_merge(args)
+        return _run_sum(args)
+    except HTTPException as exc:
+        print(f"error: {exc.detail}", file=sys.stderr)
+        return 2
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -23,6 +23,17 @@ MASK_PATHS = (
 _LINKED_DATA_NAME_RE = re.compile(r"^data(?:[_-]?(\d+))?$")
 
 
+def linked_view_files(base_file: Path, opened: list[Any]) -> list[Path]:
+    """Return the external files a dataset view reads from besides `base_file`.
+
+    `opened` is the handle list returned by `resolve_dataset_view`; the result is
+    sorted and excludes `base_file`, so it can key caches and staleness checks.
+    """
+    base = Path(base_file).resolve()
+    files = {Path(handle.filename).resolve() for handle in opened}
+    return sorted(path for path in files if path != base)
+
+
 @dataclass
 class HDF5StackService:
     data_dir: Path
@@ -753,3 +764,53 @@ class HDF5StackService:
             raise HTTPException(status_code=400, detail="Dataset is not 3D or 4D")
 
         raise HTTPException(status_code=400, detail="Unsupported dataset view")
+
+    @staticmethod
+    def frame_chunk_depth(view: dict[str, Any]) -> int:
+        """Return the HDF5 chunk length along the frame axis (1 if unchunked)."""
+        if view["kind"] == "dataset":
+            dset = view["dataset"]
+        elif view["kind"] == "linked_stack" and view["segments"]:
+            dset = view["segments"][0]["dataset"]
+        else:
+            return 1
+        chunks = getattr(dset, "chunks", None)
+        if not chunks:
+            return 1
+        return max(1, int(chunks[0]))
+
+    @staticmethod
+    def extract_frames(view: dict[str, Any], start: int, stop: int, threshold: int) -> np.ndarray:
+        """Read frames [start, stop) of a 3D/4D view as one (n, y, x) block."""
+        shape = tuple(int(x) for x in view["shape"])
+        ndim = int(view["ndim"])
+        if ndim not in (3, 4):
+            raise HTTPException(status_code=400, detail="Dataset is not 3D or 4D")
+        if start < 0 or stop > int(shape[0]) or start >= stop:
+            raise HTTPException(status_code=416, detail="Frame index out of range")
+        if ndim == 4 and threshold >= int(shape[1]):
+            raise HTTPException(status_code=416, detail="Threshold index out of range")
+
+        def _read(dset: Any, lo: int, hi: int) -> np.ndarray:
+            if ndim == 4:
+                return np.asarray(dset[lo:hi, threshold, :, :])
+            return np.asarray(dset[lo:hi, :, :])
+
+        if view["kind"] == "dataset":
+            return _read(view["dataset"], start, stop)
+        if view["kind"] == "linked_stack":
+            parts: list[np.ndarray] = []
+            offset = 0
+            for segment in view["segments"]:
+                frames = int(segment["frames"])
+                lo = max(start, offset)
+                hi = min(stop, offset + frames)
+                if lo < hi:
+                    parts.append(_read(segment["dataset"], lo - offset, hi - offset))
+                offset += frames
+                if offset >= stop:
+                    break
+            if len(parts) == 1:
+                return parts[0]
+            return np.concatenate(parts, axis=0)
+        raise HTTPException(status_code=400, detail="Unsupported dataset view")
@@ -0,0 +1,454 @@
+from __future__ import annotations
+
+"""Stack-wide hit finding over HDF5 image stacks.
+
+A hit-finding job counts the local maxima of every frame with the criterion
+of the viewer's peak finder (a pixel is a peak when it is brighter than its
+left/upper neighbours and at least as bright as its right/lower ones; masked
+and saturated pixels never count and act as -inf neighbours) and calls a
+frame a *hit* when it holds at least `min_peaks` peaks. The criterion runs on
+whole blocks of frames at once, and blocks are evaluated on a thread pool
+while the next ones are read.
+
+The result is a small HDF5 file next to the source: the per-frame peak counts
+and hit indices under `/entry/hits`, plus a virtual dataset `/entry/data/data`
+that maps only the hit frames of the source, so the viewer can step through
+the hits without copying any pixel data. Jobs queue on a bounded
+`JobScheduler` sized by `jobs.workers`, like series jobs.
+"""
+
+import functools
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+from fastapi import HTTPException
+
+from .frame_prefetch import FramePrefetcher, decode_worker_count
+from .job_scheduler import JobScheduler
+
+# Pixel-mask bits that exclude a pixel from peak detection (same as the viewer).
+PEAK_BAD_MASK_BITS = 0x1F
+HITS_SUFFIX = "_hits.h5"
+DEFAULT_MIN_PEAKS = 10
+# Detector metadata that holds the count above which a pixel is saturated.
+SATURATION_PATHS = (
+    "/entry/instrument/detector/detectorSpecific/countrate_correction_count_cutoff",
+    "/entry/instrument/detector/saturation_value",
+)
+_MAX_JOBS = 16
+# Upper bound for one block read from the source stack (rounded to whole chunks).
+_READ_BLOCK_BYTES = 64 * 1024 * 1024
+_ACTIVE_STATUSES = {"queued", "running"}
+
+
+@dataclass(frozen=True)
+class HitFindingDeps:
+    data_dir: Path
+    get_allow_abs_paths: Callable[[], bool]
+    is_within: Callable[[Path, Path], bool]
+    logger: Any
+    ensure_hdf5_stack: Callable[[], None]
+    get_h5py: Callable[[], Any]
+    resolve_image_file: Callable[[str], Path]
+    resolve_dataset_view: Callable[[Any, Path, str], tuple[dict[str, Any], list[Any]]]
+    extract_frames: Callable[[dict[str, Any], int, int, int], np.ndarray]
+    frame_chunk_depth: Callable[[dict[str, Any]], int]
+    find_pixel_mask: Callable[..., Any]
+    get_decode_workers: Callable[[], int]
+    get_job_workers: Callable[[], int] = lambda: 2
+
+
+def saturation_cutoff(h5: Any, dtype: Any) -> float | None:
+    """Return the value at or above which pixels count as saturated.
+
+    Uses the detector's count cutoff when the file records one, otherwise the
+    largest value of an integer dtype (the overflow marker of counting
+    detectors). Float stacks without metadata have no cutoff.
+    """
+    for path in SATURATION_PATHS:
+        if path in h5:
+            try:
+                value = float(np.asarray(h5[path][()]).reshape(-1)[0])
+            except (TypeError, ValueError, IndexError):
+                continue
+            if np.isfinite(value) and value > 0:
+                return value
+    dtype = np.dtype(dtype)
+    if dtype.kind in "iu":
+        return float(np.iinfo(dtype).max)
+    return None
+
+
+def count_peaks(
+    frames: np.ndarray,
+    *,
+    bad_pixels: np.ndarray | None = None,
+    saturation: float | None = None,
+    min_intensity: float = 0.0,
+) -> np.ndarray:
+    """Count the peaks of every frame of a `(k, H, W)` block; returns `(k,)` int32.
+
+    Border pixels are never peaks. Only positive pixels of at least
+    `min_intensity` qualify. Unlike the viewer overlay there is no cap on the
+    number of peaks and no minimum-separation filter, so counts are plain
+    local-maximum counts.
+    """
+    frames = np.asarray(frames)
+    if frames.ndim == 2:
+        frames = frames[None]
+    count = frames.shape[0]
+    if frames.shape[1] < 3 or frames.shape[2] < 3:
+        return np.zeros(count, dtype=np.int32)
+    # float32 is exact for counts below 2**24; wider integers keep float64.
+    narrow = frames.dtype.itemsize <= 2 or frames.dtype == np.float32
+    work = np.array(frames, dtype=np.float32 if narrow else np.float64)
+    if frames.dtype.kind == "f":
+        np.copyto(work, -np.inf, where=~np.isfinite(work))
+    if saturation is not None:
+        np.copyto(work, -np.inf, where=work >= saturation)
+    if bad_pixels is not None:
+        work[:, bad_pixels] = -np.inf
+
+    center = work[:, 1:-1, 1:-1]
+    peaks = center > 0
+    if min_intensity > 0:
+        peaks &= center >= min_intensity
+    peaks &= center > work[:, 1:-1, :-2]
+    peaks &= center >= work[:, 1:-1, 2:]
+    peaks &= center > work[:, :-2, 1:-1]
+    peaks &= center >= work[:, 2:, 1:-1]
+    return peaks.reshape(count, -1).sum(axis=1, dtype=np.int64).astype(np.int32)
+
+
+def _vds_source_name(source_file: str, output_dir: Path) -> str:
+    # Relative names keep the hits file valid when the data directory moves.
+    try:
+        return os.path.relpath(source_file, output_dir)
+    except ValueError:
+        return source_file
+
+
+def hit_layout(
+    h5py: Any, view: dict[str, Any], hits: np.ndarray, threshold: int, out_dir: Path
+) -> Any:
+    """Build a virtual layout `(len(hits), H, W)` that maps the hit frames of `view`.
+
+    Consecutive hits inside one source dataset share one mapping.
+    """
+    shape = tuple(int(x) for x in view["shape"])
+    ndim = int(view["ndim"])
+    layout = h5py.VirtualLayout(
+        shape=(int(hits.size), shape[-2], shape[-1]), dtype=np.dtype(view["dtype"])
+    )
+    if view["kind"] == "dataset":
+        segments = [{"dataset": view["dataset"], "frames": shape[0]}]
+    else:
+        segments = view["segments"]
+    offset = 0
+    out = 0
+    for segment in segments:
+        dset = segment["dataset"]
+        frames = int(segment["frames"])
+        local = hits[(hits >= offset) & (hits < offset + frames)] - offset
+        offset += frames
+        if not local.size:
+            continue
+        source = h5py.VirtualSource(
+            _vds_source_name(dset.file.filename, out_dir),
+            dset.name,
+            shape=tuple(int(x) for x in dset.shape),
+            dtype=dset.dtype,
+        )
+        breaks = np.flatnonzero(np.diff(local) != 1) + 1
+        for run in np.split(local, breaks):
+            lo, hi = int(run[0]), int(run[-1]) + 1
+            selection = source[lo:hi, threshold] if ndim == 4 else source[lo:hi]
+            layout[out : out + hi - lo] = selection
+            out += hi - lo
+    return layout
+
+
+class _HitJob:
+    def __init__(self, config: dict[str, Any]) -> None:
+        self.config = config
+        self.status: dict[str, Any] = {
+            "id": config["id"],
+            "file": config["file"],
+            "dataset": config["dataset"],
+            "threshold": config["threshold"],
+            "min_peaks": config["min_peaks"],
+            "min_intensity": config["min_intensity"],
+            "status": "queued",
+            "progress": 0.0,
+            "message": "Queued",
+            "frame_count": 0,
+            "frames_done": 0,
+            "hit_count": 0,
+            "saturation": None,
+            "output": None,
+            "error": None,
+            "updated_at": time.time(),
+        }
+        self.peak_counts: np.ndarray | None = None
+        self.cancel = threading.Event()
+
+
+class HitFindingService:
+    """Run hit-finding jobs on a bounded worker pool."""
+
+    def __init__(self, deps: HitFindingDeps) -> None:
+        self._deps = deps
+        self._jobs: dict[str, _HitJob] = {}
+        self._lock = threading.Lock()
+        self._scheduler = JobScheduler(deps.get_job_workers, thread_name_prefix="albis-hits")
+
+    def start(
+        self,
+        *,
+        file: str,
+        dataset: str,
+        threshold: int = 0,
+        min_peaks: int = DEFAULT_MIN_PEAKS,
+        min_intensity: float = 0.0,
+        saturation: float | None = None,
+        apply_mask: bool = True,
+        output_path: str | None = None,
+    ) -> dict[str, Any]:
+        source_path = self._deps.resolve_image_file(file)
+        if source_path.suffix.lower() not in {".h5", ".hdf5"}:
+            raise HTTPException(status_code=400, detail="Hit finding requires an HDF5 stack")
+        if not dataset:
+            raise HTTPException(status_code=400, detail="Missing dataset")
+        config = {
+            "id": uuid.uuid4().hex,
+            "file": str(source_path),
+            "dataset": dataset,
+            "threshold": max(0, int(threshold)),
+            "min_peaks": max(1, int(min_peaks)),
+            "min_intensity": float(min_intensity),
+            "saturation": float(saturation) if saturation is not None else None,
+            "apply_mask": bool(apply_mask),
+            "output": self._resolve_output(source_path, output_path),
+        }
+        job = _HitJob(config)
+        with self._lock:
+            self._prune_locked()
+            self._jobs[config["id"]] = job
+            status = dict(job.status)
+        self._scheduler.submit(config["id"], functools.partial(self._run_job, job))
+        return status
+
+    def get_status(self, job_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job.status) if job else None
+
+    def cancel(self, job_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job.cancel.set()
+        if self._scheduler.cancel(job_id) == "queued":
+            self._update(job, status="cancelled", message="Cancelled")
+        with self._lock:
+            return dict(job.status)
+
+    def peak_counts(self, job_id: str) -> np.ndarray | None:
+        """Peak count per frame scanned so far (frames not scanned yet are -1)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.peak_counts is None:
+                return None
+            return job.peak_counts.copy()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.cancel.set()
+
+    def _resolve_output(self, source_path: Path, output_path: str | None) -> Path:
+        raw = (output_path or "").strip()
+        if raw:
+            target = Path(raw).expanduser()
+            if not target.is_absolute():
+                target = self._deps.data_dir / target
+            target = target.resolve()
+            if target.suffix.lower() not in {".h5", ".hdf5"}:
+                target = target.with_name(target.name + ".h5")
+        else:
+            target = source_path.with_name(f"{source_path.stem}{HITS_SUFFIX}")
+            if not os.access(source_path.parent, os.W_OK):
+                target = (self._deps.data_dir / "output" / target.name).resolve()
+        allowed_root = self._deps.data_dir.resolve()
+        if not self._deps.get_allow_abs_paths() and not self._deps.is_within(target, allowed_root):
+            raise HTTPException(status_code=400, detail="Output path is outside data directory")
+        if target.resolve() == source_path.resolve():
+            raise HTTPException(status_code=400, detail="Output path is the source file")
+        return target
+
+    def _prune_locked(self) -> None:
+        finished = [
+            key for key, job in self._jobs.items() if job.status["status"] not in _ACTIVE_STATUSES
+        ]
+        while len(self._jobs) >= _MAX_JOBS and finished:
+            self._jobs.pop(finished.pop(0), None)
+        if len(self._jobs) >= _MAX_JOBS:
+            raise HTTPException(status_code=429, detail="Too many hit-finding jobs")
+
+    def _update(self, job: _HitJob, **changes: Any) -> None:
+        with self._lock:
+            job.status.update(changes)
+            job.status["updated_at"] = time.time()
+
+    def _run_job(self, job: _HitJob) -> None:
+        config = job.config
+        source_path = Path(config["file"])
+        output = Path(config["output"])
+        tmp_path = output.with_name(output.name + ".tmp")
+        try:
+            self._update(job, status="running", message="Finding hits…")
+            self._deps.ensure_hdf5_stack()
+            h5py = self._deps.get_h5py()
+            with h5py.File(source_path, "r") as h5:
+                try:
+                    view, extra_files = self._deps.resolve_dataset_view(
+                        h5, source_path, config["dataset"]
+                    )
+                except KeyError as exc:
+                    raise HTTPException(status_code=404, detail="Dataset not found") from exc
+                try:
+                    self._scan(job, h5, view)
+                    if job.cancel.is_set():
+                        self._update(job, status="cancelled", message="Cancelled")
+                        return
+                    output.parent.mkdir(parents=True, exist_ok=True)
+                    self._write_output(job, h5, view, tmp_path)
+                finally:
+                    for handle in extra_files:
+                        try:
+                            handle.close()
+                        except Exception:
+                            pass
+            os.replace(tmp_path, output)
+            hits = int(job.status["hit_count"])
+            frames = int(job.status["frame_count"])
+            self._update(
+                job,
+                status="done",
+                progress=1.0,
+                message=f"{hits} hit(s) in {frames} frame(s)",
+                output=str(output),
+            )
+        except Exception as exc:
+            tmp_path.unlink(missing_ok=True)
+            self._deps.logger.exception("Hit finding failed: %s", exc)
+            detail = exc.detail if isinstance(exc, HTTPException) else str(exc)
+            self._update(
+                job, status="error", progress=1.0, message=f"Failed: {detail}", error=str(detail)
+            )
+
+    def _scan(self, job: _HitJob, h5: Any, view: dict[str, Any]) -> None:
+        config = job.config
+        thr = int(config["threshold"])
+        shape = tuple(int(x) for x in view["shape"])
+        ndim = int(view["ndim"])
+        if ndim not in (3, 4):
+            raise HTTPException(status_code=400, detail="Hit finding requires 3D or 4D stacks")
+        if ndim == 4 and thr >= shape[1]:
+            raise HTTPException(status_code=416, detail="Threshold index out of range")
+        frame_count = shape[0]
+        image_shape = (shape[-2], shape[-1])
+        source_dtype = np.dtype(view["dtype"])
+
+        bad_pixels = None
+        if config["apply_mask"]:
+            mask = self._deps.find_pixel_mask(h5, threshold=thr)
+            if mask is not None and tuple(mask.shape) == image_shape:
+                bad = (np.asarray(mask[()]).astype(np.uint32) & PEAK_BAD_MASK_BITS) != 0
+                bad_pixels = bad if bad.any() else None
+        saturation = config["saturation"]
+        if saturation is None:
+            saturation = saturation_cutoff(h5, source_dtype)
+
+        counts = np.full(frame_count, -1, dtype=np.int32)
+        with self._lock:
+            job.peak_counts = counts
+            job.status.update(frame_count=frame_count, saturation=saturation)
+
+        depth = max(1, int(self._deps.frame_chunk_depth(view)))
+        frame_bytes = max(1, image_shape[0] * image_shape[1] * source_dtype.itemsize)
+        block = depth * max(1, (_READ_BLOCK_BYTES // frame_bytes) // depth)
+        starts = list(range(0, frame_count, block))
+
+        def _count_block(block_idx: int) -> np.ndarray:
+            lo = starts[block_idx]
+            frames = self._deps.extract_frames(view, lo, min(frame_count, lo + block), thr)
+            return count_peaks(
+                frames,
+                bad_pixels=bad_pixels,
+                saturation=saturation,
+                min_intensity=config["min_intensity"],
+            )
+
+        min_peaks = int(config["min_peaks"])
+        hits = 0
+        workers = decode_worker_count(self._deps.get_decode_workers())
+        # Blocks are read in order; the criterion of earlier blocks runs meanwhile.
+        with FramePrefetcher(_count_block, range(len(starts)), workers=workers) as prefetch:
+            for block_idx, lo in enumerate(starts):
+                if job.cancel.is_set():
+                    return
+                block_counts = prefetch.get(block_idx)
+                hi = lo + block_counts.size
+                with self._lock:
+                    counts[lo:hi] = block_counts
+                hits += int(np.count_nonzero(block_counts >= min_peaks))
+                self._update(
+                    job,
+                    frames_done=hi,
+                    hit_count=hits,
+                    progress=0.95 * hi / max(1, frame_count),
+                    message=f"Scanned frame {hi}/{frame_count}, {hits} hit(s)",
+                )
+
+    def _write_output(self, job: _HitJob, h5: Any, view: dict[str, Any], tmp_path: Path) -> None:
+        h5py = self._deps.get_h5py()
+        config = job.config
+        thr = int(config["threshold"])
+        counts = job.peak_counts
+        hits = np.flatnonzero(counts >= int(config["min_peaks"])).astype(np.int64)
+        shape = tuple(int(x) for x in view["shape"])
+        self._update(job, message=f"Writing {hits.size} hit(s)…")
+        with h5py.File(tmp_path, "w") as out:
+            if "/entry/instrument" in h5:
+                try:
+                    h5.copy(h5["/entry/instrument"], out.require_group("/entry"), "instrument")
+                except Exception as exc:
+                    self._deps.logger.warning("Hit finding: metadata not copied: %s", exc)
+            data_group = out.require_group("/entry/data")
+            if hits.size:
+                layout = hit_layout(h5py, view, hits, thr, tmp_path.parent)
+                data_group.create_virtual_dataset("data", layout, fillvalue=0)
+            else:
+                data_group.create_dataset(
+                    "data", shape=(0, shape[-2], shape[-1]), dtype=np.dtype(view["dtype"])
+                )
+            group = out.require_group("/entry/hits")
+            group.create_dataset("peak_counts", data=counts)
+            group.create_dataset("frame_index", data=hits)
+            group.attrs["source_file"] = config["file"]
+            group.attrs["source_dataset"] = config["dataset"]
+            group.attrs["threshold"] = thr
+            group.attrs["min_peaks"] = int(config["min_peaks"])
+            group.attrs["min_intensity"] = float(config["min_intensity"])
+            saturation = job.status.get("saturation")
+            group.attrs["saturation"] = float(saturation) if saturation is not None else np.nan
+            group.attrs["mask_applied"] = bool(config["apply_mask"])
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+"""Bounded priority scheduler for long-running background jobs.
+
+Jobs wait in a priority queue (higher priority first, FIFO within a
+priority) and at most `get_max_workers()` of them run at once. Cancellation
+is cooperative: queued jobs are dropped immediately, running jobs see
+`check_cancelled()` raise `JobCancelled` at their next checkpoint.
+"""
+
+import heapq
+import itertools
+import threading
+from typing import Callable
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job after cancellation was requested."""
+
+
+class JobScheduler:
+    def __init__(
+        self, get_max_workers: Callable[[], int], *, thread_name_prefix: str = "albis-job"
+    ) -> None:
+        self._get_max_workers = get_max_workers
+        self._thread_name_prefix = thread_name_prefix
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._queue: list[tuple[int, int, str, Callable[[], None]]] = []
+        self._seq = itertools.count()
+        self._running: set[str] = set()
+        self._cancelled: set[str] = set()
+
+    def submit(self, job_id: str, fn: Callable[[], None], priority: int = 0) -> None:
+        with self._lock:
+            heapq.heappush(self._queue, (-int(priority), next(self._seq), job_id, fn))
+            self._dispatch_locked()
+
+    def cancel(self, job_id: str) -> str | None:
+        """Cancel a job; return its state at cancellation ("queued"/"running") or None."""
+        with self._lock:
+            for pos, item in enumerate(self._queue):
+                if item[2] == job_id:
+                    self._queue.pop(pos)
+                    heapq.heapify(self._queue)
+                    return "queued"
+            if job_id in self._running:
+                self._cancelled.add(job_id)
+                return "running"
+        return None
+
+    def is_cancelled(self, job_id: str) -> bool:
+        with self._lock:
+            return job_id in self._cancelled
+
+    def check_cancelled(self, job_id: str) -> None:
+        if self.is_cancelled(job_id):
+            raise JobCancelled(job_id)
+
+    def queue_position(self, job_id: str) -> int | None:
+        """Return the 1-based position of a queued job, or None if it is not queued."""
+        with self._lock:
+            ordered = sorted(self._queue, key=lambda item: (item[0], item[1]))
+        for pos, item in enumerate(ordered, start=1):
+            if item[2] == job_id:
+                return pos
+        return None
+
+    def wait_idle(self, timeout_s: float | None = None) -> bool:
+        """Block until no job is queued or running (their threads have returned)."""
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._queue and not self._running, timeout_s)
+
+    @property
+    def running_count(self) -> int:
+        with self._lock:
+            return len(self._running)
+
+    def _dispatch_locked(self) -> None:
+        limit = max(1, int(self._get_max_workers()))
+        while self._queue and len(self._running) < limit:
+            _, _, job_id, fn = heapq.heappop(self._queue)
+            self._running.add(job_id)
+            worker = threading.Thread(
+                target=self._run,
+                args=(job_id, fn),
+                name=f"{self._thread_name_prefix}-{job_id[:8]}",
+                daemon=True,
+            )
+            worker.start()
+
+    def _run(self, job_id: str, fn: Callable[[], None]) -> None:
+        try:
+            fn()
+        finally:
+            with self._lock:
+                self._running.discard(job_id)
+                self._cancelled.discard(job_id)
+                self._dispatch_locked()
+                self._idle.notify_all()
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+"""Out-of-process job execution with crash isolation and memory limits.
+
+Jobs run in persistent worker processes (spawn context) so a segfault in a
+decoder, an out-of-memory kill, or a runaway allocation only takes down the
+worker, never the web server. Workers report progress back over a pipe; the
+parent thread that owns the job applies the updates, watches the worker's
+resident memory and forwards cancellation. A worker that dies or exceeds the
+RSS limit is killed and replaced by a fresh one.
+"""
+
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from typing import Any, Callable
+
+from .job_scheduler import JobCancelled
+
+_POLL_INTERVAL_S = 0.2
+_STOP_TIMEOUT_S = 2.0
+
+# Lazy-loaded optional RSS probe for platforms without /proc
+_psutil = None
+
+
+class WorkerFailed(Exception):
+    """The worker process running a job crashed or was killed."""
+
+
+def process_rss_bytes(pid: int) -> int | None:
+    """Return the resident set size of a process, or None if it cannot be read."""
+    try:
+        with open(f"/proc/{pid}/statm", "rb") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    global _psutil
+    if _psutil is None:
+        try:
+            import psutil as psutil_module  # type: ignore[import-not-found]
+        except ImportError:
+            return None
+        _psutil = psutil_module
+    try:
+        return int(_psutil.Process(pid).memory_info().rss)
+    except Exception:
+        return None
+
+
+def _worker_main(conn: Any, cancel_event: Any, target: Callable[..., None]) -> None:
+    # Ctrl-C in the server terminal is handled by the parent, which stops workers itself.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        if message[0] != "run":
+            return
+        _, job_id, payload = message
+
+        def report(changes: dict[str, Any]) -> None:
+            conn.send(("update", changes))
+
+        def check_cancelled() -> None:
+            if cancel_event.is_set():
+                raise JobCancelled(job_id)
+
+        try:
+            target(job_id, payload, report, check_cancelled)
+        except Exception as exc:
+            report(
+                {"status": "error", "progress": 1.0, "message": f"Failed: {exc}", "error": str(exc)}
+            )
+        conn.send(("done",))
+
+
+class _Worker:
+    def __init__(self, ctx: Any, target: Callable[..., None], name: str) -> None:
+        self.conn, child_conn = ctx.Pipe()
+        self.cancel_event = ctx.Event()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self.cancel_event, target),
+            name=name,
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(("stop",))
+        except (OSError, ValueError):
+            pass
+        self.process.join(_STOP_TIMEOUT_S)
+        self.kill()
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(_STOP_TIMEOUT_S)
+        self.conn.close()
+
+
+class ProcessJobRunner:
+    """Run picklable job targets in a pool of restartable worker processes.
+
+    `target(job_id, payload, report, check_cancelled)` must be a module-level
+    function; `payload` must be picklable. Concurrency is bounded by the caller
+    (the job scheduler); the runner keeps up to `get_max_idle()` warm workers.
+    """
+
+    def __init__(
+        self,
+        target: Callable[..., None],
+        *,
+        get_max_idle: Callable[[], int],
+        get_max_rss_mb: Callable[[], int],
+        logger: Any,
+        name_prefix: str = "albis-worker",
+        poll_interval_s: float = _POLL_INTERVAL_S,
+    ) -> None:
+        self._target = target
+        self._get_max_idle = get_max_idle
+        self._get_max_rss_mb = get_max_rss_mb
+        self._logger = logger
+        self._name_prefix = name_prefix
+        self._poll_interval_s = max(0.01, float(poll_interval_s))
+        self._ctx = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._idle: list[_Worker] = []
+        self._spawned = 0
+        self._closed = False
+
+    def run(
+        self,
+        job_id: str,
+        payload: dict[str, Any],
+        *,
+        on_update: Callable[[dict[str, Any]], None],
+        is_cancelled: Callable[[], bool],
+    ) -> None:
+        """Run one job to completion; raise `WorkerFailed` if its worker dies."""
+        worker = self._checkout()
+        try:
+            worker.cancel_event.clear()
+            worker.conn.send(("run", job_id, payload))
+            self._supervise(worker, on_update, is_cancelled)
+        except BaseException:
+            worker.kill()
+            self._replenish()
+            raise
+        self._release(worker)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
+
+    @property
+    def idle_count(self) -> int:
+        with self._lock:
+            return len(self._idle)
+
+    def _supervise(
+        self,
+        worker: _Worker,
+        on_update: Callable[[dict[str, Any]], None],
+        is_cancelled: Callable[[], bool],
+    ) -> None:
+        pid = int(worker.process.pid or 0)
+        next_check = 0.0
+        while True:
+            if worker.conn.poll(self._poll_interval_s):
+                try:
+                    message = worker.conn.recv()
+                except (EOFError, OSError):
+                    message = None
+                if message is not None:
+                    if message[0] == "done":
+                        return
+                    on_update(message[1])
+            # Health checks run at the poll interval even while updates keep arriving.
+            now = time.monotonic()
+            if now < next_check:
+                continue
+            next_check = now + self._poll_interval_s
+            if not worker.process.is_alive():
+                worker.process.join(_STOP_TIMEOUT_S)
+                raise WorkerFailed(
+                    f"Worker process exited unexpectedly (code {worker.process.exitcode})"
+                )
+            if is_cancelled() and not worker.cancel_event.is_set():
+                worker.cancel_event.set()
+            limit_mb = max(0, int(self._get_max_rss_mb()))
+            if limit_mb:
+                rss = process_rss_bytes(pid)
+                if rss is not None and rss > limit_mb * 1024 * 1024:
+                    raise WorkerFailed(
+                        f"Worker exceeded memory limit ({rss / 1048576:.0f} MB > {limit_mb} MB)"
+                    )
+
+    def _spawn(self) -> _Worker:
+        with self._lock:
+            self._spawned += 1
+            name = f"{self._name_prefix}-{self._spawned}"
+        return _Worker(self._ctx, self._target, name)
+
+    def _checkout(self) -> _Worker:
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.process.is_alive():
+                    return worker
+                worker.kill()
+        return self._spawn()
+
+    def _release(self, worker: _Worker) -> None:
+        with self._lock:
+            keep = not self._closed and len(self._idle) < max(1, int(self._get_max_idle()))
+            if keep and worker.process.is_alive():
+                self._idle.append(worker)
+                return
+        worker.stop()
+
+    def _replenish(self) -> None:
+        """Start a replacement worker in the background after a crash."""
+
+        def _start() -> None:
+            if self._closed:
+                return
+            try:
+                worker = self._spawn()
+            except Exception as exc:
+                self._logger.warning("Could not restart job worker: %s", exc)
+                return
+            self._release(worker)
+
+        threading.Thread(target=_start, name=f"{self._name_prefix}-restart", daemon=True).start()
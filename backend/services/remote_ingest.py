@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+"""Bounded decode queue for Remote Stream ingest.
+
+Ingest handlers are coroutines; decoding a TIFF/CBF/EDF payload (or
+normalizing a raw frame) on the event loop would stall every other request
+while it runs. Handlers hand the decode and store steps to `RemoteIngestQueue`
+and await the returned future instead. Frames of one source decode in
+parallel, but their stores run in the order the frames were submitted, so
+server-assigned sequence numbers follow arrival order. At most `depth` frames
+wait for a worker; when the queue is full a new frame is either rejected
+(HTTP 503) or displaces the oldest queued frame, preferring one of the same
+source. Per-source counters and recent latencies are kept for
+`/api/remote/v1/metrics`.
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Any, Callable
+
+import numpy as np
+from fastapi import HTTPException
+
+from .frame_prefetch import decode_worker_count
+
+DEFAULT_QUEUE_DEPTH = 32
+QUEUE_POLICIES = ("reject", "drop_oldest")
+# Latency samples kept per source, and sources tracked before the least recent is forgotten.
+_LATENCY_SAMPLES = 256
+_METRICS_SOURCES_MAX = 256
+
+
+# source_id, future, decode, store, queued_at, ticket
+_Job = tuple[str, "Future[Any]", Callable[[], Any], "Callable[[Any], Any] | None", float, int]
+
+
+class _SourceMetrics:
+    __slots__ = (
+        "submitted",
+        "stored",
+        "failed",
+        "dropped",
+        "rejected",
+        "queued",
+        "latency",
+        "wait",
+    )
+
+    def __init__(self) -> None:
+        self.submitted = 0
+        self.stored = 0
+        self.failed = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.queued = 0
+        self.latency: deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+        self.wait: deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+
+
+class _StoreOrder:
+    """Submit tickets of one source; stores run strictly in ticket order."""
+
+    __slots__ = ("issued", "next", "skipped")
+
+    def __init__(self) -> None:
+        self.issued = 0
+        self.next = 0
+        self.skipped: set[int] = set()
+
+
+def _percentiles_ms(samples: deque[float]) -> dict[str, float | None]:
+    if not samples:
+        return {"last": None, "p50": None, "p95": None, "max": None}
+    values = np.asarray(samples, dtype=np.float64) * 1000.0
+    p50, p95 = np.percentile(values, [50, 95])
+    return {
+        "last": round(float(values[-1]), 3),
+        "p50": round(float(p50), 3),
+        "p95": round(float(p95), 3),
+        "max": round(float(values.max()), 3),
+    }
+
+
+class RemoteIngestQueue:
+    """Run ingest jobs on a fixed set of worker threads behind a bounded FIFO queue."""
+
+    def __init__(
+        self,
+        *,
+        workers: int = 0,
+        depth: int = DEFAULT_QUEUE_DEPTH,
+        policy: str = "reject",
+        thread_name_prefix: str = "albis-remote-decode",
+    ) -> None:
+        self._thread_name_prefix = thread_name_prefix
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._turn = threading.Condition(self._lock)
+        self._queue: deque[_Job] = deque()
+        self._metrics: OrderedDict[str, _SourceMetrics] = OrderedDict()
+        self._order: dict[str, _StoreOrder] = {}
+        self._threads = 0
+        self._names = 0
+        self._workers = 1
+        self._depth = DEFAULT_QUEUE_DEPTH
+        self._policy = "reject"
+        self.configure(workers=workers, depth=depth, policy=policy)
+
+    def configure(
+        self, *, workers: int = 0, depth: int = DEFAULT_QUEUE_DEPTH, policy: str = "reject"
+    ) -> None:
+        """Resize the pool (0 workers = one per core, up to 8) and set the full-queue policy."""
+        with self._lock:
+            self._workers = decode_worker_count(workers)
+            self._depth = max(1, int(depth))
+            policy = str(policy or "").strip().lower()
+            self._policy = policy if policy in QUEUE_POLICIES else "reject"
+            # Surplus workers exit once idle; missing ones start now.
+            while self._threads < self._workers:
+                self._threads += 1
+                self._names += 1
+                threading.Thread(
+                    target=self._work,
+                    name=f"{self._thread_name_prefix}-{self._names}",
+                    daemon=True,
+                ).start()
+            self._ready.notify_all()
+
+    def submit(
+        self,
+        source_id: str,
+        decode: Callable[[], Any],
+        store: Callable[[Any], Any] | None = None,
+    ) -> Future[Any]:
+        """Queue one frame of `source_id` and return a future for its result.
+
+        `decode()` may run alongside other frames of the same source;
+        `store(decoded)` runs once every earlier frame of the source has been
+        stored, dropped or has failed, and its return value is the result
+        (`decode()`'s when there is no `store`). Raises HTTP 503 when the queue
+        is full under the "reject" policy. Under "drop_oldest" the displaced
+        frame's future resolves to None.
+        """
+        future: Future[Any] = Future()
+        dropped: Future[Any] | None = None
+        with self._lock:
+            stats = self._source_locked(source_id)
+            if len(self._queue) >= self._depth:
+                if self._policy != "drop_oldest":
+                    stats.rejected += 1
+                    raise HTTPException(
+                        status_code=503,
+                        detail="Remote ingest queue is full",
+                        headers={"Retry-After": "1"},
+                    )
+                victim = next((job for job in self._queue if job[0] == source_id), self._queue[0])
+                self._queue.remove(victim)
+                victim_stats = self._source_locked(victim[0])
+                victim_stats.queued = max(0, victim_stats.queued - 1)
+                victim_stats.dropped += 1
+                self._finish_ticket_locked(victim[0], victim[5])
+                dropped = victim[1]
+            order = self._order.get(source_id)
+            if order is None:
+                order = self._order[source_id] = _StoreOrder()
+            ticket = order.issued
+            order.issued += 1
+            stats.submitted += 1
+            stats.queued += 1
+            self._queue.append((source_id, future, decode, store, time.perf_counter(), ticket))
+            self._ready.notify()
+        if dropped is not None and dropped.set_running_or_notify_cancel():
+            dropped.set_result(None)
+        return future
+
+    def metrics(self, source_id: str | None = None) -> dict[str, Any]:
+        """Queue state plus counters and latencies (ms) per source, or for one source."""
+        with self._lock:
+            names = [source_id] if source_id is not None else list(self._metrics)
+            sources = {}
+            for name in names:
+                stats = self._metrics.get(name)
+                if stats is None:
+                    continue
+                sources[name] = {
+                    "submitted": stats.submitted,
+                    "stored": stats.stored,
+                    "failed": stats.failed,
+                    "dropped": stats.dropped,
+                    "rejected": stats.rejected,
+                    "queued": stats.queued,
+                    "latency_ms": _percentiles_ms(stats.latency),
+                    "queue_wait_ms": _percentiles_ms(stats.wait),
+                }
+            return {
+                "workers": self._workers,
+                "queue_depth": self._depth,
+                "queued": len(self._queue),
+                "policy": self._policy,
+                "sources": sources,
+            }
+
+    def _source_locked(self, source_id: str) -> _SourceMetrics:
+        stats = self._metrics.get(source_id)
+        if stats is None:
+            stats = self._metrics[source_id] = _SourceMetrics()
+            while len(self._metrics) > _METRICS_SOURCES_MAX:
+                self._metrics.popitem(last=False)
+        else:
+            self._metrics.move_to_end(source_id)
+        return stats
+
+    def _finish_ticket_locked(self, source_id: str, ticket: int) -> None:
+        # Mark `ticket` done and move the source's turn past every finished ticket.
+        order = self._order[source_id]
+        order.skipped.add(ticket)
+        while order.next in order.skipped:
+            order.skipped.discard(order.next)
+            order.next += 1
+        if order.next == order.issued:
+            del self._order[source_id]  # nothing of this source in flight
+        self._turn.notify_all()
+
+    def _work(self) -> None:
+        while True:
+            with self._lock:
+                while not self._queue and self._threads <= self._workers:
+                    self._ready.wait()
+                if self._threads > self._workers:
+                    self._threads -= 1
+                    self._ready.notify()  # pass on a wakeup meant for a remaining worker
+                    return
+                source_id, future, decode, store, queued_at, ticket = self._queue.popleft()
+                stats = self._source_locked(source_id)
+                stats.queued = max(0, stats.queued - 1)
+            if not future.set_running_or_notify_cancel():
+                with self._lock:
+                    self._finish_ticket_locked(source_id, ticket)
+                continue  # the client went away while the frame was queued
+            started = time.perf_counter()
+            error: BaseException | None = None
+            try:
+                result = decode()
+            except Exception as exc:
+                error = exc
+            with self._turn:
+                # Earlier frames of this source are already popped, so they finish.
+                self._turn.wait_for(lambda: self._order[source_id].next == ticket)
+            try:
+                if error is None and store is not None:
+                    result = store(result)
+            except Exception as exc:
+                error = exc
+            finally:
+                with self._lock:
+                    self._finish_ticket_locked(source_id, ticket)
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+            finished = time.perf_counter()
+            with self._lock:
+                stats = self._source_locked(source_id)
+                if error is None:
+                    stats.stored += 1
+                    stats.latency.append(finished - queued_at)
+                    stats.wait.append(started - queued_at)
+                else:
+                    stats.failed += 1
@@ -0,0 +1,443 @@
+from __future__ import annotations
+
+"""Record Remote Stream sources to HDF5 stacks.
+
+A recording subscribes to one source of the remote frame store. The
+subscriber callback runs on the storing thread with the source lock held, so
+it only appends the frame to a bounded queue (dropping and counting the frame
+when the queue is full); ingest never waits for the disk. A writer thread per
+recording drains the queue and appends each frame as one chunk of a
+bitshuffle/LZ4 dataset at `/entry/data/data`, encoding chunks in parallel
+(`ChunkWriter`). Per-frame metadata (sequence number, arrival time, image
+number and date, resolution parameters) goes to `/entry/remote/*`, and the
+latest known geometry is written to the usual NeXus detector/beam paths so the
+viewer's resolution rings work on the recorded stack.
+
+The file is written as `<name>.h5.part` and renamed once the recording stops,
+so the file browser never offers a half-written stack.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+from fastapi import HTTPException
+
+from .series_output import ChunkWriter, codec_dataset_kwargs
+
+RECORD_CODEC = "bitshuffle-lz4"
+RECORDINGS_DIR = "recordings"
+# Frames waiting for the writer; past either bound new frames are dropped (and counted).
+_QUEUE_FRAMES = 256
+_QUEUE_BYTES = 512 * 1024 * 1024
+# Metadata rows and the HDF5 file are flushed at least this often while frames arrive.
+_FLUSH_INTERVAL_S = 2.0
+_STOP_WAIT_S = 30.0
+_MAX_RECORDINGS = 32
+# Per-frame float metadata: dataset name -> (path in the extracted metadata, units).
+_FLOAT_META = {
+    "distance_mm": ("distance_mm", "mm"),
+    "pixel_size_um": ("pixel_size_um", "um"),
+    "energy_ev": ("energy_ev", "eV"),
+    "wavelength_a": ("wavelength_a", "angstrom"),
+    "beam_center_x": ("beam_center_px", "pixel"),
+    "beam_center_y": ("beam_center_px", "pixel"),
+}
+# NeXus scalars written from the last finite per-frame value when the file is closed.
+_NEXUS_PATHS = {
+    "distance_mm": ("/entry/instrument/detector/detector_distance",),
+    "pixel_size_um": (
+        "/entry/instrument/detector/x_pixel_size",
+        "/entry/instrument/detector/y_pixel_size",
+    ),
+    "energy_ev": ("/entry/instrument/beam/incident_energy",),
+    "wavelength_a": ("/entry/instrument/beam/incident_wavelength",),
+    "beam_center_x": ("/entry/instrument/detector/beam_center_x",),
+    "beam_center_y": ("/entry/instrument/detector/beam_center_y",),
+}
+_ACTIVE_STATUSES = {"recording", "stopping"}
+
+
+@dataclass(frozen=True)
+class RemoteRecorderDeps:
+    data_dir: Path
+    get_allow_abs_paths: Callable[[], bool]
+    is_within: Callable[[Path, Path], bool]
+    logger: Any
+    get_h5py: Callable[[], Any]
+    subscribe: Callable[[str, Callable[[dict[str, Any]], None]], Callable[[], None]]
+    frame_bytes: Callable[[dict[str, Any]], bytes]
+
+
+def _frame_meta_row(frame: dict[str, Any]) -> dict[str, Any]:
+    meta = frame.get("meta") or {}
+    resolution = meta.get("resolution") or {}
+    row: dict[str, Any] = {
+        "seq": int(frame["seq"]),
+        "received_at": float(frame["updated_at"]),
+        "image_number": meta.get("image_number"),
+        "image_datetime": str(meta.get("image_datetime") or ""),
+    }
+    for name, (key, _units) in _FLOAT_META.items():
+        value = resolution.get(key)
+        if key == "beam_center_px":
+            value = value[0 if name.endswith("_x") else 1] if value else None
+        row[name] = float(value) if value is not None else np.nan
+    return row
+
+
+class _Recording:
+    def __init__(self, source_id: str, path: Path, max_frames: int, max_seconds: float) -> None:
+        self.source_id = source_id
+        self.path = path
+        self.max_frames = max_frames
+        self.max_seconds = max_seconds
+        self.lock = threading.Lock()
+        self.ready = threading.Condition(self.lock)
+        self.queue: deque[dict[str, Any]] = deque()
+        self.queued_bytes = 0
+        self.stopping = False
+        self.unsubscribe: Callable[[], None] | None = None
+        self.thread: threading.Thread | None = None
+        now = time.time()
+        self.status: dict[str, Any] = {
+            "source_id": source_id,
+            "file": str(path),
+            "status": "recording",
+            "message": "Waiting for frames",
+            "codec": RECORD_CODEC,
+            "max_frames": max_frames,
+            "max_seconds": max_seconds,
+            "frames_written": 0,
+            "frames_dropped": 0,
+            "frames_skipped": 0,
+            "bytes_written": 0,
+            "shape": None,
+            "dtype": None,
+            "first_seq": None,
+            "last_seq": None,
+            "started_at": now,
+            "updated_at": now,
+            "error": None,
+        }
+
+    def offer(self, frame: dict[str, Any]) -> None:
+        """Queue a committed frame; runs on the storing thread, so it never waits."""
+        nbytes = int(frame.get("nbytes") or 0)
+        with self.lock:
+            if self.stopping:
+                return
+            if len(self.queue) >= _QUEUE_FRAMES or self.queued_bytes + nbytes > _QUEUE_BYTES:
+                self.status["frames_dropped"] += 1
+                return
+            self.queue.append(frame)
+            self.queued_bytes += nbytes
+            self.ready.notify()
+
+    def snapshot(self) -> dict[str, Any]:
+        with self.lock:
+            return {**self.status, "queued": len(self.queue)}
+
+    def update(self, **changes: Any) -> None:
+        with self.lock:
+            self.status.update(changes)
+            self.status["updated_at"] = time.time()
+
+
+class _StackFile:
+    """The open HDF5 file of a recording: the frame stack plus per-frame metadata."""
+
+    def __init__(self, h5py: Any, path: Path, shape: tuple[int, int], dtype: np.dtype) -> None:
+        self.shape = shape
+        self.dtype = dtype
+        self.frames = 0
+        self.h5 = h5py.File(path, "w")
+        try:
+            entry = self.h5.require_group("entry")
+            entry.attrs["NX_class"] = "NXentry"
+            data = entry.require_group("data")
+            data.attrs["NX_class"] = "NXdata"
+            data.attrs["signal"] = "data"
+            self.data = data.create_dataset(
+                "data",
+                shape=(0, *shape),
+                maxshape=(None, *shape),
+                chunks=(1, *shape),
+                dtype=dtype,
+                **codec_dataset_kwargs(RECORD_CODEC),
+            )
+            group = entry.require_group("remote")
+            self.meta = {
+                "seq": group.create_dataset("seq", (0,), maxshape=(None,), dtype="<i8"),
+                "received_at": group.create_dataset(
+                    "received_at", (0,), maxshape=(None,), dtype="<f8"
+                ),
+                "image_number": group.create_dataset(
+                    "image_number", (0,), maxshape=(None,), dtype="<i8", fillvalue=-1
+                ),
+                "image_datetime": group.create_dataset(
+                    "image_datetime", (0,), maxshape=(None,), dtype=h5py.string_dtype()
+                ),
+            }
+            self.meta["received_at"].attrs["units"] = "s"
+            for name, (_key, units) in _FLOAT_META.items():
+                dset = group.create_dataset(
+                    name, (0,), maxshape=(None,), dtype="<f8", fillvalue=np.nan
+                )
+                dset.attrs["units"] = units
+                self.meta[name] = dset
+        except Exception:
+            self.h5.close()
+            raise
+        self.writer = ChunkWriter(RECORD_CODEC)
+        self.rows: list[dict[str, Any]] = []
+        self.latest: dict[str, float] = {}
+
+    def append(self, pixels: np.ndarray, row: dict[str, Any]) -> None:
+        index = self.frames
+        self.data.resize(index + 1, axis=0)
+        self.writer.write(self.data, (index,), pixels)
+        self.frames += 1
+        self.rows.append(row)
+
+    def flush(self) -> None:
+        """Commit pending chunks and metadata rows to the file."""
+        self.writer.flush()
+        if self.rows:
+            start = self.meta["seq"].shape[0]
+            stop = start + len(self.rows)
+            for name, dset in self.meta.items():
+                values = [row[name] for row in self.rows]
+                if name == "image_number":
+                    values = [-1 if value is None else int(value) for value in values]
+                dset.resize(stop, axis=0)
+                dset[start:stop] = values
+                if name in _NEXUS_PATHS:
+                    finite = [value for value in values if np.isfinite(value)]
+                    if finite:
+                        self.latest[name] = float(finite[-1])
+            self.rows.clear()
+        self.h5.flush()
+
+    def close(self) -> None:
+        try:
+            self.writer.close()
+            self.flush()
+            for name, value in self.latest.items():
+                units = _FLOAT_META[name][1]
+                for path in _NEXUS_PATHS[name]:
+                    if path in self.h5:
+                        del self.h5[path]
+                    self.h5.create_dataset(path, data=value).attrs["units"] = units
+        finally:
+            self.h5.close()
+
+
+class RemoteRecorderService:
+    """Record remote sources in background threads, one recording per source."""
+
+    def __init__(self, deps: RemoteRecorderDeps) -> None:
+        self._deps = deps
+        self._recordings: dict[str, _Recording] = {}
+        self._lock = threading.Lock()
+
+    def start(
+        self,
+        *,
+        source_id: str,
+        output_path: str | None = None,
+        max_frames: int = 0,
+        max_seconds: float = 0.0,
+    ) -> dict[str, Any]:
+        """Start recording `source_id`; 0 for `max_frames`/`max_seconds` means no limit."""
+        path = self._resolve_output(source_id, output_path)
+        part = path.with_name(path.name + ".part")
+        if path.exists() or part.exists():
+            raise HTTPException(status_code=409, detail="Recording output file already exists")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        except OSError as exc:
+            raise HTTPException(status_code=400, detail="Cannot create recording folder") from exc
+        rec = _Recording(source_id, path, max(0, int(max_frames)), max(0.0, float(max_seconds)))
+        with self._lock:
+            current = self._recordings.get(source_id)
+            if current is not None and current.snapshot()["status"] in _ACTIVE_STATUSES:
+                raise HTTPException(status_code=409, detail="Source is already being recorded")
+            self._prune_locked()
+            self._recordings[source_id] = rec
+        # Frames committed before the writer runs simply wait in the queue.
+        rec.unsubscribe = self._deps.subscribe(source_id, rec.offer)
+        rec.thread = threading.Thread(
+            target=self._run, args=(rec,), name="albis-remote-record", daemon=True
+        )
+        rec.thread.start()
+        return rec.snapshot()
+
+    def stop(self, source_id: str, *, wait_s: float = _STOP_WAIT_S) -> dict[str, Any] | None:
+        """Stop recording after the queued frames are written; returns the final status."""
+        with self._lock:
+            rec = self._recordings.get(source_id)
+        if rec is None:
+            return None
+        self._request_stop(rec)
+        if rec.thread is not None:
+            rec.thread.join(max(0.0, wait_s))
+        return rec.snapshot()
+
+    def status(self, source_id: str | None = None) -> dict[str, Any]:
+        """Status of every recording (finished ones are kept until pruned), or of one source."""
+        with self._lock:
+            if source_id is None:
+                recordings = list(self._recordings.values())
+            else:
+                recordings = [self._recordings[source_id]] if source_id in self._recordings else []
+        return {"recordings": {rec.source_id: rec.snapshot() for rec in recordings}}
+
+    def shutdown(self) -> None:
+        with self._lock:
+            recordings = list(self._recordings.values())
+        for rec in recordings:
+            self._request_stop(rec)
+        for rec in recordings:
+            if rec.thread is not None:
+                rec.thread.join(_STOP_WAIT_S)
+
+    def _request_stop(self, rec: _Recording) -> None:
+        with rec.lock:
+            if rec.status["status"] == "recording":
+                rec.status["status"] = "stopping"
+            rec.stopping = True
+            rec.ready.notify_all()
+
+    def _resolve_output(self, source_id: str, output_path: str | None) -> Path:
+        raw = (output_path or "").strip()
+        if raw:
+            target = Path(raw).expanduser()
+            if not target.is_absolute():
+                target = self._deps.data_dir / target
+        else:
+            stamp = time.strftime("%Y%m%d_%H%M%S")
+            safe = source_id.replace(":", "_")
+            target = self._deps.data_dir / RECORDINGS_DIR / f"{safe}_{stamp}.h5"
+        target = target.resolve()
+        if target.suffix.lower() not in {".h5", ".hdf5"}:
+            target = target.with_name(target.name + ".h5")
+        allowed_root = self._deps.data_dir.resolve()
+        if not self._deps.get_allow_abs_paths() and not self._deps.is_within(target, allowed_root):
+            raise HTTPException(status_code=400, detail="Output path is outside data directory")
+        return target
+
+    def _prune_locked(self) -> None:
+        finished = [
+            key
+            for key, rec in self._recordings.items()
+            if rec.snapshot()["status"] not in _ACTIVE_STATUSES
+        ]
+        while len(self._recordings) >= _MAX_RECORDINGS and finished:
+            self._recordings.pop(finished.pop(0), None)
+        if len(self._recordings) >= _MAX_RECORDINGS:
+            raise HTTPException(status_code=429, detail="Too many remote recordings")
+
+    def _run(self, rec: _Recording) -> None:
+        part = rec.path.with_name(rec.path.name + ".part")
+        stack: _StackFile | None = None
+        error: str | None = None
+        try:
+            last_flush = time.monotonic()
+            while True:
+                with rec.lock:
+                    while not rec.queue and not rec.stopping:
+                        if not rec.ready.wait(_FLUSH_INTERVAL_S) and stack is not None:
+                            break  # idle: commit what was written so far
+                    if not rec.queue and rec.stopping:
+                        break
+                    batch = list(rec.queue)
+                    rec.queue.clear()
+                    rec.queued_bytes = 0
+                for frame in batch:
+                    if stack is None:
+                        stack = self._open(rec, part, frame)
+                    if stack is None or not self._append(rec, stack, frame):
+                        continue
+                    if self._limit_reached(rec, stack):
+                        self._request_stop(rec)
+                        break
+                now = time.monotonic()
+                if stack is not None and (not batch or now - last_flush >= _FLUSH_INTERVAL_S):
+                    stack.flush()
+                    last_flush = now
+        except Exception as exc:
+            error = str(exc)
+            self._deps.logger.warning("Remote recording of %s failed: %s", rec.source_id, exc)
+        finally:
+            self._request_stop(rec)
+            if rec.unsubscribe is not None:
+                rec.unsubscribe()
+            with rec.lock:
+                rec.queue.clear()
+                rec.queued_bytes = 0
+            self._finish(rec, stack, part, error)
+
+    def _open(self, rec: _Recording, part: Path, frame: dict[str, Any]) -> _StackFile | None:
+        shape = tuple(int(v) for v in frame["shape"])
+        if len(shape) != 2:
+            rec.update(frames_skipped=rec.status["frames_skipped"] + 1)
+            return None
+        dtype = np.dtype(frame["dtype"])
+        stack = _StackFile(self._deps.get_h5py(), part, (shape[0], shape[1]), dtype)
+        rec.update(shape=list(shape), dtype=dtype.str, message="Recording")
+        return stack
+
+    def _append(self, rec: _Recording, stack: _StackFile, frame: dict[str, Any]) -> bool:
+        shape = tuple(int(v) for v in frame["shape"])
+        if shape != stack.shape or np.dtype(frame["dtype"]) != stack.dtype:
+            # The stack keeps the layout of its first frame.
+            rec.update(frames_skipped=rec.status["frames_skipped"] + 1)
+            return False
+        pixels = np.frombuffer(self._deps.frame_bytes(frame), dtype=stack.dtype).reshape(shape)
+        row = _frame_meta_row(frame)
+        stack.append(pixels, row)
+        with rec.lock:
+            status = rec.status
+            status["frames_written"] += 1
+            status["bytes_written"] += int(pixels.nbytes)
+            if status["first_seq"] is None:
+                status["first_seq"] = row["seq"]
+            status["last_seq"] = row["seq"]
+            status["updated_at"] = time.time()
+        return True
+
+    @staticmethod
+    def _limit_reached(rec: _Recording, stack: _StackFile) -> bool:
+        if rec.max_frames and stack.frames >= rec.max_frames:
+            return True
+        return bool(rec.max_seconds) and time.time() - rec.status["started_at"] >= rec.max_seconds
+
+    def _finish(
+        self, rec: _Recording, stack: _StackFile | None, part: Path, error: str | None
+    ) -> None:
+        if stack is not None:
+            try:
+                stack.close()
+            except Exception as exc:
+                error = error or str(exc)
+        if stack is None or not stack.frames:
+            part.unlink(missing_ok=True)
+        elif error is None:
+            try:
+                os.replace(part, rec.path)
+            except OSError as exc:
+                error = str(exc)
+        if error is not None:
+            # Frames written before the failure stay in the .part file.
+            kept = str(part) if part.exists() else None
+            rec.update(status="error", message="Recording failed", error=error, file=kept)
+        elif stack is None or not stack.frames:
+            rec.update(status="done", message="No frames recorded", file=None)
+        else:
+            rec.update(status="done", message=f"Recorded {stack.frames} frame(s)")
@@ -3,15 +3,39 @@ from __future__ import annotations
 """Remote stream helper logic.
 
 This module owns parsing and in-memory frame buffering for /api/remote/v1/*.
+
+Every source keeps a ring of its most recent frames, addressable by sequence
+number, bounded by a frame count and a byte budget per source. A global byte
+budget across all sources evicts the oldest frames first, so an idle source
+gives up its history before an active one loses frames. Each source has its
+own lock and the global order lives in one LRU index, so storing, reading and
+evicting a frame cost O(1) however many sources are active.
+
+Readers can block on a source until a newer frame is committed
+(`remote_wait_frame`); the async HTTP and WebSocket routes register a callback
+instead (`remote_subscribe`), so waiting viewers hold no thread.
+
+Frames are committed as received and then compressed by a worker thread
+(byte shuffle + zstd or LZ4, `remote.compression`), so the ring budgets hold
+several times more history. Readers get the pixels back via `remote_frame_bytes`;
+the HTTP routes pass the compressed form through to clients that accept it.
+
+Peak sets in the frame metadata are held as float32 (x, y, intensity) arrays.
+They arrive as JSON lists or in a binary form (`remote_unpack_peak_sets`), are
+validated with vectorized `np.isfinite` checks and served in that same binary
+form (`remote_pack_peak_sets`).
 """
 
+import itertools
 import json
 import math
 import re
+import sys
 import threading
 import time
-from pathlib import Path
-from typing import Any
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
 
 import numpy as np
 from fastapi import HTTPException
@@ -21,15 +45,157 @@ from ..image_formats import (
     _first_number,
     _image_ext_name,
     _normalize_image_array,
-    _read_cbf,
-    _read_cbf_gz,
-    _read_edf,
+    _read_cbf_bytes,
+    _read_cbf_gz_bytes,
+    _read_edf_bytes,
     _read_tiff_bytes,
 )
 
-_remote_frames: dict[str, dict[str, Any]] = {}
-_remote_frames_lock = threading.Lock()
-_REMOTE_SOURCES_MAX = 64
+DEFAULT_RING_FRAMES = 64
+DEFAULT_RING_MB = 256
+DEFAULT_MAX_MB = 1024
+DEFAULT_COMPRESSION = "zstd"
+REMOTE_COMPRESSIONS = ("zstd", "lz4", "none")
+# Peak sets per frame and points per set; every point is a float32 (x, y, intensity) row.
+PEAK_SETS_MAX = 32
+PEAK_POINTS_MAX = 10000
+PEAK_COLUMNS = ("x", "y", "intensity")
+
+# Level 1 already gets ~10x on shuffled detector frames; higher levels mostly cost time.
+_ZSTD_LEVEL = 1
+# Smaller frames are kept as received: the saving would not pay for the round trip.
+_REMOTE_COMPRESS_MIN_BYTES = 64 * 1024
+_REMOTE_COMPRESS_WORKERS = 2
+
+_zstandard = None
+_lz4_frame = None
+
+
+class _RemoteSource:
+    """Frames of one source in arrival order, keyed by sequence number.
+
+    Each source has its own lock, so producers of different sources never wait
+    on each other; `stored` is notified whenever a frame is committed.
+    """
+
+    __slots__ = ("frames", "nbytes", "lock", "stored", "subscribers", "waiters", "retired")
+
+    def __init__(self) -> None:
+        self.frames: OrderedDict[int, dict[str, Any]] = OrderedDict()
+        self.nbytes = 0
+        self.lock = threading.Lock()
+        self.stored = threading.Condition(self.lock)
+        # Callbacks handed every committed frame (WebSocket viewers).
+        self.subscribers: list[Callable[[dict[str, Any]], None]] = []
+        self.waiters = 0
+        # Set once the source was dropped from the registry; holders must look it up again.
+        self.retired = False
+
+
+# Lock order: registry -> source -> LRU / pending metadata. The LRU lock is never
+# held while taking a source lock, so cross-source eviction cannot deadlock.
+_remote_sources: dict[str, _RemoteSource] = {}
+_remote_sources_lock = threading.Lock()
+# Every retained frame of every source, oldest first: the global budget evicts from the front.
+_remote_lru: OrderedDict[tuple[str, int], dict[str, Any]] = OrderedDict()
+_remote_lru_lock = threading.Lock()
+_remote_bytes = {"total": 0}  # guarded by _remote_lru_lock
+# Store version stamped on every frame, so waiters notice replaced sequence numbers too.
+_remote_versions = itertools.count(1)
+_remote_limits = {
+    "ring_frames": DEFAULT_RING_FRAMES,
+    "ring_bytes": DEFAULT_RING_MB * 1024 * 1024,
+    "max_bytes": DEFAULT_MAX_MB * 1024 * 1024,
+}
+_remote_codec = {"name": DEFAULT_COMPRESSION}
+_remote_compress_pool: ThreadPoolExecutor | None = None
+# Sidecar metadata that arrived before its frame, per source (oldest dropped first).
+_remote_pending_meta: dict[str, OrderedDict[int, dict[str, Any]]] = {}
+_remote_pending_lock = threading.Lock()
+_REMOTE_PENDING_META_MAX = 64
+
+
+def remote_configure(
+    *,
+    ring_frames: int = DEFAULT_RING_FRAMES,
+    ring_mb: int = DEFAULT_RING_MB,
+    max_mb: int = DEFAULT_MAX_MB,
+    compression: str = DEFAULT_COMPRESSION,
+) -> None:
+    """Set the per-source ring limits and the global byte budget, evicting what no longer fits.
+
+    `compression` applies to frames stored from now on; retained frames keep theirs.
+    """
+    codec = str(compression or "none").strip().lower()
+    _remote_codec["name"] = codec if codec in REMOTE_COMPRESSIONS else DEFAULT_COMPRESSION
+    _remote_limits["ring_frames"] = max(1, int(ring_frames))
+    _remote_limits["ring_bytes"] = max(0, int(ring_mb)) * 1024 * 1024
+    _remote_limits["max_bytes"] = max(0, int(max_mb)) * 1024 * 1024
+    with _remote_sources_lock:
+        sources = list(_remote_sources.items())
+    for source_id, source in sources:
+        with source.lock:
+            _trim_ring_locked(source_id, source)
+    _trim_total()
+
+
+def _ensure_zstandard() -> bool:
+    global _zstandard
+    if _zstandard is None:
+        try:
+            import zstandard as zstandard_module  # type: ignore[import-not-found]
+        except ImportError:
+            return False
+        _zstandard = zstandard_module
+    return True
+
+
+def _ensure_lz4() -> bool:
+    global _lz4_frame
+    if _lz4_frame is None:
+        try:
+            import lz4.frame as lz4_frame_module  # type: ignore[import-not-found]
+        except ImportError:
+            return False
+        _lz4_frame = lz4_frame_module
+    return True
+
+
+def remote_encode(raw: bytes, itemsize: int, encoding: str) -> bytes | None:
+    """Byte-shuffle and compress frame bytes; None when the codec is not installed.
+
+    The shuffle groups byte k of every pixel together, which turns the mostly-zero
+    high bytes of counting-detector frames into long runs.
+    """
+    if encoding == "zstd" and _ensure_zstandard():
+        compress = _zstandard.ZstdCompressor(level=_ZSTD_LEVEL).compress
+    elif encoding == "lz4" and _ensure_lz4():
+        compress = _lz4_frame.compress
+    else:
+        return None
+    if itemsize > 1:
+        raw = np.frombuffer(raw, dtype=np.uint8).reshape(-1, itemsize).T.tobytes()
+    return compress(raw)
+
+
+def remote_decode(encoded: bytes, itemsize: int, encoding: str) -> bytes:
+    """Invert `remote_encode`: decompress, then restore the pixel byte order."""
+    if encoding == "zstd" and _ensure_zstandard():
+        shuffled = _zstandard.ZstdDecompressor().decompress(encoded)
+    elif encoding == "lz4" and _ensure_lz4():
+        shuffled = _lz4_frame.decompress(encoded)
+    else:
+        raise RuntimeError(f"Remote frame codec is not available: {encoding}")
+    if itemsize <= 1:
+        return shuffled
+    return np.frombuffer(shuffled, dtype=np.uint8).reshape(itemsize, -1).T.tobytes()
+
+
+def remote_frame_bytes(frame: dict[str, Any]) -> bytes:
+    """Return the C-order pixel bytes of a stored frame, decompressing if needed."""
+    if frame.get("bytes") is not None:
+        return frame["bytes"]
+    return remote_decode(frame["encoded"], int(frame["shuffle"]), str(frame["encoding"]))
 
 
 def remote_safe_source_id(source_id: str | None) -> str:
@@ -77,6 +243,46 @@ def remote_parse_shape(value: Any) -> tuple[int, ...] | None:
     return tuple(dims)
 
 
+def remote_raw_layout(
+    dtype_raw: Any, shape_raw: Any, nbytes: int | None = None
+) -> tuple[np.dtype, tuple[int, ...]]:
+    """Validate the dtype/shape of a raw frame (and its byte size, when given)."""
+    if not dtype_raw:
+        raise HTTPException(status_code=400, detail="Remote raw image requires metadata dtype")
+    shape = remote_parse_shape(shape_raw)
+    if not shape:
+        raise HTTPException(status_code=400, detail="Remote raw image requires metadata shape")
+    try:
+        dtype = np.dtype(str(dtype_raw))
+    except Exception as exc:
+        raise HTTPException(status_code=400, detail="Invalid remote dtype") from exc
+    if dtype.kind not in "biuf" or dtype.itemsize == 0:
+        raise HTTPException(status_code=400, detail="Invalid remote dtype")
+    expected = int(np.prod(shape)) * dtype.itemsize
+    if nbytes is not None and expected != nbytes:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Remote raw image size mismatch (expected {expected} bytes, got {nbytes})",
+        )
+    return dtype, shape
+
+
+def remote_raw_frame(
+    raw: bytes, dtype: np.dtype, shape: tuple[int, ...]
+) -> tuple[bytes, str, tuple[int, ...]]:
+    """Return `(bytes, dtype str, shape)` ready to store for a validated raw frame.
+
+    2D little-endian frames of a dtype the viewer reads are returned as received;
+    anything else goes through the same normalization as the multipart endpoint.
+    """
+    little = dtype.byteorder in "<|" or (dtype.byteorder == "=" and sys.byteorder == "little")
+    wide_int = dtype.kind in "iu" and dtype.itemsize > 4
+    if len(shape) == 2 and little and not wide_int:
+        return raw, dtype.newbyteorder("<").str, shape
+    frame = _normalize_image_array(np.frombuffer(raw, dtype=dtype).reshape(shape))
+    return frame.tobytes(order="C"), frame.dtype.str, tuple(int(v) for v in frame.shape)
+
+
 def remote_read_image_bytes(
     raw: bytes, *, meta: dict[str, Any], filename: str | None
 ) -> np.ndarray:
@@ -84,54 +290,21 @@ def remote_read_image_bytes(
     if not fmt and filename:
         fmt = _image_ext_name(filename).lower()
     if fmt in {"raw", "array", "binary", ""}:
-        dtype_raw = meta.get("dtype") or meta.get("type")
-        if not dtype_raw:
-            raise HTTPException(status_code=400, detail="Remote raw image requires metadata dtype")
-        shape = remote_parse_shape(meta.get("shape"))
-        if not shape:
-            raise HTTPException(status_code=400, detail="Remote raw image requires metadata shape")
-        try:
-            dtype = np.dtype(str(dtype_raw))
-        except Exception as exc:
-            raise HTTPException(status_code=400, detail="Invalid remote dtype") from exc
-        expected = int(np.prod(shape)) * dtype.itemsize
-        if expected != len(raw):
-            raise HTTPException(
-                status_code=400,
-                detail=f"Remote raw image size mismatch (expected {expected} bytes, got {len(raw)})",
-            )
+        dtype, shape = remote_raw_layout(
+            meta.get("dtype") or meta.get("type"), meta.get("shape"), len(raw)
+        )
         arr = np.frombuffer(raw, dtype=dtype).reshape(shape)
         return _normalize_image_array(np.asarray(arr))
 
     if fmt in {".tif", ".tiff", "tif", "tiff"}:
         return _read_tiff_bytes(raw)
 
-    suffix_map = {
-        ".cbf": ".cbf",
-        "cbf": ".cbf",
-        ".cbf.gz": ".cbf.gz",
-        "cbf.gz": ".cbf.gz",
-        ".edf": ".edf",
-        "edf": ".edf",
-    }
-    if fmt in suffix_map:
-        suffix = suffix_map[fmt]
-        import tempfile
-
-        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
-            tmp.write(raw)
-            tmp_path = Path(tmp.name)
-        try:
-            if suffix == ".cbf":
-                return _read_cbf(tmp_path)
-            if suffix == ".cbf.gz":
-                return _read_cbf_gz(tmp_path)
-            return _read_edf(tmp_path)
-        finally:
-            try:
-                tmp_path.unlink(missing_ok=True)
-            except Exception:
-                pass
+    if fmt in {".cbf", "cbf"}:
+        return _read_cbf_bytes(raw)
+    if fmt in {".cbf.gz", "cbf.gz"}:
+        return _read_cbf_gz_bytes(raw)
+    if fmt in {".edf", "edf"}:
+        return _read_edf_bytes(raw)
 
     raise HTTPException(status_code=400, detail=f"Unsupported remote image format: {fmt}")
 
@@ -143,38 +316,122 @@ def _remote_pick_float(meta: dict[str, Any], key: str) -> float | None:
     return _first_number(value)
 
 
+def _remote_peak_set(item: dict[str, Any], idx: int, points: np.ndarray) -> dict[str, Any] | None:
+    """Validate one peak set: float32 (x, y, intensity) rows, NaN where no intensity is given."""
+    points = points[:PEAK_POINTS_MAX]
+    with np.errstate(over="ignore", invalid="ignore"):
+        rows = np.full((points.shape[0], len(PEAK_COLUMNS)), np.nan, dtype=np.float32)
+        rows[:, : min(points.shape[1], len(PEAK_COLUMNS))] = points[:, : len(PEAK_COLUMNS)]
+    rows = rows[np.isfinite(rows[:, 0]) & np.isfinite(rows[:, 1])]
+    if not rows.shape[0]:
+        return None
+    rows[~np.isfinite(rows[:, 2]), 2] = np.nan
+    name = str(item.get("name") or f"Set {idx + 1}")[:64]
+    color = str(item.get("color") or "#4aa3ff").strip()
+    if not re.fullmatch(r"#?[0-9A-Fa-f]{6}", color):
+        color = "#4aa3ff"
+    if not color.startswith("#"):
+        color = f"#{color}"
+    return {"name": name, "color": color, "points": rows}
+
+
+def _remote_peak_points(raw_points: list[Any]) -> np.ndarray:
+    raw_points = raw_points[:PEAK_POINTS_MAX]
+    try:
+        points = np.asarray(raw_points, dtype=np.float64)
+    except (TypeError, ValueError):
+        points = None
+    if points is not None and points.ndim == 2 and points.shape[1] >= 2:
+        return points
+    # Ragged or mixed input: coerce point by point, skipping what is not a coordinate pair.
+    rows = []
+    for point in raw_points:
+        if not isinstance(point, (list, tuple)) or len(point) < 2:
+            continue
+        x = _first_number(point[0])
+        y = _first_number(point[1])
+        if x is None or y is None:
+            continue
+        intensity = _first_number(point[2]) if len(point) >= 3 else None
+        rows.append((x, y, math.nan if intensity is None else intensity))
+    return np.asarray(rows, dtype=np.float64).reshape(-1, len(PEAK_COLUMNS))
+
+
 def _remote_parse_peak_sets(value: Any) -> list[dict[str, Any]]:
     if not isinstance(value, list):
         return []
     cleaned_sets: list[dict[str, Any]] = []
-    for idx, item in enumerate(value[:32]):
-        if not isinstance(item, dict):
-            continue
-        raw_points = item.get("points")
-        if not isinstance(raw_points, list):
+    for idx, item in enumerate(value[:PEAK_SETS_MAX]):
+        if not isinstance(item, dict) or not isinstance(item.get("points"), list):
             continue
-        points: list[list[float]] = []
-        for point in raw_points[:10000]:
-            if not isinstance(point, (list, tuple)) or len(point) < 2:
-                continue
-            x = _first_number(point[0])
-            y = _first_number(point[1])
-            if x is None or y is None or not math.isfinite(x) or not math.isfinite(y):
-                continue
-            intensity = _first_number(point[2]) if len(point) >= 3 else None
-            row = [float(x), float(y)]
-            if intensity is not None and math.isfinite(intensity):
-                row.append(float(intensity))
-            points.append(row)
-        if not points:
-            continue
-        name = str(item.get("name") or f"Set {idx + 1}")[:64]
-        color = str(item.get("color") or "#4aa3ff").strip()
-        if not re.fullmatch(r"#?[0-9A-Fa-f]{6}", color):
-            color = "#4aa3ff"
-        if not color.startswith("#"):
-            color = f"#{color}"
-        cleaned_sets.append({"name": name, "color": color, "points": points})
+        cleaned = _remote_peak_set(item, idx, _remote_peak_points(item["points"]))
+        if cleaned is not None:
+            cleaned_sets.append(cleaned)
+    return cleaned_sets
+
+
+def remote_pack_peak_sets(peak_sets: list[dict[str, Any]]) -> bytes:
+    """Serialize peak sets to the binary form of `/api/remote/v1/peaks`.
+
+    Layout: little-endian uint32 header length, a UTF-8 JSON header
+    (`{"columns": ["x", "y", "intensity"], "sets": [{"name", "color", "count"}]}`) padded
+    with spaces to a multiple of 4 bytes, then `count` rows of little-endian float32
+    columns per set, in header order.
+    """
+    header = json.dumps(
+        {
+            "columns": list(PEAK_COLUMNS),
+            "sets": [
+                {"name": item["name"], "color": item["color"], "count": len(item["points"])}
+                for item in peak_sets
+            ],
+        }
+    ).encode("utf-8")
+    header += b" " * (-len(header) % 4)
+    parts = [len(header).to_bytes(4, "little"), header]
+    parts.extend(np.ascontiguousarray(item["points"], dtype="<f4").tobytes() for item in peak_sets)
+    return b"".join(parts)
+
+
+def remote_unpack_peak_sets(data: bytes) -> list[dict[str, Any]]:
+    """Parse peak sets sent in the `remote_pack_peak_sets` layout.
+
+    Producers may send 2 columns (x, y) instead of 3 by setting `"columns": 2`. Rows with
+    a non-finite coordinate are dropped, like in JSON peak sets.
+    """
+    if len(data) < 4:
+        raise HTTPException(status_code=400, detail="Peak data is shorter than its prefix")
+    size = int.from_bytes(data[:4], "little")
+    if len(data) < 4 + size:
+        raise HTTPException(status_code=400, detail="Peak header exceeds the peak data")
+    try:
+        header = json.loads(data[4 : 4 + size])
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Invalid peak header JSON") from exc
+    sets = header.get("sets") if isinstance(header, dict) else None
+    if not isinstance(sets, list):
+        raise HTTPException(status_code=400, detail="Peak header must list its sets")
+    columns = header.get("columns", len(PEAK_COLUMNS))
+    columns = len(columns) if isinstance(columns, list) else _as_int(columns)
+    if columns not in (2, len(PEAK_COLUMNS)):
+        raise HTTPException(status_code=400, detail="Peak data must have 2 or 3 columns")
+    offset = 4 + size
+    cleaned_sets: list[dict[str, Any]] = []
+    for idx, item in enumerate(sets):
+        count = _as_int(item.get("count")) if isinstance(item, dict) else None
+        if count is None or count < 0:
+            raise HTTPException(status_code=400, detail="Peak set count must be >= 0")
+        nbytes = count * columns * 4
+        if offset + nbytes > len(data):
+            raise HTTPException(status_code=400, detail="Peak data is shorter than its header")
+        points = np.frombuffer(data, dtype="<f4", count=count * columns, offset=offset)
+        offset += nbytes
+        if idx < PEAK_SETS_MAX:
+            cleaned = _remote_peak_set(item, idx, points.reshape(count, columns))
+            if cleaned is not None:
+                cleaned_sets.append(cleaned)
+    if offset != len(data):
+        raise HTTPException(status_code=400, detail="Peak data is longer than its header")
     return cleaned_sets
 
 
@@ -251,37 +508,324 @@ def remote_extract_metadata(meta: dict[str, Any]) -> dict[str, Any]:
     }
 
 
+def _lookup(source_id: str) -> _RemoteSource | None:
+    # A plain dict read is atomic; the registry lock only orders creation and retirement.
+    return _remote_sources.get(source_id)
+
+
+def _lock_source(source_id: str) -> _RemoteSource:
+    """Return the live state of a source (created if needed) with its lock held."""
+    while True:
+        source = _remote_sources.get(source_id)
+        if source is None:
+            with _remote_sources_lock:
+                source = _remote_sources.get(source_id)
+                if source is None:
+                    source = _remote_sources[source_id] = _RemoteSource()
+        source.lock.acquire()
+        if not source.retired:
+            return source
+        source.lock.release()
+
+
+def _retire_if_idle(source_id: str) -> None:
+    """Forget a source without frames, waiters or subscribers (skipped while it is busy)."""
+    with _remote_sources_lock:
+        source = _remote_sources.get(source_id)
+        if source is None or not source.lock.acquire(blocking=False):
+            return
+        try:
+            if not source.frames and not source.waiters and not source.subscribers:
+                source.retired = True
+                del _remote_sources[source_id]
+        finally:
+            source.lock.release()
+
+
+def _drop_locked(source_id: str, source: _RemoteSource, seq: int | None = None) -> None:
+    """Drop frame `seq` (default: the oldest) of a source whose lock is held."""
+    if seq is None:
+        seq, entry = source.frames.popitem(last=False)
+    else:
+        entry = source.frames.pop(seq)
+    source.nbytes -= int(entry["stored_nbytes"])
+    with _remote_lru_lock:
+        if _remote_lru.get((source_id, seq)) is entry:
+            del _remote_lru[(source_id, seq)]
+            _remote_bytes["total"] -= int(entry["stored_nbytes"])
+
+
+def _trim_ring_locked(source_id: str, source: _RemoteSource) -> None:
+    while len(source.frames) > 1 and (
+        len(source.frames) > _remote_limits["ring_frames"]
+        or source.nbytes > _remote_limits["ring_bytes"]
+    ):
+        _drop_locked(source_id, source)
+
+
+def _trim_total() -> None:
+    """Evict the oldest frames of any source until the global budget fits.
+
+    The newest frame overall is always kept. Victims leave the LRU index first and
+    their rings afterwards, one source lock at a time.
+    """
+    if _remote_bytes["total"] <= _remote_limits["max_bytes"]:
+        return
+    victims: list[tuple[tuple[str, int], dict[str, Any]]] = []
+    with _remote_lru_lock:
+        while _remote_bytes["total"] > _remote_limits["max_bytes"] and len(_remote_lru) > 1:
+            key, entry = _remote_lru.popitem(last=False)
+            _remote_bytes["total"] -= int(entry["stored_nbytes"])
+            victims.append((key, entry))
+    for (source_id, seq), entry in victims:
+        source = _lookup(source_id)
+        if source is None:
+            continue
+        with source.lock:
+            if source.frames.get(seq) is entry:
+                del source.frames[seq]
+                source.nbytes -= int(entry["stored_nbytes"])
+            emptied = not source.frames
+        if emptied:
+            _retire_if_idle(source_id)
+
+
 def remote_store_frame(
     *, source_id: str, frame: np.ndarray, meta: dict[str, Any], seq: int | None
 ) -> int:
+    return remote_store_raw(
+        source_id=source_id,
+        raw=frame.tobytes(order="C"),
+        dtype=frame.dtype.str,
+        shape=tuple(int(v) for v in frame.shape),
+        meta=meta,
+        seq=seq,
+    )
+
+
+def remote_store_raw(
+    *,
+    source_id: str,
+    raw: bytes,
+    dtype: str,
+    shape: tuple[int, ...],
+    meta: dict[str, Any] | None,
+    seq: int | None,
+) -> int:
+    """Store frame bytes as given (no copy); `meta=None` uses sidecar metadata sent ahead.
+
+    Waiters and subscribers see the frame at once; compression follows on a worker thread.
+    """
     now = time.time()
-    with _remote_frames_lock:
-        previous = _remote_frames.get(source_id)
-        next_seq = (
-            int(seq) if seq is not None else int(previous.get("seq", 0) + 1 if previous else 1)
-        )
-        _remote_frames[source_id] = {
+    source = _lock_source(source_id)
+    try:
+        if source.frames and seq is None:
+            next_seq = int(next(reversed(source.frames))) + 1
+        else:
+            next_seq = int(seq) if seq is not None else 1
+        early_meta = None
+        # Only `remote_attach_meta` adds metadata for this source, under the lock held here.
+        if source_id in _remote_pending_meta:
+            with _remote_pending_lock:
+                pending = _remote_pending_meta.get(source_id)
+                early_meta = pending.pop(next_seq, None) if pending else None
+        if meta is None:
+            meta = early_meta if early_meta is not None else remote_extract_metadata({})
+        if next_seq in source.frames:
+            # A repeated sequence number replaces the retained frame.
+            _drop_locked(source_id, source, next_seq)
+        entry = {
             "source_id": source_id,
             "seq": next_seq,
             "updated_at": now,
-            "dtype": frame.dtype.str,
-            "shape": tuple(int(v) for v in frame.shape),
-            "bytes": frame.tobytes(order="C"),
+            "dtype": dtype,
+            "shape": tuple(shape),
+            "bytes": raw,
+            "nbytes": len(raw),
+            "encoded": None,
+            "encoding": None,
+            "shuffle": np.dtype(dtype).itemsize,
+            "stored_nbytes": len(raw),
             "meta": meta,
+            "version": next(_remote_versions),
         }
-        if len(_remote_frames) > _REMOTE_SOURCES_MAX:
-            oldest = sorted(
-                _remote_frames.items(),
-                key=lambda item: float(item[1].get("updated_at", 0.0)),
+        source.frames[next_seq] = entry
+        source.nbytes += len(raw)
+        with _remote_lru_lock:
+            _remote_lru[(source_id, next_seq)] = entry
+            _remote_bytes["total"] += len(raw)
+        _trim_ring_locked(source_id, source)
+        if source.waiters:
+            source.stored.notify_all()
+        for notify in source.subscribers:
+            try:
+                # Subscribers share the stored bytes; only the entry dict is copied.
+                notify(dict(entry))
+            except Exception:
+                pass
+        codec = _remote_codec["name"]
+    finally:
+        source.lock.release()
+    _trim_total()
+    if codec != "none" and len(raw) >= _REMOTE_COMPRESS_MIN_BYTES:
+        _remote_compressor().submit(_remote_compress, source_id, entry, codec)
+    return next_seq
+
+
+def _remote_compressor() -> ThreadPoolExecutor:
+    global _remote_compress_pool
+    with _remote_sources_lock:
+        if _remote_compress_pool is None:
+            _remote_compress_pool = ThreadPoolExecutor(
+                max_workers=_REMOTE_COMPRESS_WORKERS, thread_name_prefix="albis-remote-codec"
             )
-            for old_source, _entry in oldest[: len(_remote_frames) - _REMOTE_SOURCES_MAX]:
-                _remote_frames.pop(old_source, None)
-        return next_seq
+        return _remote_compress_pool
+
+
+def _remote_compress(source_id: str, entry: dict[str, Any], codec: str) -> None:
+    """Replace the raw bytes of a retained frame with their compressed form."""
+    seq = int(entry["seq"])
+    source = _lookup(source_id)
+    if source is None:
+        return
+    with source.lock:
+        if source.frames.get(seq) is not entry or entry["bytes"] is None:
+            return  # evicted or replaced meanwhile
+        raw = entry["bytes"]
+    encoded = remote_encode(raw, int(entry["shuffle"]), codec)
+    if encoded is None or len(encoded) >= len(raw):
+        return
+    with source.lock:
+        if source.frames.get(seq) is not entry:
+            return
+        saved = len(raw) - len(encoded)
+        source.nbytes -= saved
+        with _remote_lru_lock:
+            entry.update(bytes=None, encoded=encoded, encoding=codec, stored_nbytes=len(encoded))
+            if _remote_lru.get((source_id, seq)) is entry:
+                _remote_bytes["total"] -= saved
+
+
+def remote_attach_meta(source_id: str, seq: int, meta: dict[str, Any]) -> bool:
+    """Attach sidecar metadata to frame `seq`.
+
+    Returns True when the frame is retained. Otherwise the metadata is held
+    until a frame with that sequence number arrives without metadata of its own.
+    """
+    source = _lock_source(source_id)
+    frame = None
+    try:
+        frame = source.frames.get(int(seq))
+        if frame is not None:
+            frame["meta"] = meta
+            return True
+        with _remote_pending_lock:
+            if source_id not in _remote_pending_meta and len(_remote_pending_meta) >= 64:
+                _remote_pending_meta.pop(next(iter(_remote_pending_meta)))
+            pending = _remote_pending_meta.setdefault(source_id, OrderedDict())
+            pending[int(seq)] = meta
+            while len(pending) > _REMOTE_PENDING_META_MAX:
+                pending.popitem(last=False)
+        return False
+    finally:
+        source.lock.release()
+        if frame is None:
+            _retire_if_idle(source_id)
 
 
 def remote_snapshot(source_id: str) -> dict[str, Any] | None:
-    with _remote_frames_lock:
-        frame = _remote_frames.get(source_id)
-        if not frame:
+    """Return the most recently stored frame of a source."""
+    source = _lookup(source_id)
+    if source is None:
+        return None
+    with source.lock:
+        if not source.frames:
             return None
-        return dict(frame)
+        return dict(next(reversed(source.frames.values())))
+
+
+def remote_wait_frame(
+    source_id: str,
+    timeout_s: float,
+    *,
+    after_seq: int | None = None,
+    after_version: int = 0,
+) -> dict[str, Any] | None:
+    """Block until the newest frame of a source is past `after_seq` / `after_version`.
+
+    Returns that frame, or None once `timeout_s` passes without one.
+    """
+    deadline = time.monotonic() + max(0.0, timeout_s)
+    source = _lock_source(source_id)
+    source.waiters += 1
+    try:
+        while True:
+            if source.frames:
+                frame = next(reversed(source.frames.values()))
+                if (after_seq is None or int(frame["seq"]) > after_seq) and int(
+                    frame["version"]
+                ) > after_version:
+                    return dict(frame)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            source.stored.wait(remaining)
+    finally:
+        source.waiters -= 1
+        source.lock.release()
+        _retire_if_idle(source_id)
+
+
+def remote_subscribe(
+    source_id: str, notify: Callable[[dict[str, Any]], None]
+) -> Callable[[], None]:
+    """Call `notify(frame)` for every frame committed to a source; returns the unsubscribe.
+
+    `notify` runs on the storing thread with the source lock held, so it must only
+    hand the frame off (e.g. `loop.call_soon_threadsafe`).
+    """
+    source = _lock_source(source_id)
+    try:
+        source.subscribers.append(notify)
+    finally:
+        source.lock.release()
+
+    def _unsubscribe() -> None:
+        with source.lock:
+            if notify in source.subscribers:
+                source.subscribers.remove(notify)
+        _retire_if_idle(source_id)
+
+    return _unsubscribe
+
+
+def remote_frame_at(source_id: str, seq: int) -> dict[str, Any] | None:
+    """Return the retained frame with sequence number `seq`, if any."""
+    source = _lookup(source_id)
+    if source is None:
+        return None
+    with source.lock:
+        frame = source.frames.get(int(seq))
+        return dict(frame) if frame else None
+
+
+def remote_history(source_id: str) -> dict[str, Any]:
+    """Describe the retained frames of a source (sequence numbers in arrival order)."""
+    source = _lookup(source_id)
+    seqs: list[int] = []
+    nbytes = 0
+    if source is not None:
+        with source.lock:
+            seqs = list(source.frames)
+            nbytes = source.nbytes
+    return {
+        "source_id": source_id,
+        "seqs": seqs,
+        "frames": len(seqs),
+        "bytes": nbytes,
+        "oldest_seq": seqs[0] if seqs else None,
+        "latest_seq": seqs[-1] if seqs else None,
+        "ring_frames": _remote_limits["ring_frames"],
+        "ring_bytes": _remote_limits["ring_bytes"],
+        "compression": _remote_codec["name"],
+    }
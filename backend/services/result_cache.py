@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+"""Content-addressed cache for finished job outputs.
+
+An entry is keyed by a hash of everything that determines a job's result (the
+source file signature plus the job parameters) and lives in
+`<root>/<key>/`:
+
+- `entry.json`: the key parts, the cached file names with their per-file
+  metadata, and the total size in bytes;
+- the output files themselves, hard-linked from the job's outputs when the
+  cache shares their filesystem and copied otherwise.
+
+The modification time of `entry.json` is the entry's last use; entries are
+evicted least recently used first once the cache exceeds its size budget.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable
+
+_ENTRY_FILE = "entry.json"
+
+
+def link_or_copy(src: Path, dst: Path) -> None:
+    """Hard-link `src` to `dst`, falling back to a copy across filesystems."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+class ResultCache:
+    def __init__(self, root: Path, get_max_bytes: Callable[[], int]) -> None:
+        self._root = Path(root)
+        self._get_max_bytes = get_max_bytes
+        self._lock = threading.Lock()
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    @property
+    def enabled(self) -> bool:
+        return int(self._get_max_bytes()) > 0
+
+    @staticmethod
+    def make_key(parts: dict[str, Any]) -> str:
+        payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _entry_dir(self, key: str) -> Path:
+        if len(key) != 64 or not all(ch in "0123456789abcdef" for ch in key):
+            raise ValueError("Invalid cache key")
+        return self._root / key
+
+    def lookup(self, key: str) -> dict[str, Any] | None:
+        """Return the entry with absolute `path`s for its files, or None on a miss."""
+        if not self.enabled:
+            return None
+        entry_dir = self._entry_dir(key)
+        entry = _read_json(entry_dir / _ENTRY_FILE)
+        if entry is None:
+            return None
+        files = []
+        for item in entry.get("files", []):
+            path = entry_dir / str(item.get("name", ""))
+            if not path.is_file():
+                # Damaged entry (files removed by hand): drop it and recompute.
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                return None
+            files.append({**item, "path": path})
+        try:
+            os.utime(entry_dir / _ENTRY_FILE)
+        except OSError:
+            return None
+        return {**entry, "files": files}
+
+    def store(
+        self, key: str, files: list[tuple[Path, dict[str, Any]]], meta: dict[str, Any]
+    ) -> bool:
+        """Add `files` (path plus per-file metadata) under `key`; return False if not cached."""
+        max_bytes = int(self._get_max_bytes())
+        if max_bytes <= 0 or not files:
+            return False
+        entry_dir = self._entry_dir(key)
+        if (entry_dir / _ENTRY_FILE).is_file():
+            return True
+        size = sum(int(path.stat().st_size) for path, _ in files)
+        if size > max_bytes:
+            return False
+        self._root.mkdir(parents=True, exist_ok=True)
+        tmp_dir = self._root / f".tmp-{uuid.uuid4().hex}"
+        tmp_dir.mkdir()
+        try:
+            items = []
+            for idx, (path, item) in enumerate(files):
+                name = f"{idx:05d}{path.suffix}"
+                link_or_copy(path, tmp_dir / name)
+                items.append({**item, "name": name})
+            _write_json(
+                tmp_dir / _ENTRY_FILE,
+                {**meta, "key": key, "files": items, "size": size, "created_at": time.time()},
+            )
+            try:
+                os.rename(tmp_dir, entry_dir)
+            except OSError:
+                # An identical job finished first; its entry is just as good.
+                return entry_dir.is_dir()
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        self.evict(keep=key)
+        return True
+
+    def evict(self, keep: str | None = None) -> int:
+        """Remove least recently used entries until the cache fits its budget."""
+        max_bytes = max(0, int(self._get_max_bytes()))
+        with self._lock:
+            entries = []
+            total = 0
+            for entry_dir in self._entries():
+                entry_file = entry_dir / _ENTRY_FILE
+                entry = _read_json(entry_file)
+                try:
+                    last_used = entry_file.stat().st_mtime
+                except OSError:
+                    entry = None
+                if entry is None:
+                    continue
+                size = int(entry.get("size", 0))
+                total += size
+                entries.append((last_used, size, entry_dir))
+            removed = 0
+            for _last_used, size, entry_dir in sorted(entries, key=lambda item: item[0]):
+                if total <= max_bytes:
+                    break
+                if entry_dir.name == keep:
+                    continue
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                total -= size
+                removed += 1
+            return removed
+
+    def stats(self) -> dict[str, int]:
+        entries = 0
+        size = 0
+        for entry_dir in self._entries():
+            entry = _read_json(entry_dir / _ENTRY_FILE)
+            if entry is not None:
+                entries += 1
+                size += int(entry.get("size", 0))
+        return {"entries": entries, "bytes": size}
+
+    def _entries(self) -> list[Path]:
+        if not self._root.is_dir():
+            return []
+        return [path for path in self._root.iterdir() if not path.name.startswith(".")]
+
+
+def _write_json(path: Path, payload: dict[str, Any]) -> None:
+    path.write_text(json.dumps(payload), encoding="utf-8")
+
+
+def _read_json(path: Path) -> dict[str, Any] | None:
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return payload if isinstance(payload, dict) else None
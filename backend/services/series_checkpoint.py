@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+"""On-disk checkpoints for resumable series jobs.
+
+Each checkpointed job owns `<root>/<job_id>/`:
+
+- `job.json`: the job parameters, written once when the job is queued;
+- `state.json` + `state-<generation>.npz`: the reduction cursor and the
+  accumulator arrays, replaced atomically at every checkpoint.
+
+The generation number ties `state.json` to its arrays, so a crash while a
+checkpoint is written leaves the previous checkpoint intact.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+
+class SeriesCheckpointStore:
+    def __init__(self, root: Path) -> None:
+        self._root = Path(root)
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def _job_dir(self, job_id: str) -> Path:
+        if not job_id or not all(ch.isalnum() for ch in job_id):
+            raise ValueError("Invalid job id")
+        return self._root / job_id
+
+    def create(self, job_id: str, job: dict[str, Any]) -> None:
+        job_dir = self._job_dir(job_id)
+        job_dir.mkdir(parents=True, exist_ok=True)
+        _write_json(job_dir / "job.json", job)
+
+    def save_state(self, job_id: str, state: dict[str, Any], arrays: dict[str, np.ndarray]) -> None:
+        job_dir = self._job_dir(job_id)
+        if not job_dir.is_dir():
+            return
+        previous = _read_json(job_dir / "state.json") or {}
+        generation = int(previous.get("generation", 0)) + 1
+        fd, tmp_name = tempfile.mkstemp(prefix=".state-", suffix=".npz", dir=job_dir)
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                np.savez(fh, **arrays)
+            os.replace(tmp_name, job_dir / f"state-{generation}.npz")
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        _write_json(job_dir / "state.json", {**state, "generation": generation})
+        (job_dir / f"state-{generation - 1}.npz").unlink(missing_ok=True)
+
+    def load(
+        self, job_id: str
+    ) -> tuple[dict[str, Any], dict[str, Any] | None, dict[str, np.ndarray]]:
+        """Return `(job, state, arrays)`; state is None before the first checkpoint."""
+        job_dir = self._job_dir(job_id)
+        job = _read_json(job_dir / "job.json")
+        if job is None:
+            raise FileNotFoundError(job_id)
+        state = _read_json(job_dir / "state.json")
+        arrays: dict[str, np.ndarray] = {}
+        if state is not None:
+            with np.load(job_dir / f"state-{int(state['generation'])}.npz") as npz:
+                arrays = {name: npz[name] for name in npz.files}
+        return job, state, arrays
+
+    def list(self) -> list[dict[str, Any]]:
+        """Summaries of every stored checkpoint, newest first."""
+        entries: list[dict[str, Any]] = []
+        if not self._root.is_dir():
+            return entries
+        for job_dir in self._root.iterdir():
+            job = _read_json(job_dir / "job.json")
+            if job is None:
+                continue
+            state = _read_json(job_dir / "state.json") or {}
+            entries.append(
+                {
+                    "id": job_dir.name,
+                    "created_at": job.get("created_at"),
+                    "checkpointed_at": state.get("checkpointed_at"),
+                    "progress": float(state.get("progress", 0.0)),
+                    "config": job.get("config", {}),
+                }
+            )
+        entries.sort(key=lambda item: float(item.get("created_at") or 0.0), reverse=True)
+        return entries
+
+    def exists(self, job_id: str) -> bool:
+        return (self._job_dir(job_id) / "job.json").is_file()
+
+    def remove(self, job_id: str) -> None:
+        shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+
+
+def _write_json(path: Path, payload: dict[str, Any]) -> None:
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(payload), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _read_json(path: Path) -> dict[str, Any] | None:
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return payload if isinstance(payload, dict) else None
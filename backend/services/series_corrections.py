@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+"""Per-pixel corrections applied to frames before they are reduced.
+
+`FrameCorrector` turns raw frames into `(raw - dark) * gain / norm_ref` with
+masked and invalid pixels set to zero. Every stage runs in place on the
+float64 block that holds the converted frames, so a block of frames costs one
+allocation regardless of how many stages are enabled. The reference maps are
+prepared once per job (and threshold).
+"""
+
+from typing import Any
+
+import numpy as np
+from fastapi import HTTPException
+
+FLAT_MODES = ("flat", "gain")
+# Upper bound for one block read while averaging a stack of reference frames.
+_REFERENCE_BLOCK_BYTES = 64 * 1024 * 1024
+
+
+def normalize_flat_mode(value: str | None) -> str:
+    mode = str(value or "flat").strip().lower()
+    if mode not in FLAT_MODES:
+        raise HTTPException(status_code=400, detail="Invalid flat mode")
+    return mode
+
+
+def reference_frame(
+    arr: Any, image_shape: tuple[int, int], threshold_count: int, label: str
+) -> np.ndarray:
+    """Reduce a loaded reference to `(threshold_count, H, W)` float64 maps.
+
+    Accepts one map `(H, W)`, one map per threshold `(T, H, W)`, or a stack of
+    reference frames `(N, H, W)` / `(N, T, H, W)` that is averaged (dark runs).
+    `arr` may be an HDF5 dataset; stacks are then read in blocks.
+    """
+    shape = tuple(int(x) for x in arr.shape)
+    per_threshold = len(shape) == 3 and threshold_count > 1 and shape[0] == threshold_count
+    if len(shape) == 4 or (len(shape) == 3 and not per_threshold):
+        frame_bytes = max(1, int(np.prod(shape[1:])) * 8)
+        step = max(1, _REFERENCE_BLOCK_BYTES // frame_bytes)
+        ref = np.zeros(shape[1:], dtype=np.float64)
+        for start in range(0, shape[0], step):
+            ref += np.asarray(arr[start : start + step], dtype=np.float64).sum(axis=0)
+        ref /= max(1, shape[0])
+    else:
+        ref = np.asarray(arr[()] if hasattr(arr, "id") else arr, dtype=np.float64)
+    if ref.ndim == 2:
+        ref = np.broadcast_to(ref, (threshold_count, *ref.shape))
+    if tuple(ref.shape[-2:]) != tuple(image_shape) or ref.shape[0] != threshold_count:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{label} shape {shape} does not match frames {tuple(image_shape)}",
+        )
+    return ref
+
+
+def gain_from_reference(ref: np.ndarray, mode: str) -> np.ndarray:
+    """Return a multiplicative gain map; flat fields are scaled to a mean gain of 1."""
+    if mode == "gain":
+        return np.where(np.isfinite(ref), ref, 0.0)
+    valid = np.isfinite(ref) & (ref > 0)
+    gain = np.zeros_like(ref, dtype=np.float64)
+    if valid.any():
+        np.divide(float(ref[valid].mean()), ref, out=gain, where=valid)
+    return gain
+
+
+class FrameCorrector:
+    """Fused in-place dark / gain / normalization / mask stages for one threshold."""
+
+    def __init__(
+        self,
+        *,
+        dark: np.ndarray | None = None,
+        gain: np.ndarray | None = None,
+        norm_ref: np.ndarray | None = None,
+        zero_mask: np.ndarray | None = None,
+    ) -> None:
+        self.dark = dark
+        self.gain = gain
+        self.norm_ref = None
+        self.norm_valid = None
+        zero = zero_mask
+        if norm_ref is not None:
+            # The reference frame goes through the same dark/gain stages as the data.
+            ref = np.array(norm_ref, dtype=np.float64)
+            self._apply_linear(ref)
+            if zero_mask is not None:
+                ref[zero_mask] = np.nan
+            self.norm_valid = np.isfinite(ref) & (np.abs(ref) > 1e-12)
+            self.norm_ref = ref
+            invalid = ~self.norm_valid
+            zero = invalid if zero is None else (zero | invalid)
+        self.zero_mask = zero if zero is not None and zero.any() else None
+
+    @property
+    def active(self) -> bool:
+        return any(
+            item is not None for item in (self.dark, self.gain, self.norm_ref, self.zero_mask)
+        )
+
+    def _apply_linear(self, out: np.ndarray) -> None:
+        if self.dark is not None:
+            np.subtract(out, self.dark, out=out)
+        if self.gain is not None:
+            np.multiply(out, self.gain, out=out)
+
+    def apply(self, out: np.ndarray) -> np.ndarray:
+        """Correct `out` (float64, `(H, W)` or `(k, H, W)`) in place and return it."""
+        self._apply_linear(out)
+        if self.norm_ref is not None:
+            np.divide(out, self.norm_ref, out=out, where=self.norm_valid)
+        if self.zero_mask is not None:
+            np.copyto(out, 0.0, where=self.zero_mask)
+        return out
+
+    def apply_block(self, frames: Any) -> np.ndarray:
+        """Convert a block of frames to float64 (one allocation) and correct it in place."""
+        return self.apply(np.array(frames, dtype=np.float64))
@@ -0,0 +1,421 @@
+from __future__ import annotations
+
+"""Live series sums that follow a growing dataset.
+
+A follow session keeps a running sum over one threshold of an HDF5 stack (or
+a CBF/TIFF/EDF file series) and, on every refresh, reads only the frames that
+were appended since the previous one: new frames of a growing dataset, newly
+linked `data_NNNNNN` members of a master file, or new files of a series.
+The current sum is served as a frame so the viewer can display it while the
+collection is still running.
+
+If frames that were already summed change (a member disappears, a file is
+replaced, the stack shrinks) the session starts over from frame 0.
+"""
+
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+from fastapi import HTTPException
+
+DEFAULT_FOLLOW_INTERVAL_S = 2.0
+# Sessions nobody has looked at for this long stop on their own.
+FOLLOW_IDLE_TIMEOUT_S = 600.0
+_MAX_SESSIONS = 8
+# Upper bound for one block read from the source stack (rounded to whole chunks).
+_READ_BLOCK_BYTES = 64 * 1024 * 1024
+_ACTIVE_STATUSES = {"starting", "following"}
+
+
+@dataclass(frozen=True)
+class SeriesFollowDeps:
+    logger: Any
+    ensure_hdf5_stack: Callable[[], None]
+    get_h5py: Callable[[], Any]
+    resolve_image_file: Callable[[str], Path]
+    image_ext_name: Callable[[str], str]
+    resolve_series_files: Callable[[Path], tuple[list[Path], int]]
+    read_tiff: Callable[..., np.ndarray]
+    read_cbf: Callable[[Path], np.ndarray]
+    read_cbf_gz: Callable[[Path], np.ndarray]
+    read_edf: Callable[[Path], np.ndarray]
+    resolve_dataset_view: Callable[[Any, Path, str], tuple[dict[str, Any], list[Any]]]
+    extract_frames: Callable[[dict[str, Any], int, int, int], np.ndarray]
+    frame_chunk_depth: Callable[[dict[str, Any]], int]
+    find_pixel_mask: Callable[..., Any]
+
+
+def consumed_prefix_intact(previous: list[tuple[str, int]], current: list[tuple[str, int]]) -> bool:
+    """True when `current` still starts with the members summed so far.
+
+    Members are `(name, frames)`; the last summed member may have grown.
+    """
+    if len(current) < len(previous):
+        return False
+    for idx, (name, frames) in enumerate(previous):
+        cur_name, cur_frames = current[idx]
+        if cur_name != name:
+            return False
+        if cur_frames != frames and (idx != len(previous) - 1 or cur_frames < frames):
+            return False
+    return True
+
+
+class _FollowSession:
+    def __init__(self, config: dict[str, Any]) -> None:
+        self.config = config
+        self.status: dict[str, Any] = {
+            "id": config["id"],
+            "file": config["file"],
+            "dataset": config["dataset"],
+            "threshold": config["threshold"],
+            "operation": config["operation"],
+            "status": "starting",
+            "message": "Starting…",
+            "frames_summed": 0,
+            "restarts": 0,
+            "revision": 0,
+            "error": None,
+            "updated_at": time.time(),
+        }
+        self.acc: np.ndarray | None = None
+        self.mask: np.ndarray | None = None
+        self.members: list[tuple[str, int]] = []
+        self.wake = threading.Event()
+        self.stop = threading.Event()
+        self.last_access = time.monotonic()
+
+
+class SeriesFollowService:
+    """Run follow sessions in background threads, one per followed dataset."""
+
+    def __init__(self, deps: SeriesFollowDeps) -> None:
+        self._deps = deps
+        self._sessions: dict[str, _FollowSession] = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._listeners: dict[str, set[Callable[[], None]]] = {}
+
+    def start(
+        self,
+        *,
+        file: str,
+        dataset: str = "",
+        threshold: int = 0,
+        operation: str = "sum",
+        apply_mask: bool = True,
+        interval_s: float | None = None,
+    ) -> dict[str, Any]:
+        source_path = self._deps.resolve_image_file(file)
+        is_h5 = self._deps.image_ext_name(source_path.name) in {".h5", ".hdf5"}
+        if is_h5 and not dataset:
+            raise HTTPException(status_code=400, detail="Missing dataset")
+        operation = str(operation or "sum").strip().lower()
+        if operation not in {"sum", "mean"}:
+            raise HTTPException(status_code=400, detail="Follow mode supports sum and mean only")
+        config = {
+            "id": uuid.uuid4().hex,
+            "file": str(source_path),
+            "dataset": dataset if is_h5 else "",
+            "is_h5": is_h5,
+            "threshold": max(0, int(threshold)),
+            "operation": operation,
+            "apply_mask": bool(apply_mask),
+            "interval_s": max(0.1, float(interval_s or DEFAULT_FOLLOW_INTERVAL_S)),
+        }
+        session = _FollowSession(config)
+        with self._lock:
+            for other in self._sessions.values():
+                same_source = all(
+                    other.config[name] == config[name]
+                    for name in ("file", "dataset", "threshold", "operation", "apply_mask")
+                )
+                if same_source and other.status["status"] in _ACTIVE_STATUSES:
+                    other.last_access = time.monotonic()
+                    other.wake.set()
+                    return dict(other.status)
+            self._prune_locked()
+            self._sessions[config["id"]] = session
+        threading.Thread(
+            target=self._run_session, args=(session,), name="albis-follow", daemon=True
+        ).start()
+        return dict(session.status)
+
+    def get_status(self, session_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            session.last_access = time.monotonic()
+            return dict(session.status)
+
+    def refresh(self, session_id: str) -> dict[str, Any] | None:
+        """Pick up new frames now instead of at the next interval."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            session.last_access = time.monotonic()
+            session.wake.set()
+            return dict(session.status)
+
+    def stop(self, session_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            session.stop.set()
+            session.wake.set()
+            return dict(session.status)
+
+    def wait_update(
+        self, session_id: str, after_revision: int, timeout_s: float
+    ) -> dict[str, Any] | None:
+        """Block until the session revision exceeds `after_revision` or the timeout passes."""
+        deadline = time.monotonic() + max(0.0, timeout_s)
+        with self._changed:
+            while True:
+                session = self._sessions.get(session_id)
+                if session is None:
+                    return None
+                session.last_access = time.monotonic()
+                remaining = deadline - time.monotonic()
+                if int(session.status["revision"]) > after_revision or remaining <= 0:
+                    return dict(session.status)
+                self._changed.wait(remaining)
+
+    def subscribe(self, session_id: str, callback: Callable[[], None]) -> Callable[[], None]:
+        """Call `callback` (from the session thread) whenever the session changes.
+
+        Returns the function that removes the subscription.
+        """
+        with self._lock:
+            self._listeners.setdefault(session_id, set()).add(callback)
+
+        def _unsubscribe() -> None:
+            with self._lock:
+                callbacks = self._listeners.get(session_id)
+                if callbacks is not None:
+                    callbacks.discard(callback)
+                    if not callbacks:
+                        del self._listeners[session_id]
+
+        return _unsubscribe
+
+    def frame(self, session_id: str) -> tuple[np.ndarray, dict[str, Any]] | None:
+        """Return a copy of the current sum (or mean) and the session status."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            session.last_access = time.monotonic()
+            if session.acc is None:
+                return None
+            frames = int(session.status["frames_summed"])
+            if session.config["operation"] == "mean":
+                out = session.acc / float(max(1, frames))
+            else:
+                out = session.acc.copy()
+            return out, dict(session.status)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            sessions = list(self._sessions.values())
+        for session in sessions:
+            session.stop.set()
+            session.wake.set()
+
+    def _prune_locked(self) -> None:
+        finished = [
+            key
+            for key, session in self._sessions.items()
+            if session.status["status"] not in _ACTIVE_STATUSES
+        ]
+        while len(self._sessions) >= _MAX_SESSIONS and finished:
+            self._sessions.pop(finished.pop(0), None)
+        if len(self._sessions) >= _MAX_SESSIONS:
+            raise HTTPException(status_code=429, detail="Too many follow sessions")
+
+    def _publish(self, session: _FollowSession, **changes: Any) -> None:
+        with self._changed:
+            session.status.update(changes)
+            session.status["revision"] = int(session.status["revision"]) + 1
+            session.status["updated_at"] = time.time()
+            self._notify_locked(session)
+
+    def _notify_locked(self, session: _FollowSession) -> None:
+        self._changed.notify_all()
+        for callback in list(self._listeners.get(session.config["id"], ())):
+            callback()
+
+    def _run_session(self, session: _FollowSession) -> None:
+        config = session.config
+        try:
+            while not session.stop.is_set():
+                if time.monotonic() - session.last_access > FOLLOW_IDLE_TIMEOUT_S:
+                    self._publish(session, status="stopped", message="Stopped (idle)")
+                    return
+                before = int(session.status["frames_summed"])
+                if config["is_h5"]:
+                    self._refresh_h5(session)
+                else:
+                    self._refresh_files(session)
+                summed = int(session.status["frames_summed"])
+                if summed != before or session.status["status"] == "starting":
+                    self._publish(
+                        session,
+                        status="following",
+                        message=f"Following: {summed} frame(s)",
+                        last_frame_at=time.time() if summed != before else None,
+                    )
+                session.wake.wait(config["interval_s"])
+                session.wake.clear()
+            self._publish(session, status="stopped", message="Stopped")
+        except Exception as exc:
+            self._deps.logger.exception("Series follow failed: %s", exc)
+            detail = exc.detail if isinstance(exc, HTTPException) else str(exc)
+            self._publish(session, status="error", message=f"Failed: {detail}", error=str(detail))
+
+    def _restart(self, session: _FollowSession) -> None:
+        with self._changed:
+            session.acc = None
+            session.members = []
+            session.status["frames_summed"] = 0
+            session.status["restarts"] = int(session.status["restarts"]) + 1
+            session.status["revision"] = int(session.status["revision"]) + 1
+            self._notify_locked(session)
+
+    def _add(
+        self,
+        session: _FollowSession,
+        block_sum: np.ndarray,
+        frames: int,
+        members: list[tuple[str, int]],
+    ) -> None:
+        # Published per block so a long backlog shows up while it is being read.
+        with self._changed:
+            if session.acc is None:
+                session.acc = np.zeros(block_sum.shape, dtype=block_sum.dtype)
+            session.acc += block_sum
+            if session.mask is not None:
+                session.acc[session.mask] = 0
+            session.members = members
+            session.status["frames_summed"] = int(session.status["frames_summed"]) + frames
+            session.status["revision"] = int(session.status["revision"]) + 1
+            self._notify_locked(session)
+
+    def _refresh_h5(self, session: _FollowSession) -> None:
+        config = session.config
+        source_path = Path(config["file"])
+        thr = int(config["threshold"])
+        self._deps.ensure_hdf5_stack()
+        h5py = self._deps.get_h5py()
+        # Reopened on every refresh so appended frames and new links become visible.
+        try:
+            h5 = h5py.File(source_path, "r")
+        except OSError:
+            return  # locked or not fully written yet; retried on the next refresh
+        with h5:
+            try:
+                view, extra_files = self._deps.resolve_dataset_view(
+                    h5, source_path, config["dataset"]
+                )
+            except KeyError:
+                return  # the first data member may not exist yet
+            try:
+                shape = tuple(int(x) for x in view["shape"])
+                ndim = int(view["ndim"])
+                if ndim not in (3, 4):
+                    raise HTTPException(
+                        status_code=400, detail="Follow mode requires 3D or 4D image stacks"
+                    )
+                if ndim == 4 and thr >= shape[1]:
+                    raise HTTPException(status_code=416, detail="Threshold index out of range")
+                if view["kind"] == "linked_stack":
+                    members = [(str(seg["path"]), int(seg["frames"])) for seg in view["segments"]]
+                else:
+                    members = [(str(view["path"]), int(shape[0]))]
+                if not consumed_prefix_intact(session.members, members):
+                    self._restart(session)
+                if session.mask is None and config["apply_mask"]:
+                    mask_dset = self._deps.find_pixel_mask(h5, threshold=thr if ndim == 4 else None)
+                    if mask_dset is not None:
+                        mask = np.asarray(mask_dset) != 0
+                        session.mask = mask if mask.any() else None
+
+                source_dtype = np.dtype(view["dtype"])
+                acc_dtype = (
+                    np.dtype(np.int64) if source_dtype.kind in "biu" else np.dtype(np.float64)
+                )
+                frame_bytes = max(1, shape[-2] * shape[-1] * source_dtype.itemsize)
+                depth = max(1, int(self._deps.frame_chunk_depth(view)))
+                block = depth * max(1, (_READ_BLOCK_BYTES // frame_bytes) // depth)
+                cursor = int(session.status["frames_summed"])
+                frame_count = int(shape[0])
+                while cursor < frame_count and not session.stop.is_set():
+                    block_end = min(frame_count, (cursor // block + 1) * block)
+                    frames = self._deps.extract_frames(view, cursor, block_end, thr)
+                    self._add(
+                        session,
+                        frames.sum(axis=0, dtype=acc_dtype),
+                        block_end - cursor,
+                        _members_upto(members, block_end),
+                    )
+                    cursor = block_end
+            finally:
+                for handle in extra_files:
+                    try:
+                        handle.close()
+                    except Exception:
+                        pass
+
+    def _refresh_files(self, session: _FollowSession) -> None:
+        config = session.config
+        files, _ = self._deps.resolve_series_files(Path(config["file"]))
+        members = [(str(path), 1) for path in files]
+        if not consumed_prefix_intact(session.members, members):
+            self._restart(session)
+        for idx in range(int(session.status["frames_summed"]), len(files)):
+            if session.stop.is_set():
+                return
+            try:
+                frame = np.asarray(self._read_image(files[idx]))
+            except Exception:
+                # Most likely still being written; retried on the next refresh.
+                return
+            acc_dtype = np.dtype(np.int64) if frame.dtype.kind in "biu" else np.dtype(np.float64)
+            if config["apply_mask"] and frame.dtype.kind in "if":
+                gaps = frame < 0
+                if gaps.any():
+                    with self._lock:
+                        session.mask = gaps if session.mask is None else (session.mask | gaps)
+            self._add(session, frame.astype(acc_dtype), 1, members[: idx + 1])
+
+    def _read_image(self, path: Path) -> np.ndarray:
+        ext_name = self._deps.image_ext_name(path.name)
+        if ext_name in {".tif", ".tiff"}:
+            return self._deps.read_tiff(path, index=0)
+        if ext_name == ".cbf":
+            return self._deps.read_cbf(path)
+        if ext_name == ".cbf.gz":
+            return self._deps.read_cbf_gz(path)
+        if ext_name == ".edf":
+            return self._deps.read_edf(path)
+        raise HTTPException(status_code=400, detail="Unsupported image format")
+
+
+def _members_upto(members: list[tuple[str, int]], frame_count: int) -> list[tuple[str, int]]:
+    """The members covering frames [0, frame_count), the last one possibly partial."""
+    out: list[tuple[str, int]] = []
+    remaining = frame_count
+    for name, frames in members:
+        if remaining <= 0:
+            break
+        out.append((name, min(frames, remaining)))
+        remaining -= frames
+    return out
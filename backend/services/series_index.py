@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+"""Prefix-sum checkpoint index for fast range sums over HDF5 stacks.
+
+The index stores cumulative sums `P[k] = sum(frames[0 : k * M])` every `M`
+frames per threshold in a sidecar HDF5 file next to the source. A range sum
+over frames [a, b] is `P(b + 1) - P(a)`, where each prefix comes from the
+nearest checkpoint plus at most `M / 2` frame reads.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+from fastapi import HTTPException
+
+from .hdf5_stack import linked_view_files
+
+DEFAULT_CHECKPOINT_INTERVAL = 100
+SIDECAR_SUFFIX = ".albis-index"
+
+# Upper bound for one block read from the source stack (rounded to whole chunks).
+_READ_BLOCK_BYTES = 64 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class SeriesIndexDeps:
+    data_dir: Path
+    logger: Any
+    ensure_hdf5_stack: Callable[[], None]
+    get_h5py: Callable[[], Any]
+    resolve_image_file: Callable[[str], Path]
+    resolve_dataset_view: Callable[[Any, Path, str], tuple[dict[str, Any], list[Any]]]
+    extract_frames: Callable[[dict[str, Any], int, int, int], np.ndarray]
+    frame_chunk_depth: Callable[[dict[str, Any]], int]
+
+
+def source_signature(path: Path, linked: list[Path] | tuple[Path, ...] = ()) -> tuple[int, ...]:
+    """Size and mtime of the source and of every linked data file (-1, -1 if missing)."""
+    signature: list[int] = []
+    for item in (path, *linked):
+        try:
+            stat = Path(item).stat()
+        except OSError:
+            signature.extend((-1, -1))
+            continue
+        signature.extend((int(stat.st_size), int(stat.st_mtime_ns)))
+    return tuple(signature)
+
+
+def prefix_plan(x: int, interval: int, checkpoints: int) -> tuple[int, int, int]:
+    """Return (checkpoint, read_start, read_stop) for the cheapest way to get P(x).
+
+    `P(x) = P[checkpoint] + frames[read_start:read_stop]` when the checkpoint
+    lies at or before `x`, and `P[checkpoint] - frames[read_start:read_stop]`
+    when it lies after `x`.
+    """
+    lower = min(x // interval, checkpoints - 1)
+    lower_reads = x - lower * interval
+    upper = lower + 1
+    if upper < checkpoints and upper * interval - x < lower_reads:
+        return upper, x, upper * interval
+    return lower, lower * interval, x
+
+
+class SeriesIndexService:
+    """Build and query prefix-sum indices in background threads."""
+
+    def __init__(
+        self, deps: SeriesIndexDeps, default_interval: int = DEFAULT_CHECKPOINT_INTERVAL
+    ) -> None:
+        self._deps = deps
+        self._default_interval = max(1, int(default_interval))
+        self._builds: dict[tuple[str, str], dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def sidecar_path(self, source_path: Path, dataset: str) -> Path:
+        """Return the index file for a dataset, preferring a directory next to the data."""
+        key = hashlib.sha1(dataset.encode("utf-8")).hexdigest()[:16]
+        # Dot-prefixed so the file browser keeps hiding it.
+        sidecar_dir = source_path.with_name(f".{source_path.name}{SIDECAR_SUFFIX}")
+        if not os.access(source_path.parent, os.W_OK) and not sidecar_dir.is_dir():
+            digest = hashlib.sha1(str(source_path.resolve()).encode("utf-8")).hexdigest()[:16]
+            sidecar_dir = self._deps.data_dir / ".albis_cache" / "series_index" / digest
+        return sidecar_dir / f"{key}.h5"
+
+    def start_build(
+        self, *, file: str, dataset: str, interval: int | None = None
+    ) -> dict[str, Any]:
+        source_path = self._deps.resolve_image_file(file)
+        if source_path.suffix.lower() not in {".h5", ".hdf5"}:
+            raise HTTPException(status_code=400, detail="Series index requires an HDF5 stack")
+        interval = max(1, int(interval or self._default_interval))
+        key = (str(source_path), dataset)
+        with self._lock:
+            current = self._builds.get(key)
+            if current and current.get("status") in {"queued", "running"}:
+                return dict(current)
+            build = {
+                "file": str(source_path),
+                "dataset": dataset,
+                "status": "queued",
+                "progress": 0.0,
+                "message": "Queued",
+                "interval": interval,
+                "error": None,
+                "updated_at": time.time(),
+            }
+            self._builds[key] = build
+        worker = threading.Thread(
+            target=self._run_build,
+            kwargs={
+                "key": key,
+                "source_path": source_path,
+                "dataset": dataset,
+                "interval": interval,
+            },
+            daemon=True,
+        )
+        worker.start()
+        return dict(build)
+
+    def get_status(self, *, file: str, dataset: str) -> dict[str, Any]:
+        source_path = self._deps.resolve_image_file(file)
+        with self._lock:
+            build = self._builds.get((str(source_path), dataset))
+            if build and build.get("status") in {"queued", "running", "error"}:
+                return dict(build)
+        index_path = self.sidecar_path(source_path, dataset)
+        if not index_path.exists():
+            return {"file": str(source_path), "dataset": dataset, "status": "missing"}
+        self._deps.ensure_hdf5_stack()
+        h5py = self._deps.get_h5py()
+        with h5py.File(index_path, "r") as index_h5:
+            attrs = dict(index_h5["prefix"].attrs)
+        linked = [Path(item) for item in json.loads(attrs.get("linked_files", "[]"))]
+        stale = tuple(int(v) for v in attrs.get("source_signature", (0, 0))) != source_signature(
+            source_path, linked
+        )
+        return {
+            "file": str(source_path),
+            "dataset": dataset,
+            "status": "stale" if stale else "ready",
+            "interval": int(attrs.get("interval", 0)),
+            "frame_count": int(attrs.get("frame_count", 0)),
+            "threshold_count": int(attrs.get("threshold_count", 1)),
+            "path": str(index_path),
+        }
+
+    def _update_build(self, key: tuple[str, str], **changes: Any) -> None:
+        with self._lock:
+            build = self._builds.get(key)
+            if not build:
+                return
+            build.update(changes)
+            build["updated_at"] = time.time()
+
+    def _run_build(
+        self, key: tuple[str, str], source_path: Path, dataset: str, interval: int
+    ) -> None:
+        index_path = self.sidecar_path(source_path, dataset)
+        tmp_path = index_path.with_name(index_path.name + ".tmp")
+        try:
+            self._update_build(key, status="running", message="Indexing…", progress=0.0)
+            self._deps.ensure_hdf5_stack()
+            h5py = self._deps.get_h5py()
+            index_path.parent.mkdir(parents=True, exist_ok=True)
+            with h5py.File(source_path, "r") as h5:
+                view, extra_files = self._deps.resolve_dataset_view(h5, source_path, dataset)
+                try:
+                    # Rewriting an externally linked data file leaves the master untouched.
+                    linked = linked_view_files(source_path, extra_files)
+                    signature = source_signature(source_path, linked)
+                    shape = tuple(int(x) for x in view["shape"])
+                    ndim = int(view["ndim"])
+                    if ndim not in (3, 4):
+                        raise HTTPException(
+                            status_code=400, detail="Series index requires 3D or 4D image stacks"
+                        )
+                    frame_count = shape[0]
+                    threshold_count = shape[1] if ndim == 4 else 1
+                    image_shape = (shape[-2], shape[-1])
+                    source_dtype = np.dtype(view["dtype"])
+                    acc_dtype = (
+                        np.dtype(np.int64) if source_dtype.kind in "biu" else np.dtype(np.float64)
+                    )
+                    checkpoints = frame_count // interval + 1
+                    acc = np.zeros((threshold_count,) + image_shape, dtype=acc_dtype)
+
+                    depth = max(1, int(self._deps.frame_chunk_depth(view)))
+                    frame_bytes = max(1, image_shape[0] * image_shape[1] * source_dtype.itemsize)
+                    block = depth * max(1, (_READ_BLOCK_BYTES // frame_bytes) // depth)
+
+                    with h5py.File(tmp_path, "w") as index_h5:
+                        prefix = index_h5.create_dataset(
+                            "prefix",
+                            shape=(checkpoints, threshold_count) + image_shape,
+                            dtype=acc_dtype,
+                            chunks=(1, 1) + image_shape,
+                            compression="gzip",
+                            compression_opts=1,
+                            shuffle=True,
+                            fillvalue=0,
+                        )
+                        cursor = 0
+                        while cursor < frame_count:
+                            # Stop blocks at checkpoints so each one is stored exactly.
+                            block_end = min(
+                                frame_count,
+                                (cursor // block + 1) * block,
+                                (cursor // interval + 1) * interval,
+                            )
+                            for thr in range(threshold_count):
+                                frames = self._deps.extract_frames(view, cursor, block_end, thr)
+                                acc[thr] += frames.sum(axis=0, dtype=acc_dtype)
+                            cursor = block_end
+                            if cursor % interval == 0:
+                                prefix[cursor // interval] = acc
+                            self._update_build(
+                                key,
+                                progress=cursor / max(1, frame_count),
+                                message=f"Indexed frame {cursor}/{frame_count}",
+                            )
+                        prefix.attrs["interval"] = int(interval)
+                        prefix.attrs["frame_count"] = int(frame_count)
+                        prefix.attrs["threshold_count"] = int(threshold_count)
+                        prefix.attrs["source_file"] = str(source_path)
+                        prefix.attrs["source_dataset"] = dataset
+                        prefix.attrs["source_signature"] = np.asarray(signature, dtype=np.int64)
+                        prefix.attrs["linked_files"] = json.dumps([str(f) for f in linked])
+                finally:
+                    for handle in extra_files:
+                        try:
+                            handle.close()
+                        except Exception:
+                            pass
+            os.replace(tmp_path, index_path)
+            self._update_build(key, status="done", progress=1.0, message="Index ready")
+        except Exception as exc:
+            tmp_path.unlink(missing_ok=True)
+            self._deps.logger.exception("Series index build failed: %s", exc)
+            detail = exc.detail if isinstance(exc, HTTPException) else str(exc)
+            self._update_build(
+                key, status="error", progress=1.0, message=f"Failed: {detail}", error=str(detail)
+            )
+
+    def range_sum(
+        self, *, file: str, dataset: str, start: int, end: int, threshold: int = 0
+    ) -> tuple[np.ndarray, int]:
+        """Sum frames [start, end] (0-based, inclusive); return (sum, frames read).
+
+        Without a usable index, ranges of at most one checkpoint interval are
+        summed directly; longer ranges require `start_build` first.
+        """
+        source_path = self._deps.resolve_image_file(file)
+        self._deps.ensure_hdf5_stack()
+        h5py = self._deps.get_h5py()
+        index_path = self.sidecar_path(source_path, dataset)
+        with h5py.File(source_path, "r") as h5:
+            try:
+                view, extra_files = self._deps.resolve_dataset_view(h5, source_path, dataset)
+            except KeyError as exc:
+                raise HTTPException(status_code=404, detail="Dataset not found") from exc
+            try:
+                shape = tuple(int(x) for x in view["shape"])
+                frame_count = shape[0]
+                if start < 0 or end >= frame_count or start > end:
+                    raise HTTPException(status_code=416, detail="Frame range out of bounds")
+                acc_dtype = (
+                    np.dtype(np.int64)
+                    if np.dtype(view["dtype"]).kind in "biu"
+                    else np.dtype(np.float64)
+                )
+
+                def _sum(lo: int, hi: int) -> np.ndarray:
+                    if lo >= hi:
+                        return np.zeros(shape[-2:], dtype=acc_dtype)
+                    frames = self._deps.extract_frames(view, lo, hi, threshold)
+                    return frames.sum(axis=0, dtype=acc_dtype)
+
+                direct_reads = end + 1 - start
+                index_h5 = None
+                if index_path.exists():
+                    index_h5 = h5py.File(index_path, "r")
+                try:
+                    if index_h5 is None:
+                        if direct_reads > self._default_interval:
+                            raise HTTPException(status_code=409, detail="Series index not built")
+                        return _sum(start, end + 1), direct_reads
+                    prefix = index_h5["prefix"]
+                    signature = tuple(int(v) for v in prefix.attrs["source_signature"])
+                    if (
+                        signature
+                        != source_signature(
+                            source_path, linked_view_files(source_path, extra_files)
+                        )
+                        or int(prefix.attrs["frame_count"]) != frame_count
+                    ):
+                        raise HTTPException(status_code=409, detail="Series index is stale")
+                    interval = int(prefix.attrs["interval"])
+                    checkpoints = int(prefix.shape[0])
+                    if threshold >= int(prefix.shape[1]):
+                        raise HTTPException(status_code=416, detail="Threshold index out of range")
+                    plans = [prefix_plan(x, interval, checkpoints) for x in (start, end + 1)]
+                    index_reads = sum(stop - lo for _, lo, stop in plans)
+                    if direct_reads <= index_reads:
+                        return _sum(start, end + 1), direct_reads
+
+                    def _prefix(x: int, plan: tuple[int, int, int]) -> np.ndarray:
+                        checkpoint, lo, hi = plan
+                        base = np.asarray(prefix[checkpoint, threshold], dtype=acc_dtype)
+                        if checkpoint * interval <= x:
+                            return base + _sum(lo, hi)
+                        return base - _sum(lo, hi)
+
+                    total = _prefix(end + 1, plans[1]) - _prefix(start, plans[0])
+                    return total, index_reads
+                finally:
+                    if index_h5 is not None:
+                        index_h5.close()
+            finally:
+                for handle in extra_files:
+                    try:
+                        handle.close()
+                    except Exception:
+                        pass
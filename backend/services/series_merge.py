@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+"""Reassemble sharded series outputs into one result file.
+
+Shard outputs are regular series HDF5 files tagged with `shard_index`,
+`shard_count`, `shard_kind` and `shard_operations` root attributes:
+
+- `"groups"` shards hold a contiguous slice of the output groups; merging
+  concatenates them (compressed chunks are copied without re-encoding);
+- `"frames"` shards hold partial statistics of a single group over a block of
+  frames; merging combines them (sums add, variances use the pairwise
+  update of Chan et al., min/max are element-wise).
+"""
+
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from .series_output import codec_dataset_kwargs
+
+_GROUP_INDEX_DATASETS = ("sum_start_frame", "sum_end_frame", "sum_frame_count")
+
+
+def _attr_str(value: Any) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+
+def _check_shards(handles: list[Any], inputs: list[Path]) -> list[Any]:
+    """Validate that `handles` form one complete shard set; return them in shard order."""
+    for handle, path in zip(handles, inputs):
+        if "shard_index" not in handle.attrs:
+            raise ValueError(f"{path} is not a series shard output")
+    ordered = sorted(handles, key=lambda h: int(h.attrs["shard_index"]))
+    first = ordered[0]
+    count = int(first.attrs["shard_count"])
+    if [int(h.attrs["shard_index"]) for h in ordered] != list(range(1, count + 1)):
+        found = ", ".join(str(int(h.attrs["shard_index"])) for h in ordered)
+        raise ValueError(f"Expected shards 1..{count}, got {found}")
+    for key in (
+        "shard_count",
+        "shard_kind",
+        "shard_operations",
+        "operations",
+        "source_file",
+        "source_dataset",
+        "series_mode",
+        "threshold_count",
+    ):
+        values = {_attr_str(h.attrs.get(key, "")) for h in ordered}
+        if len(values) > 1:
+            raise ValueError(f"Shards disagree on {key}: {sorted(values)}")
+    return ordered
+
+
+def _op_dataset(handle: Any, shard_ops: list[str], op: str) -> Any:
+    return handle["/entry/data"]["data" if shard_ops.index(op) == 0 else op]
+
+
+def _copy_frames(srcs: list[Any], dst: Any) -> None:
+    """Concatenate `srcs` along axis 0, moving compressed chunks verbatim when possible."""
+    pos = 0
+    for src in srcs:
+        raw = src.chunks == dst.chunks and src.attrs.get("compression") == dst.attrs.get(
+            "compression"
+        )
+        inner = [()] if src.ndim == 3 else [(t,) for t in range(int(src.shape[1]))]
+        for idx in range(int(src.shape[0])):
+            for thr in inner:
+                if raw:
+                    try:
+                        mask, chunk = src.id.read_direct_chunk((idx, *thr, 0, 0))
+                        dst.id.write_direct_chunk((pos + idx, *thr, 0, 0), chunk, mask)
+                        continue
+                    except Exception:
+                        raw = False
+                dst[(pos + idx, *thr)] = src[(idx, *thr)]
+        pos += int(src.shape[0])
+
+
+def _combine_frames(
+    shards: list[Any], shard_ops: list[str], requested: list[str]
+) -> dict[str, np.ndarray]:
+    counts = [float(h["/entry/data/sum_frame_count"][0]) for h in shards]
+    total = sum(counts)
+    values = {
+        op: [np.asarray(_op_dataset(h, shard_ops, op)[()], dtype=np.float64) for h in shards]
+        for op in shard_ops
+    }
+    merged: dict[str, np.ndarray] = {}
+    for op in requested:
+        if op == "sum":
+            merged[op] = np.sum(values["sum"], axis=0)
+        elif op == "mean":
+            merged[op] = np.sum(values["sum"], axis=0) / total
+        elif op == "min":
+            merged[op] = np.minimum.reduce(values["min"])
+        elif op == "max":
+            merged[op] = np.maximum.reduce(values["max"])
+        elif op in {"var", "std"}:
+            mean = sum(n * m for n, m in zip(counts, values["mean"])) / total
+            m2 = sum(
+                n * v + n * (m - mean) ** 2
+                for n, m, v in zip(counts, values["mean"], values["var"])
+            )
+            merged[op] = m2 / total if op == "var" else np.sqrt(m2 / total)
+        else:
+            raise ValueError(f"Cannot combine {op} across frame shards")
+
+    # Masked pixels carry the flag value in every statistic; keep them flagged.
+    flag = _op_dataset(shards[0], shard_ops, requested[0]).attrs.get("mask_flag_value")
+    if flag is not None and np.isfinite(flag):
+        flagged = np.zeros(merged[requested[0]].shape, dtype=bool)
+        for arrays in values.values():
+            for arr in arrays:
+                flagged |= arr == flag
+        for arr in merged.values():
+            arr[flagged] = flag
+    return merged
+
+
+def _merge_pixel_masks(shards: list[Any], out: Any) -> None:
+    """OR the pixel masks of all shards (file series discover bad pixels while reading)."""
+    if "/entry/instrument" not in out:
+        return
+    paths: list[str] = []
+    out["/entry/instrument"].visititems(
+        lambda name, obj: (
+            paths.append(f"/entry/instrument/{name}")
+            if name.endswith("pixel_mask") and hasattr(obj, "shape")
+            else None
+        )
+    )
+    for path in paths:
+        merged = np.asarray(out[path][()])
+        for shard in shards[1:]:
+            if path in shard:
+                merged = merged | np.asarray(shard[path][()], dtype=merged.dtype)
+        out[path][...] = merged
+
+
+def merge_series_shards(
+    h5py: Any, inputs: list[Path], output: Path, *, overwrite: bool = False
+) -> dict[str, Any]:
+    """Merge a complete set of shard outputs into `output`; return a short summary."""
+    if not inputs:
+        raise ValueError("No shard files given")
+    output = Path(output)
+    if output.exists() and not overwrite:
+        raise ValueError(f"{output} already exists")
+    handles = [h5py.File(path, "r") for path in inputs]
+    created = False
+    try:
+        shards = _check_shards(handles, list(inputs))
+        first = shards[0]
+        kind = _attr_str(first.attrs["shard_kind"])
+        shard_ops = _attr_str(first.attrs["operations"]).split(",")
+        requested = _attr_str(first.attrs["shard_operations"]).split(",")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with h5py.File(output, "w") as out:
+            created = True
+            for key, value in first.attrs.items():
+                if not key.startswith("shard_"):
+                    out.attrs[key] = value
+            out.attrs["operation"] = requested[0]
+            out.attrs["operations"] = ",".join(requested)
+            out.attrs["merged_shards"] = len(shards)
+            for name in first:
+                if name != "entry":
+                    first.copy(first[name], out, name)
+            entry = out.create_group("entry")
+            entry.attrs.update(dict(first["entry"].attrs))
+            for name in first["entry"]:
+                if name != "data":
+                    first.copy(first["entry"][name], entry, name)
+            data_group = entry.create_group("data")
+            data_group.attrs.update(dict(first["/entry/data"].attrs))
+
+            if kind == "groups":
+                index = {
+                    name: np.concatenate([h[f"/entry/data/{name}"][()] for h in shards])
+                    for name in _GROUP_INDEX_DATASETS
+                }
+            else:
+                index = {
+                    "sum_start_frame": np.asarray(
+                        [min(int(h["/entry/data/sum_start_frame"][0]) for h in shards)]
+                    ),
+                    "sum_end_frame": np.asarray(
+                        [max(int(h["/entry/data/sum_end_frame"][0]) for h in shards)]
+                    ),
+                    "sum_frame_count": np.asarray(
+                        [sum(int(h["/entry/data/sum_frame_count"][0]) for h in shards)]
+                    ),
+                }
+                merged = _combine_frames(shards, shard_ops, requested)
+            group_count = int(index["sum_start_frame"].shape[0])
+
+            for op_idx, op in enumerate(requested):
+                template = _op_dataset(first, shard_ops, op)
+                compression = _attr_str(template.attrs.get("compression", "gzip"))
+                dset = data_group.create_dataset(
+                    "data" if op_idx == 0 else op,
+                    shape=(group_count, *template.shape[1:]),
+                    dtype=template.dtype,
+                    chunks=template.chunks,
+                    **codec_dataset_kwargs(compression),
+                )
+                dset.attrs.update(dict(template.attrs))
+                dset.attrs["frame_count_out"] = group_count
+                if kind == "groups":
+                    _copy_frames([_op_dataset(h, shard_ops, op) for h in shards], dset)
+                else:
+                    dset[...] = merged[op]
+            for name, values in index.items():
+                data_group.create_dataset(name, data=values.astype(np.int64))
+            _merge_pixel_masks(shards, out)
+    except BaseException:
+        if created:
+            output.unlink(missing_ok=True)
+        raise
+    finally:
+        for handle in handles:
+            handle.close()
+    return {"output": str(output), "shards": len(shards), "kind": kind, "groups": group_count}
@@ -31,11 +31,14 @@ def iter_sum_groups(
     step: int,
     range_start_1: int | None,
     range_end_1: int | None,
+    stride: int = 1,
 ) -> list[dict[str, Any]]:
     if frame_count <= 0:
         raise HTTPException(status_code=400, detail="No frames available")
 
     mode = (mode or "chunks").lower()
+    if mode == "step":
+        mode = "chunks"
     size = max(1, int(step))
 
     groups: list[dict[str, Any]] = []
@@ -90,4 +93,204 @@ def iter_sum_groups(
             cursor = chunk_end + 1
         return groups
 
+    if mode == "rolling":
+        # Windows of `step` frames advancing by `stride`; indices are ranges because
+        # stride-1 windows over long stacks would otherwise hold millions of ints.
+        start_1 = int(range_start_1 or 1)
+        end_1 = int(range_end_1 or frame_count)
+        first = max(0, start_1 - 1)
+        last = min(frame_count - 1, end_1 - 1)
+        if first > last:
+            raise HTTPException(status_code=400, detail="Range start must be <= range end")
+        if size > last - first + 1:
+            raise HTTPException(status_code=400, detail="Rolling window exceeds frame range")
+        stride = max(1, int(stride))
+        for window_idx, cursor in enumerate(range(first, last - size + 2, stride)):
+            end = cursor + size - 1
+            groups.append(
+                {
+                    "indices": range(cursor, end + 1),
+                    "start": cursor,
+                    "end": end,
+                    "count": size,
+                    "window": window_idx,
+                }
+            )
+        return groups
+
     raise HTTPException(status_code=400, detail="Invalid series summing mode")
+
+
+def shard_groups(
+    groups: list[dict[str, Any]], mode: str, index: int, count: int
+) -> tuple[list[dict[str, Any]], str]:
+    """Return the part of `groups` that shard `index` of `count` (1-based) reduces.
+
+    Modes with several output groups are split by group (`"groups"` shards
+    write a slice of the final output); a single group is split into contiguous
+    frame blocks (`"frames"` shards write partial statistics that are combined
+    on merge).
+    """
+    count = int(count)
+    index = int(index)
+    if count < 1 or not 1 <= index <= count:
+        raise HTTPException(status_code=400, detail="Shard must be i/n with 1 <= i <= n")
+    if len(groups) == 1 and (mode or "").lower() != "rolling":
+        blocks = np.array_split(np.asarray(groups[0]["indices"], dtype=np.int64), count)
+        part = [int(idx) for idx in blocks[index - 1]]
+        if not part:
+            raise HTTPException(status_code=400, detail="Shard has no frames")
+        return [{"indices": part, "start": part[0], "end": part[-1], "count": len(part)}], "frames"
+    first = (index - 1) * len(groups) // count
+    last = index * len(groups) // count
+    if first >= last:
+        raise HTTPException(status_code=400, detail="Shard has no groups")
+    return groups[first:last], "groups"
+
+
+def frame_shard_operations(operations: list[str]) -> list[str]:
+    """Statistics a frame shard must write so `operations` can be combined on merge."""
+    if "median" in operations:
+        raise HTTPException(status_code=400, detail="Median cannot be combined across frame shards")
+    extra: list[str] = []
+    if {"sum", "mean"} & set(operations):
+        extra.append("sum")
+    if {"std", "var"} & set(operations):
+        extra += ["mean", "var"]
+    return list(operations) + [op for op in extra if op not in operations]
+
+
+SERIES_OPERATIONS = ("sum", "mean", "median", "std", "var", "min", "max")
+
+
+def normalize_operations(value: Any, default: str = "sum") -> list[str]:
+    """Parse an operation list (list or comma-separated string), preserving order."""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        items: list[Any] = [default]
+    elif isinstance(value, str):
+        items = value.split(",")
+    elif isinstance(value, (list, tuple)):
+        items = list(value)
+    else:
+        raise HTTPException(status_code=400, detail="Invalid operation")
+    operations: list[str] = []
+    for item in items:
+        name = str(item).strip().lower()
+        if not name:
+            continue
+        if name not in SERIES_OPERATIONS:
+            raise HTTPException(status_code=400, detail=f"Invalid operation: {name}")
+        if name not in operations:
+            operations.append(name)
+    if not operations:
+        raise HTTPException(status_code=400, detail="Invalid operation")
+    return operations
+
+
+class GroupReducer:
+    """Accumulate several statistics over one group of frames in a single pass.
+
+    Sum/mean share one accumulator, variance and std use Welford's streaming
+    update, min/max are running projections, and median keeps the frames.
+    Variance is the population variance (ddof=0).
+    """
+
+    def __init__(self, operations: list[str]) -> None:
+        self.operations = list(operations)
+        ops = set(self.operations)
+        self._track_sum = bool(ops & {"sum", "mean"})
+        self._track_moments = bool(ops & {"std", "var"})
+        self._track_min = "min" in ops
+        self._track_max = "max" in ops
+        self._stack: list[np.ndarray] | None = [] if "median" in ops else None
+        self.count = 0
+        self._sum: np.ndarray | None = None
+        self._mean: np.ndarray | None = None
+        self._m2: np.ndarray | None = None
+        self._delta: np.ndarray | None = None
+        self._scratch: np.ndarray | None = None
+        self._min: np.ndarray | None = None
+        self._max: np.ndarray | None = None
+
+    def add(self, arr: np.ndarray) -> None:
+        arr = np.asarray(arr, dtype=np.float64)
+        self.count += 1
+        if self._stack is not None:
+            self._stack.append(np.array(arr, dtype=np.float64))
+        if self.count == 1:
+            if self._track_sum:
+                self._sum = np.array(arr, dtype=np.float64)
+            if self._track_moments:
+                self._mean = np.array(arr, dtype=np.float64)
+                self._m2 = np.zeros_like(self._mean)
+                self._delta = np.empty_like(self._mean)
+                self._scratch = np.empty_like(self._mean)
+            if self._track_min:
+                self._min = np.array(arr, dtype=np.float64)
+            if self._track_max:
+                self._max = np.array(arr, dtype=np.float64)
+            return
+        if self._sum is not None:
+            self._sum += arr
+        if self._mean is not None:
+            np.subtract(arr, self._mean, out=self._delta)
+            np.multiply(self._delta, 1.0 / self.count, out=self._scratch)
+            self._mean += self._scratch
+            np.subtract(arr, self._mean, out=self._scratch)
+            self._scratch *= self._delta
+            self._m2 += self._scratch
+        if self._min is not None:
+            np.minimum(self._min, arr, out=self._min)
+        if self._max is not None:
+            np.maximum(self._max, arr, out=self._max)
+
+    def state_arrays(self) -> dict[str, np.ndarray]:
+        """Return the accumulator arrays needed to continue this reduction later."""
+        arrays: dict[str, np.ndarray] = {}
+        for name in ("sum", "mean", "m2", "min", "max"):
+            value = getattr(self, f"_{name}")
+            if value is not None:
+                arrays[name] = value
+        if self._stack:
+            arrays["stack"] = np.stack(self._stack, axis=0)
+        return arrays
+
+    @classmethod
+    def from_state(
+        cls, operations: list[str], count: int, arrays: dict[str, np.ndarray]
+    ) -> "GroupReducer":
+        """Rebuild a reducer from `count` and `state_arrays()` output."""
+        reducer = cls(operations)
+        reducer.count = int(count)
+        if reducer.count <= 0:
+            return reducer
+        for name in ("sum", "mean", "m2", "min", "max"):
+            if name in arrays:
+                setattr(reducer, f"_{name}", np.array(arrays[name], dtype=np.float64))
+        if reducer._mean is not None:
+            reducer._delta = np.empty_like(reducer._mean)
+            reducer._scratch = np.empty_like(reducer._mean)
+        if reducer._stack is not None and "stack" in arrays:
+            reducer._stack = [np.array(frame, dtype=np.float64) for frame in arrays["stack"]]
+        return reducer
+
+    def results(self) -> dict[str, np.ndarray]:
+        if self.count <= 0:
+            return {}
+        out: dict[str, np.ndarray] = {}
+        for op in self.operations:
+            if op == "sum":
+                out[op] = self._sum
+            elif op == "mean":
+                out[op] = self._sum / float(self.count)
+            elif op == "var":
+                out[op] = self._m2 / float(self.count)
+            elif op == "std":
+                out[op] = np.sqrt(self._m2 / float(self.count))
+            elif op == "min":
+                out[op] = self._min
+            elif op == "max":
+                out[op] = self._max
+            elif op == "median" and self._stack:
+                out[op] = np.median(np.stack(self._stack, axis=0), axis=0)
+        return out
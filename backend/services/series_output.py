@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+"""HDF5 output codecs and chunk writing for series jobs.
+
+Output chunks are encoded in a thread pool and committed with
+`write_direct_chunk`, so compression runs in parallel while the HDF5 library
+only sees cheap raw writes. Codecs without a Python-side encoder fall back to
+the regular HDF5 filter pipeline.
+"""
+
+import os
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+import numpy as np
+from fastapi import HTTPException
+
+OUTPUT_CODECS = ("bitshuffle-lz4", "zstd", "gzip", "none")
+
+_CODEC_ALIASES = {
+    "bitshuffle-lz4": "bitshuffle-lz4",
+    "bitshuffle": "bitshuffle-lz4",
+    "bslz4": "bitshuffle-lz4",
+    "zstd": "zstd",
+    "gzip": "gzip",
+    "deflate": "gzip",
+    "none": "none",
+    "": "none",
+}
+
+_GZIP_LEVEL = 4
+_ZSTD_LEVEL = 3
+# Same target block size as the bitshuffle HDF5 filter (BSHUF_TARGET_BLOCK_SIZE_B).
+_BSHUF_TARGET_BLOCK_BYTES = 8192
+
+# Lazy-loaded optional encoders
+_lz4_block = None
+_zstandard = None
+
+
+def normalize_output_codec(value: str | None) -> str:
+    key = str(value if value is not None else "gzip").strip().lower()
+    codec = _CODEC_ALIASES.get(key)
+    if codec is None:
+        raise HTTPException(status_code=400, detail="Invalid compression")
+    return codec
+
+
+def codec_dataset_kwargs(codec: str) -> dict[str, Any]:
+    """Return `create_dataset` filter arguments for an output codec."""
+    if codec == "gzip":
+        return {"compression": "gzip", "compression_opts": _GZIP_LEVEL, "shuffle": True}
+    if codec == "none":
+        return {}
+    import hdf5plugin  # type: ignore[import-not-found]
+
+    if codec == "bitshuffle-lz4":
+        return dict(hdf5plugin.Bitshuffle(cname="lz4"))
+    if codec == "zstd":
+        return dict(hdf5plugin.Zstd(clevel=_ZSTD_LEVEL))
+    raise HTTPException(status_code=400, detail="Invalid compression")
+
+
+def _ensure_lz4() -> bool:
+    global _lz4_block
+    if _lz4_block is None:
+        try:
+            import lz4.block as lz4_block_module  # type: ignore[import-not-found]
+        except ImportError:
+            return False
+        _lz4_block = lz4_block_module
+    return True
+
+
+def _ensure_zstandard() -> bool:
+    global _zstandard
+    if _zstandard is None:
+        try:
+            import zstandard as zstandard_module  # type: ignore[import-not-found]
+        except ImportError:
+            return False
+        _zstandard = zstandard_module
+    return True
+
+
+def _encode_gzip(arr: np.ndarray) -> bytes:
+    # HDF5 applies shuffle before deflate: group byte k of every element together.
+    flat = np.ascontiguousarray(arr).reshape(-1)
+    itemsize = flat.dtype.itemsize
+    shuffled = flat.view(np.uint8).reshape(-1, itemsize).T.tobytes()
+    return zlib.compress(shuffled, _GZIP_LEVEL)
+
+
+def _encode_none(arr: np.ndarray) -> bytes:
+    return np.ascontiguousarray(arr).tobytes()
+
+
+def _encode_zstd(arr: np.ndarray) -> bytes:
+    compressor = _zstandard.ZstdCompressor(level=_ZSTD_LEVEL)
+    return compressor.compress(np.ascontiguousarray(arr).tobytes())
+
+
+def _bitshuffle(block: np.ndarray) -> bytes:
+    count = int(block.shape[0])
+    itemsize = block.dtype.itemsize
+    bits = np.unpackbits(
+        block.view(np.uint8).reshape(count, itemsize), axis=1, bitorder="little"
+    ).reshape(count, itemsize, 8)
+    return np.packbits(bits.transpose(1, 2, 0), axis=2, bitorder="little").tobytes()
+
+
+def _encode_bitshuffle_lz4(arr: np.ndarray) -> bytes:
+    """Encode one chunk in the bitshuffle HDF5 filter layout (LZ4 blocks)."""
+    flat = np.ascontiguousarray(arr).reshape(-1)
+    itemsize = flat.dtype.itemsize
+    block_size = max(8, (_BSHUF_TARGET_BLOCK_BYTES // itemsize) // 8 * 8)
+    parts = [struct.pack(">QI", flat.nbytes, block_size * itemsize)]
+    total = int(flat.size)
+    pos = 0
+    while total - pos >= 8:
+        count = min(block_size, (total - pos) // 8 * 8)
+        packed = _lz4_block.compress(_bitshuffle(flat[pos : pos + count]), store_size=False)
+        parts.append(struct.pack(">I", len(packed)))
+        parts.append(packed)
+        pos += count
+    # Trailing elements that do not fill a group of 8 are stored verbatim.
+    parts.append(flat[pos:].tobytes())
+    return b"".join(parts)
+
+
+def chunk_encoder(codec: str) -> Callable[[np.ndarray], bytes] | None:
+    """Return a thread-safe chunk encoder, or None if only HDF5 can encode the codec."""
+    if codec == "gzip":
+        return _encode_gzip
+    if codec == "none":
+        return _encode_none
+    if codec == "zstd" and _ensure_zstandard():
+        return _encode_zstd
+    if codec == "bitshuffle-lz4" and _ensure_lz4():
+        return _encode_bitshuffle_lz4
+    return None
+
+
+class ChunkWriter:
+    """Write whole-chunk frames to datasets, compressing them in parallel.
+
+    `write()` expects one array per dataset chunk (chunks span the trailing
+    image axes and are 1 along every leading axis). All target datasets must
+    use the writer's codec. Encoded chunks are committed in submission order;
+    at most `max_pending` chunks are buffered.
+    """
+
+    def __init__(
+        self,
+        codec: str,
+        *,
+        workers: int | None = None,
+        max_pending: int | None = None,
+    ) -> None:
+        self._encode = chunk_encoder(codec)
+        self._pool: ThreadPoolExecutor | None = None
+        self._pending: deque[tuple[Any, tuple[int, ...], Future[bytes]]] = deque()
+        if self._encode is not None:
+            count = max(1, int(workers or os.cpu_count() or 1))
+            self._pool = ThreadPoolExecutor(max_workers=count, thread_name_prefix="albis-h5-enc")
+            self._max_pending = max(1, int(max_pending or count * 2))
+
+    @property
+    def parallel(self) -> bool:
+        return self._pool is not None
+
+    def write(self, dset: Any, index: tuple[int, ...], arr: np.ndarray) -> None:
+        if len(index) != len(dset.shape) - 2:
+            raise ValueError("Chunk index does not match dataset rank")
+        data = np.ascontiguousarray(arr, dtype=np.dtype(dset.dtype))
+        if self._pool is None:
+            dset[tuple(index) + (slice(None), slice(None))] = data
+            return
+        offset = tuple(int(i) for i in index) + (0, 0)
+        self._pending.append((dset, offset, self._pool.submit(self._encode, data)))
+        while len(self._pending) > self._max_pending:
+            self._commit_one()
+
+    def flush(self) -> None:
+        while self._pending:
+            self._commit_one()
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+                self._pool = None
+
+    def _commit_one(self) -> None:
+        dset, offset, future = self._pending.popleft()
+        dset.id.write_direct_chunk(offset, future.result(), 0)
+
+    def __enter__(self) -> "ChunkWriter":
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.close()
@@ -2,16 +2,45 @@ from __future__ import annotations
 
 """Background series operations service."""
 
+import functools
 import threading
 import time
 import uuid
+from collections import deque
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Callable
+from typing import Any, Callable, Iterator
 
 import numpy as np
 from fastapi import HTTPException
 
+from .frame_prefetch import FramePrefetcher, decode_worker_count
+from .hdf5_stack import linked_view_files
+from .job_scheduler import JobCancelled, JobScheduler
+from .process_runner import ProcessJobRunner, WorkerFailed
+from .result_cache import ResultCache, link_or_copy
+from .series_checkpoint import SeriesCheckpointStore
+from .series_corrections import (
+    FrameCorrector,
+    gain_from_reference,
+    normalize_flat_mode,
+    reference_frame,
+)
+from .series_ops import (
+    GroupReducer,
+    frame_shard_operations,
+    normalize_operations,
+    shard_groups,
+)
+from .series_output import ChunkWriter, codec_dataset_kwargs, normalize_output_codec
+
+# Upper bound for one block read from an HDF5 stack (rounded to whole source chunks).
+_READ_BLOCK_BYTES = 64 * 1024 * 1024
+# Minimum interval between published progress updates (and cancellation checks).
+_PROGRESS_INTERVAL_S = 0.25
+# Bumped whenever the output layout changes so stale cache entries stop matching.
+_RESULT_CACHE_VERSION = 1
+
 
 @dataclass(frozen=True)
 class SeriesSummingDeps:
@@ -29,22 +58,49 @@ class SeriesSummingDeps:
     read_cbf_gz: Callable[[Path], np.ndarray]
     read_edf: Callable[[Path], np.ndarray]
     write_tiff: Callable[[Path, np.ndarray], None]
-    iter_sum_groups: Callable[[int, str, int, int | None, int | None], list[dict[str, Any]]]
+    iter_sum_groups: Callable[..., list[dict[str, Any]]]
     mask_flag_value: Callable[[np.dtype], float]
     mask_slices: Callable[[np.ndarray], tuple[np.ndarray, np.ndarray, np.ndarray]]
     resolve_dataset_view: Callable[[Any, Path, str], tuple[dict[str, Any], list[Any]]]
     extract_frame: Callable[[dict[str, Any], int, int], np.ndarray]
+    extract_frames: Callable[[dict[str, Any], int, int, int], np.ndarray]
+    frame_chunk_depth: Callable[[dict[str, Any]], int]
     find_pixel_mask: Callable[[Any, int | None], Any | None]
+    get_job_workers: Callable[[], int] = lambda: 2
+    # Process isolation: `worker_target` is the picklable child entry point
+    # (see series_worker.run_series_job); without it jobs run on threads.
+    get_job_isolation: Callable[[], str] = lambda: "thread"
+    get_job_max_rss_mb: Callable[[], int] = lambda: 0
+    worker_target: Callable[..., None] | None = None
+    # Seconds between checkpoints of running jobs; 0 disables resumable jobs.
+    get_checkpoint_interval_s: Callable[[], float] = lambda: 0.0
+    # Size budget of the finished-result cache in MB; 0 disables it.
+    get_result_cache_mb: Callable[[], int] = lambda: 0
+    # Threads decoding file-series frames ahead of the reduction; 0 = one per core.
+    get_decode_workers: Callable[[], int] = lambda: 0
+
+
+_FINISHED_STATUSES = {"done", "error", "cancelled"}
+_ACTIVE_STATUSES = {"queued", "running"}
 
 
 class SeriesSummingService:
-    """Threaded job manager for long-running series operations."""
+    """Job manager for long-running series operations on a bounded worker pool."""
 
     def __init__(self, deps: SeriesSummingDeps, max_finished_jobs: int = 200) -> None:
         self._deps = deps
         self._jobs: dict[str, dict[str, Any]] = {}
         self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._listeners: dict[str, set[Callable[[], None]]] = {}
         self._max_finished_jobs = max(10, int(max_finished_jobs))
+        self._scheduler = JobScheduler(deps.get_job_workers, thread_name_prefix="albis-series")
+        self._runner: ProcessJobRunner | None = None
+        self._checkpoints = SeriesCheckpointStore(deps.data_dir / ".albis_cache" / "series_jobs")
+        self._results = ResultCache(
+            deps.data_dir / ".albis_cache" / "series_results",
+            lambda: max(0, int(deps.get_result_cache_mb())) * 1024 * 1024,
+        )
 
     def start_job(
         self,
@@ -60,66 +116,408 @@ class SeriesSummingService:
         output_path: str | None,
         output_format: str,
         apply_mask: bool,
+        compression: str = "gzip",
+        operations: list[str] | None = None,
+        stride: int = 1,
+        priority: int = 0,
+        shard: tuple[int, int] | None = None,
+        dark_file: str = "",
+        dark_dataset: str = "",
+        flat_file: str = "",
+        flat_dataset: str = "",
+        flat_mode: str = "flat",
     ) -> str:
+        """Queue a series job; `shard=(i, n)` reduces only part i of n (see `shard_groups`).
+
+        `dark_file` / `flat_file` enable dark subtraction and flat-field (or gain
+        map, `flat_mode="gain"`) correction ahead of the reduction.
+        """
+        compression = normalize_output_codec(compression)
+        flat_mode = normalize_flat_mode(flat_mode)
+        corrections = {
+            "dark_file": str(dark_file or ""),
+            "dark_dataset": str(dark_dataset or ""),
+            "flat_file": str(flat_file or ""),
+            "flat_dataset": str(flat_dataset or ""),
+            "flat_mode": flat_mode,
+        }
+        operations = normalize_operations(operations if operations else operation)
+        operation = operations[0]
+        stride = max(1, int(stride))
+        if mode.lower() == "rolling" and any(op not in {"sum", "mean"} for op in operations):
+            raise HTTPException(status_code=400, detail="Rolling windows support sum and mean only")
+        if shard is not None:
+            shard = (int(shard[0]), int(shard[1]))
+            if shard[1] < 1 or not 1 <= shard[0] <= shard[1]:
+                raise HTTPException(status_code=400, detail="Shard must be i/n with 1 <= i <= n")
         job_id = uuid.uuid4().hex
+        config = {
+            "file": file,
+            "dataset": dataset,
+            "mode": mode,
+            "step": step,
+            "operation": operation,
+            "operations": list(operations),
+            "normalize_frame": normalize_frame,
+            "range_start": range_start,
+            "range_end": range_end,
+            "format": output_format,
+            "apply_mask": apply_mask,
+            "output_path": output_path,
+            "compression": compression,
+            "stride": stride,
+            "shard": list(shard) if shard else None,
+            **corrections,
+        }
+        job_kwargs = {
+            "file": file,
+            "dataset": dataset,
+            "mode": mode,
+            "step": step,
+            "operation": operation,
+            "normalize_frame": normalize_frame,
+            "range_start": range_start,
+            "range_end": range_end,
+            "output_path": str(output_path or ""),
+            "output_format": output_format,
+            "apply_mask": apply_mask,
+            "compression": compression,
+            "operations": list(operations),
+            "stride": stride,
+            "shard": list(shard) if shard else None,
+            **corrections,
+        }
+        created_at = time.time()
+        if float(self._deps.get_checkpoint_interval_s()) > 0:
+            try:
+                self._checkpoints.create(
+                    job_id,
+                    {
+                        "created_at": created_at,
+                        "priority": int(priority),
+                        "config": config,
+                        "job": job_kwargs,
+                    },
+                )
+            except OSError as exc:
+                # An unwritable data directory only costs resumability, not the job.
+                self._deps.logger.warning("Series job %s runs without checkpoints: %s", job_id, exc)
+                self._checkpoints.remove(job_id)
+        self._submit(job_id, job_kwargs, config, int(priority), created_at, resume=False)
+        return job_id
+
+    def list_resumable_jobs(self) -> list[dict[str, Any]]:
+        """Checkpointed jobs that are not queued or running in this process."""
+        with self._lock:
+            active = {
+                jid for jid, info in self._jobs.items() if info.get("status") in _ACTIVE_STATUSES
+            }
+        return [entry for entry in self._checkpoints.list() if entry["id"] not in active]
+
+    def resume_job(self, job_id: str, priority: int | None = None) -> dict[str, Any] | None:
+        """Queue a checkpointed job again; it continues from its last checkpoint."""
+        try:
+            stored, _state, _arrays = self._checkpoints.load(job_id)
+        except (FileNotFoundError, ValueError):
+            return None
+        job = self.get_job(job_id)
+        if job and job.get("status") in _ACTIVE_STATUSES:
+            raise HTTPException(status_code=409, detail="Job is already queued or running")
+        job_priority = int(stored.get("priority", 0) if priority is None else priority)
+        self._submit(
+            job_id,
+            dict(stored["job"]),
+            dict(stored.get("config", {})),
+            job_priority,
+            float(stored.get("created_at") or time.time()),
+            resume=True,
+        )
+        return self.get_job(job_id)
+
+    def discard_job(self, job_id: str) -> bool:
+        """Delete a checkpoint and the partial outputs it refers to."""
+        try:
+            _stored, state, _arrays = self._checkpoints.load(job_id)
+        except (FileNotFoundError, ValueError):
+            return False
+        job = self.get_job(job_id)
+        if job and job.get("status") in _ACTIVE_STATUSES:
+            raise HTTPException(status_code=409, detail="Job is queued or running")
+        for path in ((state or {}).get("sink") or {}).get("outputs", []):
+            Path(path).unlink(missing_ok=True)
+        self._checkpoints.remove(job_id)
+        return True
+
+    def _result_key(self, source_path: Path, ext: str, params: dict[str, Any]) -> str:
+        """Hash the source signature and every parameter that shapes the outputs."""
+        is_h5 = ext in {".h5", ".hdf5"}
+        if is_h5:
+            # Rewriting an externally linked data file leaves the master untouched.
+            files = [source_path, *self._linked_files(source_path, str(params["dataset"]))]
+        else:
+            files, _ = self._deps.resolve_series_files(source_path)
+        source = []
+        for path in files:
+            stat = Path(path).stat()
+            source.append([str(path), int(stat.st_size), int(stat.st_mtime_ns)])
+        output_format = "hdf5" if str(params["output_format"]).lower() in {"hdf5", "h5"} else "tiff"
+        mode = str(params["mode"]).lower()
+        normalize_frame = params.get("normalize_frame")
+        references = {}
+        for label in ("dark", "flat"):
+            ref_file = str(params.get(f"{label}_file") or "")
+            if not ref_file:
+                continue
+            ref_path = self._deps.resolve_image_file(ref_file)
+            stat = ref_path.stat()
+            references[label] = [
+                str(ref_path),
+                int(stat.st_size),
+                int(stat.st_mtime_ns),
+                str(params.get(f"{label}_dataset") or ""),
+            ]
+        if "flat" in references:
+            references["flat_mode"] = str(params.get("flat_mode") or "flat")
+        return ResultCache.make_key(
+            {
+                "version": _RESULT_CACHE_VERSION,
+                "source": source,
+                "dataset": str(params["dataset"]) if is_h5 else "",
+                "mode": mode,
+                "step": max(1, int(params["step"])),
+                "stride": max(1, int(params.get("stride", 1))) if mode == "rolling" else 1,
+                "range_start": params.get("range_start"),
+                "range_end": params.get("range_end"),
+                "operations": list(params["operations"]),
+                "normalize_frame": int(normalize_frame) if normalize_frame is not None else None,
+                "apply_mask": bool(params["apply_mask"]),
+                "format": output_format,
+                "compression": str(params["compression"]) if output_format == "hdf5" else None,
+                "shard": list(params["shard"]) if params.get("shard") else None,
+                "references": references,
+            }
+        )
+
+    def _linked_files(self, source_path: Path, dataset: str) -> list[Path]:
+        """External files the dataset view of an HDF5 master reads from."""
+        self._deps.ensure_hdf5_stack()
+        h5py = self._deps.get_h5py()
+        with h5py.File(source_path, "r") as h5:
+            _view, extra_files = self._deps.resolve_dataset_view(h5, source_path, dataset)
+            try:
+                return linked_view_files(source_path, extra_files)
+            finally:
+                for handle in extra_files:
+                    try:
+                        handle.close()
+                    except Exception:
+                        pass
+
+    def _outputs_from_cache(self, job_kwargs: dict[str, Any]) -> list[str] | None:
+        """Materialize a cached result at the requested output path, or return None."""
+        if not self._results.enabled:
+            return None
+        try:
+            source_path = self._deps.resolve_image_file(job_kwargs["file"])
+            ext = self._deps.image_ext_name(source_path.name)
+            entry = self._results.lookup(self._result_key(source_path, ext, job_kwargs))
+            if entry is None:
+                return None
+            # Path errors are reported by the job itself, like on a cache miss.
+            base_target = self._resolve_output_base(job_kwargs["output_path"])
+        except Exception:
+            return None
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        outputs: list[str] = []
+        try:
+            for item in entry["files"]:
+                if entry.get("format") == "hdf5":
+                    target = self._h5_output_file(base_target, timestamp)
+                else:
+                    target = base_target.parent / (
+                        f"{self._tiff_base(base_target)}{item['tag']}_{timestamp}.tiff"
+                    )
+                target = self._next_available_path(target)
+                link_or_copy(item["path"], target)
+                outputs.append(str(target))
+        except (OSError, HTTPException) as exc:
+            self._deps.logger.warning("Could not reuse cached series result: %s", exc)
+            for path in outputs:
+                Path(path).unlink(missing_ok=True)
+            return None
+        return outputs
+
+    def _complete_from_cache(self, job_id: str, job_kwargs: dict[str, Any]) -> bool:
+        """Finish a queued job with a cached result; False means it has to run."""
+        outputs = self._outputs_from_cache(job_kwargs)
+        if outputs is None:
+            return False
+        self._checkpoints.remove(job_id)
+        self._update_job(
+            job_id,
+            status="done",
+            progress=1.0,
+            message=f"Completed from cache: wrote {len(outputs)} file(s)",
+            outputs=outputs,
+            eta_s=0.0,
+            cached=True,
+            done_at=time.time(),
+        )
+        return True
+
+    def _cache_outputs(
+        self,
+        key: str,
+        source_path: Path,
+        ext: str,
+        params: dict[str, Any],
+        outputs: list[str],
+        base_target: Path,
+        timestamp: str,
+    ) -> None:
+        """Add finished outputs to the result cache unless the source changed meanwhile."""
+        try:
+            if self._result_key(source_path, ext, params) != key:
+                return
+            output_format = (
+                "hdf5" if str(params["output_format"]).lower() in {"hdf5", "h5"} else "tiff"
+            )
+            tiff_base = self._tiff_base(base_target)
+            files = []
+            for output in outputs:
+                path = Path(output)
+                tag = ""
+                if output_format == "tiff":
+                    tag = path.name[len(tiff_base) :].rsplit(f"_{timestamp}", 1)[0]
+                files.append((path, {"tag": tag}))
+            self._results.store(
+                key,
+                files,
+                {"format": output_format, "source_file": str(source_path)},
+            )
+        except Exception as exc:
+            self._deps.logger.warning("Could not cache series result: %s", exc)
+
+    def _submit(
+        self,
+        job_id: str,
+        job_kwargs: dict[str, Any],
+        config: dict[str, Any],
+        priority: int,
+        created_at: float,
+        *,
+        resume: bool,
+    ) -> None:
         job_data = {
             "id": job_id,
             "status": "queued",
             "progress": 0.0,
             "message": "Queued",
-            "created_at": time.time(),
+            "created_at": created_at,
             "updated_at": time.time(),
             "outputs": [],
             "error": None,
-            "config": {
-                "file": file,
-                "dataset": dataset,
-                "mode": mode,
-                "step": step,
-                "operation": operation,
-                "normalize_frame": normalize_frame,
-                "range_start": range_start,
-                "range_end": range_end,
-                "format": output_format,
-                "apply_mask": apply_mask,
-                "output_path": output_path,
-            },
+            "priority": priority,
+            "cpu_time_s": 0.0,
+            "io_time_s": 0.0,
+            "revision": 0,
+            "resumed": resume,
+            "cached": False,
+            "config": config,
         }
         with self._lock:
+            previous = self._jobs.get(job_id)
+            if previous is not None:
+                job_data["revision"] = int(previous.get("revision", 0)) + 1
             self._jobs[job_id] = job_data
             self._trim_finished_jobs()
+            self._notify_locked(job_id)
 
-        worker = threading.Thread(
-            target=self._run_job,
-            kwargs={
-                "job_id": job_id,
-                "file": file,
-                "dataset": dataset,
-                "mode": mode,
-                "step": step,
-                "operation": operation,
-                "normalize_frame": normalize_frame,
-                "range_start": range_start,
-                "range_end": range_end,
-                "output_path": str(output_path or ""),
-                "output_format": output_format,
-                "apply_mask": apply_mask,
-            },
-            daemon=True,
-        )
-        worker.start()
-        return job_id
+        if self._deps.worker_target is not None and self._deps.get_job_isolation() == "process":
+            run = functools.partial(self._run_job_isolated, job_id, job_kwargs, resume)
+        else:
+            run = functools.partial(self._run_job, job_id, **job_kwargs, resume=resume)
+        if not resume:
+            run = functools.partial(self._run_or_reuse, job_id, job_kwargs, run)
+        self._scheduler.submit(job_id, run, priority=priority)
+
+    def _run_or_reuse(
+        self, job_id: str, job_kwargs: dict[str, Any], run: Callable[[], None]
+    ) -> None:
+        # The cache lookup stats sources and copies outputs, so it runs on the job thread.
+        if not self._complete_from_cache(job_id, job_kwargs):
+            run()
 
     def get_job(self, job_id: str) -> dict[str, Any] | None:
         with self._lock:
             job = self._jobs.get(job_id)
             if not job:
                 return None
-            return dict(job)
+            job = dict(job)
+        if job.get("status") == "queued":
+            job["queue_position"] = self._scheduler.queue_position(job_id)
+        return job
+
+    def wait_job_update(
+        self, job_id: str, after_revision: int, timeout_s: float
+    ) -> dict[str, Any] | None:
+        """Block until the job changes past `after_revision` or the timeout expires."""
+        deadline = time.monotonic() + max(0.0, float(timeout_s))
+        with self._changed:
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return None
+                remaining = deadline - time.monotonic()
+                if int(job.get("revision", 0)) > after_revision or remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+        return self.get_job(job_id)
+
+    def subscribe_job(self, job_id: str, callback: Callable[[], None]) -> Callable[[], None]:
+        """Call `callback` (from the updating thread) whenever the job changes.
+
+        Returns the function that removes the subscription.
+        """
+        with self._lock:
+            self._listeners.setdefault(job_id, set()).add(callback)
+
+        def _unsubscribe() -> None:
+            with self._lock:
+                callbacks = self._listeners.get(job_id)
+                if callbacks is not None:
+                    callbacks.discard(callback)
+                    if not callbacks:
+                        del self._listeners[job_id]
+
+        return _unsubscribe
+
+    def cancel_job(self, job_id: str) -> dict[str, Any] | None:
+        """Request cancellation; queued jobs stop at once, running ones at the next progress update."""
+        job = self.get_job(job_id)
+        if not job:
+            return None
+        if job.get("status") in _FINISHED_STATUSES:
+            raise HTTPException(status_code=409, detail="Job already finished")
+        state = self._scheduler.cancel(job_id)
+        if state == "queued":
+            self._update_job(job_id, status="cancelled", message="Cancelled", done_at=time.time())
+        elif state == "running":
+            self._update_job(job_id, message="Cancelling…", cancel_requested=True)
+        return self.get_job(job_id)
+
+    def wait_idle(self, timeout_s: float | None = None) -> bool:
+        """Block until every queued and running job has returned from its thread."""
+        return self._scheduler.wait_idle(timeout_s)
+
+    def shutdown(self) -> None:
+        """Stop idle worker processes (running jobs finish on their own)."""
+        if self._runner is not None:
+            self._runner.shutdown()
 
     def _trim_finished_jobs(self) -> None:
         done_jobs = [
-            jid for jid, info in self._jobs.items() if info.get("status") in {"done", "error"}
+            jid for jid, info in self._jobs.items() if info.get("status") in _FINISHED_STATUSES
         ]
         if len(done_jobs) <= self._max_finished_jobs:
             return
@@ -134,6 +532,86 @@ class SeriesSummingService:
                 return
             job.update(changes)
             job["updated_at"] = time.time()
+            job["revision"] = int(job.get("revision", 0)) + 1
+            self._notify_locked(job_id)
+
+    def _notify_locked(self, job_id: str) -> None:
+        self._changed.notify_all()
+        for callback in list(self._listeners.get(job_id, ())):
+            callback()
+
+    def _check_cancelled(self, job_id: str) -> None:
+        self._scheduler.check_cancelled(job_id)
+
+    def _output_opened(self, job_id: str, path: str) -> None:
+        """Called before a job writes an output file; process workers report it."""
+
+    def _process_runner(self) -> ProcessJobRunner:
+        with self._lock:
+            if self._runner is None:
+                self._runner = ProcessJobRunner(
+                    self._deps.worker_target,
+                    get_max_idle=self._deps.get_job_workers,
+                    get_max_rss_mb=self._deps.get_job_max_rss_mb,
+                    logger=self._deps.logger,
+                    name_prefix="albis-series-worker",
+                )
+            return self._runner
+
+    def _run_job_isolated(self, job_id: str, job_kwargs: dict[str, Any], resume: bool) -> None:
+        """Run `_run_job` in a worker process and mirror its status updates here."""
+        partial_outputs: list[str] = []
+
+        def _on_update(changes: dict[str, Any]) -> None:
+            if "partial_output" in changes:
+                partial_outputs.append(str(changes.pop("partial_output")))
+                if not changes:
+                    return
+            self._update_job(job_id, **changes)
+
+        try:
+            # Paths are resolved against the live config here; the worker trusts them.
+            resolved = {"file": str(self._deps.resolve_image_file(job_kwargs["file"]))}
+            for key in ("dark_file", "flat_file"):
+                if job_kwargs.get(key):
+                    resolved[key] = str(self._deps.resolve_image_file(job_kwargs[key]))
+            payload = {
+                "data_dir": str(self._deps.data_dir),
+                "allow_abs_paths": bool(self._deps.get_allow_abs_paths()),
+                "checkpoint_interval_s": float(self._deps.get_checkpoint_interval_s()),
+                "result_cache_mb": int(self._deps.get_result_cache_mb()),
+                "decode_workers": int(self._deps.get_decode_workers()),
+                "job": {**job_kwargs, **resolved, "resume": resume},
+            }
+            self._process_runner().run(
+                job_id,
+                payload,
+                on_update=_on_update,
+                is_cancelled=lambda: self._scheduler.is_cancelled(job_id),
+            )
+        except Exception as exc:
+            if not isinstance(exc, (HTTPException, WorkerFailed)):
+                self._deps.logger.exception("Series worker failed: %s", exc)
+            # A killed worker keeps its last checkpoint so the job can be resumed.
+            resumable = isinstance(exc, WorkerFailed) and self._checkpoints.exists(job_id)
+            if not resumable:
+                self._checkpoints.remove(job_id)
+                # The dead worker could not remove what it had started to write.
+                for path in partial_outputs:
+                    try:
+                        Path(path).unlink(missing_ok=True)
+                    except OSError:
+                        pass
+            detail = exc.detail if isinstance(exc, HTTPException) else str(exc)
+            self._update_job(
+                job_id,
+                status="error",
+                progress=1.0,
+                message=f"Failed: {detail}" + (" (resumable)" if resumable else ""),
+                error=str(detail),
+                resumable=resumable,
+                done_at=time.time(),
+            )
 
     def _resolve_output_base(self, output_path: str | None) -> Path:
         raw = (output_path or "").strip()
@@ -167,6 +645,16 @@ class SeriesSummingService:
                 return candidate
         raise HTTPException(status_code=500, detail="Unable to allocate output file name")
 
+    @staticmethod
+    def _h5_output_file(base_target: Path, timestamp: str) -> Path:
+        if base_target.suffix.lower() in {".h5", ".hdf5"}:
+            return base_target
+        return base_target.parent / f"{base_target.name}_{timestamp}.h5"
+
+    @staticmethod
+    def _tiff_base(base_target: Path) -> str:
+        return base_target.stem or base_target.name or "series_sum"
+
     def _copy_h5_metadata(self, src_h5: Any, dst_h5: Any, threshold_count: int) -> None:
         h5py = self._deps.get_h5py()
         for key, val in src_h5.attrs.items():
@@ -233,6 +721,181 @@ class SeriesSummingService:
             return self._deps.read_edf(path)
         raise HTTPException(status_code=400, detail="Unsupported image format")
 
+    def _load_reference(
+        self,
+        file: str,
+        dataset: str,
+        image_shape: tuple[int, int],
+        threshold_count: int,
+        label: str,
+    ) -> np.ndarray:
+        """Load a dark / flat reference as `(threshold_count, H, W)` float64 maps."""
+        path = self._deps.resolve_image_file(file)
+        if self._deps.image_ext_name(path.name) in {".h5", ".hdf5"}:
+            self._deps.ensure_hdf5_stack()
+            h5py = self._deps.get_h5py()
+            with h5py.File(path, "r") as h5:
+                if not dataset or dataset not in h5:
+                    raise HTTPException(status_code=400, detail=f"{label} dataset not found")
+                return reference_frame(h5[dataset], image_shape, threshold_count, label)
+        return reference_frame(self._read_non_h5_image(path), image_shape, threshold_count, label)
+
+    def _iter_h5_frames(
+        self,
+        view: dict[str, Any],
+        thr: int,
+        start: int,
+        stop: int,
+        correct: Callable[[np.ndarray], np.ndarray] | None = None,
+    ) -> Iterator[tuple[int, np.ndarray]]:
+        """Yield frames [start, stop) from block reads aligned to the source chunk grid.
+
+        `correct` maps each raw block to the float64 block that is yielded, so
+        per-pixel corrections run once per block instead of once per frame.
+        """
+        shape = tuple(int(x) for x in view["shape"])
+        itemsize = np.dtype(view["dtype"]).itemsize
+        if correct is not None:
+            itemsize = max(itemsize, np.dtype(np.float64).itemsize)
+        frame_bytes = max(1, shape[-2] * shape[-1] * itemsize)
+        depth = max(1, int(self._deps.frame_chunk_depth(view)))
+        block = depth * max(1, (_READ_BLOCK_BYTES // frame_bytes) // depth)
+        cursor = start
+        while cursor < stop:
+            block_end = min(stop, (cursor // block + 1) * block)
+            frames = self._deps.extract_frames(view, cursor, block_end, thr)
+            if correct is not None:
+                frames = correct(frames)
+            for offset in range(int(frames.shape[0])):
+                yield cursor + offset, frames[offset]
+            cursor = block_end
+
+    def _iter_file_frames(
+        self,
+        series_files: list[Path],
+        start: int,
+        stop: int,
+        prefetcher: FramePrefetcher | None = None,
+    ) -> Iterator[tuple[int, np.ndarray]]:
+        for frame_idx in range(start, stop):
+            if prefetcher is not None:
+                yield frame_idx, prefetcher.get(frame_idx)
+            else:
+                yield frame_idx, self._read_non_h5_image(series_files[frame_idx])
+
+    @staticmethod
+    def _reduce_groups(
+        *,
+        groups: list[dict[str, Any]],
+        operations: list[str],
+        rolling_window: int | None,
+        read_run: Callable[[int, int], Iterator[tuple[int, np.ndarray]]],
+        prepare: Callable[[np.ndarray], np.ndarray],
+        emit: Callable[[int, dict[str, Any], dict[str, np.ndarray]], None],
+        advance: Callable[[int], None],
+        resume: tuple[dict[str, Any], dict[str, np.ndarray]] | None = None,
+        checkpointer: _Checkpointer | None = None,
+    ) -> None:
+        """Reduce `groups`, optionally continuing from a checkpoint cursor.
+
+        The cursor names the group (and, for rolling windows, the run) in
+        progress and the next frame to read; the arrays hold the reducer or
+        running-window state at that point.
+        """
+        cursor, saved = resume if resume is not None else ({}, {})
+        first_group = int(cursor.get("group", 0))
+        next_frame = int(cursor.get("next_frame", 0))
+        if rolling_window is None:
+            for group_idx, group in enumerate(groups):
+                if group_idx < first_group:
+                    continue
+                resuming = bool(cursor) and group_idx == first_group
+                if resuming:
+                    reducer_state = {k[2:]: v for k, v in saved.items() if k.startswith("r_")}
+                    reducer = GroupReducer.from_state(operations, cursor["count"], reducer_state)
+                else:
+                    reducer = GroupReducer(operations)
+                for run_start, run_stop in _contiguous_runs(group["indices"]):
+                    if resuming:
+                        run_start = max(run_start, next_frame)
+                    for frame_idx, raw in read_run(run_start, run_stop):
+                        reducer.add(prepare(raw))
+                        advance(frame_idx)
+                        if checkpointer is not None and checkpointer.due():
+                            checkpointer.save(
+                                {
+                                    "group": group_idx,
+                                    "next_frame": frame_idx + 1,
+                                    "count": reducer.count,
+                                },
+                                {f"r_{k}": v for k, v in reducer.state_arrays().items()},
+                            )
+                results = reducer.results()
+                if results:
+                    emit(group_idx, group, results)
+            return
+
+        # Rolling windows: every frame is read once; the running sum gains the
+        # entering frame and loses the one that just left the window. The ring
+        # holds frames as read (source dtype) and `prepare` runs again on the
+        # way out, so a window costs its raw size rather than float64 copies.
+        window = int(rolling_window)
+        ring: deque[tuple[int, np.ndarray]] = deque()
+        group_idx = first_group
+        first_run = int(cursor.get("run", 0))
+        for run_idx, (run_start, run_stop) in enumerate(_window_runs(groups)):
+            if run_idx < first_run:
+                continue
+            ring.clear()
+            acc: np.ndarray | None = None
+            evicted = 0
+            if cursor and run_idx == first_run:
+                run_start = next_frame
+                evicted = int(cursor.get("evicted", 0))
+                if "acc" in saved:
+                    # Only the sum and the window's frame range are checkpointed;
+                    # the frames themselves are read again.
+                    acc = np.array(saved["acc"], dtype=np.float64)
+                    ring_idx = np.asarray(saved["ring_idx"], dtype=np.int64)
+                    if ring_idx.size:
+                        ring.extend(read_run(int(ring_idx[0]), int(ring_idx[-1]) + 1))
+            for frame_idx, raw in read_run(run_start, run_stop):
+                while ring and ring[0][0] <= frame_idx - window:
+                    acc -= prepare(ring.popleft()[1])
+                    evicted += 1
+                arr = prepare(raw)
+                if acc is None:
+                    acc = np.array(arr, dtype=np.float64)
+                else:
+                    acc += arr
+                ring.append((frame_idx, raw))
+                if evicted >= window:
+                    # Re-anchor once per window length so add/subtract rounding cannot drift.
+                    acc[...] = 0.0
+                    for _, frame in ring:
+                        acc += prepare(frame)
+                    evicted = 0
+                advance(frame_idx)
+                while group_idx < len(groups) and int(groups[group_idx]["end"]) == frame_idx:
+                    results: dict[str, np.ndarray] = {}
+                    for op_name in operations:
+                        results[op_name] = acc / float(window) if op_name == "mean" else acc.copy()
+                    emit(group_idx, groups[group_idx], results)
+                    group_idx += 1
+                if checkpointer is not None and checkpointer.due():
+                    checkpointer.save(
+                        {
+                            "run": run_idx,
+                            "group": group_idx,
+                            "next_frame": frame_idx + 1,
+                            "evicted": evicted,
+                        },
+                        {
+                            "acc": acc,
+                            "ring_idx": np.asarray([idx for idx, _ in ring], dtype=np.int64),
+                        },
+                    )
+
     def _run_job(
         self,
         job_id: str,
@@ -247,20 +910,285 @@ class SeriesSummingService:
         output_path: str | None,
         output_format: str,
         apply_mask: bool,
+        compression: str = "gzip",
+        operations: list[str] | None = None,
+        stride: int = 1,
+        shard: list[int] | None = None,
+        dark_file: str = "",
+        dark_dataset: str = "",
+        flat_file: str = "",
+        flat_dataset: str = "",
+        flat_mode: str = "flat",
+        resume: bool = False,
     ) -> None:
+        sink: _SeriesOutputSink | None = None
+        cpu_start = time.thread_time()
+        started_at = time.perf_counter()
+        io_time = 0.0
+        correct_time = 0.0
+        bytes_read = 0
+
+        def _times() -> dict[str, float]:
+            # CPU time of the job thread; output encoding in the ChunkWriter pool is not included.
+            return {
+                "cpu_time_s": round(time.thread_time() - cpu_start, 3),
+                "io_time_s": round(io_time, 3),
+            }
+
+        def _timed_frames(
+            frames: Iterator[tuple[int, np.ndarray]], itemsize: int | None = None
+        ) -> Iterator[tuple[int, np.ndarray]]:
+            # `itemsize` counts source bytes for frames that arrive already converted.
+            nonlocal io_time, bytes_read
+            while True:
+                started = time.perf_counter()
+                corrected_before = correct_time
+                item = next(frames, None)
+                io_time += time.perf_counter() - started - (correct_time - corrected_before)
+                if item is None:
+                    return
+                bytes_read += int(item[1].size * itemsize if itemsize else item[1].nbytes)
+                yield item
+
+        def _block_corrector(corrector: FrameCorrector) -> Callable[[np.ndarray], np.ndarray]:
+            def _correct(frames: np.ndarray) -> np.ndarray:
+                nonlocal correct_time
+                started = time.perf_counter()
+                out = corrector.apply_block(frames)
+                correct_time += time.perf_counter() - started
+                return out
+
+            return _correct
+
+        def _emit(
+            thr: int,
+            group_idx: int,
+            group: dict[str, Any],
+            results: dict[str, np.ndarray],
+            mask_bits: np.ndarray | None,
+        ) -> None:
+            nonlocal io_time
+            started = time.perf_counter()
+            sink.emit(thr, group_idx, group, results, mask_bits)
+            io_time += time.perf_counter() - started
+
         try:
+            checkpoint_interval = float(self._deps.get_checkpoint_interval_s())
+            checkpointing = checkpoint_interval > 0 and self._checkpoints.exists(job_id)
+            saved_state: dict[str, Any] | None = None
+            saved_arrays: dict[str, np.ndarray] = {}
+            if resume:
+                _, saved_state, saved_arrays = self._checkpoints.load(job_id)
             source_path = self._deps.resolve_image_file(file)
             ext = self._deps.image_ext_name(source_path.name)
             base_target = self._resolve_output_base(output_path)
-            timestamp = time.strftime("%Y%m%d_%H%M%S")
+            result_params = {
+                "dataset": dataset,
+                "mode": mode,
+                "step": step,
+                "stride": stride,
+                "range_start": range_start,
+                "range_end": range_end,
+                "operations": list(operations or [operation.lower()]),
+                "normalize_frame": normalize_frame,
+                "apply_mask": apply_mask,
+                "output_format": output_format,
+                "compression": compression,
+                "shard": shard,
+                "dark_file": dark_file,
+                "dark_dataset": dark_dataset,
+                "flat_file": flat_file,
+                "flat_dataset": flat_dataset,
+                "flat_mode": flat_mode,
+            }
+            cache_key: str | None = None
+            if self._results.enabled:
+                # Keyed before reading so a source modified mid-job is not cached.
+                cache_key = self._result_key(source_path, ext, result_params)
+            if saved_state is not None:
+                timestamp = str(saved_state["sink"]["timestamp"])
+            else:
+                timestamp = time.strftime("%Y%m%d_%H%M%S")
             output_format = output_format.lower()
+            if output_format not in {"hdf5", "h5", "tiff", "tif"}:
+                raise HTTPException(status_code=400, detail="Unsupported output format")
             mode = mode.lower()
-            operation = operation.lower()
+            operations = list(operations or [operation.lower()])
+            op_label = "/".join(op.capitalize() for op in operations)
             step = max(1, int(step))
+            stride = max(1, int(stride))
+            rolling_window = step if mode == "rolling" else None
             normalize_frame_idx = int(normalize_frame) - 1 if normalize_frame is not None else None
+            flat_mode = normalize_flat_mode(flat_mode)
+            references: dict[str, str] = {}
+            if dark_file:
+                references["dark"] = dark_file
+            if flat_file:
+                references["flat"] = flat_file
+
+            def _reference_maps(
+                image_shape: tuple[int, int], threshold_count: int
+            ) -> tuple[np.ndarray | None, np.ndarray | None]:
+                # Loaded once per job; per-threshold slices are views of these maps.
+                dark_map = (
+                    self._load_reference(
+                        dark_file, dark_dataset, image_shape, threshold_count, "Dark"
+                    )
+                    if dark_file
+                    else None
+                )
+                if dark_map is not None:
+                    dark_map = np.nan_to_num(dark_map, nan=0.0, posinf=0.0, neginf=0.0)
+                gain_map = (
+                    gain_from_reference(
+                        self._load_reference(
+                            flat_file, flat_dataset, image_shape, threshold_count, "Flat"
+                        ),
+                        flat_mode,
+                    )
+                    if flat_file
+                    else None
+                )
+                return dark_map, gain_map
 
             self._update_job(job_id, status="running", message="Preparing datasets…", progress=0.01)
 
+            signature: list[int] = []
+            requested_operations = list(operations)
+            shard_info: dict[str, Any] | None = None
+
+            def _plan(frame_count: int, threshold_count: int) -> tuple[list[dict[str, Any]], int]:
+                nonlocal shard_info
+                if normalize_frame_idx is not None and (
+                    normalize_frame_idx < 0 or normalize_frame_idx >= frame_count
+                ):
+                    raise HTTPException(status_code=400, detail="Normalize frame is out of range")
+                groups = self._deps.iter_sum_groups(
+                    frame_count, mode, step, range_start, range_end, stride
+                )
+                if not groups:
+                    raise HTTPException(status_code=400, detail="No frames available for summing")
+                if shard:
+                    groups, shard_kind = shard_groups(groups, mode, shard[0], shard[1])
+                    if shard_kind == "frames":
+                        if output_format not in {"hdf5", "h5"}:
+                            raise HTTPException(
+                                status_code=400, detail="Frame shards require HDF5 output"
+                            )
+                        operations[:] = frame_shard_operations(operations)
+                    shard_info = {
+                        "index": int(shard[0]),
+                        "count": int(shard[1]),
+                        "kind": shard_kind,
+                        "operations": requested_operations,
+                    }
+                if rolling_window is not None:
+                    frames_read = sum(stop - start for start, stop in _window_runs(groups))
+                else:
+                    frames_read = sum(int(group["count"]) for group in groups)
+                if checkpointing or saved_state is not None:
+                    stat = source_path.stat()
+                    signature[:] = [frame_count, int(stat.st_size), int(stat.st_mtime_ns)]
+                if saved_state is not None and list(saved_state.get("source", [])) != signature:
+                    raise HTTPException(
+                        status_code=409,
+                        detail="Source changed since the checkpoint; start the job again",
+                    )
+                return groups, max(1, frames_read * threshold_count)
+
+            def _open_sink(
+                groups: list[dict[str, Any]],
+                frame_count: int,
+                threshold_count: int,
+                image_shape: tuple[int, int],
+                flag_value: float,
+                metadata_source: Any | None,
+            ) -> _SeriesOutputSink:
+                return _SeriesOutputSink(
+                    self,
+                    output_format=output_format,
+                    base_target=base_target,
+                    timestamp=timestamp,
+                    source_path=source_path,
+                    dataset=dataset,
+                    mode=mode,
+                    step=step,
+                    stride=stride,
+                    operations=operations,
+                    groups=groups,
+                    frame_count=frame_count,
+                    threshold_count=threshold_count,
+                    image_shape=image_shape,
+                    flag_value=flag_value,
+                    apply_mask=apply_mask,
+                    normalize_frame=normalize_frame,
+                    range_start=range_start,
+                    range_end=range_end,
+                    compression=compression,
+                    metadata_source=metadata_source,
+                    shard=shard_info,
+                    references=references,
+                    flat_mode=flat_mode,
+                    resume_state=saved_state["sink"] if saved_state is not None else None,
+                    on_output=lambda path: self._output_opened(job_id, path),
+                )
+
+            processed = int(saved_state["processed"]) if saved_state is not None else 0
+            next_publish = 0.0
+
+            def _resume_for(thr: int) -> tuple[dict[str, Any], dict[str, np.ndarray]] | None:
+                if saved_state is None or int(saved_state["thr"]) != thr:
+                    return None
+                return dict(saved_state["cursor"]), saved_arrays
+
+            def _checkpointer(
+                thr: int, total_steps: int, extra: dict[str, np.ndarray] | None = None
+            ) -> _Checkpointer | None:
+                if not checkpointing:
+                    return None
+
+                def _save(cursor: dict[str, Any], arrays: dict[str, np.ndarray]) -> None:
+                    nonlocal io_time
+                    started = time.perf_counter()
+                    sink.flush()
+                    state = {
+                        "thr": thr,
+                        "cursor": cursor,
+                        "processed": processed,
+                        "progress": round(min(0.95, processed / total_steps), 4),
+                        "checkpointed_at": time.time(),
+                        "source": signature,
+                        "sink": sink.checkpoint_state(),
+                    }
+                    self._checkpoints.save_state(job_id, state, {**arrays, **(extra or {})})
+                    io_time += time.perf_counter() - started
+
+                return _Checkpointer(checkpoint_interval, _save)
+
+            def _advance(label: str, frame_idx: int, frame_count: int, total_steps: int) -> None:
+                # Called per frame: bookkeeping is published (and cancellation checked)
+                # at most every _PROGRESS_INTERVAL_S, never per frame.
+                nonlocal processed, next_publish
+                processed += 1
+                now = time.perf_counter()
+                if now < next_publish and processed < total_steps:
+                    return
+                next_publish = now + _PROGRESS_INTERVAL_S
+                self._check_cancelled(job_id)
+                elapsed = max(now - started_at, 1e-6)
+                frames_per_s = processed / elapsed
+                self._update_job(
+                    job_id,
+                    progress=min(0.95, processed / total_steps),
+                    message=f"{op_label} {label}frame {frame_idx + 1}/{frame_count}",
+                    frames_done=processed,
+                    frames_total=total_steps,
+                    frames_per_s=round(frames_per_s, 1),
+                    mb_per_s=round(bytes_read / elapsed / 1e6, 2),
+                    eta_s=round(max(0, total_steps - processed) / frames_per_s, 1),
+                    **_times(),
+                )
+
             if ext in {".h5", ".hdf5"}:
                 self._deps.ensure_hdf5_stack()
                 h5py = self._deps.get_h5py()
@@ -276,19 +1204,7 @@ class SeriesSummingService:
                             )
                         frame_count = int(shape[0])
                         threshold_count = int(shape[1]) if ndim == 4 else 1
-                        if normalize_frame_idx is not None and (
-                            normalize_frame_idx < 0 or normalize_frame_idx >= frame_count
-                        ):
-                            raise HTTPException(
-                                status_code=400, detail="Normalize frame is out of range"
-                            )
-                        groups = self._deps.iter_sum_groups(
-                            frame_count, mode, step, range_start, range_end
-                        )
-                        if not groups:
-                            raise HTTPException(
-                                status_code=400, detail="No frames available for summing"
-                            )
+                        groups, total_steps = _plan(frame_count, threshold_count)
 
                         source_dtype = np.dtype(view["dtype"])
                         flag_value = self._deps.mask_flag_value(source_dtype)
@@ -305,92 +1221,65 @@ class SeriesSummingService:
                                 continue
                             mask_bits_by_thr.append(np.asarray(mask_dset, dtype=np.uint32))
 
-                        total_input_frames = sum(int(group["count"]) for group in groups)
-                        total_steps = max(1, total_input_frames * threshold_count)
-                        processed = 0
-                        sums: list[
-                            tuple[int, int, int, int, int, np.ndarray, np.ndarray | None]
-                        ] = []
-
-                        for thr in range(threshold_count):
+                        dark_map, gain_map = _reference_maps(
+                            (int(shape[-2]), int(shape[-1])), threshold_count
+                        )
+                        sink = _open_sink(
+                            groups,
+                            frame_count,
+                            threshold_count,
+                            (int(shape[-2]), int(shape[-1])),
+                            flag_value,
+                            h5,
+                        )
+                        first_thr = int(saved_state["thr"]) if saved_state is not None else 0
+                        for thr in range(first_thr, threshold_count):
                             mask_bits = mask_bits_by_thr[thr]
                             _, _, any_mask = (
                                 self._deps.mask_slices(mask_bits)
                                 if mask_bits is not None
                                 else (None, None, None)
                             )
-                            norm_ref: np.ndarray | None = None
-                            norm_ref_valid: np.ndarray | None = None
-                            if normalize_frame_idx is not None:
-                                norm_ref = np.asarray(
-                                    self._deps.extract_frame(view, normalize_frame_idx, thr),
-                                    dtype=np.float64,
-                                )
-                                if any_mask is not None:
-                                    norm_ref = norm_ref.copy()
-                                    norm_ref[any_mask] = np.nan
-                                norm_ref_valid = np.isfinite(norm_ref) & (np.abs(norm_ref) > 1e-12)
-
-                            for chunk_idx, group in enumerate(groups):
-                                start_idx = int(group["start"])
-                                end_idx = int(group["end"])
-                                frame_indices = list(group["indices"])
-                                acc: np.ndarray | None = None
-                                median_stack: list[np.ndarray] | None = (
-                                    [] if operation == "median" else None
-                                )
-                                for frame_idx in frame_indices:
-                                    arr = self._deps.extract_frame(view, frame_idx, thr)
-                                    arr = np.asarray(arr, dtype=np.float64)
-                                    if norm_ref is not None and norm_ref_valid is not None:
-                                        arr = np.divide(
-                                            arr,
-                                            norm_ref,
-                                            out=np.zeros_like(arr, dtype=np.float64),
-                                            where=norm_ref_valid,
-                                        )
-                                    if any_mask is not None:
-                                        arr = arr.copy()
-                                        arr[any_mask] = 0.0
-                                    if operation == "median":
-                                        if median_stack is not None:
-                                            median_stack.append(arr)
-                                    else:
-                                        if acc is None:
-                                            acc = np.zeros_like(arr, dtype=np.float64)
-                                        acc += arr
-                                    processed += 1
-                                    progress = min(0.95, processed / total_steps)
-                                    self._update_job(
-                                        job_id,
-                                        progress=progress,
-                                        message=(
-                                            f"{operation.capitalize()} threshold {thr + 1}/{threshold_count}, "
-                                            f"frame {frame_idx + 1}/{frame_count}"
-                                        ),
-                                    )
-                                if operation == "median":
-                                    if not median_stack:
-                                        continue
-                                    reduced = np.median(np.stack(median_stack, axis=0), axis=0)
-                                else:
-                                    if acc is None:
-                                        continue
-                                    if operation == "mean":
-                                        reduced = acc / float(max(1, len(frame_indices)))
-                                    else:
-                                        reduced = acc
-                                sums.append(
-                                    (
-                                        thr,
-                                        chunk_idx,
-                                        start_idx,
-                                        end_idx,
-                                        len(frame_indices),
-                                        reduced,
-                                        mask_bits,
-                                    )
-                                )
+                            corrector = FrameCorrector(
+                                dark=dark_map[thr] if dark_map is not None else None,
+                                gain=gain_map[thr] if gain_map is not None else None,
+                                norm_ref=(
+                                    self._deps.extract_frame(view, normalize_frame_idx, thr)
+                                    if normalize_frame_idx is not None
+                                    else None
+                                ),
+                                zero_mask=any_mask,
+                            )
+
+                            fix = _block_corrector(corrector)
+                            rolling = rolling_window is not None
+                            label = (
+                                f"threshold {thr + 1}/{threshold_count}, "
+                                if threshold_count > 1
+                                else ""
+                            )
+                            self._reduce_groups(
+                                groups=groups,
+                                operations=operations,
+                                rolling_window=rolling_window,
+                                # Blocks arrive converted and corrected in place; rolling
+                                # windows keep raw frames and correct each one as it is used.
+                                read_run=lambda start, stop, thr=thr, fix=fix: _timed_frames(
+                                    self._iter_h5_frames(
+                                        view, thr, start, stop, None if rolling else fix
+                                    ),
+                                    source_dtype.itemsize,
+                                ),
+                                prepare=fix if rolling else _as_prepared,
+                                emit=lambda group_idx, group, results, thr=thr, bits=mask_bits: (
+                                    _emit(thr, group_idx, group, results, bits)
+                                ),
+                                advance=lambda frame_idx, label=label: _advance(
+                                    label, frame_idx, frame_count, total_steps
+                                ),
+                                resume=_resume_for(thr),
+                                checkpointer=_checkpointer(thr, total_steps),
+                            )
                     finally:
                         for handle in extra_files:
                             try:
@@ -401,25 +1290,17 @@ class SeriesSummingService:
                 series_files, _ = self._deps.resolve_series_files(source_path)
                 frame_count = len(series_files)
                 threshold_count = 1
-                if normalize_frame_idx is not None and (
-                    normalize_frame_idx < 0 or normalize_frame_idx >= frame_count
-                ):
-                    raise HTTPException(status_code=400, detail="Normalize frame is out of range")
-                groups = self._deps.iter_sum_groups(frame_count, mode, step, range_start, range_end)
-                if not groups:
-                    raise HTTPException(status_code=400, detail="No frames available for summing")
+                groups, total_steps = _plan(frame_count, threshold_count)
 
                 sample = self._read_non_h5_image(series_files[0])
                 image_h = int(sample.shape[-2])
                 image_w = int(sample.shape[-1])
-                shape = (int(frame_count), image_h, image_w)
-                source_dtype = np.dtype(sample.dtype)
-                flag_value = self._deps.mask_flag_value(source_dtype)
+                flag_value = self._deps.mask_flag_value(np.dtype(sample.dtype))
                 mask_bits = np.zeros((image_h, image_w), dtype=np.uint32) if apply_mask else None
                 mask_bits_by_thr = [mask_bits]
 
-                norm_ref: np.ndarray | None = None
-                norm_ref_valid: np.ndarray | None = None
+                dark_map, gain_map = _reference_maps((image_h, image_w), threshold_count)
+                ref_arr = None
                 if normalize_frame_idx is not None:
                     ref_arr = np.asarray(
                         self._read_non_h5_image(series_files[normalize_frame_idx]), dtype=np.float64
@@ -433,228 +1314,102 @@ class SeriesSummingService:
                                 mask_bits[neg & ~gaps] |= 0x1E
                             ref_arr = ref_arr.copy()
                             ref_arr[neg] = np.nan
-                    norm_ref = ref_arr
-                    norm_ref_valid = np.isfinite(norm_ref) & (np.abs(norm_ref) > 1e-12)
-
-                total_input_frames = sum(int(group["count"]) for group in groups)
-                total_steps = max(1, total_input_frames)
-                processed = 0
-                sums = []
-
-                for chunk_idx, group in enumerate(groups):
-                    start_idx = int(group["start"])
-                    end_idx = int(group["end"])
-                    frame_indices = list(group["indices"])
-                    acc: np.ndarray | None = None
-                    median_stack: list[np.ndarray] | None = [] if operation == "median" else None
-                    for frame_idx in frame_indices:
-                        arr = np.asarray(
-                            self._read_non_h5_image(series_files[frame_idx]), dtype=np.float64
-                        )
-                        if apply_mask:
-                            neg = arr < 0
-                            if neg.any():
-                                gaps = arr == -1
-                                if mask_bits is not None:
-                                    mask_bits[gaps] |= 1
-                                    mask_bits[neg & ~gaps] |= 0x1E
-                                arr = arr.copy()
-                                arr[neg] = 0.0
-                            if mask_bits is not None and np.any(mask_bits):
-                                arr = arr.copy()
-                                arr[mask_bits != 0] = 0.0
-                        if norm_ref is not None and norm_ref_valid is not None:
-                            arr = np.divide(
-                                arr,
-                                norm_ref,
-                                out=np.zeros_like(arr, dtype=np.float64),
-                                where=norm_ref_valid,
-                            )
-                        if operation == "median":
-                            if median_stack is not None:
-                                median_stack.append(arr)
-                        else:
-                            if acc is None:
-                                acc = np.zeros_like(arr, dtype=np.float64)
-                            acc += arr
-                        processed += 1
-                        progress = min(0.95, processed / total_steps)
-                        self._update_job(
-                            job_id,
-                            progress=progress,
-                            message=f"{operation.capitalize()} frame {frame_idx + 1}/{frame_count}",
-                        )
-                    if operation == "median":
-                        if not median_stack:
-                            continue
-                        reduced = np.median(np.stack(median_stack, axis=0), axis=0)
-                    else:
-                        if acc is None:
-                            continue
-                        if operation == "mean":
-                            reduced = acc / float(max(1, len(frame_indices)))
-                        else:
-                            reduced = acc
-                    sums.append(
-                        (0, chunk_idx, start_idx, end_idx, len(frame_indices), reduced, mask_bits)
-                    )
+                # The mask grows while reading, so masked pixels are zeroed per frame below.
+                corrector = FrameCorrector(
+                    dark=dark_map[0] if dark_map is not None else None,
+                    gain=gain_map[0] if gain_map is not None else None,
+                    norm_ref=ref_arr,
+                )
+                if mask_bits is not None and "mask_bits" in saved_arrays:
+                    # Gap/bad pixels seen before the checkpoint.
+                    mask_bits |= saved_arrays["mask_bits"].astype(np.uint32)
 
-            outputs: list[str] = []
-            self._update_job(job_id, progress=0.97, message="Writing outputs…")
-            if output_format in {"hdf5", "h5"}:
-                self._deps.ensure_hdf5_stack()
-                h5py = self._deps.get_h5py()
-                if base_target.suffix.lower() in {".h5", ".hdf5"}:
-                    out_file = base_target
-                else:
-                    out_file = base_target.parent / f"{base_target.name}_{timestamp}.h5"
-                out_file = self._next_available_path(out_file)
-                with h5py.File(out_file, "w") as out_h5:
-                    out_h5.attrs["source_file"] = str(source_path)
-                    out_h5.attrs["source_dataset"] = str(dataset)
-                    out_h5.attrs["series_mode"] = mode
-                    out_h5.attrs["operation"] = operation
-                    out_h5.attrs["frame_count"] = int(frame_count)
-                    out_h5.attrs["threshold_count"] = int(threshold_count)
-                    out_h5.attrs["mask_applied"] = bool(apply_mask)
-                    if normalize_frame is not None:
-                        out_h5.attrs["normalize_frame"] = int(normalize_frame)
-
-                    out_frame_count = len(groups)
-                    image_h = int(shape[-2])
-                    image_w = int(shape[-1])
-                    if threshold_count > 1:
-                        data_shape = (out_frame_count, threshold_count, image_h, image_w)
-                        data_chunks = (1, 1, image_h, image_w)
-                    else:
-                        data_shape = (out_frame_count, image_h, image_w)
-                        data_chunks = (1, image_h, image_w)
-
-                    entry_group = out_h5.require_group("/entry")
-                    data_group = entry_group.require_group("data")
-
-                    if ext in {".h5", ".hdf5"}:
-                        try:
-                            with h5py.File(source_path, "r") as src_h5:
-                                self._copy_h5_metadata(src_h5, out_h5, threshold_count)
-                        except Exception:
-                            pass
-
-                    data_dset = data_group.create_dataset(
-                        "data",
-                        shape=data_shape,
-                        dtype=np.float64,
-                        chunks=data_chunks,
-                        compression="gzip",
-                        compression_opts=4,
-                        shuffle=True,
-                    )
-                    data_dset.attrs["sum_mode"] = mode
-                    data_dset.attrs["sum_step"] = int(step)
-                    data_dset.attrs["sum_operation"] = operation
-                    if range_start is not None:
-                        data_dset.attrs["sum_range_start"] = int(range_start)
-                    if range_end is not None:
-                        data_dset.attrs["sum_range_end"] = int(range_end)
-                    if normalize_frame is not None:
-                        data_dset.attrs["sum_normalize_frame"] = int(normalize_frame)
-                    data_dset.attrs["source_dataset"] = str(dataset)
-                    data_dset.attrs["frame_count_in"] = int(frame_count)
-                    data_dset.attrs["frame_count_out"] = int(out_frame_count)
-                    data_dset.attrs["threshold_count"] = int(threshold_count)
-                    data_dset.attrs["signal"] = "data"
-
-                    chunk_start = np.asarray(
-                        [int(group["start"]) for group in groups], dtype=np.int64
+                def _prepare_file_frame(raw: np.ndarray) -> np.ndarray:
+                    arr = np.array(raw, dtype=np.float64)
+                    if apply_mask:
+                        neg = arr < 0
+                        if neg.any():
+                            gaps = arr == -1
+                            if mask_bits is not None:
+                                mask_bits[gaps] |= 1
+                                mask_bits[neg & ~gaps] |= 0x1E
+                            arr[neg] = 0.0
+                    corrector.apply(arr)
+                    if mask_bits is not None and np.any(mask_bits):
+                        arr[mask_bits != 0] = 0.0
+                    return arr
+
+                sink = _open_sink(
+                    groups, frame_count, threshold_count, (image_h, image_w), flag_value, None
+                )
+                decode_workers = decode_worker_count(self._deps.get_decode_workers())
+                prefetcher = (
+                    FramePrefetcher(
+                        lambda idx: self._read_non_h5_image(series_files[idx]),
+                        _read_order(groups, rolling_window),
+                        workers=decode_workers,
                     )
-                    chunk_end = np.asarray([int(group["end"]) for group in groups], dtype=np.int64)
-                    chunk_count = np.asarray(
-                        [int(group["count"]) for group in groups], dtype=np.int64
+                    if decode_workers > 1
+                    else None
+                )
+                try:
+                    # File series discover gap/bad pixels while reading, so each output is
+                    # flagged with the mask known at the time its group completes.
+                    self._reduce_groups(
+                        groups=groups,
+                        operations=operations,
+                        rolling_window=rolling_window,
+                        read_run=lambda start, stop: _timed_frames(
+                            self._iter_file_frames(series_files, start, stop, prefetcher)
+                        ),
+                        prepare=_prepare_file_frame,
+                        emit=lambda group_idx, group, results: _emit(
+                            0, group_idx, group, results, mask_bits
+                        ),
+                        advance=lambda frame_idx: _advance("", frame_idx, frame_count, total_steps),
+                        resume=_resume_for(0),
+                        checkpointer=_checkpointer(
+                            0,
+                            total_steps,
+                            {"mask_bits": mask_bits} if mask_bits is not None else None,
+                        ),
                     )
-                    data_group.create_dataset("sum_start_frame", data=chunk_start)
-                    data_group.create_dataset("sum_end_frame", data=chunk_end)
-                    data_group.create_dataset("sum_frame_count", data=chunk_count)
-
-                    for thr, chunk_idx, _start_idx, _end_idx, _count, arr, mask_bits in sums:
-                        arr_out = np.asarray(arr, dtype=np.float64)
-                        if mask_bits is not None:
-                            _, _, any_mask = self._deps.mask_slices(mask_bits)
-                            arr_out = arr_out.copy()
-                            arr_out[any_mask] = flag_value
-                        if threshold_count > 1:
-                            data_dset[chunk_idx, thr, :, :] = arr_out
-                        else:
-                            data_dset[chunk_idx, :, :] = arr_out
-
-                    if apply_mask:
-                        base_mask_bits = mask_bits_by_thr[0] if mask_bits_by_thr else None
-                        if base_mask_bits is not None:
-                            mask_group = out_h5.require_group(
-                                "/entry/instrument/detector/detectorSpecific"
-                            )
-                            mask_group.create_dataset(
-                                "pixel_mask",
-                                data=base_mask_bits.astype(np.uint32),
-                                compression="gzip",
-                            )
-                        if threshold_count > 1:
-                            detector_group = out_h5.require_group("/entry/instrument/detector")
-                            for thr, mask_bits in enumerate(mask_bits_by_thr):
-                                if mask_bits is None:
-                                    continue
-                                thr_group = detector_group.require_group(
-                                    f"threshold_{thr + 1}_channel"
-                                )
-                                thr_group.create_dataset(
-                                    "pixel_mask",
-                                    data=mask_bits.astype(np.uint32),
-                                    compression="gzip",
-                                )
-                    outputs.append(str(out_file))
-            elif output_format in {"tiff", "tif"}:
-                base_name = base_target.stem or base_target.name or "series_sum"
-                out_dir = base_target.parent
-                use_float_tiff = operation in {"mean", "median"} or normalize_frame_idx is not None
-                for thr, chunk_idx, start_idx, end_idx, frame_count_in_sum, arr, mask_bits in sums:
-                    thr_tag = f"_thr{thr + 1:02d}" if threshold_count > 1 else ""
-                    if mode == "all":
-                        chunk_tag = "_all"
-                    elif mode == "nth":
-                        chunk_tag = f"_every{step:03d}_n{frame_count_in_sum:05d}"
-                    else:
-                        chunk_tag = (
-                            f"_chunk{chunk_idx + 1:04d}_f{start_idx + 1:06d}-{end_idx + 1:06d}"
-                        )
-                    out_file = out_dir / f"{base_name}{thr_tag}{chunk_tag}_{timestamp}.tiff"
-                    out_file = self._next_available_path(out_file)
-                    if use_float_tiff:
-                        arr_tiff = np.asarray(arr, dtype=np.float32)
-                    else:
-                        arr_out = np.rint(np.asarray(arr, dtype=np.float64))
-                        tiff_dtype: np.dtype = np.int32
-                        max_val = float(np.nanmax(arr_out)) if arr_out.size else 0.0
-                        if max_val > float(np.iinfo(np.int32).max):
-                            tiff_dtype = np.int64
-                        arr_tiff = arr_out.astype(tiff_dtype, casting="unsafe")
-                    if mask_bits is not None:
-                        gap_mask, bad_mask, _ = self._deps.mask_slices(mask_bits)
-                        arr_tiff = arr_tiff.copy()
-                        arr_tiff[gap_mask] = -1
-                        arr_tiff[bad_mask] = -2
-                    self._deps.write_tiff(out_file, np.asarray(arr_tiff))
-                    outputs.append(str(out_file))
-            else:
-                raise HTTPException(status_code=400, detail="Unsupported output format")
+                finally:
+                    if prefetcher is not None:
+                        prefetcher.close()
 
+            self._check_cancelled(job_id)
+            self._update_job(job_id, progress=0.97, message="Finalizing outputs…")
+            finish_started = time.perf_counter()
+            outputs = sink.finish(mask_bits_by_thr)
+            io_time += time.perf_counter() - finish_started
+            sink = None
+            self._checkpoints.remove(job_id)
+            if cache_key is not None:
+                self._cache_outputs(
+                    cache_key, source_path, ext, result_params, outputs, base_target, timestamp
+                )
             self._update_job(
                 job_id,
                 status="done",
                 progress=1.0,
                 message=f"Completed: wrote {len(outputs)} file(s)",
                 outputs=outputs,
+                eta_s=0.0,
                 done_at=time.time(),
+                **_times(),
+            )
+        except JobCancelled:
+            if sink is not None:
+                sink.abort()
+            self._checkpoints.remove(job_id)
+            self._update_job(
+                job_id, status="cancelled", message="Cancelled", done_at=time.time(), **_times()
             )
         except Exception as exc:
+            if sink is not None:
+                sink.abort()
+            self._checkpoints.remove(job_id)
             self._deps.logger.exception("Series summing failed: %s", exc)
             detail = exc.detail if isinstance(exc, HTTPException) else str(exc)
             self._update_job(
@@ -664,4 +1419,347 @@ class SeriesSummingService:
                 message=f"Failed: {detail}",
                 error=str(detail),
                 done_at=time.time(),
+                **_times(),
+            )
+
+
+class _Checkpointer:
+    """Save the reduction state of a running job every `interval_s` seconds."""
+
+    def __init__(
+        self,
+        interval_s: float,
+        save: Callable[[dict[str, Any], dict[str, np.ndarray]], None],
+    ) -> None:
+        self._interval_s = float(interval_s)
+        self._save = save
+        self._next = time.monotonic() + self._interval_s
+
+    def due(self) -> bool:
+        return time.monotonic() >= self._next
+
+    def save(self, cursor: dict[str, Any], arrays: dict[str, np.ndarray]) -> None:
+        self._save(cursor, arrays)
+        self._next = time.monotonic() + self._interval_s
+
+
+def _as_prepared(frame: np.ndarray) -> np.ndarray:
+    return frame
+
+
+def _contiguous_runs(indices: Any) -> list[tuple[int, int]]:
+    """Split ascending frame indices into half-open runs of consecutive frames."""
+    if isinstance(indices, range) and indices.step == 1:
+        return [(indices.start, indices.stop)] if len(indices) else []
+    runs: list[list[int]] = []
+    for idx in indices:
+        idx = int(idx)
+        if runs and runs[-1][1] == idx:
+            runs[-1][1] = idx + 1
+        else:
+            runs.append([idx, idx + 1])
+    return [(start, stop) for start, stop in runs]
+
+
+def _read_order(groups: list[dict[str, Any]], rolling_window: int | None) -> np.ndarray:
+    """Frame indices in the order `_reduce_groups` reads them."""
+    if rolling_window is not None:
+        runs = [np.arange(start, stop) for start, stop in _window_runs(groups)]
+    else:
+        runs = [np.asarray(group["indices"], dtype=np.int64) for group in groups]
+    return np.concatenate(runs) if runs else np.zeros(0, dtype=np.int64)
+
+
+def _window_runs(groups: list[dict[str, Any]]) -> list[tuple[int, int]]:
+    """Merge overlapping rolling windows into the half-open frame runs they cover."""
+    runs: list[list[int]] = []
+    for group in groups:
+        start = int(group["start"])
+        stop = int(group["end"]) + 1
+        if runs and start <= runs[-1][1]:
+            runs[-1][1] = max(runs[-1][1], stop)
+        else:
+            runs.append([start, stop])
+    return [(start, stop) for start, stop in runs]
+
+
+class _SeriesOutputSink:
+    """Write reduced groups to HDF5 or TIFF as soon as each group completes."""
+
+    def __init__(
+        self,
+        service: SeriesSummingService,
+        *,
+        output_format: str,
+        base_target: Path,
+        timestamp: str,
+        source_path: Path,
+        dataset: str,
+        mode: str,
+        step: int,
+        stride: int,
+        operations: list[str],
+        groups: list[dict[str, Any]],
+        frame_count: int,
+        threshold_count: int,
+        image_shape: tuple[int, int],
+        flag_value: float,
+        apply_mask: bool,
+        normalize_frame: int | None,
+        range_start: int | None,
+        range_end: int | None,
+        compression: str,
+        metadata_source: Any | None,
+        shard: dict[str, Any] | None = None,
+        references: dict[str, str] | None = None,
+        flat_mode: str = "flat",
+        resume_state: dict[str, Any] | None = None,
+        on_output: Callable[[str], None] | None = None,
+    ) -> None:
+        self._service = service
+        self._on_output = on_output
+        self._deps = service._deps
+        self._mode = mode
+        self._step = step
+        self._operations = list(operations)
+        self._threshold_count = threshold_count
+        self._flag_value = flag_value
+        self._apply_mask = apply_mask
+        self._float_output = normalize_frame is not None or bool(references)
+        self._timestamp = timestamp
+        self._outputs: list[str] = []
+        self._h5_file: Any | None = None
+        self._writer: ChunkWriter | None = None
+        self._data_dsets: dict[str, Any] = {}
+        # A resumed job rewrites its groups in place instead of allocating new names.
+        self._resumed = resume_state is not None
+
+        if output_format in {"hdf5", "h5"} and resume_state is not None:
+            self._deps.ensure_hdf5_stack()
+            h5py = self._deps.get_h5py()
+            out_file = Path(resume_state["outputs"][0])
+            self._track(out_file)
+            self._h5_file = h5py.File(out_file, "r+")
+            data_group = self._h5_file["/entry/data"]
+            for op_idx, op_name in enumerate(self._operations):
+                self._data_dsets[op_name] = data_group["data" if op_idx == 0 else op_name]
+            self._writer = ChunkWriter(compression)
+        elif output_format in {"hdf5", "h5"}:
+            self._deps.ensure_hdf5_stack()
+            h5py = self._deps.get_h5py()
+            out_file = service._next_available_path(service._h5_output_file(base_target, timestamp))
+            self._track(out_file)
+            out_h5 = h5py.File(out_file, "w")
+            self._h5_file = out_h5
+            out_h5.attrs["source_file"] = str(source_path)
+            out_h5.attrs["source_dataset"] = str(dataset)
+            out_h5.attrs["series_mode"] = mode
+            out_h5.attrs["operation"] = self._operations[0]
+            out_h5.attrs["operations"] = ",".join(self._operations)
+            out_h5.attrs["frame_count"] = int(frame_count)
+            out_h5.attrs["threshold_count"] = int(threshold_count)
+            out_h5.attrs["mask_applied"] = bool(apply_mask)
+            if normalize_frame is not None:
+                out_h5.attrs["normalize_frame"] = int(normalize_frame)
+            for label, ref_file in (references or {}).items():
+                out_h5.attrs[f"{label}_file"] = str(ref_file)
+            if references and "flat" in references:
+                out_h5.attrs["flat_mode"] = flat_mode
+            if shard is not None:
+                # Read by `merge_series_shards` to reassemble the full result.
+                out_h5.attrs["shard_index"] = int(shard["index"])
+                out_h5.attrs["shard_count"] = int(shard["count"])
+                out_h5.attrs["shard_kind"] = str(shard["kind"])
+                out_h5.attrs["shard_operations"] = ",".join(shard["operations"])
+
+            out_frame_count = len(groups)
+            image_h, image_w = image_shape
+            if threshold_count > 1:
+                data_shape = (out_frame_count, threshold_count, image_h, image_w)
+                data_chunks = (1, 1, image_h, image_w)
+            else:
+                data_shape = (out_frame_count, image_h, image_w)
+                data_chunks = (1, image_h, image_w)
+
+            entry_group = out_h5.require_group("/entry")
+            data_group = entry_group.require_group("data")
+
+            if metadata_source is not None:
+                try:
+                    service._copy_h5_metadata(metadata_source, out_h5, threshold_count)
+                except Exception:
+                    pass
+
+            # The first operation keeps the viewer-facing `/entry/data/data` name;
+            # every further statistic gets its own `/entry/data/<operation>` dataset.
+            for op_idx, op_name in enumerate(self._operations):
+                data_dset = data_group.create_dataset(
+                    "data" if op_idx == 0 else op_name,
+                    shape=data_shape,
+                    dtype=np.float64,
+                    chunks=data_chunks,
+                    **codec_dataset_kwargs(compression),
+                )
+                data_dset.attrs["sum_mode"] = mode
+                data_dset.attrs["sum_step"] = int(step)
+                if mode == "rolling":
+                    data_dset.attrs["sum_stride"] = int(stride)
+                data_dset.attrs["sum_operation"] = op_name
+                data_dset.attrs["compression"] = compression
+                if op_name in {"std", "var"}:
+                    data_dset.attrs["ddof"] = 0
+                if range_start is not None:
+                    data_dset.attrs["sum_range_start"] = int(range_start)
+                if range_end is not None:
+                    data_dset.attrs["sum_range_end"] = int(range_end)
+                if normalize_frame is not None:
+                    data_dset.attrs["sum_normalize_frame"] = int(normalize_frame)
+                data_dset.attrs["source_dataset"] = str(dataset)
+                data_dset.attrs["frame_count_in"] = int(frame_count)
+                data_dset.attrs["frame_count_out"] = int(out_frame_count)
+                data_dset.attrs["threshold_count"] = int(threshold_count)
+                data_dset.attrs["signal"] = "data"
+                if apply_mask:
+                    data_dset.attrs["mask_flag_value"] = float(flag_value)
+                self._data_dsets[op_name] = data_dset
+
+            chunk_start = np.asarray([int(group["start"]) for group in groups], dtype=np.int64)
+            chunk_end = np.asarray([int(group["end"]) for group in groups], dtype=np.int64)
+            chunk_count = np.asarray([int(group["count"]) for group in groups], dtype=np.int64)
+            data_group.create_dataset("sum_start_frame", data=chunk_start)
+            data_group.create_dataset("sum_end_frame", data=chunk_end)
+            data_group.create_dataset("sum_frame_count", data=chunk_count)
+            self._writer = ChunkWriter(compression)
+        else:
+            self._tiff_base = service._tiff_base(base_target)
+            self._tiff_dir = base_target.parent
+            if resume_state is not None:
+                for path in resume_state["outputs"]:
+                    self._track(Path(path))
+
+    def emit(
+        self,
+        thr: int,
+        group_idx: int,
+        group: dict[str, Any],
+        results: dict[str, np.ndarray],
+        mask_bits: np.ndarray | None,
+    ) -> None:
+        if self._writer is not None:
+            any_mask = None
+            if mask_bits is not None:
+                _, _, any_mask = self._deps.mask_slices(mask_bits)
+            for op_name, arr in results.items():
+                arr_out = np.asarray(arr, dtype=np.float64)
+                if any_mask is not None:
+                    arr_out = arr_out.copy()
+                    arr_out[any_mask] = self._flag_value
+                index = (group_idx, thr) if self._threshold_count > 1 else (group_idx,)
+                self._writer.write(self._data_dsets[op_name], index, arr_out)
+            return
+
+        start_idx = int(group["start"])
+        end_idx = int(group["end"])
+        thr_tag = f"_thr{thr + 1:02d}" if self._threshold_count > 1 else ""
+        if self._mode == "all":
+            chunk_tag = "_all"
+        elif self._mode == "nth":
+            chunk_tag = f"_every{self._step:03d}_n{int(group['count']):05d}"
+        elif self._mode == "rolling":
+            chunk_tag = f"_win{group_idx + 1:05d}_f{start_idx + 1:06d}-{end_idx + 1:06d}"
+        else:
+            chunk_tag = f"_chunk{group_idx + 1:04d}_f{start_idx + 1:06d}-{end_idx + 1:06d}"
+        for op_name, arr in results.items():
+            op_tag = f"_{op_name}" if len(self._operations) > 1 else ""
+            out_file = (
+                self._tiff_dir
+                / f"{self._tiff_base}{thr_tag}{chunk_tag}{op_tag}_{self._timestamp}.tiff"
             )
+            if not self._resumed:
+                out_file = self._service._next_available_path(out_file)
+            if op_name in {"mean", "median", "std", "var"} or self._float_output:
+                arr_tiff = np.asarray(arr, dtype=np.float32)
+            else:
+                arr_out = np.rint(np.asarray(arr, dtype=np.float64))
+                tiff_dtype: np.dtype = np.int32
+                max_val = float(np.nanmax(arr_out)) if arr_out.size else 0.0
+                if max_val > float(np.iinfo(np.int32).max):
+                    tiff_dtype = np.int64
+                arr_tiff = arr_out.astype(tiff_dtype, casting="unsafe")
+            if mask_bits is not None:
+                gap_mask, bad_mask, _ = self._deps.mask_slices(mask_bits)
+                arr_tiff = arr_tiff.copy()
+                arr_tiff[gap_mask] = -1
+                arr_tiff[bad_mask] = -2
+            self._track(out_file)
+            self._deps.write_tiff(out_file, np.asarray(arr_tiff))
+
+    def _track(self, path: Path) -> None:
+        # Recorded before the file is written so an abort removes partial files too.
+        self._outputs.append(str(path))
+        if self._on_output is not None:
+            self._on_output(str(path))
+
+    def flush(self) -> None:
+        """Commit pending chunks and flush the HDF5 file (called before a checkpoint)."""
+        if self._writer is not None:
+            self._writer.flush()
+        if self._h5_file is not None:
+            self._h5_file.flush()
+
+    def checkpoint_state(self) -> dict[str, Any]:
+        return {"outputs": list(self._outputs), "timestamp": self._timestamp}
+
+    def finish(self, mask_bits_by_thr: list[np.ndarray | None]) -> list[str]:
+        if self._h5_file is None:
+            return list(self._outputs)
+        try:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            out_h5 = self._h5_file
+            if self._apply_mask:
+                base_mask_bits = mask_bits_by_thr[0] if mask_bits_by_thr else None
+                if base_mask_bits is not None:
+                    mask_group = out_h5.require_group("/entry/instrument/detector/detectorSpecific")
+                    mask_group.create_dataset(
+                        "pixel_mask",
+                        data=base_mask_bits.astype(np.uint32),
+                        compression="gzip",
+                    )
+                if self._threshold_count > 1:
+                    detector_group = out_h5.require_group("/entry/instrument/detector")
+                    for thr, mask_bits in enumerate(mask_bits_by_thr):
+                        if mask_bits is None:
+                            continue
+                        thr_group = detector_group.require_group(f"threshold_{thr + 1}_channel")
+                        thr_group.create_dataset(
+                            "pixel_mask",
+                            data=mask_bits.astype(np.uint32),
+                            compression="gzip",
+                        )
+        finally:
+            self._h5_file.close()
+            self._h5_file = None
+        return list(self._outputs)
+
+    def abort(self) -> None:
+        """Close handles and remove partially written outputs."""
+        try:
+            if self._writer is not None:
+                self._writer.close()
+        except Exception:
+            pass
+        self._writer = None
+        try:
+            if self._h5_file is not None:
+                self._h5_file.close()
+        except Exception:
+            pass
+        self._h5_file = None
+        for path in self._outputs:
+            try:
+                Path(path).unlink(missing_ok=True)
+            except OSError:
+                pass
+        self._outputs = []
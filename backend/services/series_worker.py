@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+"""Worker-process entry point for isolated series jobs.
+
+`run_series_job` is started by `ProcessJobRunner` in a spawned child. It
+rebuilds the series dependencies from plain settings (the parent's deps hold
+closures over live app state and cannot be pickled) and runs the regular
+`SeriesSummingService._run_job`, sending every status change to the parent.
+"""
+
+import logging
+from pathlib import Path
+from typing import Any, Callable
+
+from ..image_formats import (
+    _image_ext_name,
+    _read_cbf,
+    _read_cbf_gz,
+    _read_edf,
+    _read_tiff,
+    _resolve_series_files,
+    _write_tiff,
+)
+from .hdf5_stack import HDF5StackService
+from .series_ops import iter_sum_groups, mask_flag_value, mask_slices
+from .series_summing import SeriesSummingDeps, SeriesSummingService
+
+# Lazy-loaded HDF5 stack (hdf5plugin registers the compression filters)
+_h5py = None
+
+
+def _ensure_hdf5_stack() -> None:
+    global _h5py
+    if _h5py is None:
+        import hdf5plugin  # noqa: F401  # type: ignore[import-not-found]
+        import h5py  # type: ignore[import-not-found]
+
+        _h5py = h5py
+
+
+def _get_h5py() -> Any:
+    _ensure_hdf5_stack()
+    return _h5py
+
+
+def _is_within(path: Path, root: Path) -> bool:
+    try:
+        path.relative_to(root)
+        return True
+    except ValueError:
+        return False
+
+
+def build_worker_deps(
+    data_dir: Path,
+    allow_abs_paths: bool,
+    checkpoint_interval_s: float = 0.0,
+    result_cache_mb: int = 0,
+    decode_workers: int = 0,
+) -> SeriesSummingDeps:
+    hdf5_stack = HDF5StackService(
+        data_dir=data_dir,
+        get_allow_abs_paths=lambda: allow_abs_paths,
+        is_within=_is_within,
+        get_h5py=_get_h5py,
+    )
+    return SeriesSummingDeps(
+        data_dir=data_dir,
+        get_allow_abs_paths=lambda: allow_abs_paths,
+        is_within=_is_within,
+        logger=logging.getLogger("albis.worker"),
+        ensure_hdf5_stack=_ensure_hdf5_stack,
+        get_h5py=_get_h5py,
+        # The parent already resolved and validated the source path.
+        resolve_image_file=lambda name: Path(name),
+        image_ext_name=_image_ext_name,
+        resolve_series_files=_resolve_series_files,
+        read_tiff=_read_tiff,
+        read_cbf=_read_cbf,
+        read_cbf_gz=_read_cbf_gz,
+        read_edf=_read_edf,
+        write_tiff=_write_tiff,
+        iter_sum_groups=iter_sum_groups,
+        mask_flag_value=mask_flag_value,
+        mask_slices=mask_slices,
+        resolve_dataset_view=hdf5_stack.resolve_dataset_view,
+        extract_frame=hdf5_stack.extract_frame,
+        extract_frames=hdf5_stack.extract_frames,
+        frame_chunk_depth=hdf5_stack.frame_chunk_depth,
+        find_pixel_mask=hdf5_stack.find_pixel_mask,
+        get_checkpoint_interval_s=lambda: checkpoint_interval_s,
+        get_result_cache_mb=lambda: result_cache_mb,
+        get_decode_workers=lambda: decode_workers,
+    )
+
+
+class _WorkerSeriesService(SeriesSummingService):
+    """Series service whose status updates and cancellation go through the worker pipe."""
+
+    def __init__(
+        self,
+        deps: SeriesSummingDeps,
+        report: Callable[[dict[str, Any]], None],
+        check_cancelled: Callable[[], None],
+    ) -> None:
+        super().__init__(deps)
+        self._report = report
+        self._check = check_cancelled
+
+    def _update_job(self, job_id: str, **changes: Any) -> None:
+        self._report(changes)
+
+    def _check_cancelled(self, job_id: str) -> None:
+        self._check()
+
+    def _output_opened(self, job_id: str, path: str) -> None:
+        # The server removes these if this process dies before cleaning up itself.
+        self._report({"partial_output": path})
+
+
+def run_series_job(
+    job_id: str,
+    payload: dict[str, Any],
+    report: Callable[[dict[str, Any]], None],
+    check_cancelled: Callable[[], None],
+) -> None:
+    deps = build_worker_deps(
+        Path(payload["data_dir"]),
+        bool(payload["allow_abs_paths"]),
+        float(payload.get("checkpoint_interval_s", 0.0)),
+        int(payload.get("result_cache_mb", 0)),
+        int(payload.get("decode_workers", 0)),
+    )
+    service = _WorkerSeriesService(deps, report, check_cancelled)
+    service._run_job(job_id, **payload["job"])
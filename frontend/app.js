@@ -34,6 +34,7 @@ const toolbarThresholdSelect = document.getElementById("toolbar-threshold");
 const toolbarFrameWrap = document.getElementById("toolbar-frame-wrap");
 const toolbarFrameIndexWrap = document.getElementById("toolbar-frame-index-wrap");
 const toolbarStepWrap = document.getElementById("toolbar-step-wrap");
+const toolbarBinWrap = document.getElementById("toolbar-bin-wrap");
 const toolbarFpsWrap = document.getElementById("toolbar-fps-wrap");
 const toolbarPlaybackWrap = document.getElementById("toolbar-playback-wrap");
 const toolbarPlaybackToggle = document.getElementById("toolbar-playback-toggle");
@@ -50,6 +51,8 @@ const toolbarMoreFullscreen = document.getElementById("toolbar-more-fullscreen")
 const frameRange = document.getElementById("frame-range");
 const frameIndex = document.getElementById("frame-index");
 const frameStep = document.getElementById("frame-step");
+const frameBin = document.getElementById("frame-bin");
+const frameBinOp = document.getElementById("frame-bin-op");
 const fpsSelect = document.getElementById("fps-select");
 const autoScaleToggle = document.getElementById("auto-scale");
 const minInput = document.getElementById("min-input");
@@ -155,6 +158,8 @@ const remoteWavelengthEl = document.getElementById("remote-wavelength");
 const remoteDistanceEl = document.getElementById("remote-distance");
 const remoteCenterEl = document.getElementById("remote-center");
 const remotePeakSetsEl = document.getElementById("remote-peak-sets");
+const remoteRecordBtn = document.getElementById("remote-record-toggle");
+const remoteRecordStatusEl = document.getElementById("remote-record-status");
 const dataSourceSummaryEl = document.getElementById("summary-data-source");
 const dataSourceStateEl = document.getElementById("data-source-state");
 const dataSourceSkeletonEl = document.getElementById("data-source-skeleton");
@@ -251,12 +256,19 @@ const peaksExportBtn = document.getElementById("peaks-export");
 const peaksBody = document.getElementById("peaks-body");
 const peaksSectionStateEl = document.getElementById("peaks-state");
 const peaksSummaryEl = document.getElementById("summary-peaks");
+const hitsMinPeaksInput = document.getElementById("hits-min-peaks");
+const hitsMinIntensityInput = document.getElementById("hits-min-intensity");
+const hitsStartBtn = document.getElementById("hits-start");
+const hitsStatusEl = document.getElementById("hits-status");
 const seriesSumMode = document.getElementById("series-sum-mode");
 const seriesSumOperation = document.getElementById("series-sum-operation");
+const seriesSumExtraOps = Array.from(document.querySelectorAll("[data-series-extra-op]"));
 const seriesSumStepField = document.getElementById("series-sum-step-field");
 const seriesSumStepLabel = document.getElementById("series-sum-step-label");
 const seriesSumStep = document.getElementById("series-sum-step");
 const seriesSumStepHint = document.getElementById("series-sum-step-hint");
+const seriesSumStrideField = document.getElementById("series-sum-stride-field");
+const seriesSumStride = document.getElementById("series-sum-stride");
 const seriesSumRangeStartField = document.getElementById("series-sum-range-start-field");
 const seriesSumRangeEndField = document.getElementById("series-sum-range-end-field");
 const seriesSumRangeStart = document.getElementById("series-sum-range-start");
@@ -264,11 +276,24 @@ const seriesSumRangeEnd = document.getElementById("series-sum-range-end");
 const seriesSumNormalizeEnable = document.getElementById("series-sum-normalize-enable");
 const seriesSumNormalizeFrameField = document.getElementById("series-sum-normalize-frame-field");
 const seriesSumNormalizeFrame = document.getElementById("series-sum-normalize-frame");
+const seriesSumCorrectionsEnable = document.getElementById("series-sum-corrections-enable");
+const seriesSumCorrectionsField = document.getElementById("series-sum-corrections-field");
+const seriesSumDarkFile = document.getElementById("series-sum-dark-file");
+const seriesSumDarkDataset = document.getElementById("series-sum-dark-dataset");
+const seriesSumFlatFile = document.getElementById("series-sum-flat-file");
+const seriesSumFlatDataset = document.getElementById("series-sum-flat-dataset");
+const seriesSumFlatMode = document.getElementById("series-sum-flat-mode");
 const seriesSumOutput = document.getElementById("series-sum-output");
 const seriesSumBrowse = document.getElementById("series-sum-browse");
 const seriesSumFormat = document.getElementById("series-sum-format");
+const seriesSumCompressionField = document.getElementById("series-sum-compression-field");
+const seriesSumCompression = document.getElementById("series-sum-compression");
 const seriesSumMask = document.getElementById("series-sum-mask");
 const seriesSumStart = document.getElementById("series-sum-start");
+const seriesSumCancel = document.getElementById("series-sum-cancel");
+const seriesSumFollow = document.getElementById("series-sum-follow");
+const seriesSumResumable = document.getElementById("series-sum-resumable");
+const seriesSumResumableList = document.getElementById("series-sum-resumable-list");
 const seriesSumProgress = document.getElementById("series-sum-progress");
 const seriesSumProgressFill = document.getElementById("series-sum-progress-fill");
 const seriesSumProgressText = document.getElementById("series-sum-progress-text");
@@ -301,6 +326,19 @@ const settingsAllowAbs = document.getElementById("settings-allow-abs");
 const settingsScanCache = document.getElementById("settings-scan-cache");
 const settingsMaxScanDepth = document.getElementById("settings-max-scan-depth");
 const settingsMaxUpload = document.getElementById("settings-max-upload");
+const settingsJobWorkers = document.getElementById("settings-job-workers");
+const settingsJobIsolation = document.getElementById("settings-job-isolation");
+const settingsJobMaxRss = document.getElementById("settings-job-max-rss");
+const settingsJobCheckpoint = document.getElementById("settings-job-checkpoint");
+const settingsJobResultCache = document.getElementById("settings-job-result-cache");
+const settingsJobDecodeWorkers = document.getElementById("settings-job-decode-workers");
+const settingsRemoteRingFrames = document.getElementById("settings-remote-ring-frames");
+const settingsRemoteRingMb = document.getElementById("settings-remote-ring-mb");
+const settingsRemoteMaxMb = document.getElementById("settings-remote-max-mb");
+const settingsRemoteCompression = document.getElementById("settings-remote-compression");
+const settingsRemoteDecodeWorkers = document.getElementById("settings-remote-decode-workers");
+const settingsRemoteQueueDepth = document.getElementById("settings-remote-queue-depth");
+const settingsRemoteQueuePolicy = document.getElementById("settings-remote-queue-policy");
 const settingsLogLevel = document.getElementById("settings-log-level");
 const settingsLogDir = document.getElementById("settings-log-dir");
 const fileInput = document.getElementById("file-input");
@@ -359,6 +397,13 @@ let resolutionOverlayScheduled = false;
 let peakOverlayScheduled = false;
 let peakFinderScheduled = false;
 let seriesSumPollTimer = null;
+let seriesSumEvents = null;
+let remoteEvents = null;
+let remoteSocket = null;
+let seriesFollowTimer = null;
+let hitFindingTimer = null;
+let remoteRecordTimer = null;
+let remoteRecording = false;
 let panelTabState = "view";
 let backendTimer = null;
 let inspectorSelectedRow = null;
@@ -510,6 +555,8 @@ const APP_FRONTEND_VERSION = "0.8.1";
 const DEFAULT_RING_COUNT = 3;
 const MOBILE_PANEL_SNAP_POINTS = [0.6, 1];
 const FRAME_STEP_OPTIONS = [1, 10, 100, 1000];
+const FRAME_BIN_OPTIONS = [1, 2, 5, 10, 20, 50, 100];
+const FRAME_BIN_OPERATIONS = ["sum", "mean", "max"];
 const PIXEL_LABEL_DEFAULT_MIN_CELL_PX = 18;
 const PIXEL_LABEL_DEFAULT_MAX_LABELS = 4000;
 const PIXEL_LABEL_DENSE_ZOOM_PX = 24;
@@ -844,6 +891,8 @@ function applyHelpMap() {
     "toolbar-more-panel-toggle": "Open or close side menu",
     "toolbar-more-fullscreen": "Toggle full screen (F)",
     "frame-step": "Frame step size",
+    "frame-bin": "Combine consecutive frames while browsing",
+    "frame-bin-op": "How binned frames are combined",
     "fps-select": "Playback speed",
     "toolbar-more-step": "Frame step size",
     "toolbar-more-fps": "Playback speed",
@@ -2322,6 +2371,7 @@ function updateRingsSectionState() {
 }
 
 function updatePeaksSectionState() {
+  updateHitFindingUi();
   if (!peaksSectionStateEl) return;
   if (!analysisState.peaksEnabled) {
     setSectionBadgeState(peaksSectionStateEl, "empty", "Enable Peak Finder to detect peaks.");
@@ -2428,6 +2478,105 @@ function renderPeakList() {
   updatePeaksSectionState();
 }
 
+function updateHitFindingUi() {
+  const job = state.hitFinding;
+  if (hitsStartBtn) {
+    hitsStartBtn.textContent = job.running ? "Cancel" : "Find hits";
+    hitsStartBtn.disabled = !job.running && !(isHdf5File(state.file) && state.dataset);
+  }
+  if (hitsStatusEl) {
+    const canOpen = !job.running && Boolean(job.output);
+    hitsStatusEl.classList.toggle("is-clickable", canOpen);
+    hitsStatusEl.title = canOpen ? "Click to open the hit frames" : "";
+  }
+}
+
+function setHitFindingStatus(text) {
+  if (hitsStatusEl) hitsStatusEl.textContent = text;
+}
+
+async function startHitFinding() {
+  if (!isHdf5File(state.file) || !state.dataset) return;
+  const minPeaks = Math.max(1, Math.round(Number(hitsMinPeaksInput?.value) || 10));
+  const minIntensity = Math.max(0, Number(hitsMinIntensityInput?.value) || 0);
+  try {
+    const data = await fetchJSONWithInit(`${API}/analysis/hit-finding/start`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({
+        file: state.file,
+        dataset: state.dataset,
+        threshold: state.thresholdCount > 1 ? state.thresholdIndex : 0,
+        min_peaks: minPeaks,
+        min_intensity: minIntensity,
+        apply_mask: Boolean(state.maskEnabled),
+      }),
+    });
+    state.hitFinding = { id: String(data.id || ""), running: true, output: "" };
+    setHitFindingStatus(data.message || "Queued");
+    updateHitFindingUi();
+    hitFindingTimer = window.setTimeout(pollHitFinding, 500);
+  } catch (err) {
+    console.error(err);
+    setHitFindingStatus(err?.message || "Failed to start hit finding");
+  }
+}
+
+async function pollHitFinding() {
+  hitFindingTimer = null;
+  const job = state.hitFinding;
+  if (!job.id || !job.running) return;
+  try {
+    const data = await fetchJSON(`${API}/analysis/hit-finding/status?id=${encodeURIComponent(job.id)}`);
+    if (state.hitFinding.id !== job.id) return;
+    setHitFindingStatus(data.message || data.status);
+    if (data.status === "queued" || data.status === "running") {
+      hitFindingTimer = window.setTimeout(pollHitFinding, 500);
+      return;
+    }
+    job.running = false;
+    job.output = data.status === "done" && data.hit_count > 0 ? String(data.output || "") : "";
+    if (job.output) {
+      setHitFindingStatus(`${data.message} — click to step through the hits`);
+    }
+  } catch (err) {
+    console.error(err);
+    job.running = false;
+    setHitFindingStatus("Failed to query hit finding");
+  }
+  updateHitFindingUi();
+}
+
+async function cancelHitFinding() {
+  const id = state.hitFinding.id;
+  if (!id) return;
+  try {
+    await fetchJSONWithInit(`${API}/analysis/hit-finding/cancel`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ id }),
+    });
+  } catch (err) {
+    console.error(err);
+  }
+}
+
+async function openHitFindingOutput() {
+  const output = state.hitFinding.output;
+  if (state.hitFinding.running || !output) return;
+  try {
+    await ensureFileMode();
+    await loadAutoloadFile(output);
+    if (state.frameCount > 1) {
+      requestFrame(0);
+    }
+    setStatus("Opened hit frames");
+  } catch (err) {
+    console.error(err);
+    setStatus("Failed to open hit frames");
+  }
+}
+
 function detectPeaks(maxPeaks) {
   if (!state.hasFrame || !state.dataRaw || !state.width || !state.height) return [];
   const width = state.width;
@@ -2620,15 +2769,15 @@ function drawPeakOverlay() {
 
   externalSets.forEach((set) => {
     const color = typeof set?.color === "string" && set.color ? set.color : "#4aa3ff";
-    const points = Array.isArray(set?.points) ? set.points : [];
+    // Float32 rows straight from /api/remote/v1/peaks (finite x/y checked by the server).
+    const points = set?.points instanceof Float32Array ? set.points : null;
+    if (!points) return;
+    const stride = Math.max(2, Number(set.stride) || 3);
     const radius = Math.max(5, Math.min(11, 7 + Math.log2(Math.max(1, zoom)) * 0.35));
-    points.forEach((peak) => {
-      const px = Number(peak?.x);
-      const py = Number(peak?.y);
-      if (!Number.isFinite(px) || !Number.isFinite(py)) return;
-      const sx = (px + 0.5 - viewX) * zoom + offsetX;
-      const sy = (py + 0.5 - viewY) * zoom + offsetY;
-      if (sx < -20 || sy < -20 || sx > width + 20 || sy > height + 20) return;
+    for (let i = 0; i + 1 < points.length; i += stride) {
+      const sx = (points[i] + 0.5 - viewX) * zoom + offsetX;
+      const sy = (points[i + 1] + 0.5 - viewY) * zoom + offsetY;
+      if (sx < -20 || sy < -20 || sx > width + 20 || sy > height + 20) continue;
 
       peakCtx.setLineDash([4, 3]);
       peakCtx.beginPath();
@@ -2642,7 +2791,7 @@ function drawPeakOverlay() {
       peakCtx.lineWidth = 1.35;
       peakCtx.strokeStyle = color;
       peakCtx.stroke();
-    });
+    }
   });
 
   if (!hasLocalPeaks) {
@@ -2739,13 +2888,17 @@ function setSeriesSumProgress(progress, text) {
 function updateSeriesSumUi() {
   const mode = (seriesSumMode?.value || "all").toLowerCase();
   const isNth = mode === "nth";
-  const isRange = mode === "range";
+  const isRolling = mode === "rolling";
+  const isRange = mode === "range" || isRolling;
   const normalizeEnabled = Boolean(seriesSumNormalizeEnable?.checked);
   if (seriesSumStepField) {
     seriesSumStepField.classList.toggle("is-hidden", mode === "all");
   }
   if (seriesSumStepLabel) {
-    seriesSumStepLabel.textContent = isNth ? "Nth interval (N)" : "Chunk size (N)";
+    seriesSumStepLabel.textContent = isNth ? "Nth interval (N)" : isRolling ? "Window (N)" : "Chunk size (N)";
+  }
+  if (seriesSumStrideField) {
+    seriesSumStrideField.classList.toggle("is-hidden", !isRolling);
   }
   if (seriesSumRangeStartField) {
     seriesSumRangeStartField.classList.toggle("is-hidden", !isRange);
@@ -2756,6 +2909,10 @@ function updateSeriesSumUi() {
   if (seriesSumNormalizeFrameField) {
     seriesSumNormalizeFrameField.classList.toggle("is-hidden", !normalizeEnabled);
   }
+  const correctionsEnabled = Boolean(seriesSumCorrectionsEnable?.checked);
+  if (seriesSumCorrectionsField) {
+    seriesSumCorrectionsField.classList.toggle("is-hidden", !correctionsEnabled);
+  }
   const totalFrames = Math.max(1, Number(state.frameCount || 1));
   if (seriesSumRangeStart) {
     seriesSumRangeStart.min = "1";
@@ -2780,18 +2937,38 @@ function updateSeriesSumUi() {
     seriesSumStart.disabled = !ready || state.seriesSum.running;
     seriesSumStart.textContent = state.seriesSum.running ? "Summing…" : "Start";
   }
+  if (seriesSumCancel) {
+    seriesSumCancel.classList.toggle("is-hidden", !state.seriesSum.running);
+    seriesSumCancel.disabled = !state.seriesSum.jobId;
+  }
   if (seriesSumBrowse) {
     seriesSumBrowse.disabled = state.seriesSum.running || !ready;
   }
+  if (seriesSumFollow) {
+    const following = Boolean(state.seriesFollow.id);
+    seriesSumFollow.textContent = following ? "Stop follow" : "Follow live";
+    seriesSumFollow.disabled = !following && (state.seriesSum.running || !ready);
+  }
   if (seriesSumMode) {
     seriesSumMode.disabled = state.seriesSum.running || !ready;
   }
   if (seriesSumOperation) {
     seriesSumOperation.disabled = state.seriesSum.running || !ready;
   }
+  const primaryOperation = (seriesSumOperation?.value || "sum").toLowerCase();
+  seriesSumExtraOps.forEach((input) => {
+    const isPrimary = input.dataset.seriesExtraOp === primaryOperation;
+    input.disabled = state.seriesSum.running || !ready || isPrimary;
+    if (isPrimary) {
+      input.checked = false;
+    }
+  });
   if (seriesSumStep) {
     seriesSumStep.disabled = state.seriesSum.running || mode === "all" || !ready;
   }
+  if (seriesSumStride) {
+    seriesSumStride.disabled = state.seriesSum.running || !isRolling || !ready;
+  }
   if (seriesSumRangeStart) {
     seriesSumRangeStart.disabled = state.seriesSum.running || !isRange || !ready;
   }
@@ -2804,12 +2981,29 @@ function updateSeriesSumUi() {
   if (seriesSumNormalizeFrame) {
     seriesSumNormalizeFrame.disabled = state.seriesSum.running || !normalizeEnabled || !ready;
   }
+  if (seriesSumCorrectionsEnable) {
+    seriesSumCorrectionsEnable.disabled = state.seriesSum.running || !ready;
+  }
+  [seriesSumDarkFile, seriesSumDarkDataset, seriesSumFlatFile, seriesSumFlatDataset, seriesSumFlatMode].forEach(
+    (input) => {
+      if (input) {
+        input.disabled = state.seriesSum.running || !correctionsEnabled || !ready;
+      }
+    },
+  );
   if (seriesSumOutput) {
     seriesSumOutput.disabled = state.seriesSum.running || !ready;
   }
   if (seriesSumFormat) {
     seriesSumFormat.disabled = state.seriesSum.running || !ready;
   }
+  const isHdfOutput = (seriesSumFormat?.value || "hdf5").toLowerCase() !== "tiff";
+  if (seriesSumCompressionField) {
+    seriesSumCompressionField.classList.toggle("is-hidden", !isHdfOutput);
+  }
+  if (seriesSumCompression) {
+    seriesSumCompression.disabled = state.seriesSum.running || !isHdfOutput || !ready;
+  }
   if (seriesSumMask) {
     seriesSumMask.disabled = state.seriesSum.running || !ready;
   }
@@ -2821,6 +3015,10 @@ function stopSeriesSumPolling() {
     window.clearTimeout(seriesSumPollTimer);
     seriesSumPollTimer = null;
   }
+  if (seriesSumEvents) {
+    seriesSumEvents.close();
+    seriesSumEvents = null;
+  }
 }
 
 function resolveSeriesOpenTarget(outputs) {
@@ -2828,6 +3026,90 @@ function resolveSeriesOpenTarget(outputs) {
   return String(outputs[0]);
 }
 
+function formatSeriesSumRate(data) {
+  const parts = [];
+  const fps = Number(data.frames_per_s);
+  const mbps = Number(data.mb_per_s);
+  const eta = Number(data.eta_s);
+  if (Number.isFinite(fps) && fps > 0) {
+    parts.push(`${fps >= 100 ? Math.round(fps) : fps.toFixed(1)} fr/s`);
+  }
+  if (Number.isFinite(mbps) && mbps > 0) {
+    parts.push(`${mbps.toFixed(1)} MB/s`);
+  }
+  if (data.status === "running" && Number.isFinite(eta)) {
+    const secs = Math.max(0, Math.round(eta));
+    const mins = Math.floor(secs / 60);
+    parts.push(`ETA ${mins}:${String(secs % 60).padStart(2, "0")}`);
+  }
+  return parts.join(" · ");
+}
+
+// Apply one job snapshot (SSE event or status poll); returns true while the job is active.
+function applySeriesSumStatus(data) {
+  const status = data.status || "running";
+  const progress = Number.isFinite(data.progress) ? Number(data.progress) : state.seriesSum.progress;
+  let message = data.message || state.seriesSum.message || "Running…";
+  if (status === "queued" && Number.isFinite(data.queue_position)) {
+    message = `Queued (position ${data.queue_position})`;
+  }
+  const rate = status === "running" ? formatSeriesSumRate(data) : "";
+  if (rate) {
+    message = `${message} · ${rate}`;
+  }
+  const outputs = Array.isArray(data.outputs) ? data.outputs : [];
+  state.seriesSum.running = status === "queued" || status === "running";
+  state.seriesSum.outputs = outputs;
+  state.seriesSum.openTarget = state.seriesSum.running ? "" : resolveSeriesOpenTarget(outputs);
+  setSeriesSumProgress(progress, message);
+  updateSeriesSumUi();
+  if (state.seriesSum.running) {
+    return true;
+  }
+  if (status === "done") {
+    const count = state.seriesSum.outputs.length;
+    setStatus(`Series summing done (${count} file${count === 1 ? "" : "s"})`);
+  } else if (status === "error") {
+    setStatus(data.resumable ? "Series summing interrupted (resumable)" : `Series summing failed`);
+  } else if (status === "cancelled") {
+    setStatus("Series summing cancelled");
+  }
+  refreshResumableSeriesJobs();
+  return false;
+}
+
+function watchSeriesSumJob() {
+  stopSeriesSumPolling();
+  if (!state.seriesSum.jobId || typeof window.EventSource !== "function") {
+    pollSeriesSumStatus();
+    return;
+  }
+  const source = new EventSource(
+    `${API}/analysis/jobs/${encodeURIComponent(state.seriesSum.jobId)}/events`
+  );
+  seriesSumEvents = source;
+  source.onmessage = (event) => {
+    let data = null;
+    try {
+      data = JSON.parse(event.data);
+    } catch (err) {
+      console.error(err);
+      return;
+    }
+    if (!applySeriesSumStatus(data) && seriesSumEvents === source) {
+      source.close();
+      seriesSumEvents = null;
+    }
+  };
+  source.onerror = () => {
+    // EventSource reconnects on its own; fall back to polling once it gives up.
+    if (source.readyState === EventSource.CLOSED && seriesSumEvents === source) {
+      seriesSumEvents = null;
+      pollSeriesSumStatus();
+    }
+  };
+}
+
 async function pollSeriesSumStatus() {
   if (!state.seriesSum.jobId) {
     state.seriesSum.running = false;
@@ -2838,24 +3120,8 @@ async function pollSeriesSumStatus() {
     const data = await fetchJSON(
       `${API}/analysis/series-sum/status?job_id=${encodeURIComponent(state.seriesSum.jobId)}`
     );
-    const status = data.status || "running";
-    const progress = Number.isFinite(data.progress) ? Number(data.progress) : state.seriesSum.progress;
-    const message = data.message || state.seriesSum.message || "Running…";
-    const outputs = Array.isArray(data.outputs) ? data.outputs : [];
-    state.seriesSum.running = status === "queued" || status === "running";
-    state.seriesSum.outputs = outputs;
-    state.seriesSum.openTarget = state.seriesSum.running ? "" : resolveSeriesOpenTarget(outputs);
-    setSeriesSumProgress(progress, message);
-    updateSeriesSumUi();
-    if (state.seriesSum.running) {
+    if (applySeriesSumStatus(data)) {
       seriesSumPollTimer = window.setTimeout(pollSeriesSumStatus, 500);
-      return;
-    }
-    if (status === "done") {
-      const count = state.seriesSum.outputs.length;
-      setStatus(`Series summing done (${count} file${count === 1 ? "" : "s"})`);
-    } else if (status === "error") {
-      setStatus(`Series summing failed`);
     }
   } catch (err) {
     console.error(err);
@@ -2867,10 +3133,211 @@ async function pollSeriesSumStatus() {
   }
 }
 
+const SERIES_FOLLOW_POLL_MS = 1000;
+
+function scheduleSeriesFollowPoll(delay = SERIES_FOLLOW_POLL_MS) {
+  if (seriesFollowTimer) {
+    window.clearTimeout(seriesFollowTimer);
+  }
+  seriesFollowTimer = window.setTimeout(pollSeriesFollow, delay);
+}
+
+async function pollSeriesFollow() {
+  seriesFollowTimer = null;
+  const follow = state.seriesFollow;
+  if (!follow.id) return;
+  if (follow.shown && state.file !== follow.appliedLabel) {
+    // Another image was opened; the live sum no longer owns the view.
+    stopSeriesFollow();
+    return;
+  }
+  const params = new URLSearchParams({ id: follow.id, after: String(follow.revision) });
+  try {
+    const res = await fetch(`${API}/analysis/series-follow/frame?${params.toString()}`, { cache: "no-store" });
+    if (res.status === 404) {
+      stopSeriesFollow(false);
+      setStatus("Live sum ended");
+      return;
+    }
+    if (res.ok && res.status !== 204) {
+      const buffer = await res.arrayBuffer();
+      const dtype = parseDtype(res.headers.get("X-Dtype"));
+      const shape = parseShape(res.headers.get("X-Shape"));
+      follow.revision = Number(res.headers.get("X-Revision") || follow.revision);
+      follow.framesSummed = Number(res.headers.get("X-Frames-Summed") || 0);
+      const label = `Live ${follow.operation} (${follow.framesSummed} frames) ${follow.label}`;
+      applyExternalFrame(typedArrayFrom(buffer, dtype), shape, dtype, label, !follow.shown, follow.shown);
+      follow.shown = true;
+      follow.appliedLabel = state.file;
+      setSeriesSumProgress(0, `Following: ${follow.framesSummed} frame(s)`);
+      const status = res.headers.get("X-Follow-Status");
+      if (status === "error" || status === "stopped") {
+        stopSeriesFollow(false);
+        return;
+      }
+    }
+  } catch (err) {
+    console.error(err);
+  }
+  if (state.seriesFollow.id) {
+    scheduleSeriesFollowPoll();
+  }
+}
+
+async function startSeriesFollow() {
+  if (!state.file) return;
+  const primary = (seriesSumOperation?.value || "sum").toLowerCase();
+  const operation = primary === "mean" ? "mean" : "sum";
+  try {
+    const data = await fetchJSONWithInit(`${API}/analysis/series-follow/start`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({
+        file: state.file,
+        dataset: state.dataset,
+        threshold: state.thresholdCount > 1 ? state.thresholdIndex : 0,
+        operation,
+        apply_mask: Boolean(seriesSumMask?.checked),
+      }),
+    });
+    state.seriesFollow = {
+      id: String(data.id || ""),
+      revision: 0,
+      framesSummed: 0,
+      operation,
+      label: fileLabel(state.file),
+      shown: false,
+    };
+    setSeriesSumProgress(0, "Following…");
+    updateSeriesSumUi();
+    scheduleSeriesFollowPoll(0);
+  } catch (err) {
+    console.error(err);
+    setStatus(err?.message || "Failed to start live sum");
+  }
+}
+
+async function stopSeriesFollow(notify = true) {
+  const id = state.seriesFollow.id;
+  state.seriesFollow = { id: "", revision: 0, framesSummed: 0 };
+  if (seriesFollowTimer) {
+    window.clearTimeout(seriesFollowTimer);
+    seriesFollowTimer = null;
+  }
+  updateSeriesSumUi();
+  if (!notify || !id) return;
+  try {
+    await fetchJSONWithInit(`${API}/analysis/series-follow/stop`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ id }),
+    });
+  } catch (err) {
+    console.error(err);
+  }
+}
+
+async function cancelSeriesSumming() {
+  const jobId = state.seriesSum.jobId;
+  if (!jobId || !state.seriesSum.running) return;
+  try {
+    await fetchJSONWithInit(`${API}/analysis/series-sum/cancel`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ job_id: jobId }),
+    });
+    setSeriesSumProgress(state.seriesSum.progress, "Cancelling…");
+  } catch (err) {
+    console.error(err);
+    setStatus("Failed to cancel series summing");
+  }
+}
+
+async function refreshResumableSeriesJobs() {
+  if (!seriesSumResumable || !seriesSumResumableList) return;
+  let jobs = [];
+  try {
+    const data = await fetchJSON(`${API}/analysis/series-sum/resumable`);
+    jobs = Array.isArray(data.jobs) ? data.jobs : [];
+  } catch (err) {
+    console.error(err);
+  }
+  seriesSumResumableList.innerHTML = "";
+  jobs.forEach((job) => {
+    const row = document.createElement("div");
+    row.className = "series-sum-resumable-row";
+    const label = document.createElement("span");
+    const config = job.config || {};
+    const name = String(config.file || "").split("/").pop() || job.id;
+    const percent = Math.round(Number(job.progress || 0) * 100);
+    label.textContent = `${name} · ${config.mode || "all"} · ${percent}%`;
+    label.title = String(config.file || "");
+    const resume = document.createElement("button");
+    resume.type = "button";
+    resume.className = "btn btn-secondary";
+    resume.textContent = "Resume";
+    resume.disabled = state.seriesSum.running;
+    resume.addEventListener("click", () => resumeSeriesSumming(job.id));
+    const discard = document.createElement("button");
+    discard.type = "button";
+    discard.className = "btn btn-secondary";
+    discard.textContent = "Discard";
+    discard.addEventListener("click", () => discardSeriesSumming(job.id));
+    row.append(label, resume, discard);
+    seriesSumResumableList.appendChild(row);
+  });
+  seriesSumResumable.classList.toggle("is-hidden", jobs.length === 0);
+}
+
+async function resumeSeriesSumming(jobId) {
+  if (!jobId || state.seriesSum.running) return;
+  try {
+    stopSeriesSumPolling();
+    await fetchJSONWithInit(`${API}/analysis/series-sum/resume`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ job_id: jobId }),
+    });
+    state.seriesSum.jobId = String(jobId);
+    state.seriesSum.running = true;
+    state.seriesSum.outputs = [];
+    state.seriesSum.openTarget = "";
+    setSeriesSumProgress(0.01, "Resuming…");
+    setStatus("Series summing resumed");
+    updateSeriesSumUi();
+    watchSeriesSumJob();
+  } catch (err) {
+    console.error(err);
+    setStatus("Failed to resume series summing");
+  }
+  refreshResumableSeriesJobs();
+}
+
+async function discardSeriesSumming(jobId) {
+  try {
+    await fetchJSONWithInit(`${API}/analysis/series-sum/discard`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ job_id: jobId }),
+    });
+  } catch (err) {
+    console.error(err);
+    setStatus("Failed to discard interrupted job");
+  }
+  refreshResumableSeriesJobs();
+}
+
 async function startSeriesSumming() {
   if (!state.file || (isHdfFile(state.file) && !state.dataset) || state.seriesSum.running) return;
   const mode = (seriesSumMode?.value || "all").toLowerCase();
   const operation = (seriesSumOperation?.value || "sum").toLowerCase();
+  const operations = [operation];
+  seriesSumExtraOps.forEach((input) => {
+    const extra = String(input.dataset.seriesExtraOp || "").toLowerCase();
+    if (input.checked && extra && !operations.includes(extra)) {
+      operations.push(extra);
+    }
+  });
   const normalizeEnabled = Boolean(seriesSumNormalizeEnable?.checked);
   const totalFrames = Math.max(1, Math.round(Number(state.frameCount || 1)));
 
@@ -2883,10 +3350,25 @@ async function startSeriesSumming() {
 
   const rangeStart = Math.max(1, Math.round(Number(seriesSumRangeStart?.value || 1)));
   const rangeEnd = Math.max(1, Math.round(Number(seriesSumRangeEnd?.value || totalFrames)));
-  if (mode === "range" && rangeStart > rangeEnd) {
+  const usesRange = mode === "range" || mode === "rolling";
+  if (usesRange && rangeStart > rangeEnd) {
     setStatus("Range start must be <= range end");
     return;
   }
+  const stride = Math.max(1, Math.round(Number(seriesSumStride?.value || 1)));
+  if (mode === "rolling") {
+    if (seriesSumStride) {
+      seriesSumStride.value = String(stride);
+    }
+    if (step > rangeEnd - rangeStart + 1) {
+      setStatus("Rolling window must not exceed the frame range");
+      return;
+    }
+    if (operations.some((item) => item !== "sum" && item !== "mean")) {
+      setStatus("Rolling windows support sum and mean only");
+      return;
+    }
+  }
 
   let normalizeFrame = null;
   if (normalizeEnabled) {
@@ -2896,18 +3378,35 @@ async function startSeriesSumming() {
     }
   }
 
+  const correctionsEnabled = Boolean(seriesSumCorrectionsEnable?.checked);
+  const correction = (input) => (correctionsEnabled ? (input?.value || "").trim() : "");
+  const darkFile = correction(seriesSumDarkFile);
+  const flatFile = correction(seriesSumFlatFile);
+  if (correctionsEnabled && !darkFile && !flatFile) {
+    setStatus("Enter a dark frame or flat field file");
+    return;
+  }
+
   const payload = {
     file: state.file,
     dataset: state.dataset,
     mode,
     step,
+    stride,
     operation,
+    operations,
     normalize_frame: normalizeFrame,
-    range_start: mode === "range" ? rangeStart : null,
-    range_end: mode === "range" ? rangeEnd : null,
+    range_start: usesRange ? rangeStart : null,
+    range_end: usesRange ? rangeEnd : null,
     output_path: (seriesSumOutput?.value || "").trim(),
     format: (seriesSumFormat?.value || "hdf5").toLowerCase(),
+    compression: (seriesSumCompression?.value || "gzip").toLowerCase(),
     apply_mask: Boolean(seriesSumMask?.checked),
+    dark_file: darkFile,
+    dark_dataset: darkFile ? correction(seriesSumDarkDataset) : "",
+    flat_file: flatFile,
+    flat_dataset: flatFile ? correction(seriesSumFlatDataset) : "",
+    flat_mode: (seriesSumFlatMode?.value || "flat").toLowerCase(),
   };
   try {
     stopSeriesSumPolling();
@@ -2927,7 +3426,7 @@ async function startSeriesSumming() {
     setSeriesSumProgress(0.01, "Queued");
     setStatus("Series summing started");
     updateSeriesSumUi();
-    pollSeriesSumStatus();
+    watchSeriesSumJob();
   } catch (err) {
     console.error(err);
     state.seriesSum.running = false;
@@ -3923,6 +4422,27 @@ function setFrameStep(value) {
   }
 }
 
+function setFrameBin(value, op = state.frameBinOp) {
+  const parsed = Math.round(Number(value || 1));
+  const next = FRAME_BIN_OPTIONS.includes(parsed) ? parsed : FRAME_BIN_OPTIONS[0];
+  const nextOp = FRAME_BIN_OPERATIONS.includes(op) ? op : FRAME_BIN_OPERATIONS[0];
+  const changed = next !== state.frameBin || nextOp !== state.frameBinOp;
+  state.frameBin = next;
+  state.frameBinOp = nextOp;
+  if (frameBin) {
+    frameBin.value = String(next);
+  }
+  if (frameBinOp) {
+    frameBinOp.value = nextOp;
+    frameBinOp.disabled = next <= 1;
+  }
+  // Binned frames are served by /api/frame for HDF5 stacks only.
+  const hasSeries = Array.isArray(state.seriesFiles) && state.seriesFiles.length > 0;
+  if (changed && !hasSeries && state.file && state.dataset) {
+    requestFrame(state.frameIndex);
+  }
+}
+
 function updatePlayButtons() {
   const hasSeries = Array.isArray(state.seriesFiles) && state.seriesFiles.length > 0;
   const disabled = !state.file || (!state.dataset && !hasSeries) || state.frameCount <= 1;
@@ -5092,6 +5612,7 @@ function updateAutoloadUI() {
   if (toolbarFrameWrap) toolbarFrameWrap.classList.toggle("is-hidden", !showPlaybackControls);
   if (toolbarFrameIndexWrap) toolbarFrameIndexWrap.classList.toggle("is-hidden", !showPlaybackControls);
   if (toolbarStepWrap) toolbarStepWrap.classList.toggle("is-hidden", !showPlaybackControls);
+  if (toolbarBinWrap) toolbarBinWrap.classList.toggle("is-hidden", !showPlaybackControls);
   if (toolbarFpsWrap) toolbarFpsWrap.classList.toggle("is-hidden", !showPlaybackControls);
   if (toolbarPlaybackWrap) {
     toolbarPlaybackWrap.classList.toggle("is-hidden", !showPlaybackControls);
@@ -5273,6 +5794,9 @@ async function startAutoload() {
     await fetchSimplonMask();
   }
   updateLiveBadge();
+  if (state.autoload.mode === "remote") {
+    watchRemoteSocket();
+  }
   autoloadTick();
   state.autoload.timer = window.setInterval(autoloadTick, state.autoload.interval);
 }
@@ -5283,6 +5807,7 @@ async function stopAutoload({ keepMode = true, disableMonitor = true } = {}) {
     window.clearInterval(state.autoload.timer);
     state.autoload.timer = null;
   }
+  stopRemoteEvents();
   if (state.autoload.running && state.autoload.mode === "simplon" && disableMonitor) {
     await setSimplonMode(false);
   }
@@ -5316,9 +5841,15 @@ async function ensureFileMode() {
   }
 }
 
-async function autoloadTick() {
-  if (!state.autoload.running || state.autoload.busy) return;
-  if (state.isLoading) return;
+async function autoloadTick({ pushed = false } = {}) {
+  if (!state.autoload.running) return;
+  const remote = state.autoload.mode === "remote";
+  // While the event stream is open, new remote frames are pushed instead of polled.
+  if (remote && !pushed && remoteEventsOpen()) return;
+  if (state.autoload.busy || state.isLoading) {
+    if (pushed) state.autoload.remotePending = true;
+    return;
+  }
   state.autoload.busy = true;
   state.autoload.lastPoll = Date.now();
   updateAutoloadMeta();
@@ -5327,12 +5858,120 @@ async function autoloadTick() {
       await autoloadWatchTick();
     } else if (state.autoload.mode === "simplon") {
       await autoloadSimplonTick();
-    } else if (state.autoload.mode === "remote") {
-      await autoloadRemoteTick();
+    } else if (remote) {
+      await autoloadRemoteTick({ wait: !pushed });
     }
   } finally {
     state.autoload.busy = false;
   }
+  if (state.autoload.remotePending) {
+    state.autoload.remotePending = false;
+    window.setTimeout(() => autoloadTick({ pushed: true }), 0);
+  }
+}
+
+function remoteEventsOpen() {
+  if (remoteSocket && remoteSocket.readyState === WebSocket.OPEN) return true;
+  return Boolean(remoteEvents) && remoteEvents.readyState === EventSource.OPEN;
+}
+
+function stopRemoteEvents() {
+  state.autoload.remotePending = false;
+  if (remoteSocket) {
+    const socket = remoteSocket;
+    remoteSocket = null;
+    socket.close();
+  }
+  if (remoteEvents) {
+    remoteEvents.close();
+    remoteEvents = null;
+  }
+}
+
+function watchRemoteSocket() {
+  stopRemoteEvents();
+  if (typeof window.WebSocket !== "function") {
+    watchRemoteEvents();
+    return;
+  }
+  const sourceId = (state.autoload.remoteSourceId || "default").trim() || "default";
+  const url = new URL(`${API}/remote/v2/ws/stream`, window.location.href);
+  url.protocol = url.protocol === "https:" ? "wss:" : "ws:";
+  url.searchParams.set("source_id", sourceId);
+  if (state.autoload.lastRemoteSeq > 0) {
+    url.searchParams.set("after_seq", String(state.autoload.lastRemoteSeq));
+  }
+  const socket = new WebSocket(url.toString());
+  socket.binaryType = "arraybuffer";
+  remoteSocket = socket;
+  let header = null;
+  let awaitingPeaks = false;
+  socket.onmessage = (event) => {
+    if (remoteSocket !== socket) return;
+    // Each frame arrives as a JSON header followed by its pixel bytes and, when
+    // `peaks_nbytes` is set, a binary message with its peak sets.
+    if (typeof event.data === "string") {
+      try {
+        header = JSON.parse(event.data);
+      } catch (err) {
+        console.error(err);
+        header = null;
+      }
+      awaitingPeaks = false;
+      return;
+    }
+    const live = state.autoload.running && state.autoload.mode === "remote";
+    if (awaitingPeaks) {
+      awaitingPeaks = false;
+      if (live) applyRemotePeakSets(decodePeakSets(event.data));
+      return;
+    }
+    const frameHeader = header;
+    header = null;
+    awaitingPeaks = Number(frameHeader?.peaks_nbytes) > 0;
+    if (!frameHeader || !live) return;
+    const seq = showRemoteFrame(event.data, new Headers(frameHeader.headers || {}), sourceId);
+    state.autoload.lastRemoteSeq = Number.isFinite(seq) && seq > 0 ? seq : 0;
+    if (!awaitingPeaks) applyRemotePeakSets([]);
+    finishRemoteUpdate();
+  };
+  socket.onclose = () => {
+    // Fall back to the event stream (and long-polling) while the autoload keeps running.
+    if (remoteSocket !== socket) return;
+    remoteSocket = null;
+    if (state.autoload.running && state.autoload.mode === "remote") {
+      watchRemoteEvents();
+    }
+  };
+}
+
+function watchRemoteEvents() {
+  stopRemoteEvents();
+  if (typeof window.EventSource !== "function") return;
+  const sourceId = (state.autoload.remoteSourceId || "default").trim() || "default";
+  const params = new URLSearchParams({ source_id: sourceId });
+  if (state.autoload.lastRemoteSeq > 0) {
+    params.set("after_seq", String(state.autoload.lastRemoteSeq));
+  }
+  const source = new EventSource(`${API}/remote/v1/events?${params.toString()}`);
+  remoteEvents = source;
+  source.onmessage = (event) => {
+    let data = null;
+    try {
+      data = JSON.parse(event.data);
+    } catch (err) {
+      console.error(err);
+      return;
+    }
+    if (remoteEvents !== source || Number(data?.seq) === state.autoload.lastRemoteSeq) return;
+    autoloadTick({ pushed: true });
+  };
+  source.onerror = () => {
+    // EventSource reconnects on its own; the interval long-polls once it gives up.
+    if (source.readyState === EventSource.CLOSED && remoteEvents === source) {
+      remoteEvents = null;
+    }
+  };
 }
 
 async function autoloadWatchTick() {
@@ -5454,62 +6093,88 @@ async function autoloadSimplonTick() {
   updateLiveBadge();
 }
 
-async function fetchRemoteMeta(sourceId, seq) {
+async function fetchRemotePeaks(sourceId, seq) {
   if (!sourceId) return;
   const params = new URLSearchParams({ source_id: sourceId });
   if (Number.isFinite(seq) && seq > 0) {
     params.set("seq", String(Math.round(seq)));
   }
   try {
-    const res = await fetch(`${API}/remote/v1/meta?${params.toString()}`, { cache: "no-store" });
+    const res = await fetch(`${API}/remote/v1/peaks?${params.toString()}`, { cache: "no-store" });
     if (res.status === 204 || !res.ok) {
       return;
     }
-    const payload = await res.json();
-    if (!payload || typeof payload !== "object") return;
-    const peakSets = Array.isArray(payload.peak_sets) ? payload.peak_sets : [];
-    const normalized = [];
-    peakSets.forEach((set, idx) => {
-      if (!set || typeof set !== "object") return;
-      const color = typeof set.color === "string" && set.color ? set.color : "#4aa3ff";
-      const name = typeof set.name === "string" && set.name ? set.name : `Set ${idx + 1}`;
-      const points = Array.isArray(set.points) ? set.points : [];
-      const list = [];
-      for (let i = 0; i < points.length; i += 1) {
-        const point = points[i];
-        if (!Array.isArray(point) || point.length < 2) continue;
-        const x = Number(point[0]);
-        const y = Number(point[1]);
-        const intensity = point.length > 2 ? Number(point[2]) : null;
-        if (!Number.isFinite(x) || !Number.isFinite(y)) continue;
-        list.push({
-          x,
-          y,
-          intensity: Number.isFinite(intensity) ? intensity : null,
-        });
-      }
-      if (list.length) {
-        normalized.push({ name, color, points: list });
-      }
-    });
-    analysisState.externalPeakSets = normalized;
-    if (state.autoload.remoteMeta) {
-      state.autoload.remoteMeta.peakSets = normalized.length;
-      updateRemoteMetaUI(state.autoload.remoteMeta);
-    }
-    schedulePeakOverlay();
+    applyRemotePeakSets(decodePeakSets(await res.arrayBuffer()));
   } catch (err) {
     console.warn(err);
   }
 }
 
-async function autoloadRemoteTick() {
+function decodePeakSets(buffer) {
+  // Layout of /api/remote/v1/peaks: uint32 LE header length, JSON header padded to 4 bytes,
+  // then `count` float32 (x, y, intensity) rows per set. Rows stay views into the buffer.
+  if (!(buffer instanceof ArrayBuffer) || buffer.byteLength < 4) return [];
+  const size = new DataView(buffer).getUint32(0, true);
+  if (4 + size > buffer.byteLength || size % 4) return [];
+  let header = null;
+  try {
+    header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 4, size)));
+  } catch (err) {
+    console.warn(err);
+    return [];
+  }
+  const sets = Array.isArray(header?.sets) ? header.sets : [];
+  const columns = Array.isArray(header?.columns) ? header.columns.length : 3;
+  const decoded = [];
+  let offset = 4 + size;
+  for (let idx = 0; idx < sets.length; idx += 1) {
+    const set = sets[idx] || {};
+    const count = Math.max(0, Math.floor(Number(set.count) || 0));
+    if (offset + count * columns * 4 > buffer.byteLength) break;
+    const points = new Float32Array(buffer, offset, count * columns);
+    offset += count * columns * 4;
+    if (!count) continue;
+    decoded.push({
+      name: typeof set.name === "string" && set.name ? set.name : `Set ${idx + 1}`,
+      color: typeof set.color === "string" && set.color ? set.color : "#4aa3ff",
+      points,
+      stride: columns,
+    });
+  }
+  return decoded;
+}
+
+function applyRemotePeakSets(peakSets) {
+  analysisState.externalPeakSets = Array.isArray(peakSets) ? peakSets : [];
+  if (state.autoload.remoteMeta) {
+    state.autoload.remoteMeta.peakSets = analysisState.externalPeakSets.length;
+    updateRemoteMetaUI(state.autoload.remoteMeta);
+  }
+  schedulePeakOverlay();
+}
+
+async function autoloadRemoteTick({ wait = false } = {}) {
   const sourceId = (state.autoload.remoteSourceId || "default").trim() || "default";
   const params = new URLSearchParams({ source_id: sourceId });
   if (state.autoload.lastRemoteSeq > 0) {
     params.set("after_seq", String(state.autoload.lastRemoteSeq));
   }
-  const res = await fetch(`${API}/remote/v1/latest?${params.toString()}`, { cache: "no-store" });
+  if (wait) {
+    // Long-poll for up to one interval: a new frame returns at once, without extra requests.
+    params.set("timeout", String(Math.min(10, Math.max(0.1, state.autoload.interval / 1000))));
+  }
+  // The browser undoes a zstd Content-Encoding itself; the byte shuffle is undone below.
+  const res = await fetch(`${API}/remote/v1/latest?${params.toString()}`, {
+    cache: "no-store",
+    headers: { "X-Accept-Byte-Shuffle": "1" },
+  });
+  if (
+    !state.autoload.running ||
+    state.autoload.mode !== "remote" ||
+    sourceId !== ((state.autoload.remoteSourceId || "default").trim() || "default")
+  ) {
+    return;
+  }
   if (res.status === 204) {
     setAutoloadStatus("Remote: waiting");
     updateLiveBadge();
@@ -5520,25 +6185,59 @@ async function autoloadRemoteTick() {
     updateLiveBadge();
     return;
   }
+  const polledSeq = Number(res.headers.get("X-Remote-Seq"));
+  if (remoteSocket && remoteEventsOpen() && polledSeq <= state.autoload.lastRemoteSeq) {
+    // The socket opened while this poll was pending and already showed this frame.
+    return;
+  }
   const buffer = await res.arrayBuffer();
-  const dtype = parseDtype(res.headers.get("X-Dtype"));
-  const shape = parseShape(res.headers.get("X-Shape"));
-  const data = typedArrayFrom(buffer, dtype);
-  const remoteMeta = applyRemoteMeta(res.headers);
-  const seq = Number(remoteMeta.seq || 0);
-  const label =
-    remoteMeta.displayName ||
-    `Remote stream (${sourceId})${Number.isFinite(seq) && seq > 0 ? ` #${seq}` : ""}`;
-  applyExternalFrame(data, shape, dtype, label, false, false, { autoMask: false });
+  const seq = showRemoteFrame(buffer, res.headers, sourceId);
   if (Number.isFinite(seq) && seq > 0) {
     if (seq !== state.autoload.lastRemoteSeq) {
       state.autoload.lastRemoteSeq = seq;
-      await fetchRemoteMeta(sourceId, seq);
+      // Frames without peak sets skip the extra request.
+      if (Number(res.headers.get("X-Remote-PeakSets")) > 0) {
+        await fetchRemotePeaks(sourceId, seq);
+      } else {
+        applyRemotePeakSets([]);
+      }
     }
   } else {
     analysisState.externalPeakSets = [];
     schedulePeakOverlay();
   }
+  finishRemoteUpdate();
+}
+
+function unshuffleBytes(buffer, itemsize) {
+  // Inverse of the server's byte shuffle: byte k of pixel i sits at k * count + i.
+  const src = new Uint8Array(buffer);
+  const count = Math.floor(src.length / itemsize);
+  const out = new Uint8Array(src.length);
+  for (let k = 0; k < itemsize; k += 1) {
+    const plane = src.subarray(k * count, (k + 1) * count);
+    for (let i = 0, j = k; i < count; i += 1, j += itemsize) {
+      out[j] = plane[i];
+    }
+  }
+  return out.buffer;
+}
+
+function showRemoteFrame(buffer, headers, sourceId) {
+  const dtype = parseDtype(headers.get("X-Dtype"));
+  const shape = parseShape(headers.get("X-Shape"));
+  const shuffle = Number(headers.get("X-Byte-Shuffle") || 0);
+  const data = typedArrayFrom(shuffle > 1 ? unshuffleBytes(buffer, shuffle) : buffer, dtype);
+  const remoteMeta = applyRemoteMeta(headers);
+  const seq = Number(remoteMeta.seq || 0);
+  const label =
+    remoteMeta.displayName ||
+    `Remote stream (${sourceId})${Number.isFinite(seq) && seq > 0 ? ` #${seq}` : ""}`;
+  applyExternalFrame(data, shape, dtype, label, false, false, { autoMask: false });
+  return seq;
+}
+
+function finishRemoteUpdate() {
   state.autoload.lastUpdate = Date.now();
   updateAutoloadMeta();
   setAutoloadStatus("Remote: updated");
@@ -6143,6 +6842,45 @@ function fillSettingsForm(config, configPath = "") {
   settingsScanCache.value = String(Number(config?.data?.scan_cache_sec ?? 2.0));
   settingsMaxScanDepth.value = String(Number(config?.data?.max_scan_depth ?? -1));
   settingsMaxUpload.value = String(Number(config?.data?.max_upload_mb ?? 0));
+  if (settingsJobWorkers) {
+    settingsJobWorkers.value = String(Number(config?.jobs?.workers ?? 2));
+  }
+  if (settingsJobIsolation) {
+    settingsJobIsolation.value = String(config?.jobs?.isolation ?? "process");
+  }
+  if (settingsJobMaxRss) {
+    settingsJobMaxRss.value = String(Number(config?.jobs?.max_rss_mb ?? 0));
+  }
+  if (settingsJobCheckpoint) {
+    settingsJobCheckpoint.value = String(Number(config?.jobs?.checkpoint_interval_s ?? 60));
+  }
+  if (settingsJobResultCache) {
+    settingsJobResultCache.value = String(Number(config?.jobs?.result_cache_mb ?? 2048));
+  }
+  if (settingsJobDecodeWorkers) {
+    settingsJobDecodeWorkers.value = String(Number(config?.jobs?.decode_workers ?? 0));
+  }
+  if (settingsRemoteRingFrames) {
+    settingsRemoteRingFrames.value = String(Number(config?.remote?.ring_frames ?? 64));
+  }
+  if (settingsRemoteRingMb) {
+    settingsRemoteRingMb.value = String(Number(config?.remote?.ring_mb ?? 256));
+  }
+  if (settingsRemoteMaxMb) {
+    settingsRemoteMaxMb.value = String(Number(config?.remote?.max_mb ?? 1024));
+  }
+  if (settingsRemoteCompression) {
+    settingsRemoteCompression.value = String(config?.remote?.compression ?? "zstd");
+  }
+  if (settingsRemoteDecodeWorkers) {
+    settingsRemoteDecodeWorkers.value = String(Number(config?.remote?.decode_workers ?? 0));
+  }
+  if (settingsRemoteQueueDepth) {
+    settingsRemoteQueueDepth.value = String(Number(config?.remote?.queue_depth ?? 32));
+  }
+  if (settingsRemoteQueuePolicy) {
+    settingsRemoteQueuePolicy.value = String(config?.remote?.queue_policy ?? "reject");
+  }
 
   settingsLogLevel.value = String(config?.logging?.level ?? "INFO").toUpperCase();
   settingsLogDir.value = String(config?.logging?.dir ?? "");
@@ -6180,6 +6918,25 @@ function collectSettingsForm() {
       max_scan_depth: Math.max(-1, asInt(settingsMaxScanDepth?.value, -1)),
       max_upload_mb: Math.max(0, asInt(settingsMaxUpload?.value, 0)),
     },
+    jobs: {
+      workers: Math.max(1, Math.min(32, asInt(settingsJobWorkers?.value, 2))),
+      isolation: settingsJobIsolation?.value === "thread" ? "thread" : "process",
+      max_rss_mb: Math.max(0, asInt(settingsJobMaxRss?.value, 0)),
+      checkpoint_interval_s: Math.max(0, asFloat(settingsJobCheckpoint?.value, 60)),
+      result_cache_mb: Math.max(0, asInt(settingsJobResultCache?.value, 2048)),
+      decode_workers: Math.max(0, Math.min(64, asInt(settingsJobDecodeWorkers?.value, 0))),
+    },
+    remote: {
+      ring_frames: Math.max(1, asInt(settingsRemoteRingFrames?.value, 64)),
+      ring_mb: Math.max(0, asInt(settingsRemoteRingMb?.value, 256)),
+      max_mb: Math.max(0, asInt(settingsRemoteMaxMb?.value, 1024)),
+      compression: ["zstd", "lz4", "none"].includes(settingsRemoteCompression?.value)
+        ? settingsRemoteCompression.value
+        : "zstd",
+      decode_workers: Math.max(0, Math.min(64, asInt(settingsRemoteDecodeWorkers?.value, 0))),
+      queue_depth: Math.max(1, Math.min(4096, asInt(settingsRemoteQueueDepth?.value, 32))),
+      queue_policy: settingsRemoteQueuePolicy?.value === "drop_oldest" ? "drop_oldest" : "reject",
+    },
     logging: {
       level: (settingsLogLevel?.value || "INFO").toUpperCase(),
       dir: (settingsLogDir?.value || "").trim(),
@@ -7613,6 +8370,62 @@ function updateRemoteMetaUI(meta) {
   }
 }
 
+function updateRemoteRecordUi(rec) {
+  const status = rec?.status || "";
+  remoteRecording = status === "recording" || status === "stopping";
+  if (remoteRecordBtn) {
+    remoteRecordBtn.textContent = remoteRecording ? "Stop recording" : "Record";
+    remoteRecordBtn.disabled = status === "stopping";
+  }
+  if (!remoteRecordStatusEl) return;
+  let text = "-";
+  if (status === "error") {
+    text = rec.error || "Recording failed";
+  } else if (rec) {
+    const dropped = Number(rec.frames_dropped || 0);
+    text = `${rec.message || status}, ${Number(rec.frames_written || 0)} frame(s)`;
+    if (dropped > 0) text += `, ${dropped} dropped`;
+  }
+  remoteRecordStatusEl.textContent = text;
+  remoteRecordStatusEl.title = rec?.file || "";
+}
+
+async function pollRemoteRecording() {
+  if (remoteRecordTimer) window.clearTimeout(remoteRecordTimer);
+  remoteRecordTimer = null;
+  const source = state.autoload.remoteSourceId || "default";
+  try {
+    const data = await fetchJSON(`${API}/remote/v1/record/status?source_id=${encodeURIComponent(source)}`);
+    if ((state.autoload.remoteSourceId || "default") !== source) return;
+    updateRemoteRecordUi(data.recordings?.[source] || null);
+    if (remoteRecording) {
+      remoteRecordTimer = window.setTimeout(pollRemoteRecording, 1000);
+    }
+  } catch (err) {
+    console.error(err);
+  }
+}
+
+async function toggleRemoteRecording() {
+  const source = state.autoload.remoteSourceId || "default";
+  const action = remoteRecording ? "stop" : "start";
+  if (remoteRecordBtn) remoteRecordBtn.disabled = true;
+  try {
+    const data = await fetchJSONWithInit(`${API}/remote/v1/record/${action}`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ source_id: source }),
+    });
+    updateRemoteRecordUi(data);
+    setStatus(action === "start" ? `Recording ${source}` : data.message || "Recording stopped");
+  } catch (err) {
+    console.error(err);
+    setStatus(err?.message || "Failed to change the recording");
+  }
+  if (remoteRecordBtn) remoteRecordBtn.disabled = false;
+  pollRemoteRecording();
+}
+
 function applyImageMeta(headers) {
   if (!headers) return;
   const distanceMm = parseHeaderFloat(headers, "X-Image-DetectorDistance-MM");
@@ -9604,7 +10417,7 @@ async function loadFrame() {
     state.dataset
   )}&index=${state.frameIndex}${
     state.thresholdCount > 1 ? `&threshold=${state.thresholdIndex}` : ""
-  }`;
+  }${state.frameBin > 1 ? `&bin=${state.frameBin}&op=${state.frameBinOp}` : ""}`;
   try {
     const res = await fetch(url);
     if (!res.ok) {
@@ -9956,6 +10769,16 @@ frameStep?.addEventListener("change", () => {
   closeToolbarPlaybackPopover();
 });
 
+frameBin?.addEventListener("change", () => {
+  setFrameBin(frameBin.value);
+  closeToolbarPlaybackPopover();
+});
+
+frameBinOp?.addEventListener("change", () => {
+  setFrameBin(state.frameBin, frameBinOp.value);
+  closeToolbarPlaybackPopover();
+});
+
 fpsSelect?.addEventListener("change", () => {
   setFps(Number(fpsSelect.value));
   closeToolbarPlaybackPopover();
@@ -9977,6 +10800,9 @@ autoloadMode?.addEventListener("change", () => {
   } else {
     startAutoload();
   }
+  if (state.autoload.mode === "remote") {
+    pollRemoteRecording();
+  }
 });
 
 autoloadWatchEnabled?.addEventListener("change", () => {
@@ -10028,8 +10854,10 @@ remoteSourceInput?.addEventListener("change", () => {
     analysisState.externalPeakSets = [];
     updateRemoteMetaUI({});
     schedulePeakOverlay();
+    watchRemoteSocket();
     autoloadTick();
   }
+  pollRemoteRecording();
 });
 
 [autoloadTypeHdf5, autoloadTypeTiff, autoloadTypeCbf].forEach((input) => {
@@ -11464,6 +12292,9 @@ if (fpsSelect) {
 if (frameStep) {
   setFrameStep(frameStep.value);
 }
+if (frameBin) {
+  setFrameBin(frameBin.value);
+}
 if (histLogX) {
   state.histLogX = histLogX.checked;
 }
@@ -11631,6 +12462,22 @@ peaksExportBtn?.addEventListener("click", () => {
   exportPeakCsv();
 });
 
+remoteRecordBtn?.addEventListener("click", () => {
+  toggleRemoteRecording();
+});
+
+hitsStartBtn?.addEventListener("click", () => {
+  if (state.hitFinding.running) {
+    cancelHitFinding();
+  } else {
+    startHitFinding();
+  }
+});
+
+hitsStatusEl?.addEventListener("click", () => {
+  openHitFindingOutput();
+});
+
 if (seriesSumOutput && !seriesSumOutput.value.trim()) {
   syncSeriesSumOutputPath(true);
 }
@@ -11646,6 +12493,13 @@ seriesSumOperation?.addEventListener("change", () => {
 seriesSumNormalizeEnable?.addEventListener("change", () => {
   updateSeriesSumUi();
 });
+seriesSumCorrectionsEnable?.addEventListener("change", () => {
+  updateSeriesSumUi();
+});
+
+seriesSumFormat?.addEventListener("change", () => {
+  updateSeriesSumUi();
+});
 
 seriesSumStep?.addEventListener("change", () => {
   validateSeriesStepInput(true);
@@ -11711,9 +12565,22 @@ seriesSumStart?.addEventListener("click", () => {
   startSeriesSumming();
 });
 
+seriesSumCancel?.addEventListener("click", () => {
+  cancelSeriesSumming();
+});
+
+seriesSumFollow?.addEventListener("click", () => {
+  if (state.seriesFollow.id) {
+    stopSeriesFollow();
+  } else {
+    startSeriesFollow();
+  }
+});
+
 renderPeakList();
 setSeriesSumProgress(0, "Idle");
 updateSeriesSumUi();
+refreshResumableSeriesJobs();
 if (pixelLabelToggle) {
   state.pixelLabels = pixelLabelToggle.checked;
   pixelLabelToggle.addEventListener("change", () => {
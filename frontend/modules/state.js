@@ -70,6 +70,8 @@ export function createAppState() {
     playTimer: null,
     fps: 1,
     step: 1,
+    frameBin: 1,
+    frameBinOp: "sum",
     panelWidth: 640,
     panelCollapsed: true,
     autoScale: true,
@@ -130,6 +132,7 @@ export function createAppState() {
       lastPoll: 0,
       lastMonitorSig: "",
       lastRemoteSeq: 0,
+      remotePending: false,
       lastMaskAttempt: 0,
       simplonMeta: {},
     },
@@ -142,5 +145,15 @@ export function createAppState() {
       openTarget: "",
       autoOutputPath: "",
     },
+    seriesFollow: {
+      id: "",
+      revision: 0,
+      framesSummed: 0,
+    },
+    hitFinding: {
+      id: "",
+      running: false,
+      output: "",
+    },
   };
 }
@@ -0,0 +1,66 @@
+"""Measure remote ingest decode throughput for CBF, CBF.GZ and EDF payloads.
+
+Builds one synthetic Pilatus-sized frame per format, then times
+``remote_read_image_bytes`` (the decode step of ``POST /api/remote/v1/frame``)
+over repeated calls.
+
+    python test_scripts/bench_image_decode.py --repeat 20
+"""
+
+import argparse
+import gzip
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.services.remote_stream import remote_read_image_bytes  # noqa: E402
+
+
+def _payloads(height: int, width: int) -> dict[str, bytes]:
+    import fabio.cbfimage
+    import fabio.edfimage
+
+    rng = np.random.default_rng(0)
+    frame = rng.poisson(20, size=(height, width)).astype(np.int32)
+    # Bragg-like hot spots and module gaps exercise the 16/32-bit escapes.
+    hot = rng.integers(0, frame.size, size=frame.size // 200)
+    frame.flat[hot] = rng.integers(200, 2_000_000, size=hot.size)
+    frame[:, width // 2 : width // 2 + 7] = -1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cbf_path = Path(tmp) / "frame.cbf"
+        edf_path = Path(tmp) / "frame.edf"
+        fabio.cbfimage.CbfImage(data=frame).write(str(cbf_path))
+        fabio.edfimage.EdfImage(data=frame).write(str(edf_path))
+        cbf = cbf_path.read_bytes()
+        edf = edf_path.read_bytes()
+    return {"cbf": cbf, "cbf.gz": gzip.compress(cbf, compresslevel=1), "edf": edf}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--height", type=int, default=2527)
+    parser.add_argument("--width", type=int, default=2463)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    pixels = args.height * args.width
+    for fmt, raw in _payloads(args.height, args.width).items():
+        remote_read_image_bytes(raw, meta={"format": fmt}, filename=None)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            remote_read_image_bytes(raw, meta={"format": fmt}, filename=None)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        print(
+            f"{fmt:7s} {len(raw) / 1e6:7.2f} MB  {elapsed * 1e3:8.1f} ms/frame  "
+            f"{1.0 / elapsed:6.1f} frames/s  {pixels / elapsed / 1e6:7.1f} Mpx/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Measure Remote Stream memory per retained frame and /latest egress per codec.
+
+Stores synthetic Eiger-like frames (low Poisson counts, saturated gaps) with
+each `remote.compression` setting, waits for the compression worker, then
+reports the bytes held per frame and the bytes sent by `/api/remote/v1/latest`
+to a client that accepts the stored encoding and to one that does not.
+
+    python test_scripts/bench_remote_compression.py --frames 16
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.app import app  # noqa: E402
+from backend.services.remote_stream import (  # noqa: E402
+    remote_configure,
+    remote_history,
+    remote_snapshot,
+    remote_store_frame,
+)
+
+
+def _frame(rng: np.random.Generator, height: int, width: int) -> np.ndarray:
+    frame = rng.poisson(2, size=(height, width)).astype(np.uint32)
+    frame[:, width // 2 : width // 2 + 10] = np.iinfo(np.uint32).max
+    return frame
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--height", type=int, default=2167)
+    parser.add_argument("--width", type=int, default=2070)
+    parser.add_argument("--frames", type=int, default=8)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = [_frame(rng, args.height, args.width) for _ in range(args.frames)]
+    client = TestClient(app)
+    for codec in ("none", "lz4", "zstd"):
+        source = f"bench-{codec}"
+        remote_configure(ring_frames=args.frames, ring_mb=4096, max_mb=4096, compression=codec)
+        start = time.perf_counter()
+        for frame in frames:
+            remote_store_frame(source_id=source, frame=frame, meta={}, seq=None)
+        stored = time.perf_counter() - start
+        while codec != "none" and remote_snapshot(source)["encoding"] is None:
+            time.sleep(0.005)
+        # Older frames finish first; the newest one was compressed last.
+        settled = time.perf_counter() - start
+        held = remote_history(source)["bytes"] / args.frames
+
+        sizes = {}
+        for label, headers in (
+            ("accepts", {"Accept-Encoding": codec, "X-Accept-Byte-Shuffle": "1"}),
+            ("plain", {"Accept-Encoding": "identity"}),
+        ):
+            start = time.perf_counter()
+            with client.stream(
+                "GET", "/api/remote/v1/latest", params={"source_id": source}, headers=headers
+            ) as res:
+                sent = sum(len(chunk) for chunk in res.iter_raw())
+            sizes[label] = (sent, time.perf_counter() - start)
+        raw = frames[0].nbytes
+        print(
+            f"{codec:5s} held {held / 1e6:6.2f} MB/frame ({raw / held:5.1f}x)  "
+            f"store {stored / args.frames * 1e3:6.2f} ms/frame  "
+            f"compressed after {settled * 1e3:7.1f} ms  "
+            f"egress {sizes['accepts'][0] / 1e6:6.2f} MB ({raw / sizes['accepts'][0]:5.1f}x, "
+            f"{sizes['accepts'][1] * 1e3:5.1f} ms)  "
+            f"plain {sizes['plain'][0] / 1e6:6.2f} MB ({sizes['plain'][1] * 1e3:5.1f} ms)"
+        )
+    remote_configure()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Measure Remote Stream store/snapshot throughput with many concurrent producers.
+
+Every producer thread feeds its own sources round-robin while reader threads
+poll the newest frame of random sources. The global byte budget is set low
+enough that every insert evicts, which is the path where all sources meet.
+
+    python test_scripts/bench_remote_contention.py --producers 32 --sources-per-producer 32
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.services.remote_stream import (  # noqa: E402
+    remote_configure,
+    remote_snapshot,
+    remote_store_raw,
+)
+
+
+def _run(args: argparse.Namespace, raw: bytes) -> tuple[float, float, float, float]:
+    per = max(1, args.sources_per_producer)
+    latencies: list[list[float]] = [[] for _ in range(args.producers)]
+    reads = [0] * args.readers
+    start_gate = threading.Barrier(args.producers + args.readers + 1)
+    done = threading.Event()
+
+    def _produce(idx: int) -> None:
+        sources = [f"bench-{idx * per + k}" for k in range(per)]
+        own = latencies[idx]
+        start_gate.wait()
+        for count in range(args.frames):
+            t0 = time.perf_counter()
+            remote_store_raw(
+                source_id=sources[count % per],
+                raw=raw,
+                dtype="<u2",
+                shape=(64, 64),
+                meta={},
+                seq=None,
+            )
+            own.append(time.perf_counter() - t0)
+
+    def _read(idx: int) -> None:
+        rng = random.Random(idx)
+        start_gate.wait()
+        while not done.is_set():
+            remote_snapshot(f"bench-{rng.randrange(args.producers * per)}")
+            reads[idx] += 1
+
+    producers = [threading.Thread(target=_produce, args=(i,)) for i in range(args.producers)]
+    readers = [threading.Thread(target=_read, args=(i,)) for i in range(args.readers)]
+    for thread in producers + readers:
+        thread.start()
+    start_gate.wait()
+    start = time.perf_counter()
+    for thread in producers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    for thread in readers:
+        thread.join()
+
+    samples = np.sort(np.concatenate([np.asarray(lat) for lat in latencies]))
+    return (
+        args.producers * args.frames / elapsed,
+        sum(reads) / elapsed,
+        samples[len(samples) // 2],
+        samples[int(len(samples) * 0.99)],
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--producers", type=int, default=32)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--frames", type=int, default=2000, help="frames per producer")
+    parser.add_argument("--sources-per-producer", type=int, default=32)
+    parser.add_argument("--max-mb", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5, help="runs; the median is reported")
+    args = parser.parse_args()
+
+    raw = np.zeros((64, 64), dtype="<u2").tobytes()
+    remote_configure(ring_frames=16, ring_mb=256, max_mb=args.max_mb, compression="none")
+    runs = [_run(args, raw) for _ in range(max(1, args.repeat))]
+    remote_configure()
+
+    rate, reads, p50, p99 = (float(np.median(column)) for column in zip(*runs))
+    print(
+        f"{args.producers} producers x {args.sources_per_producer} sources: "
+        f"{rate:9.0f} frames/s  {reads:9.0f} snapshots/s  "
+        f"store p50 {p50 * 1e6:7.1f} us  p99 {p99 * 1e6:8.1f} us"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Measure how multipart Remote Stream ingest affects other requests.
+
+Starts the backend with uvicorn, keeps several producers posting CBF (or
+gzipped CBF) frames to `POST /api/remote/v1/frame` and, meanwhile, times
+`GET /api/health`. When the decode runs on the event loop every health check
+queues behind it.
+
+    python test_scripts/bench_remote_ingest_loop.py --producers 4 --seconds 10
+"""
+
+import argparse
+import gzip
+import json
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _cbf_payload(height: int, width: int, fmt: str) -> bytes:
+    import fabio.cbfimage
+
+    rng = np.random.default_rng(0)
+    frame = rng.poisson(20, size=(height, width)).astype(np.int32)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "frame.cbf"
+        fabio.cbfimage.CbfImage(data=frame).write(str(path))
+        raw = path.read_bytes()
+    return gzip.compress(raw, compresslevel=1) if fmt == "cbf.gz" else raw
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--height", type=int, default=2527)
+    parser.add_argument("--width", type=int, default=2463)
+    parser.add_argument("--producers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--format", choices=["cbf", "cbf.gz"], default="cbf.gz")
+    args = parser.parse_args()
+
+    payload = _cbf_payload(args.height, args.width, args.format)
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.app:app", "--port", str(port)],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30.0
+        while True:
+            try:
+                httpx.get(f"{base}/api/health", timeout=1.0)
+                break
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.1)
+
+        stop = threading.Event()
+        status: dict[int, int] = {}
+        lock = threading.Lock()
+
+        def _produce(idx: int) -> None:
+            with httpx.Client(timeout=60.0) as client:
+                while not stop.is_set():
+                    res = client.post(
+                        f"{base}/api/remote/v1/frame",
+                        params={"source_id": f"bench-{idx}"},
+                        data={"meta": json.dumps({"format": args.format})},
+                        files={
+                            "image": (f"frame.{args.format}", payload, "application/octet-stream")
+                        },
+                    )
+                    with lock:
+                        status[res.status_code] = status.get(res.status_code, 0) + 1
+
+        probes: list[float] = []
+        producers = [threading.Thread(target=_produce, args=(i,)) for i in range(args.producers)]
+        for thread in producers:
+            thread.start()
+        started = time.monotonic()
+        with httpx.Client(timeout=60.0) as client:
+            while time.monotonic() - started < args.seconds:
+                t0 = time.perf_counter()
+                client.get(f"{base}/api/health")
+                probes.append(time.perf_counter() - t0)
+                time.sleep(0.01)
+        elapsed = time.monotonic() - started
+        stop.set()
+        for thread in producers:
+            thread.join()
+        metrics = httpx.get(f"{base}/api/remote/v1/metrics", timeout=5.0)
+    finally:
+        server.terminate()
+        server.wait()
+
+    values = np.sort(np.asarray(probes)) * 1e3
+    print(
+        f"{args.producers} producers: {status.get(200, 0) / elapsed:6.1f} frames/s "
+        f"(status {dict(sorted(status.items()))})  /api/health p50 {np.median(values):6.1f} ms  "
+        f"p99 {values[int(len(values) * 0.99)]:7.1f} ms  max {values[-1]:7.1f} ms"
+    )
+    if metrics.status_code == 200:
+        for source, stats in sorted(metrics.json()["sources"].items()):
+            print(f"  {source}: latency {stats['latency_ms']}  dropped {stats['dropped']}")
+
+
+if __name__ == "__main__":
+    main()
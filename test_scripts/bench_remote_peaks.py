@@ -0,0 +1,73 @@
+"""Measure Remote Stream peak-set ingest and transport, JSON versus binary.
+
+Builds `--sets` peak sets of `--points` points each, then times parsing them
+from JSON metadata and from the binary attachment, and fetching them through
+`/api/remote/v1/meta` (nested JSON lists) and `/api/remote/v1/peaks` (float32).
+
+    python test_scripts/bench_remote_peaks.py --sets 32 --points 10000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.app import app  # noqa: E402
+from backend.services.remote_stream import (  # noqa: E402
+    remote_extract_metadata,
+    remote_pack_peak_sets,
+    remote_store_frame,
+    remote_unpack_peak_sets,
+)
+
+
+def _median_ms(fn, repeat: int) -> tuple[float, object]:
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)) * 1e3, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sets", type=int, default=32)
+    parser.add_argument("--points", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5, help="runs; the median is reported")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    sets = [
+        {
+            "name": f"set-{idx}",
+            "color": "#00ff88",
+            "points": np.round(rng.uniform(0, 4000, (args.points, 3)), 2).tolist(),
+        }
+        for idx in range(args.sets)
+    ]
+    json_ms, meta = _median_ms(lambda: remote_extract_metadata({"peak_sets": sets}), args.repeat)
+    packed = remote_pack_peak_sets(meta["peak_sets"])
+    binary_ms, _ = _median_ms(lambda: remote_unpack_peak_sets(packed), args.repeat)
+    print(f"parse   JSON {json_ms:8.2f} ms   binary {binary_ms:8.2f} ms")
+
+    remote_store_frame(
+        source_id="bench-peaks", frame=np.zeros((16, 16), np.uint16), meta=meta, seq=1
+    )
+    client = TestClient(app)
+    for route in ("meta", "peaks"):
+        ms, res = _median_ms(
+            lambda: client.get(f"/api/remote/v1/{route}", params={"source_id": "bench-peaks"}),
+            args.repeat,
+        )
+        print(f"/{route:6s} {ms:8.2f} ms  {len(res.content) / 1e6:7.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
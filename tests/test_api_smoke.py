@@ -1,12 +1,18 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import threading
+import time
 import uuid
 
 import numpy as np
+import pytest
 from fastapi.testclient import TestClient
 
 from backend.app import ALBIS_VERSION, app
+from backend.routes import stream as stream_routes
+from backend.services.remote_stream import remote_frame_at
 
 
 def test_health_endpoint() -> None:
@@ -77,4 +83,284 @@ def test_remote_stream_roundtrip_raw_frame() -> None:
     meta_payload = meta_response.json()
     assert meta_payload["series_number"] == 7
     assert meta_payload["image_number"] == 11
-    assert len(meta_payload["peak_sets"]) == 1
+    assert meta_payload["peak_sets"][0]["points"] == [[1, 2, 10.0], [3, 1, 8.0]]
+    peaks = client.get("/api/remote/v1/peaks", params={"source_id": source_id, "seq": seq})
+    assert peaks.status_code == 200 and peaks.headers["x-remote-peaksets"] == "1"
+    size = int.from_bytes(peaks.content[:4], "little")
+    assert json.loads(peaks.content[4 : 4 + size])["sets"][0]["count"] == 2
+    rows = np.frombuffer(peaks.content[4 + size :], dtype="<f4").reshape(2, 3)
+    np.testing.assert_array_equal(rows, [[1, 2, 10], [3, 1, 8]])
+
+    # Peak sets may also come as a binary attachment in the peaks' own layout.
+    upload = client.post(
+        "/api/remote/v1/frame",
+        params={"source_id": source_id},
+        data={"meta": json.dumps({"format": "raw", "dtype": "<u2", "shape": [4, 6]})},
+        files={
+            "image": ("frame.raw", frame.tobytes(order="C"), "application/octet-stream"),
+            "peaks": ("peaks.bin", peaks.content, "application/octet-stream"),
+        },
+    )
+    assert upload.status_code == 200, upload.text
+    again = client.get("/api/remote/v1/peaks", params={"source_id": source_id})
+    assert again.headers["x-remote-seq"] == str(seq + 1)
+    assert again.content == peaks.content
+
+    # The ingests went through the decode queue and show up in the per-source metrics.
+    stats = client.get("/api/remote/v1/metrics", params={"source_id": source_id}).json()
+    source_stats = stats["sources"][source_id]
+    assert source_stats["stored"] == 2 and source_stats["dropped"] == 0
+    assert source_stats["latency_ms"]["last"] > 0
+    bad = client.post(
+        "/api/remote/v1/frame",
+        params={"source_id": source_id},
+        data={"meta": json.dumps({"format": "jpeg"})},
+        files={"image": ("frame.jpg", b"xx", "application/octet-stream")},
+    )
+    assert bad.status_code == 400
+    stats = client.get("/api/remote/v1/metrics", params={"source_id": source_id}).json()
+    assert stats["sources"][source_id]["failed"] == 1
+
+
+def test_remote_frame_by_seq_returns_retained_history() -> None:
+    client = TestClient(app)
+    source_id = f"pytest-{uuid.uuid4().hex[:8]}"
+    meta = {"format": "raw", "dtype": "<u2", "shape": [2, 3]}
+    for value in range(3):
+        frame = np.full((2, 3), value, dtype=np.uint16)
+        upload = client.post(
+            "/api/remote/v1/frame",
+            params={"source_id": source_id, "seq": 10 + value},
+            data={"meta": json.dumps({**meta, "image_number": value})},
+            files={"image": ("frame.raw", frame.tobytes(), "application/octet-stream")},
+        )
+        assert upload.status_code == 200
+
+    history = client.get("/api/remote/v1/history", params={"source_id": source_id}).json()
+    assert history["seqs"] == [10, 11, 12]
+    older = client.get("/api/remote/v1/frame", params={"source_id": source_id, "seq": 11})
+    assert older.status_code == 200
+    assert older.headers["x-remote-seq"] == "11"
+    assert older.headers["x-remote-image"] == "1"
+    np.testing.assert_array_equal(np.frombuffer(older.content, dtype="<u2"), 1)
+    meta_response = client.get("/api/remote/v1/meta", params={"source_id": source_id, "seq": 10})
+    assert meta_response.json()["image_number"] == 0
+    missing = client.get("/api/remote/v1/frame", params={"source_id": source_id, "seq": 3})
+    assert missing.status_code == 404
+    assert missing.json()["oldest_seq"] == 10
+
+
+def test_remote_v2_raw_body_ingest_and_sidecar_meta() -> None:
+    client = TestClient(app)
+    source_id = f"pytest-{uuid.uuid4().hex[:8]}"
+    frame = np.arange(12, dtype="<u2").reshape(3, 4)
+    upload = client.post(
+        "/api/remote/v2/frame",
+        params={"source_id": source_id},
+        content=frame.tobytes(),
+        headers={
+            "Content-Type": "application/octet-stream",
+            "X-Dtype": "<u2",
+            "X-Shape": "3,4",
+            "X-Seq": "5",
+            "X-Meta": json.dumps({"display_name": "raw body", "image_number": 5}),
+        },
+    )
+    assert upload.status_code == 200, upload.text
+    assert upload.json()["seq"] == 5
+    assert upload.json()["stored_as_received"] is True
+    latest = client.get("/api/remote/v1/latest", params={"source_id": source_id})
+    assert latest.headers["x-remote-display"] == "raw body"
+    assert latest.headers["x-shape"] == "3,4"
+    np.testing.assert_array_equal(np.frombuffer(latest.content, dtype="<u2").reshape(3, 4), frame)
+
+    # Sidecar metadata may arrive before its frame; big-endian frames are converted.
+    sidecar = client.post(
+        "/api/remote/v2/meta",
+        params={"source_id": source_id, "seq": 6},
+        json={"image_number": 6, "peak_sets": [{"name": "p", "points": [[1, 1]]}]},
+    )
+    assert sidecar.json()["attached"] is False
+    upload = client.post(
+        "/api/remote/v2/frame",
+        params={"source_id": source_id},
+        content=frame.astype(">u2").tobytes(),
+        headers={"X-Dtype": ">u2", "X-Shape": "3,4", "X-Seq": "6"},
+    )
+    assert upload.json()["stored_as_received"] is False
+    latest = client.get("/api/remote/v1/latest", params={"source_id": source_id})
+    assert latest.headers["x-dtype"] == "<u2"
+    assert latest.headers["x-remote-image"] == "6"
+    assert latest.headers["x-remote-peaksets"] == "1"
+    np.testing.assert_array_equal(np.frombuffer(latest.content, dtype="<u2").reshape(3, 4), frame)
+
+    bad = client.post(
+        "/api/remote/v2/frame",
+        params={"source_id": source_id},
+        content=frame.tobytes()[:-2],
+        headers={"X-Dtype": "<u2", "X-Shape": "3,4"},
+    )
+    assert bad.status_code == 400
+    assert "size mismatch" in bad.json()["detail"]
+
+
+def test_remote_latest_passes_compressed_frames_through() -> None:
+    zstandard = pytest.importorskip("zstandard")
+    client = TestClient(app)
+    source_id = f"pytest-{uuid.uuid4().hex[:8]}"
+    frame = np.random.default_rng(1).poisson(3, size=(200, 300)).astype("<u4")
+    client.post(
+        "/api/remote/v2/frame",
+        params={"source_id": source_id},
+        content=frame.tobytes(),
+        headers={"X-Dtype": "<u4", "X-Shape": "200,300"},
+    )
+    deadline = time.monotonic() + 5.0
+    while remote_frame_at(source_id, 1)["encoding"] is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    params = {"source_id": source_id}
+    passed = client.get(
+        "/api/remote/v1/latest",
+        params=params,
+        headers={"Accept-Encoding": "gzip, zstd", "X-Accept-Byte-Shuffle": "1"},
+    )
+    assert passed.headers["content-encoding"] == "zstd"
+    assert passed.headers["x-byte-shuffle"] == "4"
+    assert int(passed.headers["content-length"]) < frame.nbytes // 4
+    encoded = remote_frame_at(source_id, 1)["encoded"]
+    shuffled = zstandard.ZstdDecompressor().decompress(encoded)
+    assert passed.content in (encoded, shuffled)  # whether or not the client decodes zstd
+    unshuffled = np.frombuffer(shuffled, dtype=np.uint8).reshape(4, -1).T.tobytes()
+    np.testing.assert_array_equal(np.frombuffer(unshuffled, dtype="<u4").reshape(200, 300), frame)
+
+    # Without the opt-in, or without zstd in Accept-Encoding, the pixels are decompressed.
+    for headers in (
+        {"Accept-Encoding": "zstd"},
+        {"Accept-Encoding": "gzip, zstd;q=0", "X-Accept-Byte-Shuffle": "1"},
+    ):
+        plain = client.get("/api/remote/v1/latest", params=params, headers=headers)
+        assert "content-encoding" not in plain.headers
+        assert int(plain.headers["content-length"]) == frame.nbytes
+        np.testing.assert_array_equal(
+            np.frombuffer(plain.content, dtype="<u4").reshape(200, 300), frame
+        )
+
+
+def test_remote_long_poll_and_event_stream(monkeypatch) -> None:
+    monkeypatch.setattr(stream_routes, "_REMOTE_EVENTS_KEEPALIVE_S", 0.2)
+    monkeypatch.setattr(stream_routes, "_REMOTE_EVENTS_MAX_S", 0.5)
+    client = TestClient(app)
+    source_id = f"pytest-{uuid.uuid4().hex[:8]}"
+    frame = np.arange(6, dtype="<u2").reshape(2, 3)
+
+    def _post(seq: int) -> None:
+        client.post(
+            "/api/remote/v2/frame",
+            params={"source_id": source_id},
+            content=frame.tobytes(),
+            headers={"X-Dtype": "<u2", "X-Shape": "2,3", "X-Seq": str(seq)},
+        ).raise_for_status()
+
+    _post(1)
+    empty = client.get(
+        "/api/remote/v1/latest", params={"source_id": source_id, "after_seq": 1, "timeout": 0.05}
+    )
+    assert empty.status_code == 204
+
+    timer = threading.Timer(0.1, _post, args=(2,))
+    timer.start()
+    try:
+        waited = client.get(
+            "/api/remote/v1/latest", params={"source_id": source_id, "after_seq": 1, "timeout": 5}
+        )
+    finally:
+        timer.join()
+    assert waited.status_code == 200
+    assert waited.headers["x-remote-seq"] == "2"
+
+    # The stream replays the newest frame past after_seq, then pushes each new commit.
+    timer = threading.Timer(0.1, _post, args=(3,))
+    timer.start()
+    try:
+        with client.stream(
+            "GET", "/api/remote/v1/events", params={"source_id": source_id, "after_seq": 1}
+        ) as events:
+            body = "".join(events.iter_text())
+    finally:
+        timer.join()
+    messages = [
+        json.loads(line[len("data: ") :]) for line in body.splitlines() if line.startswith("data:")
+    ]
+    assert [message["seq"] for message in messages] == [2, 3]
+    assert messages[0]["shape"] == [2, 3] and "id: 2" in body
+
+
+def _ws_frame(header: dict, frame: np.ndarray) -> bytes:
+    encoded = json.dumps(header).encode()
+    return len(encoded).to_bytes(4, "little") + encoded + frame.tobytes()
+
+
+def test_remote_websocket_ingest_and_viewer_fan_out() -> None:
+    client = TestClient(app)
+    source_id = f"pytest-{uuid.uuid4().hex[:8]}"
+    frame = np.arange(12, dtype="<u2").reshape(3, 4)
+    layout = {"dtype": "<u2", "shape": [3, 4]}
+    url = f"/api/remote/v2/ws/stream?source_id={source_id}"
+    with client.websocket_connect(url) as viewer_a, client.websocket_connect(url) as viewer_b:
+        with client.websocket_connect(f"/api/remote/v2/ws/ingest?source_id={source_id}") as prod:
+            prod.send_bytes(_ws_frame({**layout, "seq": 3, "ack": True}, frame))
+            assert prod.receive_json() == {"seq": 3}
+            meta = {"image_number": 4, "peak_sets": [{"name": "p", "points": [[1, 2]]}]}
+            prod.send_bytes(_ws_frame({**layout, "meta": meta}, frame + 1))
+            prod.send_bytes(_ws_frame({**layout, "ack": True}, frame[:2]))
+            assert "size mismatch" in prod.receive_json()["error"]
+            prod.send_bytes(b"\x02")
+            assert "prefix" in prod.receive_json()["error"]
+
+        for viewer in (viewer_a, viewer_b):
+            for seq, expected in ((3, frame), (4, frame + 1)):
+                header = viewer.receive_json()
+                assert header["seq"] == seq
+                assert header["headers"]["X-Shape"] == "3,4"
+                data = np.frombuffer(viewer.receive_bytes(), dtype=header["headers"]["X-Dtype"])
+                np.testing.assert_array_equal(data.reshape(3, 4), expected)
+            assert header["meta"]["image_number"] == 4
+            # Peak sets follow the pixels as their own binary message, not as JSON lists.
+            assert header["meta"]["peak_sets"] == [{"name": "p", "color": "#4aa3ff", "count": 1}]
+            peaks = viewer.receive_bytes()
+            assert len(peaks) == header["peaks_nbytes"]
+            np.testing.assert_array_equal(np.frombuffer(peaks[-12:], dtype="<f4")[:2], [1, 2])
+
+    # A late viewer starts from the newest frame past after_seq.
+    with client.websocket_connect(f"{url}&after_seq=3") as viewer:
+        assert viewer.receive_json()["seq"] == 4
+        viewer.receive_bytes()
+
+    # Producers may append binary peak sets after the pixels.
+    packed = client.get("/api/remote/v1/peaks", params={"source_id": source_id}).content
+    with client.websocket_connect(f"/api/remote/v2/ws/ingest?source_id={source_id}") as prod:
+        header = {**layout, "ack": True, "peaks_nbytes": len(packed)}
+        prod.send_bytes(_ws_frame(header, frame) + packed)
+        assert prod.receive_json() == {"seq": 5}
+    latest = client.get("/api/remote/v1/peaks", params={"source_id": source_id})
+    assert latest.headers["x-remote-seq"] == "5" and latest.content == packed
+    # WebSocket frames go through the decode queue like HTTP ingest.
+    stats = client.get("/api/remote/v1/metrics", params={"source_id": source_id}).json()
+    # (The truncated frame failed its layout check before being queued.)
+    assert (stats["sources"][source_id]["stored"], stats["sources"][source_id]["failed"]) == (3, 0)
+
+
+def test_latest_frame_slot_skips_to_newest_frame() -> None:
+    async def _run() -> list[int]:
+        slot = stream_routes._LatestFrameSlot()
+        for version in (1, 2, 3):
+            slot.offer({"seq": version, "version": version})
+        first = await slot.take()
+        slot.offer({"seq": 3, "version": 3})  # repeated snapshot is not resent
+        slot.offer({"seq": 4, "version": 4})
+        second = await slot.take()
+        assert slot.dropped == 3
+        return [first["seq"], second["seq"]]
+
+    assert asyncio.run(_run()) == [3, 4]
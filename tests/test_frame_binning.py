@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.routes.frames import FrameRouteDeps, register_frame_routes
+from backend.services.hdf5_stack import HDF5StackService
+
+h5py = pytest.importorskip("h5py")
+
+
+def _client(tmp_path: Path, reads: list[tuple[int, int]]) -> TestClient:
+    stack = HDF5StackService(
+        data_dir=tmp_path,
+        get_allow_abs_paths=lambda: True,
+        is_within=lambda p, root: True,
+        get_h5py=lambda: h5py,
+    )
+
+    def extract_frames(view: dict[str, Any], start: int, stop: int, threshold: int) -> np.ndarray:
+        reads.append((start, stop))
+        return stack.extract_frames(view, start, stop, threshold)
+
+    app = FastAPI()
+    register_frame_routes(
+        app,
+        FrameRouteDeps(
+            ensure_hdf5_stack=lambda: None,
+            get_h5py=lambda: h5py,
+            resolve_file=lambda name: tmp_path / name,
+            resolve_dataset_view=stack.resolve_dataset_view,
+            extract_frame=stack.extract_frame,
+            extract_frames=extract_frames,
+            find_pixel_mask=stack.find_pixel_mask,
+            read_threshold_energies=stack.read_threshold_energies,
+        ),
+    )
+    return TestClient(app)
+
+
+def _decode(res: Any) -> np.ndarray:
+    shape = tuple(int(x) for x in res.headers["X-Shape"].split(","))
+    return np.frombuffer(res.content, dtype=np.dtype(res.headers["X-Dtype"])).reshape(shape)
+
+
+def test_frame_binning_reduces_contiguous_block_and_caches(tmp_path: Path) -> None:
+    data = np.arange(7 * 3 * 2, dtype=np.uint16).reshape(7, 3, 2)
+    with h5py.File(tmp_path / "stack.h5", "w") as h5:
+        h5.create_dataset("data", data=data)
+    reads: list[tuple[int, int]] = []
+    client = _client(tmp_path, reads)
+
+    params = {"file": "stack.h5", "dataset": "data", "index": 2, "bin": 3}
+    res = client.get("/api/frame", params=params)
+    assert res.status_code == 200
+    np.testing.assert_array_equal(_decode(res), data[2:5].astype(np.int64).sum(axis=0))
+    assert res.headers["X-Bin"] == "3"
+    assert reads == [(2, 5)]
+
+    res = client.get("/api/frame", params={**params, "op": "mean"})
+    np.testing.assert_allclose(_decode(res), data[2:5].mean(axis=0))
+    # Mean reuses the cached sum; max needs its own reduction.
+    assert reads == [(2, 5)]
+    res = client.get("/api/frame", params={**params, "op": "max"})
+    np.testing.assert_array_equal(_decode(res), data[2:5].max(axis=0))
+    assert reads == [(2, 5), (2, 5)]
+
+    # The last bin is clipped to the end of the stack.
+    res = client.get("/api/frame", params={**params, "index": 5})
+    assert res.headers["X-Bin"] == "2"
+    np.testing.assert_array_equal(_decode(res), data[5:7].astype(np.int64).sum(axis=0))
+
+    assert client.get("/api/frame", params={**params, "op": "median"}).status_code == 400
+
+
+def test_frame_binning_reads_large_bins_in_bounded_slices(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr("backend.routes.frames._BIN_SLICE_FRAMES", 4)
+    data = np.random.default_rng(1).integers(0, 1000, size=(11, 3, 2)).astype(np.uint32)
+    with h5py.File(tmp_path / "stack.h5", "w") as h5:
+        h5.create_dataset("data", data=data)
+    reads: list[tuple[int, int]] = []
+    client = _client(tmp_path, reads)
+
+    params = {"file": "stack.h5", "dataset": "data", "index": 1, "bin": 100000}
+    res = client.get("/api/frame", params=params)
+    assert res.headers["X-Bin"] == "10"
+    np.testing.assert_array_equal(_decode(res), data[1:].astype(np.int64).sum(axis=0))
+    assert reads == [(1, 5), (5, 9), (9, 11)]
+    res = client.get("/api/frame", params={**params, "op": "max"})
+    np.testing.assert_array_equal(_decode(res), data[1:].max(axis=0))
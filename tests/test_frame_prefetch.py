@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from backend.services.frame_prefetch import FramePrefetcher, decode_worker_count
+
+
+def test_frame_prefetcher_decodes_ahead_in_order() -> None:
+    active = 0
+    peak = 0
+    started: list[int] = []
+    lock = threading.Lock()
+
+    def read(idx: int) -> np.ndarray:
+        nonlocal active, peak
+        with lock:
+            started.append(idx)
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        return np.full((2, 2), idx)
+
+    order = [0, 3, 6, 1, 4, 7]
+    with FramePrefetcher(read, order, workers=3) as prefetcher:
+        assert [int(prefetcher.get(idx)[0, 0]) for idx in order] == order
+    assert peak > 1
+    assert sorted(started) == sorted(order)
+
+
+def test_frame_prefetcher_bounds_read_ahead() -> None:
+    started: list[int] = []
+    with FramePrefetcher(lambda idx: started.append(idx) or idx, range(100), workers=2) as pf:
+        assert pf.get(0) == 0
+        time.sleep(0.05)
+        assert len(started) <= 1 + 4
+
+
+def test_frame_prefetcher_skips_and_reads_unplanned_frames() -> None:
+    reads: list[int] = []
+
+    def read(idx: int) -> int:
+        reads.append(idx)
+        return idx * 10
+
+    with FramePrefetcher(read, range(20), workers=2, depth=3) as prefetcher:
+        assert prefetcher.get(5) == 50  # resume mid-plan: earlier frames are dropped
+        assert prefetcher.get(6) == 60
+        assert prefetcher.get(99) == 990  # not planned: read directly
+        assert prefetcher.get(7) == 70
+    assert not any(idx in reads for idx in range(3, 5))
+
+
+def test_frame_prefetcher_propagates_decode_errors() -> None:
+    def read(idx: int) -> int:
+        if idx == 2:
+            raise ValueError("corrupt frame")
+        return idx
+
+    with FramePrefetcher(read, range(5), workers=2) as prefetcher:
+        assert prefetcher.get(0) == 0
+        assert prefetcher.get(1) == 1
+        with pytest.raises(ValueError, match="corrupt"):
+            prefetcher.get(2)
+
+
+def test_decode_worker_count() -> None:
+    assert decode_worker_count(3) == 3
+    assert 1 <= decode_worker_count(0) <= 8
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import fields
+from pathlib import Path
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.routes.analysis import AnalysisRouteDeps, register_analysis_routes
+from backend.services.hdf5_stack import HDF5StackService
+from backend.services.hit_finding import HitFindingDeps, HitFindingService, count_peaks
+
+
+def _reference_count(frame: np.ndarray, bad: np.ndarray, saturation: float, min_intensity: float):
+    # Straight port of the viewer's per-pixel criterion.
+    height, width = frame.shape
+
+    def value(y: int, x: int) -> float:
+        v = float(frame[y, x])
+        if bad[y, x] or v >= saturation or not np.isfinite(v):
+            return -np.inf
+        return v
+
+    peaks = 0
+    for y in range(1, height - 1):
+        for x in range(1, width - 1):
+            v = value(y, x)
+            if not v > 0 or v < min_intensity:
+                continue
+            if (
+                v > value(y, x - 1)
+                and v >= value(y, x + 1)
+                and v > value(y - 1, x)
+                and v >= value(y + 1, x)
+            ):
+                peaks += 1
+    return peaks
+
+
+def test_count_peaks_matches_per_pixel_criterion() -> None:
+    rng = np.random.default_rng(4)
+    frames = rng.integers(0, 6, size=(5, 12, 14)).astype(np.uint16)
+    frames[1, 4, 4] = 65535  # saturated pixels are ignored
+    frames[2] = 3  # flat frame: plateaus are not peaks
+    bad = np.zeros((12, 14), dtype=bool)
+    bad[6, 2:9] = True
+
+    counts = count_peaks(frames, bad_pixels=bad, saturation=65535, min_intensity=2)
+    expected = [_reference_count(frame, bad, 65535, 2) for frame in frames]
+    assert counts.dtype == np.int32
+    assert counts.tolist() == expected
+    assert counts[2] == 0
+
+
+def test_hit_finding_writes_hits_only_virtual_dataset(tmp_path: Path) -> None:
+    h5py = pytest.importorskip("h5py")
+    rng = np.random.default_rng(11)
+    data = rng.integers(0, 2, size=(12, 16, 16)).astype(np.uint32)
+    hit_frames = [2, 3, 7, 10]
+    for idx in hit_frames:
+        for y, x in [(3, 3), (3, 11), (8, 6), (12, 12), (12, 3)]:
+            data[idx, y, x] = 50
+    mask = np.zeros((16, 16), dtype=np.uint32)
+    mask[8, 6] = 1  # masks one spot, the others still make a hit
+    master = tmp_path / "scan_master.h5"
+    with h5py.File(master, "w") as h5:
+        h5.create_dataset("/entry/instrument/detector/detectorSpecific/pixel_mask", data=mask)
+        h5.require_group("/entry/data")
+        for member, (lo, hi) in enumerate([(0, 5), (5, 12)], start=1):
+            name = f"scan_data_{member:06d}.h5"
+            with h5py.File(tmp_path / name, "w") as part:
+                part.create_dataset("data", data=data[lo:hi], chunks=(2, 16, 16))
+            h5[f"/entry/data/data_{member:06d}"] = h5py.ExternalLink(name, "/data")
+
+    stack = HDF5StackService(
+        data_dir=tmp_path,
+        get_allow_abs_paths=lambda: True,
+        is_within=lambda p, root: p.resolve().is_relative_to(root.resolve()),
+        get_h5py=lambda: h5py,
+    )
+    reading = threading.Event()
+    reading.set()
+
+    def extract_frames(view, start, stop, threshold):
+        reading.wait(5.0)
+        return stack.extract_frames(view, start, stop, threshold)
+
+    service = HitFindingService(
+        HitFindingDeps(
+            data_dir=tmp_path,
+            get_allow_abs_paths=lambda: False,
+            is_within=lambda p, root: p.resolve().is_relative_to(root.resolve()),
+            logger=logging.getLogger("test"),
+            ensure_hdf5_stack=lambda: None,
+            get_h5py=lambda: h5py,
+            resolve_image_file=lambda name: tmp_path / name,
+            resolve_dataset_view=stack.resolve_dataset_view,
+            extract_frames=extract_frames,
+            frame_chunk_depth=stack.frame_chunk_depth,
+            find_pixel_mask=stack.find_pixel_mask,
+            get_decode_workers=lambda: 2,
+            get_job_workers=lambda: 1,
+        )
+    )
+    route_deps = {field.name: None for field in fields(AnalysisRouteDeps)}
+    route_deps.update(
+        start_hit_finding=service.start,
+        get_hit_finding=service.get_status,
+        cancel_hit_finding=service.cancel,
+        hit_finding_peak_counts=service.peak_counts,
+    )
+    app = FastAPI()
+    register_analysis_routes(app, AnalysisRouteDeps(**route_deps))
+    client = TestClient(app)
+
+    res = client.post(
+        "/api/analysis/hit-finding/start",
+        json={"file": master.name, "dataset": "/entry/data", "min_peaks": 4, "min_intensity": 10},
+    )
+    assert res.status_code == 200, res.text
+    job_id = res.json()["id"]
+    deadline = time.monotonic() + 10.0
+    status = res.json()
+    while status["status"] in {"queued", "running"} and time.monotonic() < deadline:
+        time.sleep(0.05)
+        status = client.get("/api/analysis/hit-finding/status", params={"id": job_id}).json()
+    assert status["status"] == "done", status
+    assert status["hit_count"] == len(hit_frames)
+    assert status["saturation"] == float(np.iinfo(np.uint32).max)
+
+    counts_res = client.get("/api/analysis/hit-finding/peak-counts", params={"id": job_id})
+    counts = np.frombuffer(counts_res.content, dtype=counts_res.headers["X-Dtype"])
+    assert counts.shape == (12,)
+    assert [int(idx) for idx in np.flatnonzero(counts >= 4)] == hit_frames
+
+    output = Path(status["output"])
+    assert output == tmp_path / "scan_master_hits.h5"
+    with h5py.File(output, "r") as h5:
+        assert h5["/entry/data/data"].is_virtual
+        np.testing.assert_array_equal(h5["/entry/data/data"][()], data[hit_frames])
+        np.testing.assert_array_equal(h5["/entry/hits/frame_index"][()], hit_frames)
+        np.testing.assert_array_equal(h5["/entry/hits/peak_counts"][()], counts)
+        # The copied detector metadata lets the viewer apply the same mask.
+        np.testing.assert_array_equal(
+            h5["/entry/instrument/detector/detectorSpecific/pixel_mask"][()], mask
+        )
+
+    outside = client.post(
+        "/api/analysis/hit-finding/start",
+        json={"file": master.name, "dataset": "/entry/data", "output_path": "/elsewhere/x.h5"},
+    )
+    assert outside.status_code == 400
+    assert client.post("/api/analysis/hit-finding/start", json={"file": "x.h5"}).status_code == 400
+    bad = client.post(
+        "/api/analysis/hit-finding/start",
+        json={"file": master.name, "dataset": "/entry/data", "threshold": "x"},
+    )
+    assert bad.status_code == 400
+
+    # One worker: a second job waits in the queue and can be cancelled there.
+    reading.clear()
+    params = {"file": master.name, "dataset": "/entry/data", "output_path": "busy.h5"}
+    running = client.post("/api/analysis/hit-finding/start", json=params).json()
+    queued = client.post(
+        "/api/analysis/hit-finding/start", json={**params, "output_path": "queued.h5"}
+    ).json()
+    assert (
+        client.get("/api/analysis/hit-finding/status", params={"id": queued["id"]}).json()["status"]
+        == "queued"
+    )
+    cancelled = client.post("/api/analysis/hit-finding/cancel", json={"id": queued["id"]})
+    assert cancelled.json()["status"] == "cancelled"
+    client.post("/api/analysis/hit-finding/cancel", json={"id": running["id"]})
+    reading.set()
+    deadline = time.monotonic() + 10.0
+    while service.get_status(running["id"])["status"] in {"queued", "running"}:
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    assert not (tmp_path / "queued.h5").exists()
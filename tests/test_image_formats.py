@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import gzip
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from backend.image_formats import (
+    _CBF_BINARY_START,
+    _decode_cbf_byte_offset,
+    _decode_cbf_byte_offset_numpy,
+    _read_cbf,
+    _read_edf,
+)
+from backend.services.remote_stream import remote_read_image_bytes
+
+
+@pytest.fixture
+def no_temp_files(monkeypatch: pytest.MonkeyPatch) -> None:
+    def _fail(*_args, **_kwargs):
+        raise AssertionError("decoding must not touch temporary files")
+
+    monkeypatch.setattr(tempfile, "NamedTemporaryFile", _fail)
+
+
+def test_cbf_byte_offset_decoders_match_fabio(tmp_path: Path, no_temp_files: None) -> None:
+    cbfimage = pytest.importorskip("fabio.cbfimage")
+    rng = np.random.default_rng(3)
+    frame = rng.poisson(30, size=(40, 56)).astype(np.int64)
+    frame[5, 7:20] = rng.integers(200, 40_000, size=13)  # 16-bit deltas
+    frame[9, 3] = 2**31 - 1  # 32-bit deltas and a 64-bit one back down
+    frame[9, 4] = -(2**31)
+    frame[12, 0] = frame[11, -1] + 0x8080  # 0x80 bytes inside a wide delta
+    frame[20, :] = -1
+    frame = frame.astype(np.int32)
+    path = tmp_path / "frame.cbf"
+    cbfimage.CbfImage(data=frame).write(str(path))
+    raw = path.read_bytes()
+
+    payload = raw[raw.find(_CBF_BINARY_START) + 4 :]
+    for decode in (_decode_cbf_byte_offset, _decode_cbf_byte_offset_numpy):
+        values = decode(payload, frame.size, np.int32)
+        assert values.dtype == np.int32
+        np.testing.assert_array_equal(values.reshape(frame.shape), frame)
+        with pytest.raises(ValueError):
+            decode(payload[:100], frame.size, np.int32)
+
+    np.testing.assert_array_equal(_read_cbf(path), frame)
+    for fmt, body in (("cbf", raw), ("cbf.gz", gzip.compress(raw))):
+        arr = remote_read_image_bytes(body, meta={"format": fmt}, filename=None)
+        assert arr.dtype == np.int32
+        np.testing.assert_array_equal(arr, frame)
+
+
+def test_edf_reads_from_memory_in_either_byte_order(tmp_path: Path, no_temp_files: None) -> None:
+    edfimage = pytest.importorskip("fabio.edfimage")
+    frame = np.arange(6 * 9, dtype=np.float32).reshape(6, 9) - 20.5
+    path = tmp_path / "frame.edf"
+    edfimage.EdfImage(data=frame).write(str(path))
+
+    arr = _read_edf(path)
+    np.testing.assert_array_equal(arr, frame)
+    arr[0, 0] = 1.0  # file frames stay writable
+
+    raw = path.read_bytes()
+    close = raw.index(b"}\n") + 2
+    header = raw[:close].replace(b"LowByteFirst", b"HighByteFirst")
+    swapped = header + frame.astype(">f4").tobytes()
+    arr = remote_read_image_bytes(swapped, meta={}, filename="remote.edf")
+    assert arr.dtype == np.dtype("<f4")
+    np.testing.assert_array_equal(arr, frame)
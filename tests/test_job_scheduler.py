@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from backend.services.job_scheduler import JobCancelled, JobScheduler
+
+
+def _wait_until(predicate, timeout_s: float = 5.0) -> None:
+    deadline = time.time() + timeout_s
+    while time.time() < deadline:
+        if predicate():
+            return
+        time.sleep(0.01)
+    raise AssertionError("condition not reached in time")
+
+
+def test_scheduler_bounds_workers_and_orders_by_priority() -> None:
+    scheduler = JobScheduler(lambda: 1)
+    release = threading.Event()
+    order: list[str] = []
+
+    def job(name: str):
+        def run() -> None:
+            order.append(name)
+            if name == "first":
+                release.wait(5.0)
+
+        return run
+
+    scheduler.submit("first", job("first"))
+    _wait_until(lambda: order == ["first"])
+    scheduler.submit("low", job("low"))
+    scheduler.submit("low2", job("low2"))
+    scheduler.submit("high", job("high"), priority=5)
+
+    assert scheduler.running_count == 1
+    assert scheduler.queue_position("high") == 1
+    assert scheduler.queue_position("low") == 2
+    assert scheduler.queue_position("low2") == 3
+    assert scheduler.queue_position("first") is None
+
+    assert scheduler.cancel("low2") == "queued"
+    release.set()
+    _wait_until(lambda: len(order) == 3 and scheduler.running_count == 0)
+    assert order == ["first", "high", "low"]
+
+
+def test_scheduler_cooperative_cancel_of_running_job() -> None:
+    scheduler = JobScheduler(lambda: 2)
+    started = threading.Event()
+    outcome: list[str] = []
+
+    def run() -> None:
+        started.set()
+        try:
+            while True:
+                scheduler.check_cancelled("job")
+                time.sleep(0.01)
+        except JobCancelled:
+            outcome.append("cancelled")
+
+    scheduler.submit("job", run)
+    assert started.wait(5.0)
+    assert scheduler.cancel("job") == "running"
+    _wait_until(lambda: outcome == ["cancelled"])
+    _wait_until(lambda: scheduler.running_count == 0)
+    assert scheduler.cancel("job") is None
+    assert not scheduler.is_cancelled("job")
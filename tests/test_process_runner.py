@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pytest
+
+from backend.services.job_scheduler import JobCancelled
+from backend.services.process_runner import ProcessJobRunner, WorkerFailed
+from backend.services.series_ops import iter_sum_groups, mask_flag_value, mask_slices
+from backend.services.series_summing import SeriesSummingDeps, SeriesSummingService
+from backend.services.series_worker import run_series_job
+
+_LOGGER = type("L", (), {"exception": print, "warning": print})()
+
+
+# Worker targets must be importable module-level functions (spawn start method).
+def _echo_target(job_id, payload, report, check_cancelled) -> None:
+    report({"progress": 0.5, "pid": os.getpid()})
+    report({"status": "done", "value": payload["value"] * 2})
+
+
+def _crash_target(job_id, payload, report, check_cancelled) -> None:
+    report({"status": "running"})
+    os._exit(3)
+
+
+def _hog_target(job_id, payload, report, check_cancelled) -> None:
+    hog = np.ones(payload["mb"] * 1024 * 1024, dtype=np.uint8)
+    report({"status": "running", "size": int(hog.size)})
+    time.sleep(30)
+
+
+def _cancellable_target(job_id, payload, report, check_cancelled) -> None:
+    report({"status": "running"})
+    try:
+        for _ in range(300):
+            check_cancelled()
+            time.sleep(0.01)
+    except JobCancelled:
+        report({"status": "cancelled"})
+        return
+    report({"status": "done"})
+
+
+def _series_crash_target(job_id, payload, report, check_cancelled) -> None:
+    # Dies (without cleaning up) at the first progress update after an output was opened.
+    opened = []
+
+    def _report(changes: dict[str, Any]) -> None:
+        report(changes)
+        if "partial_output" in changes:
+            opened.append(changes["partial_output"])
+        elif opened and Path(opened[0]).exists():
+            os._exit(3)
+
+    run_series_job(job_id, payload, _report, check_cancelled)
+
+
+def _runner(target, max_rss_mb: int = 0) -> ProcessJobRunner:
+    return ProcessJobRunner(
+        target,
+        get_max_idle=lambda: 1,
+        get_max_rss_mb=lambda: max_rss_mb,
+        logger=_LOGGER,
+        poll_interval_s=0.05,
+    )
+
+
+def _run(runner: ProcessJobRunner, payload: dict[str, Any], **kwargs: Any) -> list[dict]:
+    updates: list[dict[str, Any]] = []
+    runner.run(
+        "job",
+        payload,
+        on_update=updates.append,
+        is_cancelled=kwargs.get("is_cancelled", lambda: False),
+    )
+    return updates
+
+
+def test_process_runner_reports_updates_and_reuses_worker() -> None:
+    runner = _runner(_echo_target)
+    try:
+        first = _run(runner, {"value": 21})
+        assert first[-1] == {"status": "done", "value": 42}
+        assert first[0]["pid"] != os.getpid()
+        second = _run(runner, {"value": 1})
+        assert second[0]["pid"] == first[0]["pid"]
+        assert runner.idle_count == 1
+    finally:
+        runner.shutdown()
+
+
+def test_process_runner_restarts_crashed_worker() -> None:
+    runner = _runner(_crash_target)
+    try:
+        with pytest.raises(WorkerFailed, match="code 3"):
+            _run(runner, {})
+        deadline = time.time() + 30.0
+        while runner.idle_count < 1 and time.time() < deadline:
+            time.sleep(0.05)
+        assert runner.idle_count == 1
+    finally:
+        runner.shutdown()
+
+
+def test_process_runner_kills_worker_over_memory_limit() -> None:
+    runner = _runner(_hog_target, max_rss_mb=300)
+    try:
+        started = time.time()
+        with pytest.raises(WorkerFailed, match="memory limit"):
+            _run(runner, {"mb": 600})
+        assert time.time() - started < 25.0
+    finally:
+        runner.shutdown()
+
+
+def test_process_runner_forwards_cancellation() -> None:
+    runner = _runner(_cancellable_target)
+    cancelled = threading.Event()
+    threading.Timer(0.3, cancelled.set).start()
+    try:
+        updates = _run(runner, {}, is_cancelled=cancelled.is_set)
+        assert updates[-1] == {"status": "cancelled"}
+    finally:
+        runner.shutdown()
+
+
+def _isolated_series_service(tmp_path: Path, worker_target: Any) -> SeriesSummingService:
+    def _unused(*_args, **_kwargs):
+        raise AssertionError("isolated jobs must not read data in the server process")
+
+    return SeriesSummingService(
+        SeriesSummingDeps(
+            data_dir=tmp_path,
+            get_allow_abs_paths=lambda: True,
+            is_within=lambda p, root: True,
+            logger=_LOGGER,
+            ensure_hdf5_stack=_unused,
+            get_h5py=_unused,
+            resolve_image_file=lambda name: tmp_path / name,
+            image_ext_name=_unused,
+            resolve_series_files=_unused,
+            read_tiff=_unused,
+            read_cbf=_unused,
+            read_cbf_gz=_unused,
+            read_edf=_unused,
+            write_tiff=_unused,
+            iter_sum_groups=iter_sum_groups,
+            mask_flag_value=mask_flag_value,
+            mask_slices=mask_slices,
+            resolve_dataset_view=_unused,
+            extract_frame=_unused,
+            extract_frames=_unused,
+            frame_chunk_depth=_unused,
+            find_pixel_mask=_unused,
+            get_job_isolation=lambda: "process",
+            worker_target=worker_target,
+        )
+    )
+
+
+def test_series_job_runs_in_worker_process(tmp_path: Path) -> None:
+    h5py = pytest.importorskip("h5py")
+    data = np.arange(6 * 3 * 4, dtype=np.uint16).reshape(6, 3, 4)
+    source = tmp_path / "stack.h5"
+    with h5py.File(source, "w") as h5:
+        h5.create_dataset("/entry/data/data", data=data)
+    dark = np.full((3, 4), 2, dtype=np.uint16)
+    with h5py.File(tmp_path / "dark.h5", "w") as h5:
+        h5.create_dataset("/entry/data/data", data=dark)
+
+    service = _isolated_series_service(tmp_path, run_series_job)
+    try:
+        job_id = service.start_job(
+            file="stack.h5",
+            dataset="/entry/data/data",
+            mode="chunks",
+            step=3,
+            operation="sum",
+            normalize_frame=None,
+            range_start=None,
+            range_end=None,
+            output_path="out/sum.h5",
+            output_format="hdf5",
+            apply_mask=False,
+            # Relative to the data directory, not to the worker's working directory.
+            dark_file="dark.h5",
+            dark_dataset="/entry/data/data",
+        )
+        deadline = time.time() + 60.0
+        job = service.get_job(job_id) or {}
+        while job.get("status") not in {"done", "error", "cancelled"} and time.time() < deadline:
+            time.sleep(0.05)
+            job = service.get_job(job_id) or {}
+        assert job["status"] == "done", job
+        with h5py.File(job["outputs"][0], "r") as out:
+            np.testing.assert_array_equal(
+                out["/entry/data/data"][()],
+                (data.astype(np.float64) - dark).reshape(2, 3, 3, 4).sum(axis=1),
+            )
+    finally:
+        service.shutdown()
+
+
+def test_series_job_outputs_of_a_dead_worker_are_removed(tmp_path: Path) -> None:
+    h5py = pytest.importorskip("h5py")
+    with h5py.File(tmp_path / "stack.h5", "w") as h5:
+        h5.create_dataset("/entry/data/data", data=np.ones((6, 3, 4), dtype=np.uint16))
+    service = _isolated_series_service(tmp_path, _series_crash_target)
+    try:
+        job_id = service.start_job(
+            file="stack.h5",
+            dataset="/entry/data/data",
+            mode="chunks",
+            step=1,
+            operation="sum",
+            normalize_frame=None,
+            range_start=None,
+            range_end=None,
+            output_path="out/sum.h5",
+            output_format="hdf5",
+            apply_mask=False,
+        )
+        deadline = time.time() + 60.0
+        job = service.get_job(job_id) or {}
+        while job.get("status") not in {"done", "error", "cancelled"} and time.time() < deadline:
+            time.sleep(0.05)
+            job = service.get_job(job_id) or {}
+        assert job["status"] == "error" and job["resumable"] is False, job
+        assert list((tmp_path / "out").iterdir()) == []
+        assert "partial_output" not in job
+    finally:
+        service.shutdown()
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from backend.services.remote_ingest import RemoteIngestQueue
+
+
+def _blocked_queue(policy: str) -> tuple[RemoteIngestQueue, threading.Event]:
+    # One worker stuck on a gate job, so everything submitted afterwards stays queued.
+    queue = RemoteIngestQueue(workers=1, depth=2, policy=policy)
+    gate = threading.Event()
+    started = threading.Event()
+
+    def _hold() -> str:
+        started.set()
+        gate.wait(5.0)
+        return "held"
+
+    queue.submit("gate", _hold)
+    assert started.wait(5.0)
+    return queue, gate
+
+
+def test_ingest_queue_rejects_when_full() -> None:
+    queue, gate = _blocked_queue("reject")
+    first = queue.submit("cam", lambda: 1)
+    second = queue.submit("cam", lambda: 2)
+    with pytest.raises(HTTPException) as excinfo:
+        queue.submit("cam", lambda: 3)
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.headers == {"Retry-After": "1"}
+    gate.set()
+    assert (first.result(5.0), second.result(5.0)) == (1, 2)
+
+    stats = queue.metrics("cam")["sources"]["cam"]
+    assert (stats["submitted"], stats["stored"], stats["rejected"], stats["queued"]) == (2, 2, 1, 0)
+    assert stats["latency_ms"]["max"] >= stats["queue_wait_ms"]["max"] > 0
+
+
+def test_ingest_queue_drops_oldest_frame_of_the_same_source_first() -> None:
+    queue, gate = _blocked_queue("drop_oldest")
+    other = queue.submit("other", lambda: "other")
+    old = queue.submit("cam", lambda: "old")
+    new = queue.submit("cam", lambda: "new")
+    assert old.result(5.0) is None  # displaced by the newer frame of its own source
+    newest = queue.submit("third", lambda: "third")
+    assert other.result(5.0) is None  # no queued frame of "third": the oldest overall goes
+    gate.set()
+    assert (new.result(5.0), newest.result(5.0)) == ("new", "third")
+
+    metrics = queue.metrics()
+    assert metrics["policy"] == "drop_oldest" and metrics["queue_depth"] == 2
+    assert metrics["sources"]["cam"]["dropped"] == 1
+    assert metrics["sources"]["other"]["dropped"] == 1
+    assert metrics["sources"]["third"]["dropped"] == 0
+
+
+def test_ingest_queue_reports_failures_to_the_caller() -> None:
+    queue = RemoteIngestQueue(workers=2, depth=4)
+
+    def _bad() -> None:
+        raise HTTPException(status_code=400, detail="Unsupported remote image format: x")
+
+    with pytest.raises(HTTPException):
+        queue.submit("cam", _bad).result(5.0)
+    assert queue.metrics("cam")["sources"]["cam"]["failed"] == 1
+    queue.configure(workers=1, depth=4, policy="reject")
+    assert queue.submit("cam", lambda: 7).result(5.0) == 7
+
+
+def test_ingest_queue_stores_frames_of_a_source_in_submit_order() -> None:
+    queue = RemoteIngestQueue(workers=4, depth=16)
+    stored: list[int] = []
+
+    def _decode(idx: int) -> int:
+        time.sleep(0.02 * (5 - idx))  # earlier frames decode slower
+        if idx == 2:
+            raise HTTPException(status_code=400, detail="bad frame")
+        return idx
+
+    def _store(idx: int) -> int:
+        stored.append(idx)
+        return len(stored)  # the order number a server-side seq would get
+
+    futures = [queue.submit("cam", lambda idx=idx: _decode(idx), _store) for idx in range(5)]
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result(5.0))
+        except HTTPException:
+            results.append(None)
+    assert stored == [0, 1, 3, 4]
+    assert results == [1, 2, None, 3, 4]
+    stats = queue.metrics("cam")["sources"]["cam"]
+    assert (stats["stored"], stats["failed"]) == (4, 1)
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import fields
+from pathlib import Path
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.routes.stream import StreamRouteDeps, register_stream_routes
+from backend.services import remote_recorder
+from backend.services.hdf5_stack import HDF5StackService
+from backend.services.remote_recorder import RemoteRecorderDeps, RemoteRecorderService
+from backend.services.remote_stream import (
+    remote_configure,
+    remote_extract_metadata,
+    remote_frame_bytes,
+    remote_safe_source_id,
+    remote_store_frame,
+    remote_subscribe,
+)
+
+
+def _service(tmp_path: Path, h5py, frame_bytes=remote_frame_bytes) -> RemoteRecorderService:
+    return RemoteRecorderService(
+        RemoteRecorderDeps(
+            data_dir=tmp_path,
+            get_allow_abs_paths=lambda: False,
+            is_within=lambda p, root: p.resolve().is_relative_to(root.resolve()),
+            logger=logging.getLogger("test"),
+            get_h5py=lambda: h5py,
+            subscribe=remote_subscribe,
+            frame_bytes=frame_bytes,
+        )
+    )
+
+
+def test_remote_recording_writes_a_chunked_stack_with_frame_metadata(tmp_path: Path) -> None:
+    h5py = pytest.importorskip("h5py")
+    pytest.importorskip("hdf5plugin")
+    service = _service(tmp_path, h5py)
+    route_deps = {field.name: None for field in fields(StreamRouteDeps)}
+    route_deps.update(
+        remote_safe_source_id=remote_safe_source_id,
+        remote_record_start=service.start,
+        remote_record_stop=service.stop,
+        remote_record_status=service.status,
+    )
+    app = FastAPI()
+    register_stream_routes(app, StreamRouteDeps(**route_deps))
+    client = TestClient(app)
+
+    # Frames above the compression threshold are compressed in the ring meanwhile.
+    remote_configure(ring_frames=4, compression="zstd")
+    try:
+        remote_store_frame(
+            source_id="rec-cam", frame=np.zeros((8, 8), np.uint16), meta={}, seq=None
+        )  # before the recording: not written
+        res = client.post(
+            "/api/remote/v1/record/start",
+            json={"source_id": "rec-cam", "output_path": "rec/monitor.h5"},
+        )
+        assert res.status_code == 200, res.text
+        assert (
+            client.post("/api/remote/v1/record/start", json={"source_id": "rec-cam"}).status_code
+            == 409
+        )
+        rng = np.random.default_rng(3)
+        frames = [rng.poisson(3, size=(200, 180)).astype(np.uint16) for _ in range(5)]
+        for idx, frame in enumerate(frames):
+            meta = remote_extract_metadata(
+                {
+                    "image_number": idx + 1,
+                    "resolution": {
+                        "distance_mm": 150.0 + idx,
+                        "energy_ev": 12400.0,
+                        "beam_center_px": [90.5, 100.25],
+                    },
+                }
+            )
+            remote_store_frame(source_id="rec-cam", frame=frame, meta=meta, seq=10 + idx)
+        remote_store_frame(
+            source_id="rec-cam", frame=np.zeros((4, 4), np.uint16), meta={}, seq=20
+        )  # other layout: skipped
+        status = client.post("/api/remote/v1/record/stop", json={"source_id": "rec-cam"}).json()
+    finally:
+        remote_configure()
+
+    assert status["status"] == "done", status
+    assert (status["frames_written"], status["frames_skipped"], status["frames_dropped"]) == (
+        5,
+        1,
+        0,
+    )
+    assert (status["first_seq"], status["last_seq"]) == (10, 14)
+    output = tmp_path / "rec" / "monitor.h5"
+    assert status["file"] == str(output) and not Path(f"{output}.part").exists()
+    listed = client.get("/api/remote/v1/record/status", params={"source_id": "rec-cam"}).json()
+    assert listed["recordings"]["rec-cam"]["status"] == "done"
+
+    with h5py.File(output, "r") as h5:
+        dset = h5["/entry/data/data"]
+        assert dset.chunks == (1, 200, 180)
+        assert dset.id.get_create_plist().get_filter(0)[0] == 32008  # bitshuffle
+        np.testing.assert_array_equal(dset[()], np.stack(frames))
+        np.testing.assert_array_equal(h5["/entry/remote/seq"][()], [10, 11, 12, 13, 14])
+        np.testing.assert_array_equal(h5["/entry/remote/image_number"][()], [1, 2, 3, 4, 5])
+        np.testing.assert_allclose(h5["/entry/remote/distance_mm"][()], [150, 151, 152, 153, 154])
+        assert np.isnan(h5["/entry/remote/wavelength_a"][()]).all()
+        assert float(h5["/entry/instrument/detector/detector_distance"][()]) == 154.0
+        assert h5["/entry/instrument/detector/beam_center_y"].attrs["units"] == "pixel"
+        assert float(h5["/entry/instrument/beam/incident_energy"][()]) == 12400.0
+
+        # The viewer resolves the recording like any other stack.
+        stack = HDF5StackService(
+            data_dir=tmp_path,
+            get_allow_abs_paths=lambda: True,
+            is_within=lambda p, root: True,
+            get_h5py=lambda: h5py,
+        )
+        view, extra_files = stack.resolve_dataset_view(h5, output, "/entry/data/data")
+        assert tuple(view["shape"]) == (5, 200, 180)
+        np.testing.assert_array_equal(stack.extract_frame(view, 2, 0), frames[2])
+        for handle in extra_files:
+            handle.close()
+
+
+def test_remote_recording_drops_frames_instead_of_blocking_ingest(
+    tmp_path: Path, monkeypatch
+) -> None:
+    h5py = pytest.importorskip("h5py")
+    pytest.importorskip("hdf5plugin")
+    monkeypatch.setattr(remote_recorder, "_QUEUE_FRAMES", 2)
+    gate = threading.Event()
+
+    def _slow_bytes(frame):
+        gate.wait(5.0)  # the disk is stuck until the gate opens
+        return remote_frame_bytes(frame)
+
+    service = _service(tmp_path, h5py, frame_bytes=_slow_bytes)
+    service.start(source_id="rec-slow", max_frames=3)
+    for seq in range(1, 9):
+        remote_store_frame(
+            source_id="rec-slow", frame=np.full((16, 16), seq, np.uint32), meta={}, seq=seq
+        )
+    gate.set()
+    status = service.stop("rec-slow")
+    assert status["status"] == "done", status
+    # At most two frames wait behind the stuck writer; the others were dropped at once.
+    written, dropped = status["frames_written"], status["frames_dropped"]
+    assert 2 <= written <= 3 and dropped >= 4, status
+    with h5py.File(status["file"], "r") as h5:
+        assert h5["/entry/data/data"].shape == (written, 16, 16)
+        assert Path(status["file"]).parent == tmp_path / "recordings"
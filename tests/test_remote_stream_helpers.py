@@ -1,17 +1,27 @@
 from __future__ import annotations
 
 import json
+import threading
+import time
 
 import numpy as np
 import pytest
 from fastapi import HTTPException
 
+from backend.services import remote_stream
 from backend.services.remote_stream import (
+    remote_configure,
     remote_extract_metadata,
+    remote_frame_at,
+    remote_frame_bytes,
+    remote_history,
+    remote_pack_peak_sets,
     remote_parse_meta,
     remote_safe_source_id,
     remote_snapshot,
     remote_store_frame,
+    remote_unpack_peak_sets,
+    remote_wait_frame,
 )
 
 
@@ -53,6 +63,48 @@ def test_remote_extract_metadata_resolution_and_peaksets() -> None:
     assert out["resolution"]["beam_center_px"] == [10.0, 20.0]
     assert len(out["peak_sets"]) == 1
     assert out["peak_sets"][0]["color"] == "#00ff88"
+    points = out["peak_sets"][0]["points"]
+    assert points.dtype == np.float32 and points.shape == (2, 3)
+    np.testing.assert_array_equal(points, [[1, 2, 3], [4, 5, np.nan]])
+
+
+def test_remote_peak_sets_are_validated_and_round_trip_in_binary_form() -> None:
+    sets = remote_extract_metadata(
+        {
+            "peak_sets": [
+                {"name": "even", "points": [[1, 2, 9], [np.inf, 3, 1], [5, 6, "nan"]]},
+                {"name": "ragged", "points": [[7, 8], "junk", [9, "10", 11], [None, 1]]},
+                {"name": "empty", "points": [[np.nan, 1]]},
+            ]
+        }
+    )["peak_sets"]
+    assert [item["name"] for item in sets] == ["even", "ragged"]
+    np.testing.assert_array_equal(sets[0]["points"], [[1, 2, 9], [5, 6, np.nan]])
+    np.testing.assert_array_equal(sets[1]["points"], [[7, 8, np.nan], [9, 10, 11]])
+
+    packed = remote_pack_peak_sets(sets)
+    assert (4 + int.from_bytes(packed[:4], "little")) % 4 == 0  # float32 rows are aligned
+    unpacked = remote_unpack_peak_sets(packed)
+    assert [(item["name"], item["color"]) for item in unpacked] == [
+        ("even", "#4aa3ff"),
+        ("ragged", "#4aa3ff"),
+    ]
+    for got, sent in zip(unpacked, sets):
+        np.testing.assert_array_equal(got["points"], sent["points"])
+
+    # Producers may send (x, y) pairs; non-finite coordinates are dropped.
+    header = json.dumps({"columns": 2, "sets": [{"name": "xy", "count": 3}]}).encode()
+    pairs = np.array([[1, 2], [np.nan, 4], [5, 6]], dtype="<f4").tobytes()
+    (only,) = remote_unpack_peak_sets(len(header).to_bytes(4, "little") + header + pairs)
+    np.testing.assert_array_equal(only["points"], [[1, 2, np.nan], [5, 6, np.nan]])
+    for bad in (
+        b"\x01",
+        len(header).to_bytes(4, "little") + header + pairs[:-4],
+        len(header).to_bytes(4, "little") + header + pairs + b"\0\0\0\0",
+        (5).to_bytes(4, "little") + b"[1,2]",
+    ):
+        with pytest.raises(HTTPException):
+            remote_unpack_peak_sets(bad)
 
 
 def test_remote_store_and_snapshot_roundtrip() -> None:
@@ -67,3 +119,122 @@ def test_remote_store_and_snapshot_roundtrip() -> None:
     assert tuple(snap["shape"]) == (2, 3)
     returned = np.frombuffer(snap["bytes"], dtype=np.dtype(frame.dtype.str)).reshape(2, 3)
     np.testing.assert_array_equal(returned, frame)
+
+
+def test_remote_ring_keeps_history_within_frame_and_byte_limits() -> None:
+    frame = np.zeros((8, 8), dtype=np.uint16)  # 128 bytes
+    remote_configure(ring_frames=4, ring_mb=1, max_mb=1, compression="none")
+    try:
+        for value in range(6):
+            remote_store_frame(source_id="pytest-ring", frame=frame + value, meta={}, seq=None)
+        history = remote_history("pytest-ring")
+        assert history["seqs"] == [3, 4, 5, 6]
+        assert history["bytes"] == 4 * frame.nbytes
+        assert remote_frame_at("pytest-ring", 2) is None
+        old = remote_frame_at("pytest-ring", 4)
+        assert old is not None
+        np.testing.assert_array_equal(np.frombuffer(old["bytes"], dtype="<u2"), 3)
+        assert remote_snapshot("pytest-ring")["seq"] == 6
+
+        # A repeated sequence number replaces the retained frame and becomes the latest.
+        remote_store_frame(source_id="pytest-ring", frame=frame + 9, meta={}, seq=4)
+        assert remote_history("pytest-ring")["seqs"] == [3, 5, 6, 4]
+        assert remote_snapshot("pytest-ring")["seq"] == 4
+
+        # The global byte budget evicts the oldest frames of any source first.
+        big = np.zeros((512, 512), dtype=np.uint16)  # 512 KiB
+        remote_store_frame(source_id="pytest-ring-big", frame=big, meta={}, seq=None)
+        remote_store_frame(source_id="pytest-ring-big", frame=big, meta={}, seq=None)
+        assert remote_history("pytest-ring")["frames"] == 0
+        assert remote_history("pytest-ring-big")["seqs"] == [1, 2]
+        remote_store_frame(source_id="pytest-ring-big", frame=big, meta={}, seq=None)
+        assert remote_history("pytest-ring-big")["seqs"] == [2, 3]
+    finally:
+        remote_configure()
+
+
+def test_remote_wait_frame_wakes_on_commit() -> None:
+    frame = np.zeros((2, 2), dtype=np.uint16)
+    assert remote_wait_frame("pytest-wait", 0.01) is None
+    seq = remote_store_frame(source_id="pytest-wait", frame=frame, meta={}, seq=None)
+    assert remote_wait_frame("pytest-wait", 0.0, after_seq=seq - 1)["seq"] == seq
+
+    timer = threading.Timer(
+        0.1,
+        lambda: remote_store_frame(source_id="pytest-wait", frame=frame, meta={}, seq=None),
+    )
+    start = time.monotonic()
+    timer.start()
+    try:
+        newer = remote_wait_frame("pytest-wait", 5.0, after_seq=seq)
+    finally:
+        timer.join()
+    assert newer is not None and newer["seq"] == seq + 1
+    assert time.monotonic() - start < 2.0
+
+    # Versions also announce a frame whose sequence number went backwards.
+    restarted = remote_store_frame(source_id="pytest-wait", frame=frame, meta={}, seq=1)
+    again = remote_wait_frame("pytest-wait", 0.0, after_version=newer["version"])
+    assert again is not None and again["seq"] == restarted == 1
+    assert remote_wait_frame("pytest-wait", 0.01, after_seq=seq + 1) is None
+
+
+@pytest.mark.parametrize("codec", ["zstd", "lz4"])
+def test_remote_frames_are_compressed_after_commit(codec: str) -> None:
+    pytest.importorskip("zstandard" if codec == "zstd" else "lz4.frame")
+    rng = np.random.default_rng(5)
+    frame = rng.poisson(2, size=(256, 256)).astype(np.uint32)  # 256 KiB
+    frame[:, 100] = np.iinfo(np.uint32).max
+    source = f"pytest-codec-{codec}"
+    remote_configure(compression=codec)
+    try:
+        seq = remote_store_frame(source_id=source, frame=frame, meta={}, seq=None)
+        deadline = time.monotonic() + 5.0
+        stored = remote_frame_at(source, seq)
+        while stored["encoding"] is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+            stored = remote_frame_at(source, seq)
+        assert stored["encoding"] == codec and stored["bytes"] is None
+        assert stored["shuffle"] == 4 and stored["nbytes"] == frame.nbytes
+        # The ring budget counts the compressed size.
+        assert remote_history(source)["bytes"] == stored["stored_nbytes"] < frame.nbytes // 4
+        returned = np.frombuffer(remote_frame_bytes(stored), dtype="<u4").reshape(frame.shape)
+        np.testing.assert_array_equal(returned, frame)
+    finally:
+        remote_configure()
+
+
+def test_remote_store_keeps_budgets_under_concurrent_producers() -> None:
+    frame = np.zeros((128, 128), dtype=np.uint16)  # 32 KiB: 32 frames fit the global budget
+    remote_configure(ring_frames=8, ring_mb=1, max_mb=1, compression="none")
+    sources = [f"pytest-shard-{idx}" for idx in range(16)]
+    errors: list[BaseException] = []
+
+    def _produce(idx: int) -> None:
+        try:
+            for count in range(200):
+                source = sources[(idx + count) % len(sources)]
+                remote_store_frame(source_id=source, frame=frame + count, meta={}, seq=None)
+                remote_snapshot(sources[count % len(sources)])
+        except BaseException as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=_produce, args=(idx,)) for idx in range(8)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors
+        histories = [remote_history(source) for source in sources]
+        held = sum(history["bytes"] for history in histories)
+        assert all(history["frames"] <= 8 for history in histories)
+        assert held == sum(history["frames"] for history in histories) * frame.nbytes
+        # The LRU index, the global byte count and the rings agree.
+        with remote_stream._remote_lru_lock:
+            lru_sources = [key for key in remote_stream._remote_lru if key[0] in sources]
+            total = remote_stream._remote_bytes["total"]
+        assert len(lru_sources) == held // frame.nbytes
+        assert held <= total <= 32 * frame.nbytes
+    finally:
+        remote_configure()
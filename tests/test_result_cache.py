@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from backend.services.result_cache import ResultCache
+
+
+def _output(tmp_path: Path, name: str, size: int) -> Path:
+    path = tmp_path / "out" / name
+    path.parent.mkdir(exist_ok=True)
+    path.write_bytes(b"x" * size)
+    return path
+
+
+def test_result_cache_store_and_lookup(tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path / "cache", lambda: 1024)
+    key = ResultCache.make_key({"source": ["a", 1, 2], "mode": "all"})
+    assert key == ResultCache.make_key({"mode": "all", "source": ["a", 1, 2]})
+    assert cache.lookup(key) is None
+
+    output = _output(tmp_path, "sum.h5", 100)
+    assert cache.store(key, [(output, {"tag": ""})], {"format": "hdf5"})
+    output.unlink()  # the user deleting an output does not affect the cached copy
+
+    entry = cache.lookup(key)
+    assert entry is not None and entry["format"] == "hdf5"
+    assert [item["path"].read_bytes() for item in entry["files"]] == [b"x" * 100]
+    assert cache.stats() == {"entries": 1, "bytes": 100}
+
+
+def test_result_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path / "cache", lambda: 250)
+    keys = [ResultCache.make_key({"job": idx}) for idx in range(3)]
+    for idx, key in enumerate(keys[:2]):
+        cache.store(key, [(_output(tmp_path, f"{idx}.tiff", 100), {})], {})
+        entry_file = cache.root / key / "entry.json"
+        os.utime(entry_file, (1000.0 + idx, 1000.0 + idx))
+    assert cache.lookup(keys[0]) is not None  # now the most recently used entry
+
+    cache.store(keys[2], [(_output(tmp_path, "2.tiff", 100), {})], {})
+    assert cache.lookup(keys[1]) is None
+    assert cache.lookup(keys[0]) is not None and cache.lookup(keys[2]) is not None
+
+    # Results larger than the whole budget are not cached at all.
+    big = ResultCache.make_key({"job": "big"})
+    assert not cache.store(big, [(_output(tmp_path, "big.tiff", 300), {})], {})
+
+
+def test_result_cache_disabled_and_damaged_entries(tmp_path: Path) -> None:
+    budget = {"bytes": 0}
+    cache = ResultCache(tmp_path / "cache", lambda: budget["bytes"])
+    key = ResultCache.make_key({"job": 1})
+    assert not cache.store(key, [(_output(tmp_path, "a.tiff", 10), {})], {})
+    budget["bytes"] = 100
+    assert cache.store(key, [(_output(tmp_path, "a.tiff", 10), {})], {})
+    (cache.root / key / "00000.tiff").unlink()
+    assert cache.lookup(key) is None
+    assert not (cache.root / key).exists()
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from backend.series_cli import main
+
+
+@pytest.fixture()
+def stack(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> np.ndarray:
+    h5py = pytest.importorskip("h5py")
+    data = np.random.default_rng(3).integers(0, 1000, size=(23, 4, 5)).astype(np.uint32)
+    with h5py.File(tmp_path / "stack.h5", "w") as h5:
+        h5.create_dataset("/entry/data/data", data=data, chunks=(1, 4, 5))
+    monkeypatch.chdir(tmp_path)
+    return data
+
+
+def _sum(capsys: pytest.CaptureFixture[str], *args: str) -> dict:
+    code = main(["sum", "stack.h5", "--dataset", "/entry/data/data", "--quiet", *args])
+    result = json.loads(capsys.readouterr().out)
+    assert code == 0, result
+    return result
+
+
+def _merge(capsys: pytest.CaptureFixture[str], output: str, shards: list[str]) -> dict:
+    assert main(["merge", output, *shards]) == 0
+    return json.loads(capsys.readouterr().out)
+
+
+@pytest.mark.parametrize(
+    ("mode_args", "operations"),
+    [
+        (["--mode", "step", "--step", "4"], "sum,max"),
+        (["--mode", "rolling", "--step", "5", "--stride", "2"], "mean"),
+        (["--mode", "all"], "sum,mean,std,var,min,max"),
+        (["--mode", "nth", "--step", "3"], "mean,var"),
+    ],
+)
+def test_series_cli_shards_merge_to_unsharded_result(
+    stack: np.ndarray, capsys: pytest.CaptureFixture[str], mode_args: list[str], operations: str
+) -> None:
+    import h5py
+
+    common = [*mode_args, "--operations", operations, "--compression", "zstd"]
+    full = _sum(capsys, *common, "--output", "full.h5")["outputs"][0]
+    shards = [
+        _sum(capsys, *common, "--shard", f"{idx}/3", "--output", f"part{idx}.h5")["outputs"][0]
+        for idx in (3, 1, 2)
+    ]
+    summary = _merge(capsys, "merged.h5", shards)
+    assert summary["shards"] == 3
+
+    ops = operations.split(",")
+    with h5py.File(full, "r") as ref, h5py.File("merged.h5", "r") as out:
+        assert out.attrs["operations"] == operations
+        assert "shard_index" not in out.attrs
+        for op_idx, op in enumerate(ops):
+            name = "data" if op_idx == 0 else op
+            np.testing.assert_allclose(
+                out[f"/entry/data/{name}"][()], ref[f"/entry/data/{name}"][()]
+            )
+        for name in ("sum_start_frame", "sum_end_frame", "sum_frame_count"):
+            np.testing.assert_array_equal(
+                out[f"/entry/data/{name}"][()], ref[f"/entry/data/{name}"][()]
+            )
+        assert set(out["/entry/data"]) == set(ref["/entry/data"])
+
+
+def test_series_cli_rejects_incomplete_or_invalid_shards(
+    stack: np.ndarray, capsys: pytest.CaptureFixture[str]
+) -> None:
+    first = _sum(capsys, "--mode", "step", "--step", "5", "--shard", "1/2", "--output", "a.h5")
+    assert main(["merge", "merged.h5", first["outputs"][0]]) == 2
+    assert "Expected shards 1..2" in capsys.readouterr().err
+    assert not Path("merged.h5").exists()
+
+    code = main(["sum", "stack.h5", "--dataset", "/entry/data/data", "--operation", "median"])
+    assert code == 0
+    capsys.readouterr()
+    code = main(
+        ["sum", "stack.h5", "--dataset", "/entry/data/data", "--quiet"]
+        + ["--operation", "median", "--shard", "1/2"]
+    )
+    assert code == 1
+    assert "Median cannot be combined" in json.loads(capsys.readouterr().out)["error"]
+    with pytest.raises(SystemExit):
+        main(["sum", "stack.h5", "--shard", "3/2"])
+
+
+@pytest.mark.parametrize("output_format", ["tiff", "hdf5"])
+def test_series_cli_process_exits_after_the_job(stack: np.ndarray, output_format: str) -> None:
+    pytest.importorskip("tifffile")
+    root = Path(__file__).resolve().parents[1]
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "backend.series_cli",
+            "sum",
+            "stack.h5",
+            "--dataset",
+            "/entry/data/data",
+            "--mode",
+            "step",
+            "--step",
+            "5",
+            "--format",
+            output_format,
+            "--output",
+            "cli_out",
+            "--quiet",
+        ],
+        env={**os.environ, "PYTHONPATH": str(root)},
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout)["status"] == "done"
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from backend.series_cli import main
+from backend.services.series_corrections import (
+    FrameCorrector,
+    gain_from_reference,
+    reference_frame,
+)
+
+
+def test_frame_corrector_applies_stages_in_place() -> None:
+    rng = np.random.default_rng(1)
+    frames = rng.integers(0, 100, size=(4, 3, 5)).astype(np.uint16)
+    dark = rng.uniform(0, 5, size=(3, 5))
+    flat = rng.uniform(0.5, 1.5, size=(3, 5))
+    flat[0, 0] = 0.0  # dead pixel in the flat
+    mask = np.zeros((3, 5), dtype=bool)
+    mask[2, 4] = True
+    gain = gain_from_reference(flat[None], "flat")[0]
+
+    corrector = FrameCorrector(dark=dark, gain=gain, zero_mask=mask)
+    out = corrector.apply_block(frames)
+
+    expected = (frames - dark) * (flat[flat > 0].mean() / np.where(flat > 0, flat, np.inf))
+    expected[:, mask] = 0.0
+    assert out.dtype == np.float64
+    np.testing.assert_allclose(out, expected)
+    assert (out[:, 0, 0] == 0).all()
+
+    # The normalization frame is corrected like the data before it divides.
+    norm = FrameCorrector(dark=dark, norm_ref=frames[0])
+    ref = frames[0] - dark
+    np.testing.assert_allclose(
+        norm.apply(frames[1].astype(np.float64)),
+        np.where(np.abs(ref) > 1e-12, (frames[1] - dark) / np.where(ref == 0, 1, ref), 0.0),
+    )
+
+
+def test_reference_frame_averages_stacks_and_checks_shape() -> None:
+    stack = np.arange(2 * 3 * 4, dtype=np.float64).reshape(2, 3, 4)
+    np.testing.assert_allclose(reference_frame(stack, (3, 4), 1, "Dark")[0], stack.mean(axis=0))
+    # A (T, H, W) reference of a multi-threshold dataset holds one map per threshold.
+    np.testing.assert_allclose(reference_frame(stack, (3, 4), 2, "Dark"), stack)
+    assert reference_frame(stack[0], (3, 4), 2, "Flat").shape == (2, 3, 4)
+    with pytest.raises(HTTPException):
+        reference_frame(stack, (4, 3), 1, "Flat")
+
+
+@pytest.mark.parametrize(
+    "mode_args", [["--mode", "step", "--step", "4"], ["--mode", "rolling", "--step", "3"]]
+)
+def test_series_cli_dark_and_flat_correction_matches_reference(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    mode_args: list[str],
+) -> None:
+    h5py = pytest.importorskip("h5py")
+    tifffile = pytest.importorskip("tifffile")
+    rng = np.random.default_rng(7)
+    data = rng.integers(50, 1000, size=(10, 4, 5)).astype(np.uint32)
+    darks = rng.integers(0, 20, size=(6, 4, 5)).astype(np.uint16)
+    flat = rng.uniform(0.8, 1.2, size=(4, 5)).astype(np.float32)
+    with h5py.File(tmp_path / "stack.h5", "w") as h5:
+        h5.create_dataset("/entry/data/data", data=data, chunks=(3, 4, 5))
+    with h5py.File(tmp_path / "dark.h5", "w") as h5:
+        h5.create_dataset("/entry/data/data", data=darks)
+    tifffile.imwrite(tmp_path / "flat.tif", flat)
+    monkeypatch.chdir(tmp_path)
+
+    code = main(
+        [
+            "sum",
+            "stack.h5",
+            "--dataset",
+            "/entry/data/data",
+            *mode_args,
+            "--operations",
+            "sum,mean",
+            "--dark",
+            "dark.h5",
+            "--dark-dataset",
+            "/entry/data/data",
+            "--flat",
+            "flat.tif",
+            "--output",
+            "out.h5",
+            "--quiet",
+        ]
+    )
+    result = json.loads(capsys.readouterr().out)
+    assert code == 0, result
+
+    gain = flat.astype(np.float64).mean() / flat.astype(np.float64)
+    corrected = (data - darks.mean(axis=0)) * gain
+    with h5py.File(result["outputs"][0], "r") as h5:
+        assert h5.attrs["dark_file"] == "dark.h5"
+        assert h5.attrs["flat_mode"] == "flat"
+        group = h5["/entry/data"]
+        for idx, (start, end) in enumerate(
+            zip(group["sum_start_frame"][()], group["sum_end_frame"][()])
+        ):
+            window = corrected[start : end + 1]
+            np.testing.assert_allclose(group["data"][idx], window.sum(axis=0))
+            np.testing.assert_allclose(group["mean"][idx], window.mean(axis=0))
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import fields
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.routes.analysis import AnalysisRouteDeps, register_analysis_routes
+from backend.services.hdf5_stack import HDF5StackService
+from backend.services.series_follow import (
+    SeriesFollowDeps,
+    SeriesFollowService,
+    consumed_prefix_intact,
+)
+
+
+def _service(tmp_path: Path, frames: dict[Path, np.ndarray] | None = None) -> SeriesFollowService:
+    h5py = pytest.importorskip("h5py")
+    stack = HDF5StackService(
+        data_dir=tmp_path,
+        get_allow_abs_paths=lambda: True,
+        is_within=lambda p, root: p.resolve().is_relative_to(root.resolve()),
+        get_h5py=lambda: h5py,
+    )
+    frames = frames if frames is not None else {}
+
+    def _unsupported(*_args, **_kwargs):
+        raise AssertionError("unsupported dependency was called in this test")
+
+    def read_tiff(path: Path, index: int) -> np.ndarray:
+        if path not in frames:
+            raise OSError("incomplete file")
+        return frames[path]
+
+    return SeriesFollowService(
+        SeriesFollowDeps(
+            logger=logging.getLogger("test"),
+            ensure_hdf5_stack=lambda: None,
+            get_h5py=lambda: h5py,
+            resolve_image_file=lambda name: Path(name),
+            image_ext_name=lambda name: Path(name).suffix.lower(),
+            resolve_series_files=lambda _source: (sorted(tmp_path.glob("img_*.tif")), 0),
+            read_tiff=read_tiff,
+            read_cbf=_unsupported,
+            read_cbf_gz=_unsupported,
+            read_edf=_unsupported,
+            resolve_dataset_view=stack.resolve_dataset_view,
+            extract_frames=stack.extract_frames,
+            frame_chunk_depth=stack.frame_chunk_depth,
+            find_pixel_mask=stack.find_pixel_mask,
+        )
+    )
+
+
+def _wait_for_frames(
+    service: SeriesFollowService, session_id: str, frames: int, refresh: bool = True
+) -> dict[str, Any]:
+    if refresh:
+        service.refresh(session_id)
+    deadline = time.monotonic() + 5.0
+    status = service.get_status(session_id) or {}
+    while time.monotonic() < deadline:
+        # The refresh is complete once its summary message is published.
+        if status.get("message") == f"Following: {frames} frame(s)":
+            return status
+        assert status.get("status") != "error", status
+        status = service.wait_update(session_id, int(status.get("revision", 0)), 0.5) or status
+    raise AssertionError(f"expected {frames} frames, got {status}")
+
+
+def test_consumed_prefix_intact_allows_growth_only() -> None:
+    assert consumed_prefix_intact([], [("a", 3)])
+    assert consumed_prefix_intact([("a", 3), ("b", 2)], [("a", 3), ("b", 5), ("c", 4)])
+    assert not consumed_prefix_intact([("a", 3), ("b", 2)], [("a", 3), ("b", 1)])
+    assert not consumed_prefix_intact([("a", 3), ("b", 2)], [("a", 4), ("b", 2)])
+    assert not consumed_prefix_intact([("a", 3), ("b", 2)], [("b", 2)])
+
+
+def test_series_follow_sums_only_new_frames_of_linked_members(tmp_path: Path) -> None:
+    h5py = pytest.importorskip("h5py")
+    rng = np.random.default_rng(2)
+    data = rng.integers(0, 500, size=(9, 3, 4)).astype(np.uint32)
+    master = tmp_path / "scan_master.h5"
+    mask = np.zeros((3, 4), dtype=np.uint32)
+    mask[0, 1] = 1
+    with h5py.File(master, "w") as h5:
+        h5.create_dataset("/entry/instrument/detector/detectorSpecific/pixel_mask", data=mask)
+        h5.require_group("/entry/data")
+
+    def _add_member(idx: int, lo: int, hi: int) -> None:
+        name = f"scan_data_{idx:06d}.h5"
+        with h5py.File(tmp_path / name, "w") as member:
+            member.create_dataset("data", data=data[lo:hi], chunks=(1, 3, 4))
+        with h5py.File(master, "a") as h5:
+            h5[f"/entry/data/data_{idx:06d}"] = h5py.ExternalLink(name, "/data")
+
+    extracted: list[tuple[int, int]] = []
+    service = _service(tmp_path)
+    original = service._deps.extract_frames
+    deps = service._deps.__class__(
+        **{
+            **service._deps.__dict__,
+            "extract_frames": lambda view, lo, hi, thr: (
+                extracted.append((lo, hi)) or original(view, lo, hi, thr)
+            ),
+        }
+    )
+    service = SeriesFollowService(deps)
+
+    _add_member(1, 0, 4)
+    session = service.start(file=str(master), dataset="/entry/data", interval_s=60)
+    _wait_for_frames(service, session["id"], 4, refresh=False)
+    _add_member(2, 4, 9)
+    _wait_for_frames(service, session["id"], 9)
+
+    total, status = service.frame(session["id"])
+    expected = data.sum(axis=0, dtype=np.int64)
+    expected[0, 1] = 0
+    assert total.dtype == np.int64
+    np.testing.assert_array_equal(total, expected)
+    # Every frame was read exactly once across the two refreshes.
+    assert sorted(f for lo, hi in extracted for f in range(lo, hi)) == list(range(9))
+    assert status["restarts"] == 0
+
+    # A second start for the same source joins the running session.
+    assert service.start(file=str(master), dataset="/entry/data")["id"] == session["id"]
+    service.stop(session["id"])
+
+
+def test_series_follow_file_series_waits_for_incomplete_files(tmp_path: Path) -> None:
+    frames: dict[Path, np.ndarray] = {}
+    service = _service(tmp_path, frames)
+    paths = [tmp_path / f"img_{idx:04d}.tif" for idx in range(1, 5)]
+    for idx, path in enumerate(paths[:2]):
+        path.touch()
+        frames[path] = np.full((2, 2), idx + 1, dtype=np.int32)
+    session = service.start(file=str(paths[0]), operation="mean", interval_s=60)
+    _wait_for_frames(service, session["id"], 2, refresh=False)
+
+    # The third file exists but cannot be decoded yet; the fourth is complete.
+    paths[2].touch()
+    paths[3].touch()
+    frames[paths[3]] = np.full((2, 2), 10, dtype=np.int32)
+    service.refresh(session["id"])
+    time.sleep(0.2)
+    assert service.get_status(session["id"])["frames_summed"] == 2
+
+    frames[paths[2]] = np.array([[3, -1], [3, 3]], dtype=np.int32)
+    status = _wait_for_frames(service, session["id"], 4)
+
+    route_deps = {field.name: None for field in fields(AnalysisRouteDeps)}
+    route_deps.update(
+        start_series_follow=service.start,
+        get_series_follow=service.get_status,
+        subscribe_series_follow=service.subscribe,
+        series_follow_frame=service.frame,
+        stop_series_follow=service.stop,
+    )
+    app = FastAPI()
+    register_analysis_routes(app, AnalysisRouteDeps(**route_deps))
+    client = TestClient(app)
+    res = client.get("/api/analysis/series-follow/frame", params={"id": session["id"]})
+    assert res.status_code == 200
+    assert res.headers["X-Dtype"] == "<f8" and res.headers["X-Shape"] == "2,2"
+    assert res.headers["X-Frames-Summed"] == "4"
+    mean = np.frombuffer(res.content, dtype="<f8").reshape(2, 2)
+    np.testing.assert_allclose(mean, [[4.0, 0.0], [4.0, 4.0]])
+    unchanged = client.get(
+        "/api/analysis/series-follow/frame",
+        params={"id": session["id"], "after": status["revision"]},
+    )
+    assert unchanged.status_code == 204
+    bad = client.post(
+        "/api/analysis/series-follow/start", json={"file": str(paths[0]), "threshold": "x"}
+    )
+    assert bad.status_code == 400
+
+    # The long-poll returns as soon as the session changes, not at its timeout.
+    threading.Timer(0.2, service.stop, args=(session["id"],)).start()
+    started = time.monotonic()
+    stopped = client.get(
+        "/api/analysis/series-follow/status",
+        params={"id": session["id"], "after": status["revision"], "timeout": 10},
+    ).json()
+    assert stopped["revision"] > status["revision"]
+    assert time.monotonic() - started < 5.0
+    assert client.post("/api/analysis/series-follow/stop", json={"id": session["id"]}).is_success
+    missing = client.get("/api/analysis/series-follow/frame", params={"id": "missing"})
+    assert missing.status_code == 404
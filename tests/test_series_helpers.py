@@ -4,7 +4,13 @@ import numpy as np
 import pytest
 from fastapi import HTTPException
 
-from backend.services.series_ops import iter_sum_groups, mask_flag_value, mask_slices
+from backend.services.series_ops import (
+    GroupReducer,
+    iter_sum_groups,
+    mask_flag_value,
+    mask_slices,
+    normalize_operations,
+)
 
 
 def test_iter_sum_groups_chunks() -> None:
@@ -38,6 +44,24 @@ def test_iter_sum_groups_invalid_range() -> None:
         iter_sum_groups(frame_count=10, mode="range", step=2, range_start_1=8, range_end_1=2)
 
 
+def test_iter_sum_groups_rolling() -> None:
+    groups = iter_sum_groups(
+        frame_count=10, mode="rolling", step=4, range_start_1=None, range_end_1=None, stride=3
+    )
+    assert [(g["start"], g["end"]) for g in groups] == [(0, 3), (3, 6), (6, 9)]
+    assert list(groups[1]["indices"]) == [3, 4, 5, 6]
+    assert all(g["count"] == 4 for g in groups)
+    with pytest.raises(HTTPException):
+        iter_sum_groups(frame_count=3, mode="rolling", step=4, range_start_1=None, range_end_1=None)
+
+
+def test_iter_sum_groups_step_alias() -> None:
+    groups = iter_sum_groups(
+        frame_count=5, mode="step", step=2, range_start_1=None, range_end_1=None
+    )
+    assert [g["count"] for g in groups] == [2, 2, 1]
+
+
 def test_mask_helpers() -> None:
     mask = np.array([[0, 1, 2, 4, 8, 16]], dtype=np.uint32)
     gap, bad, any_mask = mask_slices(mask)
@@ -48,3 +72,28 @@ def test_mask_helpers() -> None:
     assert np.isnan(mask_flag_value(np.dtype(np.float32)))
     assert mask_flag_value(np.dtype(np.uint16)) == float(np.iinfo(np.uint16).max)
     assert mask_flag_value(np.dtype(np.int16)) == float(np.iinfo(np.int16).min)
+
+
+def test_normalize_operations() -> None:
+    assert normalize_operations(None) == ["sum"]
+    assert normalize_operations("Mean, std,mean") == ["mean", "std"]
+    assert normalize_operations(["max", "min"]) == ["max", "min"]
+    with pytest.raises(HTTPException):
+        normalize_operations(["sum", "mode"])
+
+
+def test_group_reducer_single_pass_matches_numpy() -> None:
+    rng = np.random.default_rng(3)
+    frames = rng.normal(1e6, 5.0, size=(40, 4, 5))
+    reducer = GroupReducer(["sum", "mean", "std", "var", "min", "max", "median"])
+    for frame in frames:
+        reducer.add(frame)
+    out = reducer.results()
+    assert list(out) == ["sum", "mean", "std", "var", "min", "max", "median"]
+    np.testing.assert_allclose(out["sum"], frames.sum(axis=0))
+    np.testing.assert_allclose(out["mean"], frames.mean(axis=0))
+    np.testing.assert_allclose(out["var"], frames.var(axis=0), rtol=1e-9)
+    np.testing.assert_allclose(out["std"], frames.std(axis=0), rtol=1e-9)
+    np.testing.assert_array_equal(out["min"], frames.min(axis=0))
+    np.testing.assert_array_equal(out["max"], frames.max(axis=0))
+    np.testing.assert_array_equal(out["median"], np.median(frames, axis=0))
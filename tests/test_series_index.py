@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from backend.services.hdf5_stack import HDF5StackService
+from backend.services.series_index import SeriesIndexDeps, SeriesIndexService, prefix_plan
+
+h5py = pytest.importorskip("h5py")
+
+
+def _make_service(tmp_path: Path, reads: list[tuple[int, int]]) -> SeriesIndexService:
+    stack = HDF5StackService(
+        data_dir=tmp_path,
+        get_allow_abs_paths=lambda: True,
+        is_within=lambda p, root: True,
+        get_h5py=lambda: h5py,
+    )
+
+    def extract_frames(view: dict[str, Any], start: int, stop: int, threshold: int) -> np.ndarray:
+        reads.append((start, stop))
+        return stack.extract_frames(view, start, stop, threshold)
+
+    return SeriesIndexService(
+        SeriesIndexDeps(
+            data_dir=tmp_path,
+            logger=type("L", (), {"exception": lambda *_args, **_kwargs: None})(),
+            ensure_hdf5_stack=lambda: None,
+            get_h5py=lambda: h5py,
+            resolve_image_file=lambda name: Path(name),
+            resolve_dataset_view=stack.resolve_dataset_view,
+            extract_frames=extract_frames,
+            frame_chunk_depth=stack.frame_chunk_depth,
+        ),
+        default_interval=4,
+    )
+
+
+def _wait_for_index(service: SeriesIndexService, file: str, dataset: str) -> dict[str, Any]:
+    deadline = time.time() + 5.0
+    status: dict[str, Any] = {}
+    while time.time() < deadline:
+        status = service.get_status(file=file, dataset=dataset)
+        if status.get("status") in {"ready", "error", "stale"}:
+            return status
+        time.sleep(0.02)
+    raise AssertionError(f"index did not finish in time: {status}")
+
+
+def test_prefix_plan_picks_nearest_checkpoint() -> None:
+    assert prefix_plan(0, 10, 5) == (0, 0, 0)
+    assert prefix_plan(12, 10, 5) == (1, 10, 12)
+    assert prefix_plan(18, 10, 5) == (2, 18, 20)
+    # No checkpoint beyond the last full interval: read forward from the last one.
+    assert prefix_plan(47, 10, 5) == (4, 40, 47)
+
+
+def test_series_index_range_sums_match_brute_force(tmp_path: Path) -> None:
+    rng = np.random.default_rng(11)
+    data = rng.integers(0, 1000, size=(23, 2, 5, 4)).astype(np.uint32)
+    source = tmp_path / "stack.h5"
+    with h5py.File(source, "w") as h5:
+        h5.create_dataset("/entry/data/data", data=data, chunks=(3, 1, 5, 4))
+    reads: list[tuple[int, int]] = []
+    service = _make_service(tmp_path, reads)
+
+    with pytest.raises(HTTPException) as excinfo:
+        service.range_sum(file=str(source), dataset="/entry/data/data", start=0, end=10)
+    assert excinfo.value.status_code == 409
+
+    service.start_build(file=str(source), dataset="/entry/data/data", interval=4)
+    status = _wait_for_index(service, str(source), "/entry/data/data")
+    assert status["status"] == "ready", status
+    assert status["interval"] == 4
+    assert Path(status["path"]).parent == tmp_path / ".stack.h5.albis-index"
+
+    for start, end in [(0, 22), (3, 17), (5, 5), (9, 21), (1, 2)]:
+        for thr in range(2):
+            reads.clear()
+            total, frames_read = service.range_sum(
+                file=str(source), dataset="/entry/data/data", start=start, end=end, threshold=thr
+            )
+            expected = data[start : end + 1, thr].astype(np.int64).sum(axis=0)
+            np.testing.assert_array_equal(total, expected)
+            assert frames_read <= 4
+            assert sum(stop - lo for lo, stop in reads) == frames_read
+
+
+def test_series_index_detects_stale_source(tmp_path: Path) -> None:
+    source = tmp_path / "stack.h5"
+    with h5py.File(source, "w") as h5:
+        h5.create_dataset("data", data=np.ones((12, 3, 3), dtype=np.float32))
+    service = _make_service(tmp_path, [])
+    service.start_build(file=str(source), dataset="data")
+    assert _wait_for_index(service, str(source), "data")["status"] == "ready"
+
+    with h5py.File(source, "a") as h5:
+        h5["data"][0] = 5.0
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert service.get_status(file=str(source), dataset="data")["status"] == "stale"
+    with pytest.raises(HTTPException) as excinfo:
+        service.range_sum(file=str(source), dataset="data", start=0, end=11)
+    assert excinfo.value.status_code == 409
+
+
+def test_series_index_detects_rewritten_linked_data_file(tmp_path: Path) -> None:
+    data_file = tmp_path / "scan_data_000001.h5"
+    with h5py.File(data_file, "w") as h5:
+        h5.create_dataset("/entry/data/data", data=np.ones((12, 3, 3), dtype=np.uint32))
+    master = tmp_path / "scan_master.h5"
+    with h5py.File(master, "w") as h5:
+        h5["/entry/data/data_000001"] = h5py.ExternalLink(data_file.name, "/entry/data/data")
+    service = _make_service(tmp_path, [])
+    service.start_build(file=str(master), dataset="/entry/data")
+    assert _wait_for_index(service, str(master), "/entry/data")["status"] == "ready"
+
+    # The master keeps its size and mtime; only the linked data file changes.
+    with h5py.File(data_file, "a") as h5:
+        h5["/entry/data/data"][...] = 5
+    stat = data_file.stat()
+    os.utime(data_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert service.get_status(file=str(master), dataset="/entry/data")["status"] == "stale"
+    with pytest.raises(HTTPException) as excinfo:
+        service.range_sum(file=str(master), dataset="/entry/data", start=0, end=11)
+    assert excinfo.value.status_code == 409
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from backend.services.series_output import (
+    ChunkWriter,
+    chunk_encoder,
+    codec_dataset_kwargs,
+    normalize_output_codec,
+)
+
+h5py = pytest.importorskip("h5py")
+
+
+def test_normalize_output_codec_aliases() -> None:
+    assert normalize_output_codec(None) == "gzip"
+    assert normalize_output_codec("BSLZ4") == "bitshuffle-lz4"
+    assert normalize_output_codec("none") == "none"
+    with pytest.raises(HTTPException):
+        normalize_output_codec("lzma")
+
+
+@pytest.mark.parametrize("codec", ["gzip", "none", "zstd", "bitshuffle-lz4"])
+@pytest.mark.parametrize("dtype", [np.float64, np.uint16])
+def test_chunk_writer_roundtrip(tmp_path: Path, codec: str, dtype: type) -> None:
+    rng = np.random.default_rng(7)
+    frames = rng.integers(0, 5000, size=(3, 2, 37, 29)).astype(dtype)
+    with h5py.File(tmp_path / "out.h5", "w") as h5:
+        dset = h5.create_dataset(
+            "data",
+            shape=frames.shape,
+            dtype=dtype,
+            chunks=(1, 1, 37, 29),
+            **codec_dataset_kwargs(codec),
+        )
+        with ChunkWriter(codec, workers=2, max_pending=1) as writer:
+            for idx in range(frames.shape[0]):
+                for thr in range(frames.shape[1]):
+                    writer.write(dset, (idx, thr), frames[idx, thr])
+        np.testing.assert_array_equal(dset[()], frames)
+
+
+def test_gzip_encoder_is_always_parallel() -> None:
+    assert chunk_encoder("gzip") is not None
+    assert chunk_encoder("none") is not None
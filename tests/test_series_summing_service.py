@@ -1,13 +1,20 @@
 from __future__ import annotations
 
+import json
+import os
+import threading
 import time
+from dataclasses import fields
 from pathlib import Path
 from typing import Any
 
 import numpy as np
 import pytest
-from fastapi import HTTPException
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
 
+from backend.routes.analysis import AnalysisRouteDeps, register_analysis_routes
+from backend.services.hdf5_stack import HDF5StackService
 from backend.services.series_summing import SeriesSummingDeps, SeriesSummingService
 from backend.services.series_ops import iter_sum_groups, mask_flag_value, mask_slices
 
@@ -19,7 +26,7 @@ def _wait_for_job(
     last: dict[str, Any] | None = None
     while time.time() < deadline:
         last = service.get_job(job_id)
-        if last and last.get("status") in {"done", "error"}:
+        if last and last.get("status") in {"done", "error", "cancelled"}:
             return last
         time.sleep(0.02)
     raise AssertionError(f"job did not finish in time: {last}")
@@ -32,6 +39,7 @@ def _make_deps(
     resolve_series_files,
     read_tiff,
     write_tiff,
+    get_h5py=lambda: None,
 ) -> SeriesSummingDeps:
     def _unsupported(*_args, **_kwargs):
         raise AssertionError("unsupported dependency was called in this test")
@@ -40,9 +48,11 @@ def _make_deps(
         data_dir=tmp_path,
         get_allow_abs_paths=lambda: True,
         is_within=lambda p, root: p.resolve().is_relative_to(root.resolve()),
-        logger=type("L", (), {"exception": lambda *_args, **_kwargs: None})(),
+        logger=type(
+            "L", (), {"exception": lambda *_a, **_k: None, "warning": lambda *_a, **_k: None}
+        )(),
         ensure_hdf5_stack=lambda: None,
-        get_h5py=lambda: None,
+        get_h5py=get_h5py,
         resolve_image_file=resolve_image_file,
         image_ext_name=lambda name: ".tiff" if name.lower().endswith((".tif", ".tiff")) else "",
         resolve_series_files=resolve_series_files,
@@ -56,6 +66,8 @@ def _make_deps(
         mask_slices=mask_slices,
         resolve_dataset_view=_unsupported,
         extract_frame=_unsupported,
+        extract_frames=_unsupported,
+        frame_chunk_depth=lambda _view: 1,
         find_pixel_mask=lambda *_args, **_kwargs: None,
     )
 
@@ -150,3 +162,581 @@ def test_series_summing_service_job_lifecycle_error(tmp_path: Path) -> None:
     assert float(job["progress"]) == pytest.approx(1.0)
     assert "Failed: File not found" in str(job["message"])
     assert "File not found" in str(job["error"])
+
+
+def test_series_summing_service_hdf5_output_codec(tmp_path: Path) -> None:
+    h5py = pytest.importorskip("h5py")
+    series_files = [tmp_path / f"img_{idx:04d}.tiff" for idx in range(1, 6)]
+    frames = {
+        path: np.full((3, 4), idx + 1, dtype=np.int32) for idx, path in enumerate(series_files)
+    }
+
+    service = SeriesSummingService(
+        _make_deps(
+            tmp_path,
+            resolve_image_file=lambda name: Path(name),
+            resolve_series_files=lambda _source: (list(series_files), 0),
+            read_tiff=lambda path, index: np.asarray(frames[path]),
+            write_tiff=lambda _path, _arr: None,
+            get_h5py=lambda: h5py,
+        )
+    )
+    job_id = service.start_job(
+        file=str(series_files[0]),
+        dataset="",
+        mode="chunks",
+        step=2,
+        operation="sum",
+        normalize_frame=None,
+        range_start=None,
+        range_end=None,
+        output_path=str(tmp_path / "series_out.h5"),
+        output_format="hdf5",
+        apply_mask=False,
+        compression="bitshuffle-lz4",
+    )
+    job = _wait_for_job(service, job_id)
+
+    assert job["status"] == "done", job
+    assert job["config"]["compression"] == "bitshuffle-lz4"
+    with h5py.File(job["outputs"][0], "r") as h5:
+        data = h5["/entry/data/data"][()]
+        assert h5["/entry/data/data"].attrs["compression"] == "bitshuffle-lz4"
+    np.testing.assert_array_equal(data[:, 0, 0], [3.0, 7.0, 5.0])
+
+
+def test_series_summing_service_multi_operation_single_pass(tmp_path: Path) -> None:
+    h5py = pytest.importorskip("h5py")
+    series_files = [tmp_path / f"img_{idx:04d}.tiff" for idx in range(1, 5)]
+    frames = {
+        path: np.array([[idx, 10 - idx]], dtype=np.int32) for idx, path in enumerate(series_files)
+    }
+    reads: list[Path] = []
+
+    def read_tiff(path: Path, index: int) -> np.ndarray:
+        reads.append(path)
+        return np.asarray(frames[path])
+
+    service = SeriesSummingService(
+        _make_deps(
+            tmp_path,
+            resolve_image_file=lambda name: Path(name),
+            resolve_series_files=lambda _source: (list(series_files), 0),
+            read_tiff=read_tiff,
+            write_tiff=lambda _path, _arr: None,
+            get_h5py=lambda: h5py,
+        )
+    )
+    job_id = service.start_job(
+        file=str(series_files[0]),
+        dataset="",
+        mode="all",
+        step=1,
+        operation="sum",
+        operations=["sum", "mean", "std", "min", "max"],
+        normalize_frame=None,
+        range_start=None,
+        range_end=None,
+        output_path=str(tmp_path / "stats.h5"),
+        output_format="hdf5",
+        apply_mask=False,
+    )
+    job = _wait_for_job(service, job_id)
+
+    assert job["status"] == "done", job
+    # One sample read for the frame shape plus exactly one read per frame.
+    assert len(reads) == len(series_files) + 1
+    stack = np.stack([frames[path] for path in series_files]).astype(np.float64)
+    with h5py.File(job["outputs"][0], "r") as h5:
+        group = h5["/entry/data"]
+        np.testing.assert_allclose(group["data"][0], stack.sum(axis=0))
+        np.testing.assert_allclose(group["mean"][0], stack.mean(axis=0))
+        np.testing.assert_allclose(group["std"][0], stack.std(axis=0))
+        np.testing.assert_allclose(group["min"][0], stack.min(axis=0))
+        np.testing.assert_allclose(group["max"][0], stack.max(axis=0))
+        assert group["data"].attrs["sum_operation"] == "sum"
+
+
+def test_series_summing_service_rolling_window_matches_brute_force(tmp_path: Path) -> None:
+    h5py = pytest.importorskip("h5py")
+    series_files = [tmp_path / f"img_{idx:04d}.tiff" for idx in range(1, 10)]
+    rng = np.random.default_rng(3)
+    frames = {path: rng.integers(0, 100, size=(3, 2)).astype(np.int32) for path in series_files}
+    reads: list[Path] = []
+
+    def read_tiff(path: Path, index: int) -> np.ndarray:
+        reads.append(path)
+        return np.asarray(frames[path])
+
+    service = SeriesSummingService(
+        _make_deps(
+            tmp_path,
+            resolve_image_file=lambda name: Path(name),
+            resolve_series_files=lambda _source: (list(series_files), 0),
+            read_tiff=read_tiff,
+            write_tiff=lambda _path, _arr: None,
+            get_h5py=lambda: h5py,
+        )
+    )
+    job_id = service.start_job(
+        file=str(series_files[0]),
+        dataset="",
+        mode="rolling",
+        step=4,
+        stride=2,
+        operation="sum",
+        operations=["sum", "mean"],
+        normalize_frame=None,
+        range_start=2,
+        range_end=None,
+        output_path=str(tmp_path / "rolling.h5"),
+        output_format="hdf5",
+        apply_mask=False,
+    )
+    job = _wait_for_job(service, job_id)
+
+    assert job["status"] == "done", job
+    # One sample read plus each frame of frames 2..9 read exactly once.
+    assert len(reads) == 1 + 8
+    stack = np.stack([frames[path] for path in series_files]).astype(np.float64)
+    starts = [1, 3, 5]
+    with h5py.File(job["outputs"][0], "r") as h5:
+        group = h5["/entry/data"]
+        np.testing.assert_array_equal(group["sum_start_frame"][()], starts)
+        for out_idx, start in enumerate(starts):
+            window = stack[start : start + 4]
+            np.testing.assert_allclose(group["data"][out_idx], window.sum(axis=0))
+            np.testing.assert_allclose(group["mean"][out_idx], window.mean(axis=0))
+        assert group["data"].attrs["sum_stride"] == 2
+
+
+def test_series_summing_service_rolling_rejects_order_statistics(tmp_path: Path) -> None:
+    service = SeriesSummingService(
+        _make_deps(
+            tmp_path,
+            resolve_image_file=lambda name: Path(name),
+            resolve_series_files=lambda _source: ([], 0),
+            read_tiff=lambda _path, _index: np.zeros((2, 2), dtype=np.int32),
+            write_tiff=lambda _path, _arr: None,
+        )
+    )
+    with pytest.raises(HTTPException):
+        service.start_job(
+            file="a.tiff",
+            dataset="",
+            mode="rolling",
+            step=3,
+            operation="median",
+            normalize_frame=None,
+            range_start=None,
+            range_end=None,
+            output_path=str(tmp_path / "out"),
+            output_format="tiff",
+            apply_mask=False,
+        )
+
+
+def test_series_summing_service_queue_and_cancel(tmp_path: Path) -> None:
+    h5py = pytest.importorskip("h5py")
+    series_files = [tmp_path / f"img_{idx:04d}.tiff" for idx in range(1, 4)]
+    gate = threading.Event()
+
+    def read_tiff(path: Path, index: int) -> np.ndarray:
+        gate.wait(5.0)
+        return np.ones((2, 2), dtype=np.int32)
+
+    deps = _make_deps(
+        tmp_path,
+        resolve_image_file=lambda name: Path(name),
+        resolve_series_files=lambda _source: (list(series_files), 0),
+        read_tiff=read_tiff,
+        write_tiff=lambda _path, _arr: None,
+        get_h5py=lambda: h5py,
+    )
+    service = SeriesSummingService(
+        SeriesSummingDeps(**{**deps.__dict__, "get_job_workers": lambda: 1})
+    )
+    params = dict(
+        file=str(series_files[0]),
+        dataset="",
+        mode="chunks",
+        step=1,
+        operation="sum",
+        normalize_frame=None,
+        range_start=None,
+        range_end=None,
+        output_format="hdf5",
+        apply_mask=False,
+    )
+    running_id = service.start_job(output_path=str(tmp_path / "a.h5"), **params)
+    queued_id = service.start_job(output_path=str(tmp_path / "b.h5"), **params)
+
+    assert service.get_job(queued_id)["queue_position"] == 1
+    assert service.cancel_job(queued_id)["status"] == "cancelled"
+    assert service.cancel_job(running_id)["cancel_requested"] is True
+    gate.set()
+
+    job = _wait_for_job(service, running_id)
+    assert job["status"] == "cancelled", job
+    assert job["cpu_time_s"] >= 0.0
+    assert not (tmp_path / "a.h5").exists()
+    with pytest.raises(HTTPException):
+        service.cancel_job(running_id)
+
+
+def test_series_summing_service_throttles_progress_and_streams_events(tmp_path: Path) -> None:
+    series_files = [tmp_path / f"img_{idx:04d}.tiff" for idx in range(1, 2001)]
+    service = SeriesSummingService(
+        _make_deps(
+            tmp_path,
+            resolve_image_file=lambda name: Path(name),
+            resolve_series_files=lambda _source: (list(series_files), 0),
+            read_tiff=lambda _path, index: np.ones((4, 4), dtype=np.uint16),
+            write_tiff=lambda _path, _arr: None,
+        )
+    )
+    route_deps = {field.name: None for field in fields(AnalysisRouteDeps)}
+    route_deps.update(
+        get_series_sum_job=service.get_job,
+        subscribe_series_sum_job=service.subscribe_job,
+    )
+    app = FastAPI()
+    register_analysis_routes(app, AnalysisRouteDeps(**route_deps))
+    client = TestClient(app)
+
+    job_id = service.start_job(
+        file=str(series_files[0]),
+        dataset="",
+        mode="all",
+        step=1,
+        operation="sum",
+        normalize_frame=None,
+        range_start=None,
+        range_end=None,
+        output_path=str(tmp_path / "series_out"),
+        output_format="tiff",
+        apply_mask=False,
+    )
+    events = []
+    with client.stream("GET", f"/api/analysis/jobs/{job_id}/events") as res:
+        assert res.headers["content-type"].startswith("text/event-stream")
+        for line in res.iter_lines():
+            if line.startswith("data: "):
+                events.append(json.loads(line[len("data: ") :]))
+
+    job = events[-1]
+    assert job["status"] == "done"
+    assert job["frames_done"] == job["frames_total"] == 2000
+    assert job["frames_per_s"] > 0 and job["mb_per_s"] > 0 and job["eta_s"] == 0.0
+    # Two thousand frames, but only a handful of published updates.
+    assert job["revision"] < 100
+    revisions = [event["revision"] for event in events]
+    assert revisions == sorted(set(revisions))
+    assert client.get("/api/analysis/jobs/missing/events").status_code == 404
+
+
+class _SimulatedCrash(BaseException):
+    pass
+
+
+@pytest.mark.parametrize(
+    ("mode", "step", "operations"),
+    [("chunks", 3, ["sum", "std", "max"]), ("all", 1, ["mean", "median"]), ("rolling", 4, ["sum"])],
+)
+def test_series_summing_service_resume_matches_uninterrupted_run(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mode: str, step: int, operations: list[str]
+) -> None:
+    h5py = pytest.importorskip("h5py")
+    series_files = [tmp_path / f"img_{idx:04d}.tiff" for idx in range(1, 12)]
+    series_files[0].touch()
+    rng = np.random.default_rng(5)
+    frames = {path: rng.integers(0, 50, size=(3, 4)).astype(np.int32) for path in series_files}
+    frames[series_files[6]][0, 0] = -1  # gap pixel discovered mid-series
+
+    deps = _make_deps(
+        tmp_path,
+        resolve_image_file=lambda name: Path(name),
+        resolve_series_files=lambda _source: (list(series_files), 0),
+        read_tiff=lambda path, index: np.asarray(frames[path]),
+        write_tiff=lambda _path, _arr: None,
+        get_h5py=lambda: h5py,
+    )
+    # Decode threads read ahead of the cursor; resuming must drop the frames it skips.
+    deps = SeriesSummingDeps(
+        **{
+            **deps.__dict__,
+            "get_checkpoint_interval_s": lambda: 1e-9,
+            "get_decode_workers": lambda: 3,
+        }
+    )
+    params = dict(
+        file=str(series_files[0]),
+        dataset="",
+        mode=mode,
+        step=step,
+        operation=operations[0],
+        operations=operations,
+        normalize_frame=None,
+        range_start=None,
+        range_end=None,
+        output_format="hdf5",
+        apply_mask=True,
+    )
+    reference = SeriesSummingService(deps)
+    expected_job = _wait_for_job(
+        reference, reference.start_job(output_path=str(tmp_path / "ref.h5"), **params)
+    )
+    assert expected_job["status"] == "done", expected_job
+
+    # Checkpoint after every frame; the process "dies" while writing the 7th checkpoint.
+    crashed = threading.Event()
+    store_cls = type(reference._checkpoints)
+    original_save = store_cls.save_state
+    saves = []
+
+    def save_state(store, job_id, state, arrays):
+        saves.append(job_id)
+        # Rolling windows checkpoint their sum and frame range, never the frames.
+        if mode == "rolling":
+            assert all(np.asarray(arr).size <= 12 for arr in arrays.values()), arrays
+        if len(saves) == 7:
+            crashed.set()
+            raise _SimulatedCrash()
+        original_save(store, job_id, state, arrays)
+
+    monkeypatch.setattr(store_cls, "save_state", save_state)
+    monkeypatch.setattr(threading, "excepthook", lambda _args: None)
+    interrupted = SeriesSummingService(deps)
+    job_id = interrupted.start_job(output_path=str(tmp_path / "resumed.h5"), **params)
+    assert crashed.wait(5.0)
+    monkeypatch.setattr(store_cls, "save_state", original_save)
+
+    restarted = SeriesSummingService(deps)
+    resumable = restarted.list_resumable_jobs()
+    assert [entry["id"] for entry in resumable] == [job_id]
+    assert 0.0 < resumable[0]["progress"] < 1.0
+    assert restarted.resume_job(job_id)["resumed"] is True
+    job = _wait_for_job(restarted, job_id)
+
+    assert job["status"] == "done", job
+    assert restarted.list_resumable_jobs() == []
+    with (
+        h5py.File(expected_job["outputs"][0], "r") as ref,
+        h5py.File(job["outputs"][0], "r") as out,
+    ):
+        for name in ["data", *operations[1:]]:
+            np.testing.assert_array_equal(
+                out[f"/entry/data/{name}"][()], ref[f"/entry/data/{name}"][()]
+            )
+        mask_path = "/entry/instrument/detector/detectorSpecific/pixel_mask"
+        np.testing.assert_array_equal(out[mask_path][()], ref[mask_path][()])
+
+
+def test_series_summing_service_reuses_cached_result(tmp_path: Path) -> None:
+    series_files = [tmp_path / f"img_{idx:04d}.tiff" for idx in range(1, 7)]
+    frames = {path: np.full((2, 3), idx, dtype=np.int32) for idx, path in enumerate(series_files)}
+    for path in series_files:
+        path.write_bytes(b"frame")
+    reads: list[Path] = []
+
+    def read_tiff(path: Path, index: int) -> np.ndarray:
+        reads.append(path)
+        return np.asarray(frames[path])
+
+    deps = _make_deps(
+        tmp_path,
+        resolve_image_file=lambda name: Path(name),
+        resolve_series_files=lambda _source: (list(series_files), 0),
+        read_tiff=read_tiff,
+        write_tiff=lambda path, arr: Path(path).write_bytes(np.asarray(arr).tobytes()),
+    )
+    deps = SeriesSummingDeps(**{**deps.__dict__, "get_result_cache_mb": lambda: 1})
+    service = SeriesSummingService(deps)
+    params = dict(
+        file=str(series_files[0]),
+        dataset="",
+        mode="chunks",
+        step=3,
+        operation="sum",
+        normalize_frame=None,
+        range_start=None,
+        range_end=None,
+        output_format="tiff",
+        apply_mask=False,
+    )
+    first = _wait_for_job(service, service.start_job(output_path=str(tmp_path / "a"), **params))
+    assert first["status"] == "done" and first["cached"] is False
+    assert len(reads) == 7
+
+    # Identical request: the queued job copies the cached result, nothing is read again.
+    second = _wait_for_job(
+        service, service.start_job(output_path=str(tmp_path / "b" / "b"), **params)
+    )
+    assert second["status"] == "done" and second["cached"] is True
+    assert second["message"] == "Completed from cache: wrote 2 file(s)"
+    assert len(reads) == 7
+    assert len(second["outputs"]) == 2
+    for old, new in zip(first["outputs"], second["outputs"]):
+        assert Path(new).parent == tmp_path / "b"
+        assert Path(new).name.startswith("b_chunk")
+        # Same chunk tag, new base name and timestamp (`_YYYYmmdd_HHMMSS.tiff`).
+        assert Path(new).name[1:-21] == Path(old).name[1:-21]
+        assert Path(new).read_bytes() == Path(old).read_bytes()
+
+    # A different operation or a modified source misses the cache.
+    other = service.start_job(output_path=str(tmp_path / "c"), **{**params, "step": 2})
+    assert _wait_for_job(service, other)["cached"] is False
+    series_files[3].write_bytes(b"changed frame")
+    changed = service.start_job(output_path=str(tmp_path / "d"), **params)
+    assert _wait_for_job(service, changed)["cached"] is False
+    assert len(reads) == 21
+
+
+def test_series_summing_service_cache_tracks_linked_data_files(tmp_path: Path) -> None:
+    h5py = pytest.importorskip("h5py")
+    data_file = tmp_path / "scan_data_000001.h5"
+    with h5py.File(data_file, "w") as h5:
+        h5.create_dataset("/entry/data/data", data=np.ones((4, 2, 2), dtype=np.uint32))
+    master = tmp_path / "scan_master.h5"
+    with h5py.File(master, "w") as h5:
+        h5["/entry/data/data_000001"] = h5py.ExternalLink(data_file.name, "/entry/data/data")
+    stack = HDF5StackService(
+        data_dir=tmp_path,
+        get_allow_abs_paths=lambda: True,
+        is_within=lambda p, root: True,
+        get_h5py=lambda: h5py,
+    )
+    deps = _make_deps(
+        tmp_path,
+        resolve_image_file=lambda name: Path(name),
+        resolve_series_files=lambda _source: ([], 0),
+        read_tiff=lambda _path, _index: np.zeros((2, 2)),
+        write_tiff=lambda _path, _arr: None,
+        get_h5py=lambda: h5py,
+    )
+    service = SeriesSummingService(
+        SeriesSummingDeps(
+            **{
+                **deps.__dict__,
+                "image_ext_name": lambda name: Path(name).suffix.lower(),
+                "resolve_dataset_view": stack.resolve_dataset_view,
+                "extract_frame": stack.extract_frame,
+                "extract_frames": stack.extract_frames,
+                "frame_chunk_depth": stack.frame_chunk_depth,
+                "get_result_cache_mb": lambda: 1,
+            }
+        )
+    )
+    params = dict(
+        file=str(master),
+        dataset="/entry/data",
+        mode="all",
+        step=1,
+        operation="sum",
+        normalize_frame=None,
+        range_start=None,
+        range_end=None,
+        output_format="hdf5",
+        apply_mask=False,
+    )
+    first = _wait_for_job(service, service.start_job(output_path=str(tmp_path / "a.h5"), **params))
+    assert first["status"] == "done" and first["cached"] is False, first
+
+    # The master keeps its size and mtime; only the linked data file changes.
+    with h5py.File(data_file, "a") as h5:
+        h5["/entry/data/data"][...] = 5
+    stat = data_file.stat()
+    os.utime(data_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    second = _wait_for_job(service, service.start_job(output_path=str(tmp_path / "b.h5"), **params))
+    assert second["status"] == "done" and second["cached"] is False, second
+    with h5py.File(second["outputs"][0], "r") as h5:
+        np.testing.assert_array_equal(h5["/entry/data/data"][0], np.full((2, 2), 20))
+
+
+def test_series_summing_service_file_series_dark_flat_and_normalize(tmp_path: Path) -> None:
+    h5py = pytest.importorskip("h5py")
+    series_files = [tmp_path / f"img_{idx:04d}.tiff" for idx in range(1, 7)]
+    rng = np.random.default_rng(11)
+    frames = {path: rng.integers(20, 90, size=(3, 4)).astype(np.int32) for path in series_files}
+    frames[series_files[2]][1, 1] = -1  # gap pixel
+    dark_path = tmp_path / "dark.tiff"
+    gain_path = tmp_path / "gain.tiff"
+    frames[dark_path] = rng.integers(0, 10, size=(3, 4)).astype(np.int32)
+    frames[gain_path] = rng.uniform(0.5, 2.0, size=(3, 4))
+
+    service = SeriesSummingService(
+        _make_deps(
+            tmp_path,
+            resolve_image_file=lambda name: Path(name),
+            resolve_series_files=lambda _source: (list(series_files), 0),
+            read_tiff=lambda path, index: np.asarray(frames[path]),
+            write_tiff=lambda _path, _arr: None,
+            get_h5py=lambda: h5py,
+        )
+    )
+    job_id = service.start_job(
+        file=str(series_files[0]),
+        dataset="",
+        mode="all",
+        step=1,
+        operation="sum",
+        normalize_frame=2,
+        range_start=None,
+        range_end=None,
+        output_path=str(tmp_path / "corrected.h5"),
+        output_format="hdf5",
+        apply_mask=True,
+        dark_file=str(dark_path),
+        flat_file=str(gain_path),
+        flat_mode="gain",
+    )
+    job = _wait_for_job(service, job_id)
+
+    assert job["status"] == "done", job
+    assert job["config"]["flat_mode"] == "gain"
+    stack = np.stack([frames[path] for path in series_files]).astype(np.float64)
+    corrected = (np.clip(stack, 0, None) - frames[dark_path]) * frames[gain_path]
+    expected = (corrected / corrected[1]).sum(axis=0)
+    with h5py.File(job["outputs"][0], "r") as h5:
+        data = h5["/entry/data/data"][0]
+        assert h5.attrs["flat_mode"] == "gain"
+    assert data[1, 1] == mask_flag_value(np.dtype(np.int32))
+    keep = np.ones((3, 4), dtype=bool)
+    keep[1, 1] = False
+    np.testing.assert_allclose(data[keep], expected[keep])
+
+
+def test_series_summing_service_runs_without_checkpoints_when_they_cannot_be_written(
+    tmp_path: Path,
+) -> None:
+    h5py = pytest.importorskip("h5py")
+    series_files = [tmp_path / f"img_{idx:04d}.tiff" for idx in range(1, 4)]
+    (tmp_path / ".albis_cache").write_text("not a directory")
+    deps = _make_deps(
+        tmp_path,
+        resolve_image_file=lambda name: Path(name),
+        resolve_series_files=lambda _source: (list(series_files), 0),
+        read_tiff=lambda path, index: np.ones((2, 2), dtype=np.int32),
+        write_tiff=lambda _path, _arr: None,
+        get_h5py=lambda: h5py,
+    )
+    service = SeriesSummingService(
+        SeriesSummingDeps(**{**deps.__dict__, "get_checkpoint_interval_s": lambda: 60.0})
+    )
+    job_id = service.start_job(
+        file=str(series_files[0]),
+        dataset="",
+        mode="all",
+        step=1,
+        operation="sum",
+        normalize_frame=None,
+        range_start=None,
+        range_end=None,
+        output_path=str(tmp_path / "out.h5"),
+        output_format="hdf5",
+        apply_mask=False,
+    )
+    job = _wait_for_job(service, job_id)
+    assert job["status"] == "done", job
+    with h5py.File(job["outputs"][0], "r") as h5:
+        np.testing.assert_array_equal(h5["/entry/data/data"][0], np.full((2, 2), 3.0))